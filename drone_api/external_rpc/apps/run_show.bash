@@ -9,6 +9,9 @@ SHOW_JSON="${REPO_ROOT}/config/drone-show-config/show-h-a-100-ref.json"
 DRONES_CSV=""
 DRONE_COUNT=""
 ASSIGN_MODE="index"
+TRANSITION_PLAN="off"
+SAFE_RADIUS=""
+SPEED_MODE="sync"
 TAKEOFF_ALT=""
 SPEED_M_S="1.5"
 TOLERANCE_M="0.5"
@@ -22,6 +25,8 @@ BATCH_GOTO=""
 BATCH_LAND=""
 INIT_RETRY_MAX=""
 INIT_RETRY_INTERVAL_SEC=""
+INIT_DEADLINE_SEC=""
+PART_FILES_CSV=""
 READY_GATE_TIMEOUT_SEC=""
 READY_GATE_INTERVAL_SEC=""
 READY_GATE_CALL_TIMEOUT_SEC=""
@@ -41,9 +46,12 @@ Options:
   --show-config PATH   # alias of --show-json
   --drones CSV
   --drone-count N
-  --assign-mode index|nearest
+  --assign-mode index|nearest|minmax
+  --transition-plan off|check|speed|stagger
+  --safe-radius M
   --takeoff-alt M
   --speed MPS
+  --speed-mode sync|fixed
   --tolerance M
   --timeout-sec SEC
   --batch-size N      # 0:auto, <0:off, >0:chunk size
@@ -51,7 +59,9 @@ Options:
   --batch-goto N      # goto 用
   --batch-land N      # land 用
   --init-retry-max N  # set_ready/takeoff の最大リトライ回数
-  --init-retry-interval-sec SEC  # set_ready/takeoff のリトライ間隔[sec]
+  --init-retry-interval-sec SEC  # set_ready/takeoff のリトライ初期間隔[sec](失敗ごとに倍増)
+  --init-deadline-sec SEC        # set_ready/takeoff リトライ全体の期限[sec](0:無制限)
+  --part-files CSV               # drone-service プロセスごとの fleet part config(サーキットブレーカ単位)
   --ready-gate-timeout-sec SEC   # set_ready前のget_state到達待ちタイムアウト
   --ready-gate-interval-sec SEC  # set_ready前のget_state再確認間隔
   --ready-gate-call-timeout-sec SEC # ready gate 1回あたりの待ち時間
@@ -73,8 +83,11 @@ while [[ $# -gt 0 ]]; do
     --drones) DRONES_CSV="$2"; shift 2 ;;
     --drone-count) DRONE_COUNT="$2"; shift 2 ;;
     --assign-mode) ASSIGN_MODE="$2"; shift 2 ;;
+    --transition-plan) TRANSITION_PLAN="$2"; shift 2 ;;
+    --safe-radius) SAFE_RADIUS="$2"; shift 2 ;;
     --takeoff-alt) TAKEOFF_ALT="$2"; shift 2 ;;
     --speed) SPEED_M_S="$2"; shift 2 ;;
+    --speed-mode) SPEED_MODE="$2"; shift 2 ;;
     --tolerance) TOLERANCE_M="$2"; shift 2 ;;
     --timeout-sec) TIMEOUT_SEC="$2"; TIMEOUT_SEC_EXPLICIT="1"; shift 2 ;;
     --batch-size) BATCH_SIZE="$2"; shift 2 ;;
@@ -83,6 +96,8 @@ while [[ $# -gt 0 ]]; do
     --batch-land) BATCH_LAND="$2"; shift 2 ;;
     --init-retry-max) INIT_RETRY_MAX="$2"; shift 2 ;;
     --init-retry-interval-sec) INIT_RETRY_INTERVAL_SEC="$2"; shift 2 ;;
+    --init-deadline-sec) INIT_DEADLINE_SEC="$2"; shift 2 ;;
+    --part-files) PART_FILES_CSV="$2"; shift 2 ;;
     --ready-gate-timeout-sec) READY_GATE_TIMEOUT_SEC="$2"; shift 2 ;;
     --ready-gate-interval-sec) READY_GATE_INTERVAL_SEC="$2"; shift 2 ;;
     --ready-gate-call-timeout-sec) READY_GATE_CALL_TIMEOUT_SEC="$2"; shift 2 ;;
@@ -124,13 +139,15 @@ fi
 echo "[show-runner] service_config=${SERVICE_CONFIG}"
 echo "[show-runner] show_json=${SHOW_JSON}"
 echo "[show-runner] drones=${DRONES[*]}"
-echo "[show-runner] assign_mode=${ASSIGN_MODE} timeout_sec=${TIMEOUT_SEC}"
+echo "[show-runner] assign_mode=${ASSIGN_MODE} transition_plan=${TRANSITION_PLAN} timeout_sec=${TIMEOUT_SEC}"
 echo "[show-runner] batch_size=${BATCH_SIZE}"
 [[ -n "${BATCH_INIT}" ]] && echo "[show-runner] batch_init=${BATCH_INIT}"
 [[ -n "${BATCH_GOTO}" ]] && echo "[show-runner] batch_goto=${BATCH_GOTO}"
 [[ -n "${BATCH_LAND}" ]] && echo "[show-runner] batch_land=${BATCH_LAND}"
 [[ -n "${INIT_RETRY_MAX}" ]] && echo "[show-runner] init_retry_max=${INIT_RETRY_MAX}"
 [[ -n "${INIT_RETRY_INTERVAL_SEC}" ]] && echo "[show-runner] init_retry_interval_sec=${INIT_RETRY_INTERVAL_SEC}"
+[[ -n "${INIT_DEADLINE_SEC}" ]] && echo "[show-runner] init_deadline_sec=${INIT_DEADLINE_SEC}"
+[[ -n "${PART_FILES_CSV}" ]] && echo "[show-runner] part_files=${PART_FILES_CSV}"
 [[ -n "${READY_GATE_TIMEOUT_SEC}" ]] && echo "[show-runner] ready_gate_timeout_sec=${READY_GATE_TIMEOUT_SEC}"
 [[ -n "${READY_GATE_INTERVAL_SEC}" ]] && echo "[show-runner] ready_gate_interval_sec=${READY_GATE_INTERVAL_SEC}"
 [[ -n "${READY_GATE_CALL_TIMEOUT_SEC}" ]] && echo "[show-runner] ready_gate_call_timeout_sec=${READY_GATE_CALL_TIMEOUT_SEC}"
@@ -145,7 +162,9 @@ CMD=(
   --show-json "${SHOW_JSON}"
   --drones "${DRONES[@]}"
   --assign-mode "${ASSIGN_MODE}"
+  --transition-plan "${TRANSITION_PLAN}"
   --speed "${SPEED_M_S}"
+  --speed-mode "${SPEED_MODE}"
   --tolerance "${TOLERANCE_M}"
   --timeout-sec "${TIMEOUT_SEC}"
   --batch-size "${BATCH_SIZE}"
@@ -153,6 +172,9 @@ CMD=(
   --init-concurrency-per-proc "${INIT_CONCURRENCY_PER_PROC}"
 )
 
+if [[ -n "${SAFE_RADIUS}" ]]; then
+  CMD+=(--safe-radius "${SAFE_RADIUS}")
+fi
 if [[ -n "${TAKEOFF_ALT}" ]]; then
   CMD+=(--takeoff-alt "${TAKEOFF_ALT}")
 fi
@@ -171,6 +193,13 @@ fi
 if [[ -n "${INIT_RETRY_INTERVAL_SEC}" ]]; then
   CMD+=(--init-retry-interval-sec "${INIT_RETRY_INTERVAL_SEC}")
 fi
+if [[ -n "${INIT_DEADLINE_SEC}" ]]; then
+  CMD+=(--init-deadline-sec "${INIT_DEADLINE_SEC}")
+fi
+if [[ -n "${PART_FILES_CSV}" ]]; then
+  IFS=',' read -r -a PART_FILES <<< "${PART_FILES_CSV}"
+  CMD+=(--part-files "${PART_FILES[@]}")
+fi
 if [[ -n "${READY_GATE_TIMEOUT_SEC}" ]]; then
   CMD+=(--ready-gate-timeout-sec "${READY_GATE_TIMEOUT_SEC}")
 fi
@@ -11,8 +11,15 @@ DRONES_CSV=""
 DRONE_COUNT=""
 ASSET_NAME="ShowRunnerAsset"
 PROC_COUNT="1"
+WORKERS="1"
+PART_FILES_CSV=""
 SUMMARY_JSON=""
 ASSIGN_MODE="index"
+TRANSITION_PLAN="off"
+SAFE_RADIUS=""
+SPEED_MODE="sync"
+SCHEDULE=""
+COMPILE_SCHEDULE=""
 TAKEOFF_ALT=""
 Z_OFFSET_M="0.0"
 SPEED_M_S="1.5"
@@ -36,11 +43,18 @@ Options:
   --drone-count N
   --asset-name NAME
   --proc-count N
+  --workers N          # fleet part をまとめた asset プロセス数 (1: 単一 asset)
+  --part-files CSV     # drone-service プロセスごとの fleet part config (--workers の分割単位)
   --summary-json PATH
-  --assign-mode index|nearest
+  --assign-mode index|nearest|minmax
+  --transition-plan off|check|speed|stagger
+  --safe-radius M
   --takeoff-alt M
   --z-offset-m M
   --speed MPS
+  --speed-mode sync|fixed
+  --compile-schedule PATH  # goto 計画をバイナリ schedule に書き出して終了
+  --schedule PATH      # --compile-schedule の schedule で goto を実行
   --tolerance M
   --timeout-sec SEC
   --delta-time-msec MSEC
@@ -60,11 +74,18 @@ while [[ $# -gt 0 ]]; do
     --drone-count) DRONE_COUNT="$2"; shift 2 ;;
     --asset-name) ASSET_NAME="$2"; shift 2 ;;
     --proc-count) PROC_COUNT="$2"; shift 2 ;;
+    --workers) WORKERS="$2"; shift 2 ;;
+    --part-files) PART_FILES_CSV="$2"; shift 2 ;;
     --summary-json) SUMMARY_JSON="$2"; shift 2 ;;
     --assign-mode) ASSIGN_MODE="$2"; shift 2 ;;
+    --transition-plan) TRANSITION_PLAN="$2"; shift 2 ;;
+    --safe-radius) SAFE_RADIUS="$2"; shift 2 ;;
     --takeoff-alt) TAKEOFF_ALT="$2"; shift 2 ;;
     --z-offset-m) Z_OFFSET_M="$2"; shift 2 ;;
     --speed) SPEED_M_S="$2"; shift 2 ;;
+    --speed-mode) SPEED_MODE="$2"; shift 2 ;;
+    --schedule) SCHEDULE="$2"; shift 2 ;;
+    --compile-schedule) COMPILE_SCHEDULE="$2"; shift 2 ;;
     --tolerance) TOLERANCE_M="$2"; shift 2 ;;
     --timeout-sec) TIMEOUT_SEC="$2"; shift 2 ;;
     --delta-time-msec) DELTA_TIME_MSEC="$2"; shift 2 ;;
@@ -92,12 +113,15 @@ IFS=',' read -r -a DRONES <<< "${DRONES_CSV}"
 echo "[show-asset-runner] service_config=${SERVICE_CONFIG}"
 echo "[show-asset-runner] show_json=${SHOW_JSON}"
 echo "[show-asset-runner] drones=${DRONES[*]}"
-echo "[show-asset-runner] assign_mode=${ASSIGN_MODE} timeout_sec=${TIMEOUT_SEC}"
+echo "[show-asset-runner] assign_mode=${ASSIGN_MODE} transition_plan=${TRANSITION_PLAN} timeout_sec=${TIMEOUT_SEC}"
 echo "[show-asset-runner] asset_name=${ASSET_NAME} delta_time_msec=${DELTA_TIME_MSEC}"
 echo "[show-asset-runner] z_offset_m=${Z_OFFSET_M}"
 echo "[show-asset-runner] final_hold_extra_sec=${FINAL_HOLD_EXTRA_SEC}"
-echo "[show-asset-runner] proc_count=${PROC_COUNT}"
+echo "[show-asset-runner] proc_count=${PROC_COUNT} workers=${WORKERS}"
+[[ -n "${PART_FILES_CSV}" ]] && echo "[show-asset-runner] part_files=${PART_FILES_CSV}"
 [[ -n "${SUMMARY_JSON}" ]] && echo "[show-asset-runner] summary_json=${SUMMARY_JSON}"
+[[ -n "${SCHEDULE}" ]] && echo "[show-asset-runner] schedule=${SCHEDULE}"
+[[ -n "${COMPILE_SCHEDULE}" ]] && echo "[show-asset-runner] compile_schedule=${COMPILE_SCHEDULE}"
 
 CMD=(
   python3 "${SCRIPT_DIR}/show_asset_runner.py"
@@ -106,9 +130,12 @@ CMD=(
   --drones "${DRONES[@]}"
   --asset-name "${ASSET_NAME}"
   --proc-count "${PROC_COUNT}"
+  --workers "${WORKERS}"
   --assign-mode "${ASSIGN_MODE}"
+  --transition-plan "${TRANSITION_PLAN}"
   --z-offset-m "${Z_OFFSET_M}"
   --speed "${SPEED_M_S}"
+  --speed-mode "${SPEED_MODE}"
   --tolerance "${TOLERANCE_M}"
   --timeout-sec "${TIMEOUT_SEC}"
   --delta-time-msec "${DELTA_TIME_MSEC}"
@@ -121,6 +148,19 @@ fi
 if [[ -n "${SUMMARY_JSON}" ]]; then
   CMD+=(--summary-json "${SUMMARY_JSON}")
 fi
+if [[ -n "${PART_FILES_CSV}" ]]; then
+  IFS=',' read -r -a PART_FILES <<< "${PART_FILES_CSV}"
+  CMD+=(--part-files "${PART_FILES[@]}")
+fi
+if [[ -n "${SCHEDULE}" ]]; then
+  CMD+=(--schedule "${SCHEDULE}")
+fi
+if [[ -n "${COMPILE_SCHEDULE}" ]]; then
+  CMD+=(--compile-schedule "${COMPILE_SCHEDULE}")
+fi
+if [[ -n "${SAFE_RADIUS}" ]]; then
+  CMD+=(--safe-radius "${SAFE_RADIUS}")
+fi
 if [[ -n "${TAKEOFF_ALT}" ]]; then
   CMD+=(--takeoff-alt "${TAKEOFF_ALT}")
 fi
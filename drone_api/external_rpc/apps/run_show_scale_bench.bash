@@ -87,6 +87,7 @@ exec bash "${SCRIPT_DIR}/run_show.bash" \
   --batch-init "${BATCH_INIT}" \
   --batch-goto "${BATCH_GOTO}" \
   --speed "${SPEED_M_S}" \
+  --speed-mode fixed \
   --timeout-sec "${TIMEOUT_SEC}" \
   --use-async-shared \
   "$@" | tee "${LOG_PATH}"
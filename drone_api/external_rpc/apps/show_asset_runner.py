@@ -3,7 +3,11 @@ from __future__ import annotations
 
 import argparse
 import json
+import os
+import shutil
+import subprocess
 import sys
+import tempfile
 import time
 import traceback
 from dataclasses import dataclass
@@ -25,8 +29,25 @@ from load_show_config import resolve_show_config
 
 from hakosim_async_shared_asset_rpc import AssetAsyncSharedHakoniwaRpcDroneClient
 from hakosim_rpc import DEFAULT_SERVICE_CONFIG_PATH
-from service_config_loader import create_runtime_service_config
-from show_runner import assign_index, assign_nearest, any_failed, world_points_from_formation
+from poll_scheduler import PollScheduler
+from service_config_loader import load_runtime_service_config
+from service_registration import register_services
+from show_schedule import ScheduleStep, ShowSchedule, resolved_show_digest, write_schedule
+from formation_assignment import assign_formation, travel_distances
+from phase_barrier import PhaseBarrierClient, PhaseBarrierServer, format_address, parse_address
+from retry_policy import load_partitions, split_partitions
+from show_runner import assign_index, any_failed, world_points_from_formation
+from transition_planner import (
+    PLAN_MODES,
+    SPEED_MODES,
+    arrival_spread,
+    arrival_times,
+    plan_transition,
+    synchronized_speeds,
+)
+
+# Solver timings in the step stats; left out of compiled schedules.
+_TIMING_KEYS = ("solve_sec", "plan_sec")
 
 
 def parse_args() -> argparse.Namespace:
@@ -43,10 +64,96 @@ def parse_args() -> argparse.Namespace:
     p.add_argument("--asset-name", default="ShowRunnerAsset", help="Hakoniwa asset name")
     p.add_argument("--proc-count", type=int, default=1, help="Number of drone-service processes")
     p.add_argument("--summary-json", type=Path, help="Optional summary JSON output path")
-    p.add_argument("--assign-mode", choices=["index", "nearest"], default="index")
+    p.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help=(
+            "Run one asset process per group of fleet parts; phases start together "
+            "through a local barrier and summary JSON is aggregated (1: single asset)"
+        ),
+    )
+    p.add_argument(
+        "--part-files",
+        type=Path,
+        nargs="+",
+        help=(
+            "Fleet part configs (one per drone-service process) split among --workers "
+            "(default: split the drones into --proc-count parts)"
+        ),
+    )
+    # Set by the --workers parent for each worker process.
+    p.add_argument("--worker-index", type=int, default=None, help=argparse.SUPPRESS)
+    p.add_argument("--worker-drones", nargs="+", default=None, help=argparse.SUPPRESS)
+    p.add_argument("--barrier-address", default=None, help=argparse.SUPPRESS)
+    p.add_argument(
+        "--assign-mode",
+        choices=["index", "nearest", "minmax"],
+        default="index",
+        help="nearest: minimum total travel, minmax: minimum longest leg first",
+    )
+    p.add_argument(
+        "--assign-exact-max",
+        type=int,
+        default=None,
+        help="Largest fleet solved exactly; larger fleets use greedy assignment",
+    )
+    p.add_argument(
+        "--transition-plan",
+        choices=list(PLAN_MODES),
+        default="off",
+        help=(
+            "Check goto paths against --safe-radius (check) and fix conflicts by slowing "
+            "(speed) or delaying (stagger) drones"
+        ),
+    )
+    p.add_argument(
+        "--safe-radius",
+        type=float,
+        default=None,
+        help="Minimum separation for --transition-plan [m] (default: show options.min_distance)",
+    )
+    p.add_argument(
+        "--compile-schedule",
+        type=Path,
+        default=None,
+        help=(
+            "Plan every goto step (assignment, speeds, start offsets) offline, write "
+            "a binary schedule to this path and exit"
+        ),
+    )
+    p.add_argument(
+        "--schedule",
+        type=Path,
+        default=None,
+        help=(
+            "Run gotos from a schedule written by --compile-schedule instead of "
+            "planning them at each phase start"
+        ),
+    )
     p.add_argument("--takeoff-alt", type=float, help="Takeoff altitude [m] (default: base_alt)")
     p.add_argument("--z-offset-m", type=float, default=0.0, help="Additional Z offset applied to all formation points [m]")
-    p.add_argument("--speed", type=float, default=1.5, help="GoTo speed [m/s]")
+    p.add_argument(
+        "--speed",
+        type=float,
+        default=1.5,
+        help="GoTo speed [m/s] (sync: first goto only, and max speed when the show has none)",
+    )
+    p.add_argument(
+        "--speed-mode",
+        choices=list(SPEED_MODES),
+        default="sync",
+        help=(
+            "sync: per-drone speed from leg length and step duration_sec so the "
+            "formation arrives together (capped by show options.max_speed); fixed: --speed"
+        ),
+    )
+    p.add_argument(
+        "--arrival-slack-sec",
+        type=float,
+        default=5.0,
+        help="GoTo timeout margin over the planned arrival time [sec]",
+    )
     p.add_argument("--tolerance", type=float, default=0.5, help="GoTo tolerance [m]")
     p.add_argument("--timeout-sec", type=float, default=90.0, help="Per-command timeout [sec]")
     p.add_argument("--delta-time-msec", type=int, default=20, help="Asset manual step interval [msec]")
@@ -55,8 +162,9 @@ def parse_args() -> argparse.Namespace:
         type=int,
         default=10,
         help=(
-            "Wall-clock sleep when an RPC poll has no response [msec]. "
-            "Use 0 for no wall-clock sleep."
+            "Upper bound of the wall-clock sleep when an RPC poll has no response "
+            "[msec]; the actual wait adapts to outstanding requests and recent "
+            "completions. Use 0 for no wall-clock sleep."
         ),
     )
     p.add_argument(
@@ -82,9 +190,21 @@ def parse_args() -> argparse.Namespace:
     args = p.parse_args()
     if args.poll_sleep_msec < 0:
         p.error("--poll-sleep-msec must be >= 0")
+    if args.workers < 1:
+        p.error("--workers must be >= 1")
+    if args.schedule is not None and args.compile_schedule is not None:
+        p.error("--schedule and --compile-schedule are exclusive")
     return args
 
 
+def resolve_drone_names(args: argparse.Namespace) -> list[str]:
+    if args.drones:
+        return list(args.drones)
+    if args.drone_count:
+        return [f"Drone-{i}" for i in range(1, args.drone_count + 1)]
+    raise SystemExit("Either --drones or --drone-count is required")
+
+
 @dataclass
 class Phase:
     name: str
@@ -103,6 +223,7 @@ class AssetAsyncSharedFleet:
         timeout_msec: int,
     ) -> None:
         self.drone_names = list(drone_names)
+        self.service_config_path = service_config_path
         self.clients = {
             drone_name: AssetAsyncSharedHakoniwaRpcDroneClient(
                 drone_name=drone_name,
@@ -115,9 +236,12 @@ class AssetAsyncSharedFleet:
             for drone_name in self.drone_names
         }
 
-    def prepare_services(self, service_types: list[str]) -> None:
-        for client in self.clients.values():
-            client.prepare_services(service_types)
+    def prepare_services(self, service_types: list[str]) -> dict:
+        return register_services(
+            self.clients,
+            service_types,
+            service_config_path=self.service_config_path,
+        )
 
     def poll_once(self) -> int:
         runtime_ids: set[int] = set()
@@ -140,21 +264,23 @@ class AssetAsyncSharedFleet:
         self,
         assignments: dict[str, tuple[float, float, float]],
         *,
-        speed_m_s: float,
+        speed_m_s: float | dict[str, float],
         tolerance_m: float,
         timeout_sec: float,
+        yaw_deg: float | dict[str, float] = 0.0,
     ) -> list:
+        """goto for every drone in assignments; speed_m_s and yaw_deg may be given per drone."""
         return [
             self.clients[d].goto_async(
-                assignments[d][0],
-                assignments[d][1],
-                assignments[d][2],
-                yaw_deg=0.0,
-                speed_m_s=speed_m_s,
+                target[0],
+                target[1],
+                target[2],
+                yaw_deg=yaw_deg[d] if isinstance(yaw_deg, dict) else yaw_deg,
+                speed_m_s=speed_m_s[d] if isinstance(speed_m_s, dict) else speed_m_s,
                 tolerance_m=tolerance_m,
                 timeout_sec=timeout_sec,
             )
-            for d in self.drone_names
+            for d, target in assignments.items()
         ]
 
     def land_async_all(self) -> list:
@@ -175,15 +301,38 @@ class AssetShowStateMachine:
             raise SystemExit(
                 f"drone count ({len(self.drone_names)}) must equal show meta.drone_count ({self.meta.get('drone_count')})"
             )
+        # Assignment and planning always cover the whole fleet (every worker gets
+        # the same result); only local_drones are commanded by this process.
+        self.local_drones = list(args.worker_drones or self.drone_names)
+        self.barrier: PhaseBarrierClient | None = None
         self.center = self.options.get("center", [0.0, 0.0, 0.0])
         self.scale = float(self.options.get("scale", 1.0))
         self.base_alt = float(self.options.get("base_alt", 0.0))
         self.z_offset_m = float(args.z_offset_m)
+        self.safe_radius = (
+            args.safe_radius
+            if args.safe_radius is not None
+            else float(self.options.get("min_distance", 0.0))
+        )
+        self.max_speed = float(self.options.get("max_speed", args.speed))
+        self.schedule = self._load_schedule(args.schedule) if args.schedule else None
         self.takeoff_alt = (
             args.takeoff_alt if args.takeoff_alt is not None else max(0.5, self.base_alt)
         )
         self.estimated_positions: dict[str, tuple[float, float, float]] | None = None
+        self.assignment_stats: list[dict] = []
+        self.transition_stats: list[dict] = []
+        self.arrival_stats: list[dict] = []
+        # Current goto phase: planned arrival [sec], futures not seen done yet,
+        # and realized arrival [sec] (simulation time since the phase start).
+        self.planned_arrivals: dict[str, float] = {}
+        self.arrival_waiting: dict[str, object] = {}
+        self.realized_arrivals: dict[str, float] = {}
         self.pending = []
+        # Staggered goto starts: (simulation time [usec], drone_name, goto kwargs)
+        self.deferred: list[tuple[int, str, dict]] = []
+        self.poll_max_sec = args.poll_sleep_msec / 1000.0
+        self.poll_scheduler = PollScheduler(short_max_sec=self.poll_max_sec)
         self.phase_index = 0
         self.hold_remaining_usec = 0
         self.final_settle_remaining_usec = 0
@@ -192,6 +341,7 @@ class AssetShowStateMachine:
         self.failure_logged = False
         self.prepared = False
         self.prepare_attempts = 0
+        self.registration_stats: dict = {}
         self.fleet: AssetAsyncSharedFleet | None = None
         self.total_t0 = time.perf_counter()
         self.execution_wall_t0: float | None = None
@@ -234,14 +384,45 @@ class AssetShowStateMachine:
             self.real_time_sync_sleep_count += 1
 
     def _resolve_drones(self) -> list[str]:
-        if self.args.drones:
-            return list(self.args.drones)
-        if self.args.drone_count:
-            return [f"Drone-{i}" for i in range(1, self.args.drone_count + 1)]
-        raise SystemExit("Either --drones or --drone-count is required")
+        return resolve_drone_names(self.args)
+
+    def _plan_params(self) -> dict:
+        """Arguments that change the goto plan (recorded in compiled schedules)."""
+        return {
+            "assign_mode": self.args.assign_mode,
+            "speed_mode": self.args.speed_mode,
+            "transition_plan": self.args.transition_plan,
+            "safe_radius_m": self.safe_radius,
+            "speed_m_s": self.args.speed,
+            "max_speed_m_s": self.max_speed,
+            "tolerance_m": self.args.tolerance,
+            "z_offset_m": self.z_offset_m,
+            "timeout_sec": self.args.timeout_sec,
+            "arrival_slack_sec": self.args.arrival_slack_sec,
+        }
+
+    def _load_schedule(self, path: Path) -> ShowSchedule:
+        try:
+            schedule = ShowSchedule(path.resolve())
+        except (OSError, ValueError) as e:
+            raise SystemExit(f"cannot load schedule {path}: {e}") from e
+        if schedule.drone_names != self.drone_names:
+            raise SystemExit(f"schedule {path} was compiled for other drones")
+        if schedule.meta.get("show_sha256") != resolved_show_digest(self.resolved):
+            raise SystemExit(f"schedule {path} was compiled from another show config")
+        if len(schedule.steps) != len(self.timeline):
+            raise SystemExit(
+                f"schedule {path} has {len(schedule.steps)} steps, show timeline has {len(self.timeline)}"
+            )
+        # The compiled plan wins; say so when the command line asks for another one.
+        for key, value in self._plan_params().items():
+            if schedule.meta.get(key) != value:
+                print(f"WARN: schedule {key}={schedule.meta.get(key)} overrides {value}")
+        return schedule
 
     def _write_summary(self, status: str, error: str | None = None) -> None:
         if self.summary_written or self.args.summary_json is None:
+            self._finish_barrier(status)
             return
         total_sec = time.perf_counter() - self.total_t0
         wall_elapsed_sec = (
@@ -275,8 +456,9 @@ class AssetShowStateMachine:
             "asset_name": self.args.asset_name,
             "show_name": self.meta.get("name", "unknown"),
             "show_json": str(self.args.show_json.resolve()),
-            "drone_count": len(self.drone_names),
+            "drone_count": len(self.local_drones),
             "proc_count": int(self.args.proc_count),
+            "worker_index": self.args.worker_index,
             "assign_mode": self.args.assign_mode,
             "delta_time_msec": int(self.args.delta_time_msec),
             "real_time_sync": bool(self.args.real_time_sync),
@@ -292,11 +474,52 @@ class AssetShowStateMachine:
                 "elapsed_sec": simulation_elapsed_sec,
             },
             "real_time_factor": real_time_factor,
+            "registration": self.registration_stats,
+            "poll": self.poll_scheduler.get_stats(),
+            "assignment": {
+                "travel_total_m": sum(
+                    step["total_distance_m"] or 0.0 for step in self.assignment_stats
+                ),
+                "travel_max_m": max(
+                    (step["max_distance_m"] or 0.0 for step in self.assignment_stats),
+                    default=0.0,
+                ),
+                "steps": self.assignment_stats,
+            },
+            "transition": {
+                "mode": self.args.transition_plan,
+                "safe_radius_m": self.safe_radius,
+                "steps": self.transition_stats,
+            },
+            "arrival": {
+                "speed_mode": self.args.speed_mode,
+                "max_speed_m_s": self.max_speed,
+                "realized_spread_max_sec": max(
+                    (step.get("realized_spread_sec", 0.0) for step in self.arrival_stats),
+                    default=0.0,
+                ),
+                "steps": self.arrival_stats,
+            },
+            "schedule": (
+                {
+                    "path": str(self.schedule.path),
+                    "sha256": self.schedule.sha256,
+                    "meta": self.schedule.meta,
+                }
+                if self.schedule is not None
+                else None
+            ),
         }
         path = self.args.summary_json.resolve()
         path.parent.mkdir(parents=True, exist_ok=True)
         path.write_text(json.dumps(payload, ensure_ascii=True, indent=2) + "\n", encoding="utf-8")
         self.summary_written = True
+        self._finish_barrier(status)
+
+    def _finish_barrier(self, status: str) -> None:
+        # Sent after the summary is written: the parent aggregates on finish.
+        if self.barrier is not None:
+            self.barrier.finish(status)
 
     def _build_phases(self) -> list[Phase]:
         phases: list[Phase] = []
@@ -320,7 +543,7 @@ class AssetShowStateMachine:
             phases.append(
                 Phase(
                     name=f"goto#{idx}:{fid}",
-                    submit=self._make_goto_submit(fid=fid, duration=duration),
+                    submit=self._make_goto_submit(index=idx - 1, fid=fid, duration=duration),
                     on_complete=self._make_goto_complete(fid=fid, step=step),
                 )
             )
@@ -340,45 +563,192 @@ class AssetShowStateMachine:
                 raise RuntimeError(f"{phase_name} failed")
         return _handler
 
-    def _make_goto_submit(self, *, fid: str, duration: float) -> Callable[[], list]:
+    def _make_goto_submit(self, *, index: int, fid: str, duration: float) -> Callable[[], list]:
         def _submit() -> list:
-            world_points = world_points_from_formation(
-                self.formations[fid]["points"],
-                center=self.center,
-                scale=self.scale,
-                base_alt=self.base_alt,
-            )
-            if self.z_offset_m != 0.0:
-                world_points = [
-                    (point[0], point[1], point[2] + self.z_offset_m)
-                    for point in world_points
-                ]
-            if self.args.assign_mode == "index" or self.estimated_positions is None:
-                assignments = assign_index(self.drone_names, world_points)
+            if self.schedule is not None:
+                step = self.schedule.step(index, self.local_drones)
             else:
-                assignments = assign_nearest(
-                    self.drone_names,
-                    self.estimated_positions,
-                    world_points,
-                )
-            self._current_assignments = assignments
-            return self.fleet.goto_async_all(
+                step = self._plan_goto(fid, duration)
+                self._current_assignments = step.targets
+            return self._submit_goto(step)
+
+        return _submit
+
+    def _plan_goto(self, fid: str, duration: float) -> ScheduleStep:
+        """Targets, speeds and start offsets of one goto phase for the whole fleet."""
+        world_points = world_points_from_formation(
+            self.formations[fid]["points"],
+            center=self.center,
+            scale=self.scale,
+            base_alt=self.base_alt,
+        )
+        if self.z_offset_m != 0.0:
+            world_points = [
+                (point[0], point[1], point[2] + self.z_offset_m)
+                for point in world_points
+            ]
+        if self.args.assign_mode == "index" or self.estimated_positions is None:
+            t0 = time.perf_counter()
+            assignments = assign_index(self.drone_names, world_points)
+            stats = {"solver": "index", "solve_sec": time.perf_counter() - t0}
+            if self.estimated_positions is not None:
+                total, longest = travel_distances(self.estimated_positions, assignments)
+                stats["total_distance_m"] = total
+                stats["max_distance_m"] = longest
+            else:
+                # Start positions are not known before the first goto.
+                stats["total_distance_m"] = None
+                stats["max_distance_m"] = None
+        else:
+            assignment = assign_formation(
+                self.drone_names,
+                self.estimated_positions,
+                world_points,
+                objective="max" if self.args.assign_mode == "minmax" else "sum",
+                exact_max=self.args.assign_exact_max,
+            )
+            assignments = assignment.assignments
+            stats = assignment.to_dict()
+        speeds = {d: self.args.speed for d in assignments}
+        offsets: dict[str, float] = {}
+        transition = None
+        if self.estimated_positions is not None and self.args.speed_mode == "sync":
+            speeds, _arrival_sec = synchronized_speeds(
+                self.estimated_positions,
                 assignments,
-                speed_m_s=self.args.speed,
-                tolerance_m=self.args.tolerance,
-                timeout_sec=max(self.args.timeout_sec, duration + 10.0),
+                duration,
+                max_speed_m_s=self.max_speed,
+            )
+        if self.estimated_positions is not None and self.args.transition_plan != "off":
+            plan = plan_transition(
+                self.estimated_positions,
+                assignments,
+                speeds,
+                safe_radius_m=self.safe_radius,
+                mode=self.args.transition_plan,
+            )
+            speeds = plan.speeds
+            transition = plan.to_dict()
+            if plan.staggered:
+                offsets = {d: offset for d, offset in plan.offsets_sec.items() if offset > 0.0}
+        if self.estimated_positions is not None:
+            planned = arrival_times(
+                self.estimated_positions,
+                assignments,
+                speeds,
+                offsets,
+                min_leg_m=self.args.tolerance,
             )
+            timeout_sec = max(
+                self.args.timeout_sec,
+                max(planned.values(), default=0.0) + self.args.arrival_slack_sec,
+            )
+        else:
+            # Start positions are not known before the first goto.
+            planned = {}
+            timeout_sec = max(self.args.timeout_sec, duration + self.args.arrival_slack_sec)
+        return ScheduleStep(
+            formation=fid,
+            targets=assignments,
+            speeds=speeds,
+            offsets_sec=offsets,
+            yaw_deg={d: 0.0 for d in assignments},
+            timeout_sec=timeout_sec,
+            planned_arrivals=planned,
+            assignment=stats,
+            transition=transition,
+        )
 
-        return _submit
+    def _submit_goto(self, step: ScheduleStep) -> list:
+        self.assignment_stats.append({"formation": step.formation, **step.assignment})
+        if step.transition is not None:
+            self.transition_stats.append({"formation": step.formation, **step.transition})
+        immediate: dict[str, tuple[float, float, float]] = {}
+        now_usec: int | None = None
+        for d in self.local_drones:
+            offset = step.offsets_sec.get(d, 0.0)
+            if offset <= 0.0:
+                immediate[d] = step.targets[d]
+                continue
+            if now_usec is None:
+                now_usec = int(hakopy.simulation_time())
+            self.deferred.append(
+                (
+                    now_usec + int(offset * 1_000_000),
+                    d,
+                    {
+                        "target": step.targets[d],
+                        "speed_m_s": step.speeds[d],
+                        "yaw_deg": step.yaw_deg[d],
+                        "timeout_sec": step.timeout_sec,
+                    },
+                )
+            )
+        if now_usec is not None:
+            self.deferred.sort(key=lambda item: item[0])
+        self.planned_arrivals = {
+            d: step.planned_arrivals[d] for d in self.local_drones if d in step.planned_arrivals
+        }
+        futures = self.fleet.goto_async_all(
+            immediate,
+            speed_m_s=step.speeds,
+            yaw_deg=step.yaw_deg,
+            tolerance_m=self.args.tolerance,
+            timeout_sec=step.timeout_sec,
+        )
+        self.realized_arrivals = {}
+        self.arrival_waiting = dict(zip(immediate, futures))
+        return futures
+
+    def compile_schedule(self, path: Path) -> str:
+        """
+        Plan every goto phase offline, as if each one succeeded, and write the
+        schedule. Returns its sha256; the same inputs always give the same file.
+        """
+        steps = []
+        for timeline_step in self.timeline:
+            step = self._plan_goto(
+                timeline_step["formation"], float(timeline_step["duration_sec"])
+            )
+            # Solver timings differ run to run and stay out of the artifact.
+            step.assignment = {
+                key: value for key, value in step.assignment.items() if key not in _TIMING_KEYS
+            }
+            if step.transition is not None:
+                step.transition = {
+                    key: value for key, value in step.transition.items() if key not in _TIMING_KEYS
+                }
+            steps.append(step)
+            self.estimated_positions = dict(step.targets)
+        meta = {
+            "show_name": self.meta.get("name", "unknown"),
+            "show_sha256": resolved_show_digest(self.resolved),
+            **self._plan_params(),
+        }
+        return write_schedule(path, self.drone_names, steps, meta=meta)
 
     def _make_goto_complete(self, *, fid: str, step: dict) -> Callable[[list], None]:
         def _handler(results: list) -> None:
             if any_failed(results):
                 raise RuntimeError(f"goto failed: formation={fid}")
-            if self.estimated_positions is None:
-                self.estimated_positions = {}
-            for d in self.drone_names:
-                self.estimated_positions[d] = self._current_assignments[d]
+            if self.schedule is None:
+                if self.estimated_positions is None:
+                    self.estimated_positions = {}
+                for d in self.drone_names:
+                    self.estimated_positions[d] = self._current_assignments[d]
+            # One entry per goto phase on every worker (drones=0 when none of the local
+            # drones had a planned arrival), so the worker summaries line up by phase.
+            spread = arrival_spread(self.planned_arrivals, self.realized_arrivals)
+            self.arrival_stats.append({"phase": self.phase_index, "formation": fid, **spread})
+            if spread["drones"]:
+                print(
+                    "INFO: arrival "
+                    f"formation={fid} "
+                    + " ".join(
+                        f"{key}={value:.3f}" if isinstance(value, float) else f"{key}={value}"
+                        for key, value in spread.items()
+                    )
+                )
             hold_sec = float(step.get("hold_sec", 0.0))
             if self.phase_index == len(self.phases) - 1:
                 hold_sec += max(0.0, float(self.args.final_hold_extra_sec))
@@ -392,12 +762,25 @@ class AssetShowStateMachine:
                 "INFO: asset_show_start "
                 f"name={self.meta.get('name', 'unknown')} "
                 f"drones={len(self.drone_names)} "
+                f"local_drones={len(self.local_drones)} "
                 f"steps={len(self.timeline)} "
                 f"assign_mode={self.args.assign_mode} "
+                f"speed_mode={self.args.speed_mode} "
                 f"z_offset_m={self.args.z_offset_m}"
             )
+            if self.schedule is not None:
+                print(
+                    "INFO: schedule "
+                    f"path={self.schedule.path} "
+                    f"sha256={self.schedule.sha256} "
+                    f"steps={len(self.schedule.steps)}"
+                )
+            if self.args.barrier_address is not None:
+                self.barrier = PhaseBarrierClient(
+                    parse_address(self.args.barrier_address), self.args.worker_index
+                )
             self.fleet = AssetAsyncSharedFleet(
-                drone_names=self.drone_names,
+                drone_names=self.local_drones,
                 service_config_path=self.args.service_config_path.resolve(),
                 asset_name=self.args.asset_name,
                 delta_time_usec=self.delta_time_usec,
@@ -421,7 +804,7 @@ class AssetShowStateMachine:
             prepare_services.append("DroneLand")
         try:
             self.prepare_t0 = time.perf_counter()
-            self.fleet.prepare_services(prepare_services)
+            self.registration_stats = self.fleet.prepare_services(prepare_services)
             self.prepared = True
             sec = time.perf_counter() - self.prepare_t0
             self.phase_times["prepare_basic_services"] = sec
@@ -430,21 +813,54 @@ class AssetShowStateMachine:
         except Exception:
             pass
 
+    def _submit_deferred(self) -> None:
+        now_usec = int(hakopy.simulation_time())
+        while self.deferred and self.deferred[0][0] <= now_usec:
+            _due, drone_name, goto = self.deferred.pop(0)
+            futures = self.fleet.goto_async_all(
+                {drone_name: goto["target"]},
+                speed_m_s=goto["speed_m_s"],
+                yaw_deg=goto["yaw_deg"],
+                tolerance_m=self.args.tolerance,
+                timeout_sec=goto["timeout_sec"],
+            )
+            self.pending.extend(futures)
+            self.arrival_waiting[drone_name] = futures[0]
+
+    def _record_arrivals(self) -> None:
+        if self.phase_simulation_t0_usec is None:
+            return
+        arrived = [d for d, f in self.arrival_waiting.items() if f.done()]
+        if not arrived:
+            return
+        elapsed_sec = (
+            int(hakopy.simulation_time()) - self.phase_simulation_t0_usec
+        ) / 1_000_000.0
+        for d in arrived:
+            del self.arrival_waiting[d]
+            self.realized_arrivals[d] = elapsed_sec
+
     def step_once(self) -> None:
         if self.done or self.failed:
             return
+        if self.barrier is not None:
+            # Stop on another worker's failure now, not at the next phase barrier.
+            self.barrier.check()
         if not self.prepared:
             self._prepare_services_if_needed()
             return
         if self.hold_remaining_usec > 0:
             self.hold_remaining_usec = max(0, self.hold_remaining_usec - self.delta_time_usec)
             return
-        if self.pending:
+        if self.pending or self.deferred:
+            if self.deferred:
+                self._submit_deferred()
             processed = self.fleet.poll_once()
-            if not all(f.done() for f in self.pending):
-                if processed == 0:
-                    if self.args.poll_sleep_msec > 0:
-                        time.sleep(self.args.poll_sleep_msec / 1000.0)
+            if self.arrival_waiting:
+                self._record_arrivals()
+            outstanding = sum(1 for f in self.pending if not f.done()) + len(self.deferred)
+            if outstanding > 0:
+                self.poll_scheduler.wait(processed, outstanding, self.poll_max_sec)
                 return
             if all(f.done() for f in self.pending):
                 results = [f.result(timeout=0.0) for f in self.pending]
@@ -500,6 +916,8 @@ class AssetShowStateMachine:
             print(f"INFO: phase_time name=total sec={total_sec:.3f}")
             self._write_summary("done")
             return
+        if self.barrier is not None and not self.barrier.passed(self.phase_index):
+            return
         phase = self.phases[self.phase_index]
         print(f"INFO: asset_phase_start name={phase.name}")
         self.phase_t0 = time.perf_counter()
@@ -546,16 +964,287 @@ def _on_manual_timing_control(context) -> int:
         return 0
 
 
+def split_workers(
+    drone_names: list[str], partitions: dict[str, str], worker_count: int
+) -> list[list[str]]:
+    """Drones of each worker: whole fleet parts, spread evenly in part order."""
+    keys: list[str] = []
+    for d in drone_names:
+        key = partitions.get(d, "default")
+        if key not in keys:
+            keys.append(key)
+    worker_count = max(1, min(worker_count, len(keys)))
+    groups = [
+        set(keys[i * len(keys) // worker_count : (i + 1) * len(keys) // worker_count])
+        for i in range(worker_count)
+    ]
+    return [[d for d in drone_names if partitions.get(d, "default") in g] for g in groups]
+
+
+def _worker_summary_path(path: Path, index: int) -> Path:
+    return path.with_name(f"{path.stem}.w{index}{path.suffix}")
+
+
+def _merge_arrival_steps(steps: list[dict]) -> dict:
+    """One step of the arrival summary from the per-worker entries of the same phase."""
+    steps = [step for step in steps if step.get("drones")]
+    if not steps:
+        return {"drones": 0}
+    drones = sum(step["drones"] for step in steps)
+    latest = max(steps, key=lambda step: step["error_max_sec"])
+    planned_max = max(step["planned_max_sec"] for step in steps)
+    realized_max = max(step["realized_max_sec"] for step in steps)
+    return {
+        "drones": drones,
+        "planned_max_sec": planned_max,
+        "planned_spread_sec": planned_max
+        - min(step["planned_max_sec"] - step["planned_spread_sec"] for step in steps),
+        "realized_max_sec": realized_max,
+        "realized_spread_sec": realized_max
+        - min(step["realized_max_sec"] - step["realized_spread_sec"] for step in steps),
+        "error_mean_sec": sum(step["error_mean_sec"] * step["drones"] for step in steps) / drones,
+        "error_max_sec": latest["error_max_sec"],
+        "latest_drone": latest["latest_drone"],
+    }
+
+
+def aggregate_summaries(summaries: list[dict]) -> dict:
+    """
+    Fleet-wide summary from the worker summaries.
+
+    Phase times are the slowest worker's, simulation time spans the earliest
+    start to the latest end, and real_time_factor is that span over the longest
+    worker wall time. assignment, transition and schedule are identical on every
+    worker.
+    """
+    first = summaries[0]
+    statuses = [summary.get("status") for summary in summaries]
+
+    def _merge_max(key: str) -> dict[str, float]:
+        out: dict[str, float] = {}
+        for summary in summaries:
+            for name, sec in summary.get(key, {}).items():
+                out[name] = max(out.get(name, sec), sec)
+        return out
+
+    starts = [
+        summary["simulation_time"]["start_usec"]
+        for summary in summaries
+        if summary["simulation_time"]["start_usec"] is not None
+    ]
+    ends = [
+        summary["simulation_time"]["end_usec"]
+        for summary in summaries
+        if summary["simulation_time"]["end_usec"] is not None
+    ]
+    simulation_elapsed_sec = (
+        (max(ends) - min(starts)) / 1_000_000.0 if starts and ends else None
+    )
+    walls = [
+        summary["wall_elapsed_sec"]
+        for summary in summaries
+        if summary.get("wall_elapsed_sec") is not None
+    ]
+    wall_elapsed_sec = max(walls) if walls else None
+    by_phase: dict[int, list[dict]] = {}
+    for summary in summaries:
+        for step in summary["arrival"]["steps"]:
+            by_phase.setdefault(step["phase"], []).append(step)
+    arrival_steps = [
+        {"phase": phase, "formation": steps[0]["formation"], **_merge_arrival_steps(steps)}
+        for phase, steps in sorted(by_phase.items())
+    ]
+    return {
+        "status": "done" if all(status == "done" for status in statuses) else "failed",
+        "error": "; ".join(
+            f"worker {summary.get('worker_index')}: {summary['error']}"
+            for summary in summaries
+            if summary.get("error")
+        )
+        or None,
+        "asset_name": first["asset_name"],
+        "show_name": first["show_name"],
+        "show_json": first["show_json"],
+        "drone_count": sum(summary["drone_count"] for summary in summaries),
+        "proc_count": first["proc_count"],
+        "worker_count": len(summaries),
+        "assign_mode": first["assign_mode"],
+        "delta_time_msec": first["delta_time_msec"],
+        "real_time_sync": first["real_time_sync"],
+        "real_time_sync_sleep_count": sum(
+            summary["real_time_sync_sleep_count"] for summary in summaries
+        ),
+        "real_time_sync_sleep_sec": max(
+            summary["real_time_sync_sleep_sec"] for summary in summaries
+        ),
+        "phase_times_sec": _merge_max("phase_times_sec"),
+        "phase_simulation_times_sec": _merge_max("phase_simulation_times_sec"),
+        "total_sec": max(summary["total_sec"] for summary in summaries),
+        "wall_elapsed_sec": wall_elapsed_sec,
+        "simulation_time": {
+            "start_usec": min(starts) if starts else None,
+            "end_usec": max(ends) if ends else None,
+            "elapsed_sec": simulation_elapsed_sec,
+        },
+        "real_time_factor": (
+            simulation_elapsed_sec / wall_elapsed_sec
+            if simulation_elapsed_sec is not None and wall_elapsed_sec
+            else None
+        ),
+        "registration": [summary["registration"] for summary in summaries],
+        "poll": [summary["poll"] for summary in summaries],
+        "assignment": first["assignment"],
+        "transition": first["transition"],
+        "schedule": first.get("schedule"),
+        "arrival": {
+            **first["arrival"],
+            "realized_spread_max_sec": max(
+                (step.get("realized_spread_sec", 0.0) for step in arrival_steps),
+                default=0.0,
+            ),
+            "steps": arrival_steps,
+        },
+        "workers": [
+            {
+                "worker_index": summary.get("worker_index"),
+                "asset_name": summary["asset_name"],
+                "status": summary["status"],
+                "drone_count": summary["drone_count"],
+                "wall_elapsed_sec": summary.get("wall_elapsed_sec"),
+                "real_time_factor": summary.get("real_time_factor"),
+            }
+            for summary in summaries
+        ],
+    }
+
+
+def run_workers(args: argparse.Namespace) -> int:
+    """Parent of --workers: spawn one asset per part group and relay the phase barrier."""
+    drone_names = resolve_drone_names(args)
+    if args.part_files:
+        partitions = load_partitions(args.part_files)
+    else:
+        partitions = split_partitions(drone_names, args.proc_count)
+    groups = split_workers(drone_names, partitions, args.workers)
+    schedule_dir: Path | None = None
+    schedule_args: list[str] = []
+    if args.schedule is None:
+        # Plan once here instead of in every worker's simulation callback.
+        schedule_dir = Path(tempfile.mkdtemp(prefix="hako-show-schedule-"))
+        schedule_path = schedule_dir / "schedule.bin"
+        t0 = time.perf_counter()
+        sha256 = AssetShowStateMachine(args).compile_schedule(schedule_path)
+        print(
+            "INFO: schedule_compiled "
+            f"path={schedule_path} sha256={sha256} sec={time.perf_counter() - t0:.3f}"
+        )
+        schedule_args = ["--schedule", str(schedule_path)]
+    server = PhaseBarrierServer(len(groups))
+    env = {**os.environ, **server.worker_env()}
+    summary_path = args.summary_json.resolve() if args.summary_json is not None else None
+    procs: list[subprocess.Popen] = []
+    for i, drones in enumerate(groups):
+        parts = sorted({partitions.get(d, "default") for d in drones})
+        print(
+            "INFO: worker_start "
+            f"index={i} drones={len(drones)} parts={','.join(parts)} "
+            f"asset_name={args.asset_name}-w{i}"
+        )
+        cmd = [
+            sys.executable,
+            str(Path(__file__).resolve()),
+            *sys.argv[1:],
+            "--asset-name",
+            f"{args.asset_name}-w{i}",
+            "--worker-index",
+            str(i),
+            "--barrier-address",
+            format_address(server.address),
+        ]
+        if summary_path is not None:
+            cmd += ["--summary-json", str(_worker_summary_path(summary_path, i))]
+        cmd += schedule_args
+        cmd += ["--worker-drones", *drones]
+        procs.append(subprocess.Popen(cmd, env=env))
+
+    exited_at: dict[int, float] = {}
+
+    def _alive() -> bool:
+        # A worker may exit right after its finish message; give the message
+        # a moment to arrive before treating the exit as a failure.
+        now = time.monotonic()
+        for i, proc in enumerate(procs):
+            if proc.poll() is None or i in server.finished:
+                continue
+            if now - exited_at.setdefault(i, now) > 2.0:
+                return False
+        return True
+
+    try:
+        server.serve(alive=_alive)
+    finally:
+        barrier_stats = server.get_stats()
+        server.close()
+    print(
+        "INFO: phase_barrier "
+        + " ".join(
+            f"{key}={value:.3f}" if isinstance(value, float) else f"{key}={value}"
+            for key, value in barrier_stats.items()
+        )
+    )
+    ok = barrier_stats["aborted"] is None and all(
+        status == "done" for status in barrier_stats["finished"].values()
+    )
+    if summary_path is not None:
+        summaries = []
+        for i in range(len(groups)):
+            path = _worker_summary_path(summary_path, i)
+            if path.exists():
+                summaries.append(json.loads(path.read_text(encoding="utf-8")))
+        if summaries:
+            payload = aggregate_summaries(summaries)
+            payload["asset_name"] = args.asset_name
+            payload["barrier"] = barrier_stats
+            if len(summaries) < len(groups):
+                payload["status"] = "failed"
+            summary_path.parent.mkdir(parents=True, exist_ok=True)
+            summary_path.write_text(
+                json.dumps(payload, ensure_ascii=True, indent=2) + "\n", encoding="utf-8"
+            )
+            print(f"INFO: summary_json={summary_path} real_time_factor={payload['real_time_factor']}")
+    for proc in procs:
+        proc.wait()
+    if schedule_dir is not None:
+        shutil.rmtree(schedule_dir, ignore_errors=True)
+    return 0 if ok else 1
+
+
 def main() -> int:
     global _RUNNER
     args = parse_args()
+    if args.compile_schedule is not None:
+        runner = AssetShowStateMachine(args)
+        t0 = time.perf_counter()
+        sha256 = runner.compile_schedule(args.compile_schedule.resolve())
+        print(
+            "INFO: schedule_compiled "
+            f"path={args.compile_schedule.resolve()} "
+            f"sha256={sha256} "
+            f"steps={len(runner.timeline)} "
+            f"drones={len(runner.drone_names)} "
+            f"sec={time.perf_counter() - t0:.3f}"
+        )
+        return 0
+    if args.workers > 1 and args.worker_index is None:
+        return run_workers(args)
     _RUNNER = AssetShowStateMachine(args)
 
-    runtime_service_config_path = create_runtime_service_config(args.service_config_path.resolve())
+    runtime_service_config_path, runtime_service = load_runtime_service_config(
+        args.service_config_path.resolve()
+    )
     if args.pdu_config_path is not None:
         pdu_config_path = args.pdu_config_path.resolve()
     else:
-        runtime_service = json.loads(runtime_service_config_path.read_text())
         runtime_pdu_config_path = runtime_service.get("pdu_config_path")
         if not runtime_pdu_config_path:
             raise SystemExit(
@@ -5,14 +5,27 @@ import argparse
 import math
 import sys
 import time
+from collections import deque
 from pathlib import Path
 
 EXTERNAL_RPC_DIR = Path(__file__).resolve().parents[1]
 if str(EXTERNAL_RPC_DIR) not in sys.path:
     sys.path.insert(0, str(EXTERNAL_RPC_DIR))
 
+import hakopy
+
+import rpc_trace
 from fleet_rpc import FleetRpcController
+from formation_assignment import assign_formation, travel_distances
 from hakosim_rpc import DEFAULT_SERVICE_CONFIG_PATH
+from retry_policy import FleetRetry, RetryPolicy, load_partitions, split_partitions
+from transition_planner import (
+    PLAN_MODES,
+    SPEED_MODES,
+    arrival_times,
+    plan_transition,
+    synchronized_speeds,
+)
 
 REPO_ROOT = Path(__file__).resolve().parents[3]
 SHOW_TOOL_DIR = REPO_ROOT / "tools" / "drone-show"
@@ -32,9 +45,55 @@ def parse_args() -> argparse.Namespace:
         default=DEFAULT_SERVICE_CONFIG_PATH,
     )
     p.add_argument("--drones", nargs="+", required=True, help="Target drone names")
-    p.add_argument("--assign-mode", choices=["index", "nearest"], default="index")
+    p.add_argument(
+        "--assign-mode",
+        choices=["index", "nearest", "minmax"],
+        default="index",
+        help="nearest: minimum total travel, minmax: minimum longest leg first",
+    )
+    p.add_argument(
+        "--assign-exact-max",
+        type=int,
+        default=None,
+        help="Largest fleet solved exactly; larger fleets use greedy assignment",
+    )
+    p.add_argument(
+        "--transition-plan",
+        choices=list(PLAN_MODES),
+        default="off",
+        help=(
+            "Check goto paths against --safe-radius (check) and fix conflicts by slowing "
+            "(speed) or delaying (stagger) drones"
+        ),
+    )
+    p.add_argument(
+        "--safe-radius",
+        type=float,
+        default=None,
+        help="Minimum separation for --transition-plan [m] (default: show options.min_distance)",
+    )
     p.add_argument("--takeoff-alt", type=float, help="Takeoff altitude [m] (default: base_alt)")
-    p.add_argument("--speed", type=float, default=1.5, help="GoTo speed [m/s]")
+    p.add_argument(
+        "--speed",
+        type=float,
+        default=1.5,
+        help="GoTo speed [m/s] (sync: first goto only, and max speed when the show has none)",
+    )
+    p.add_argument(
+        "--speed-mode",
+        choices=list(SPEED_MODES),
+        default="sync",
+        help=(
+            "sync: per-drone speed from leg length and step duration_sec so the "
+            "formation arrives together (capped by show options.max_speed); fixed: --speed"
+        ),
+    )
+    p.add_argument(
+        "--arrival-slack-sec",
+        type=float,
+        default=5.0,
+        help="GoTo timeout margin over the planned arrival time [sec]",
+    )
     p.add_argument("--tolerance", type=float, default=0.5, help="GoTo tolerance [m]")
     p.add_argument("--timeout-sec", type=float, default=90.0, help="Per-command timeout [sec]")
     p.add_argument(
@@ -47,7 +106,7 @@ def parse_args() -> argparse.Namespace:
         "--ready-gate-interval-sec",
         type=float,
         default=0.5,
-        help="Retry interval for readiness probe via get_state",
+        help="Initial per-drone retry backoff for readiness probe via get_state",
     )
     p.add_argument(
         "--ready-gate-call-timeout-sec",
@@ -70,31 +129,76 @@ def parse_args() -> argparse.Namespace:
         "--init-retry-interval-sec",
         type=float,
         default=0.2,
-        help="Retry interval seconds for set_ready/takeoff initialization phases",
+        help="Initial retry backoff seconds for set_ready/takeoff (doubles per failure)",
+    )
+    p.add_argument(
+        "--init-retry-max-delay-sec",
+        type=float,
+        default=2.0,
+        help="Upper bound of the per-drone retry backoff for ready gate and init phases",
+    )
+    p.add_argument(
+        "--init-deadline-sec",
+        type=float,
+        default=0.0,
+        help="Deadline of each set_ready/takeoff retry loop (0: bounded by --init-retry-max only)",
+    )
+    p.add_argument(
+        "--retry-jitter",
+        type=float,
+        default=0.5,
+        help="Fraction (0..1) of each backoff delay that is randomized",
+    )
+    p.add_argument(
+        "--part-files",
+        type=Path,
+        nargs="+",
+        help=(
+            "Fleet part configs (one per drone-service process) used as circuit breaker "
+            "partitions (default: split --drones into --proc-count parts)"
+        ),
+    )
+    p.add_argument(
+        "--breaker-failures",
+        type=int,
+        default=8,
+        help="Consecutive failed calls that open a partition's circuit breaker",
+    )
+    p.add_argument(
+        "--breaker-cooldown-sec",
+        type=float,
+        default=2.0,
+        help="Seconds an open breaker blocks its partition before a probe call",
     )
     p.add_argument(
         "--batch-size",
         type=int,
         default=0,
-        help="Batch size for parallel RPC fan-out (0: auto, <0: no batching)",
+        help=(
+            "Requests in flight for parallel RPC fan-out, shared evenly by the "
+            "drone-service processes (0: auto, <0: no limit)"
+        ),
     )
     p.add_argument(
         "--batch-init",
         type=int,
         default=None,
-        help="Batch size for set_ready/takeoff (override --batch-size)",
+        help=(
+            "Requests in flight for ready gate/set_ready/takeoff "
+            "(default: --proc-count x --init-concurrency-per-proc)"
+        ),
     )
     p.add_argument(
         "--batch-goto",
         type=int,
         default=None,
-        help="Batch size for goto steps (override --batch-size)",
+        help="Requests in flight for goto steps (override --batch-size)",
     )
     p.add_argument(
         "--batch-land",
         type=int,
         default=None,
-        help="Batch size for land (override --batch-size)",
+        help="Requests in flight for land (override --batch-size)",
     )
     p.add_argument("--serial", action="store_true", help="Run phases in serial mode")
     p.add_argument("--land", action="store_true", help="Land all drones at end")
@@ -115,6 +219,14 @@ def parse_args() -> argparse.Namespace:
         action="store_true",
         help="Use shared-runtime async RPC client implementation",
     )
+    p.add_argument(
+        "--rpc-trace-out",
+        type=Path,
+        help=(
+            "Record every RPC call and write latency histograms to "
+            "<path>.json / <path>.csv at the end"
+        ),
+    )
     return p.parse_args()
 
 
@@ -147,7 +259,7 @@ def run_parallel(tag: str, drone_names: list[str], op_async, timeout_sec: float,
     return wait_and_print(tag, futures, timeout_sec=timeout_sec, fleet=fleet)
 
 
-def run_parallel_batched(
+def run_parallel_windowed(
     tag: str,
     drone_names: list[str],
     op_async,
@@ -155,31 +267,140 @@ def run_parallel_batched(
     fleet: FleetRpcController,
     *,
     batch_size: int,
+    partitions: dict[str, str],
 ):
-    if batch_size <= 0 or len(drone_names) <= batch_size:
-        return run_parallel(tag, drone_names, op_async, timeout_sec=timeout_sec, fleet=fleet)
-
-    results = []
-    total = len(drone_names)
-    batch_count = (total + batch_size - 1) // batch_size
-    for i in range(0, total, batch_size):
-        chunk = drone_names[i : i + batch_size]
-        bidx = (i // batch_size) + 1
-        print(
-            "INFO: batch_start "
-            f"tag={tag} batch={bidx}/{batch_count} size={len(chunk)}"
-        )
-        futures = [op_async(drone_name) for drone_name in chunk]
-        batch_results = wait_and_print(
-            f"{tag}.b{bidx}/{batch_count}",
-            futures,
-            timeout_sec=timeout_sec,
-            fleet=fleet,
+    """
+    Keep up to batch_size requests in flight, split evenly over the drone-service
+    processes in partitions, and submit a process's next drone as soon as one of
+    its requests completes. timeout_sec applies to each request from its
+    submission. Results are returned in drone_names order.
+
+    A request that times out is reported as TimeoutError but keeps its slot until
+    it resolves (response, RPC timeout or cancel), so the window is never exceeded
+    and a retry of the drone does not overlap the call still in flight. If it has
+    not resolved max(2 * timeout_sec, timeout_sec + 1) after submission (the same
+    bound as AsyncSharedHakoniwaRpcDroneClient._call), it is logged as abandoned
+    and its slot is freed.
+    """
+    limit = batch_size if batch_size > 0 else len(drone_names)
+    queues: dict[str, deque[int]] = {}
+    for i, drone_name in enumerate(drone_names):
+        queues.setdefault(partitions.get(drone_name, "default"), deque()).append(i)
+    keys = list(queues)
+    # With more processes than batch_size, each gets one slot in turn under the overall limit.
+    window = max(1, limit // max(len(keys), 1))
+    print(
+        "INFO: window_start "
+        f"tag={tag} drones={len(drone_names)} processes={len(keys)} "
+        f"window={window} limit={limit} timeout_sec={timeout_sec}"
+    )
+    results: list = [None] * len(drone_names)
+    # future -> (index, process, deadline); after a timeout the deadline is the abandon time
+    in_flight: dict[object, tuple[int, str, float]] = {}
+    abandon_after_sec = max(timeout_sec, 1.0)
+    expired: set = set()
+    counts = dict.fromkeys(keys, 0)
+    turn = 0
+
+    def report(i: int, res) -> None:
+        results[i] = res
+        if isinstance(res, Exception):
+            print(f"INFO: {tag}[{i}] ok=False message={type(res).__name__}: {res!r}")
+        else:
+            print(f"INFO: {tag}[{i}] ok={res.ok} message={res.message}")
+
+    def refill() -> None:
+        nonlocal turn
+        progressed = True
+        while progressed and len(in_flight) < limit:
+            progressed = False
+            for step in range(len(keys)):
+                if len(in_flight) >= limit:
+                    break
+                key = keys[(turn + step) % len(keys)]
+                if not queues[key] or counts[key] >= window:
+                    continue
+                i = queues[key].popleft()
+                progressed = True
+                try:
+                    future = op_async(drone_names[i])
+                except Exception as e:
+                    report(i, e)
+                    continue
+                in_flight[future] = (i, key, time.monotonic() + timeout_sec)
+                counts[key] += 1
+            turn = (turn + 1) % max(len(keys), 1)
+
+    refill()
+    while in_flight:
+        earliest = min(deadline for _i, _key, deadline in in_flight.values())
+        done, _not_done = fleet.wait_for_any(
+            list(in_flight), timeout_sec=max(earliest - time.monotonic(), 0.0)
         )
-        results.extend(batch_results)
+        now = time.monotonic()
+        freed = False
+        for future, (i, key, deadline) in list(in_flight.items()):
+            if future in done:
+                if future in expired:
+                    expired.discard(future)
+                    print(f"INFO: {tag}[{i}] resolved_after_timeout")
+                else:
+                    try:
+                        report(i, future.result(timeout=0.0))
+                    except Exception as e:
+                        report(i, e)
+            elif deadline > now:
+                continue
+            elif future in expired:
+                expired.discard(future)
+                print(f"INFO: {tag}[{i}] abandoned")
+            else:
+                report(i, TimeoutError())
+                expired.add(future)
+                in_flight[future] = (i, key, deadline + abandon_after_sec)
+                continue
+            del in_flight[future]
+            counts[key] -= 1
+            freed = True
+        if freed:
+            refill()
+    print(f"INFO: window_done tag={tag}")
     return results
 
 
+def run_parallel_staggered(
+    tag: str,
+    drone_names: list[str],
+    offsets_sec: dict[str, float],
+    op_async,
+    timeout_sec: float,
+    fleet: FleetRpcController,
+    poll_sec: float = 0.005,
+):
+    """
+    Submit each drone offsets_sec[d] simulation seconds after the first one, then wait for all.
+
+    The offsets come from the transition plan, which is in simulation time, so
+    they are measured with hakopy.simulation_time() like show_asset_runner does.
+    If the simulation stops advancing, the remaining drones are submitted after
+    timeout_sec of wall time and left to their goto timeout.
+    """
+    t0_usec = int(hakopy.simulation_time())
+    wall_deadline = time.monotonic() + timeout_sec
+    futures = {}
+    for drone_name in sorted(drone_names, key=lambda d: offsets_sec.get(d, 0.0)):
+        due_usec = t0_usec + int(offsets_sec.get(drone_name, 0.0) * 1_000_000)
+        while time.monotonic() < wall_deadline:
+            remaining_usec = due_usec - int(hakopy.simulation_time())
+            if remaining_usec <= 0:
+                break
+            time.sleep(min(remaining_usec / 1_000_000, poll_sec))
+        futures[drone_name] = op_async(drone_name)
+    return wait_and_print(
+        tag, [futures[d] for d in drone_names], timeout_sec=timeout_sec, fleet=fleet
+    )
+
+
 def world_points_from_formation(formation_points, center, scale, base_alt):
     out: list[tuple[float, float, float]] = []
     for p in formation_points:
@@ -225,24 +446,6 @@ def assign_index(drone_names: list[str], targets: list[tuple[float, float, float
     return {d: targets[i] for i, d in enumerate(drone_names)}
 
 
-def _dist3(a: tuple[float, float, float], b: tuple[float, float, float]) -> float:
-    return math.sqrt((a[0] - b[0]) ** 2 + (a[1] - b[1]) ** 2 + (a[2] - b[2]) ** 2)
-
-
-def assign_nearest(
-    drone_names: list[str],
-    current_positions: dict[str, tuple[float, float, float]],
-    targets: list[tuple[float, float, float]],
-) -> dict[str, tuple[float, float, float]]:
-    remaining = targets[:]
-    out: dict[str, tuple[float, float, float]] = {}
-    for d in drone_names:
-        cp = current_positions[d]
-        best_i = min(range(len(remaining)), key=lambda i: _dist3(cp, remaining[i]))
-        out[d] = remaining.pop(best_i)
-    return out
-
-
 def any_failed(results) -> bool:
     return any(isinstance(r, Exception) or (not bool(getattr(r, "ok", False))) for r in results)
 
@@ -265,28 +468,18 @@ def _retry_init_phase(
     op_async,
     *,
     fleet: FleetRpcController,
+    retry: FleetRetry,
     timeout_sec: float,
-    retry_max: int,
-    retry_interval_sec: float,
     batch_size: int,
 ) -> None:
-    pending = list(drones)
-    for retry in range(1, retry_max + 1):
-        results = run_parallel_batched(
-            f"{phase}.r{retry}",
-            pending,
-            op_async,
-            timeout_sec=timeout_sec,
-            fleet=fleet,
-            batch_size=batch_size,
-        )
-        pending = _failed_drones(pending, results)
-        if not pending:
-            return
-        print(f"WARN: {phase} retry={retry} failed={len(pending)}")
-        time.sleep(retry_interval_sec)
-    raise RuntimeError(
-        f"{phase} failed after retries: count={len(pending)} sample={pending[:10]}"
+    retry.run_async(
+        phase,
+        drones,
+        op_async,
+        lambda r: not isinstance(r, Exception) and bool(getattr(r, "ok", False)),
+        wait_for_any=fleet.wait_for_any,
+        call_timeout_sec=timeout_sec,
+        limit=batch_size,
     )
 
 
@@ -298,6 +491,7 @@ def wait_ready_gate(
     interval_sec: float,
     batch_size: int,
     call_timeout_sec: float,
+    retry: FleetRetry,
 ) -> None:
     if not drone_names:
         return
@@ -313,37 +507,25 @@ def wait_ready_gate(
                 break
             time.sleep(0.5)
 
-    deadline = time.time() + timeout_sec
-    pending = list(drone_names)
-    attempt = 0
-    while pending:
-        attempt += 1
-        results = run_parallel_batched(
-            f"ready_gate.r{attempt}",
-            pending,
-            lambda d: fleet.get_state_async(d),
-            timeout_sec=max(5.0, call_timeout_sec),
-            fleet=fleet,
-            batch_size=batch_size,
+    # Backoff starts at interval_sec per drone; timeout_sec bounds the whole gate.
+    gate_retry = retry.with_policy(
+        RetryPolicy(
+            base_delay_sec=interval_sec,
+            max_delay_sec=max(interval_sec, retry.policy.max_delay_sec),
+            jitter=retry.policy.jitter,
+            deadline_sec=timeout_sec,
         )
-        next_pending: list[str] = []
-        for i, d in enumerate(pending):
-            if i >= len(results):
-                next_pending.append(d)
-                continue
-            if isinstance(results[i], Exception):
-                next_pending.append(d)
-        pending = next_pending
-        if not pending:
-            print(f"INFO: ready_gate done attempts={attempt}")
-            return
-        now = time.time()
-        if now >= deadline:
-            raise RuntimeError(
-                f"ready_gate timeout: pending={len(pending)} sample={pending[:10]} attempts={attempt}"
-            )
-        print(f"WARN: ready_gate pending={len(pending)} attempt={attempt}")
-        time.sleep(interval_sec)
+    )
+    attempts = gate_retry.run_async(
+        "ready_gate",
+        drone_names,
+        lambda d: fleet.get_state_async(d),
+        lambda r: not isinstance(r, Exception),
+        wait_for_any=fleet.wait_for_any,
+        call_timeout_sec=max(5.0, call_timeout_sec),
+        limit=batch_size,
+    )
+    print(f"INFO: ready_gate done attempts={attempts}")
 
 
 def main() -> int:
@@ -353,6 +535,8 @@ def main() -> int:
         raise SystemExit("--proc-count must be >= 1")
     if args.init_concurrency_per_proc < 1:
         raise SystemExit("--init-concurrency-per-proc must be >= 1")
+    if args.rpc_trace_out is not None:
+        rpc_trace.enable_tracing()
 
     resolved = resolve_show_config(args.show_json.resolve(), enforce_drone_count=True)
     meta = resolved.get("meta", {})
@@ -372,7 +556,13 @@ def main() -> int:
     if failure_policy not in {"abort", "continue", "hold"}:
         raise SystemExit(f"invalid failure_policy: {failure_policy}")
 
+    max_speed = float(options.get("max_speed", args.speed))
     takeoff_alt = args.takeoff_alt if args.takeoff_alt is not None else max(0.5, base_alt)
+    safe_radius = (
+        args.safe_radius
+        if args.safe_radius is not None
+        else float(options.get("min_distance", 0.0))
+    )
     if args.batch_size < 0:
         global_batch_size = 0
     elif args.batch_size == 0:
@@ -388,6 +578,24 @@ def main() -> int:
     active_drones = list(args.drones)
     held_drones: set[str] = set()
     estimated_positions: dict[str, tuple[float, float, float]] | None = None
+    travel_total_sum_m = 0.0
+    travel_max_overall_m = 0.0
+    if args.part_files:
+        partitions = load_partitions(args.part_files)
+    else:
+        partitions = split_partitions(args.drones, args.proc_count)
+    init_retry = FleetRetry(
+        RetryPolicy(
+            base_delay_sec=args.init_retry_interval_sec,
+            max_delay_sec=args.init_retry_max_delay_sec,
+            jitter=args.retry_jitter,
+            deadline_sec=args.init_deadline_sec,
+            max_attempts=args.init_retry_max,
+        ),
+        partitions,
+        failure_threshold=args.breaker_failures,
+        cooldown_sec=args.breaker_cooldown_sec,
+    )
 
     print(
         "INFO: show_start "
@@ -395,6 +603,7 @@ def main() -> int:
         f"drones={len(args.drones)} "
         f"steps={len(timeline)} "
         f"assign_mode={args.assign_mode} "
+        f"speed_mode={args.speed_mode} "
         f"failure_policy={failure_policy} "
         f"proc_count={args.proc_count} "
         f"init_concurrency_per_proc={args.init_concurrency_per_proc} "
@@ -417,8 +626,15 @@ def main() -> int:
                 prepare_services.append("DroneLand")
             print("INFO: prepare_basic_services start")
             t0 = time.perf_counter()
-            fleet.prepare_services(prepare_services)
+            registration = fleet.prepare_services(prepare_services)
             print(f"INFO: phase_time name=prepare_basic_services sec={time.perf_counter() - t0:.3f}")
+            print(
+                "INFO: prepare_basic_services_detail "
+                + " ".join(
+                    f"{key}={value:.3f}" if isinstance(value, float) else f"{key}={value}"
+                    for key, value in registration.items()
+                )
+            )
             print("INFO: prepare_basic_services done")
         if not args.no_ready_gate:
             t0 = time.perf_counter()
@@ -429,6 +645,7 @@ def main() -> int:
                 interval_sec=args.ready_gate_interval_sec,
                 batch_size=init_batch_size if init_batch_size > 0 else 24,
                 call_timeout_sec=args.ready_gate_call_timeout_sec,
+                retry=init_retry,
             )
             print(f"INFO: phase_time name=ready_gate sec={time.perf_counter() - t0:.3f}")
 
@@ -445,43 +662,43 @@ def main() -> int:
         else:
             t0 = time.perf_counter()
             retry_batch_size = init_batch_size if init_batch_size > 0 else auto_init_batch_size
-            init_groups = [args.drones]
-            if retry_batch_size > 0 and len(args.drones) > retry_batch_size:
-                init_groups = [
-                    args.drones[i : i + retry_batch_size]
-                    for i in range(0, len(args.drones), retry_batch_size)
-                ]
-            total_groups = len(init_groups)
-            for i, group in enumerate(init_groups, start=1):
-                print(f"INFO: init batch_start {i}/{total_groups} size={len(group)}")
-                _retry_init_phase(
-                    "set_ready",
-                    group,
-                    lambda d: fleet.set_ready_async(d),
-                    fleet=fleet,
-                    timeout_sec=args.timeout_sec,
-                    retry_max=args.init_retry_max,
-                    retry_interval_sec=args.init_retry_interval_sec,
-                    batch_size=retry_batch_size,
-                )
-                _retry_init_phase(
-                    "takeoff",
-                    group,
-                    lambda d: fleet.takeoff_async(d, takeoff_alt),
-                    fleet=fleet,
-                    timeout_sec=args.timeout_sec,
-                    retry_max=args.init_retry_max,
-                    retry_interval_sec=args.init_retry_interval_sec,
-                    batch_size=retry_batch_size,
-                )
-                print(f"INFO: init batch_done {i}/{total_groups}")
+            # One windowed pass per phase: each process gets its next drone as
+            # soon as one of its calls completes, so no group waits on a slow drone.
+            _retry_init_phase(
+                "set_ready",
+                args.drones,
+                lambda d: fleet.set_ready_async(d),
+                fleet=fleet,
+                retry=init_retry,
+                timeout_sec=args.timeout_sec,
+                batch_size=retry_batch_size,
+            )
+            _retry_init_phase(
+                "takeoff",
+                args.drones,
+                lambda d: fleet.takeoff_async(d, takeoff_alt),
+                fleet=fleet,
+                retry=init_retry,
+                timeout_sec=args.timeout_sec,
+                batch_size=retry_batch_size,
+            )
             print(f"INFO: phase_time name=init sec={time.perf_counter() - t0:.3f}")
+            retry_stats = init_retry.get_stats()
+            print(
+                "INFO: init_retry "
+                f"rounds={retry_stats['rounds']} calls={retry_stats['calls']} "
+                + " ".join(
+                    f"{key}.opens={b['opens']} {key}.throttled={b['throttled']}"
+                    for key, b in retry_stats["breakers"].items()
+                )
+            )
 
         for idx, step in enumerate(timeline, start=1):
             step_t0 = time.perf_counter()
             fid = step["formation"]
             duration = float(step["duration_sec"])
             hold_sec = float(step["hold_sec"])
+            previous_positions = estimated_positions
             world_points = world_points_from_formation(
                 formations[fid]["points"],
                 center=center,
@@ -498,8 +715,27 @@ def main() -> int:
                     assignments = assign_index(args.drones, world_points)
                     estimated_positions = dict(assignments)
                 else:
-                    current = estimated_positions
-                    assignments = assign_nearest(args.drones, current, world_points)
+                    assignment = assign_formation(
+                        args.drones,
+                        estimated_positions,
+                        world_points,
+                        objective="max" if args.assign_mode == "minmax" else "sum",
+                        exact_max=args.assign_exact_max,
+                    )
+                    assignments = assignment.assignments
+                    print(
+                        "INFO: assignment "
+                        f"index={idx} solver={assignment.solver} "
+                        f"solve_sec={assignment.solve_sec:.3f}"
+                    )
+            if previous_positions is not None:
+                travel_total_m, travel_max_m = travel_distances(previous_positions, assignments)
+                travel_total_sum_m += travel_total_m
+                travel_max_overall_m = max(travel_max_overall_m, travel_max_m)
+                print(
+                    "INFO: travel "
+                    f"index={idx} formation={fid} total_m={travel_total_m:.3f} max_m={travel_max_m:.3f}"
+                )
 
             target_drones = [d for d in active_drones if d not in held_drones]
             print(
@@ -508,38 +744,97 @@ def main() -> int:
                 f"active={len(target_drones)} held={len(held_drones)}"
             )
 
+            speeds: dict[str, float] = {d: args.speed for d in target_drones}
+            offsets: dict[str, float] = {}
+            if previous_positions is not None and args.speed_mode == "sync":
+                speeds, _arrival_sec = synchronized_speeds(
+                    previous_positions,
+                    {d: assignments[d] for d in target_drones},
+                    duration,
+                    max_speed_m_s=max_speed,
+                )
+            if previous_positions is not None and args.transition_plan != "off":
+                plan = plan_transition(
+                    previous_positions,
+                    {d: assignments[d] for d in target_drones},
+                    speeds,
+                    safe_radius_m=safe_radius,
+                    mode=args.transition_plan,
+                )
+                speeds.update(plan.speeds)
+                offsets = plan.offsets_sec if plan.staggered else {}
+                print(
+                    "INFO: transition "
+                    f"index={idx} formation={fid} "
+                    + " ".join(
+                        f"{key}={value:.3f}" if isinstance(value, float) else f"{key}={value}"
+                        for key, value in plan.to_dict().items()
+                    )
+                )
+                for a, b, dist, at in plan.conflict_sample[:3]:
+                    print(
+                        "WARN: transition_conflict "
+                        f"index={idx} drones={a},{b} distance_m={dist:.3f} at_sec={at:.3f}"
+                    )
+
+            planned_arrivals: dict[str, float] = {}
+            if previous_positions is not None:
+                planned_arrivals = arrival_times(
+                    previous_positions,
+                    {d: assignments[d] for d in target_drones},
+                    speeds,
+                    offsets,
+                    min_leg_m=args.tolerance,
+                )
+                planned_sec = max(planned_arrivals.values(), default=0.0)
+            else:
+                # Start positions are not known before the first goto.
+                planned_sec = duration
+            goto_timeout_sec = max(args.timeout_sec, planned_sec + args.arrival_slack_sec)
+
+            def goto_op(d: str, asynchronous: bool):
+                call = fleet.goto_async if asynchronous else fleet.goto
+                return call(
+                    d,
+                    assignments[d][0],
+                    assignments[d][1],
+                    assignments[d][2],
+                    yaw_deg=0.0,
+                    speed_m_s=speeds[d],
+                    tolerance_m=args.tolerance,
+                    timeout_sec=goto_timeout_sec,
+                )
+
+            goto_t0 = time.perf_counter()
             if args.serial:
-                results = run_serial(
+                results = run_serial(f"goto#{idx}", target_drones, lambda d: goto_op(d, False))
+            elif offsets:
+                results = run_parallel_staggered(
                     f"goto#{idx}",
                     target_drones,
-                    lambda d: fleet.goto(
-                        d,
-                        assignments[d][0],
-                        assignments[d][1],
-                        assignments[d][2],
-                        yaw_deg=0.0,
-                        speed_m_s=args.speed,
-                        tolerance_m=args.tolerance,
-                        timeout_sec=max(args.timeout_sec, duration + 5.0),
-                    ),
+                    offsets,
+                    lambda d: goto_op(d, True),
+                    timeout_sec=goto_timeout_sec + 5.0,
+                    fleet=fleet,
                 )
             else:
-                results = run_parallel_batched(
+                results = run_parallel_windowed(
                     f"goto#{idx}",
                     target_drones,
-                    lambda d: fleet.goto_async(
-                        d,
-                        assignments[d][0],
-                        assignments[d][1],
-                        assignments[d][2],
-                        yaw_deg=0.0,
-                        speed_m_s=args.speed,
-                        tolerance_m=args.tolerance,
-                        timeout_sec=max(args.timeout_sec, duration + 5.0),
-                    ),
-                    timeout_sec=max(args.timeout_sec, duration + 10.0),
+                    lambda d: goto_op(d, True),
+                    timeout_sec=goto_timeout_sec + 5.0,
                     fleet=fleet,
                     batch_size=goto_batch_size,
+                    partitions=partitions,
+                )
+            if planned_arrivals:
+                planned = list(planned_arrivals.values())
+                print(
+                    "INFO: arrival "
+                    f"index={idx} formation={fid} drones={len(planned)} "
+                    f"planned_max_sec={max(planned):.3f} "
+                    f"planned_spread_sec={max(planned) - min(planned):.3f} "
+                    f"realized_sec={time.perf_counter() - goto_t0:.3f}"
                 )
 
             if any_failed(results):
@@ -572,17 +867,23 @@ def main() -> int:
             if args.serial:
                 run_serial("land", final_targets, lambda d: fleet.land(d))
             else:
-                run_parallel_batched(
+                run_parallel_windowed(
                     "land",
                     final_targets,
                     lambda d: fleet.land_async(d),
                     timeout_sec=args.timeout_sec,
                     fleet=fleet,
                     batch_size=land_batch_size,
+                    partitions=partitions,
                 )
             print(f"INFO: phase_time name=land sec={time.perf_counter() - t0:.3f}")
 
     print(f"INFO: phase_time name=total sec={time.perf_counter() - total_t0:.3f}")
+    print(f"INFO: travel_summary total_m={travel_total_sum_m:.3f} max_m={travel_max_overall_m:.3f}")
+    if args.rpc_trace_out is not None and rpc_trace.TRACER is not None:
+        rpc_trace.TRACER.export_json(args.rpc_trace_out.with_suffix(".json"))
+        rpc_trace.TRACER.export_csv(args.rpc_trace_out.with_suffix(".csv"))
+        print(f"INFO: rpc_trace_out={args.rpc_trace_out}")
     print("INFO: show_done")
     return 0
 
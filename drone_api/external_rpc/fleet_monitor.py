@@ -0,0 +1,341 @@
+#!/usr/bin/env python3
+from __future__ import annotations
+
+import itertools
+import math
+import threading
+import time
+from dataclasses import dataclass
+
+from fleet_status_reader import POS_PDU_NAME, STATUS_PDU_NAME, FleetStatusReader
+
+import fleet_state_table
+from fleet_state_table import FleetStateTable, FleetStateView
+
+
+# DroneStatus.flight_mode values (see drone_service_rc sample)
+FLIGHT_MODE_NAMES = {0: "ATTI", 1: "GPS"}
+# message of drones seen in the PDUs but never answered get_state()
+NO_STATE_MESSAGE = "no state yet"
+
+
+@dataclass
+class DroneStateSnapshot:
+    drone_name: str
+    ok: bool
+    is_ready: bool
+    mode: str
+    message: str
+    x: float
+    y: float
+    z: float
+    roll_deg: float
+    pitch_deg: float
+    yaw_deg: float
+    version: int = 0
+    tick: int = 0
+    read_time: float = 0.0
+    flight_mode: int = -1
+    internal_state: int = -1
+
+
+class FleetStateMonitor:
+    """
+    Fixed-rate fleet state monitor built on direct `status`/`pos` PDU reads.
+
+    Every interval_sec one bulk tick is read for the whole fleet, so the refresh
+    period does not grow with the number of drones. Snapshots are replaced (never
+    mutated) when a drone's state changes beyond the given epsilons; each change
+    bumps the drone's version and the table version and is pushed to subscribers.
+    ok/is_ready/message are not in the PDUs and are taken from the latest
+    get_state() reply passed to update_from_state(); until the first reply a
+    drone has ok=False and message NO_STATE_MESSAGE.
+
+    When numpy is available the same updates are also written to a columnar
+    FleetStateTable (see table_view()) for vectorized fleet-wide queries.
+    """
+
+    def __init__(
+        self,
+        status_reader: FleetStatusReader,
+        drone_names: list[str],
+        interval_sec: float = 0.1,
+        *,
+        position_epsilon_m: float = 0.01,
+        angle_epsilon_deg: float = 0.5,
+    ) -> None:
+        self.status_reader = status_reader
+        self.drone_names = list(drone_names)
+        self.interval_sec = interval_sec
+        self.position_epsilon_m = position_epsilon_m
+        self.angle_epsilon_deg = angle_epsilon_deg
+        self.version = 0
+        self._states: dict[str, DroneStateSnapshot] = {}
+        self._fresh_times: dict[str, float] = {}
+        self._state_lock = threading.Lock()
+        self._subscribers: dict[int, tuple[object, frozenset[str] | None]] = {}
+        self._subscriber_ids = itertools.count(1)
+        # numpy is optional; without it only the snapshot dict is kept
+        self.table = FleetStateTable(self.drone_names) if fleet_state_table.np is not None else None
+        self._table_dirty = False
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._stats = {
+            "ticks": 0,
+            "overruns": 0,
+            "errors": 0,
+            "changes": 0,
+            "last_tick_sec": 0.0,
+            "max_tick_sec": 0.0,
+        }
+
+    def start(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run,
+            name="fleet-state-monitor",
+            daemon=True,
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=max(1.0, self.interval_sec * 2))
+            self._thread = None
+
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def _run(self) -> None:
+        next_time = time.monotonic()
+        while not self._stop.is_set():
+            try:
+                self.poll_once()
+            except Exception as e:
+                self._stats["errors"] += 1
+                print(f"[fleet_monitor] tick failed: {e}")
+            next_time += self.interval_sec
+            delay = next_time - time.monotonic()
+            if delay < 0:
+                # A tick ran longer than the interval: skip the missed slots
+                # instead of bursting to catch up.
+                self._stats["overruns"] += 1
+                next_time = time.monotonic()
+                delay = 0.0
+            self._stop.wait(delay)
+
+    def _changed(self, old: DroneStateSnapshot, new: DroneStateSnapshot) -> bool:
+        if (
+            old.ok != new.ok
+            or old.is_ready != new.is_ready
+            or old.mode != new.mode
+            or old.message != new.message
+            or old.flight_mode != new.flight_mode
+            or old.internal_state != new.internal_state
+        ):
+            return True
+        eps = self.position_epsilon_m
+        if (
+            abs(old.x - new.x) > eps
+            or abs(old.y - new.y) > eps
+            or abs(old.z - new.z) > eps
+        ):
+            return True
+        eps = self.angle_epsilon_deg
+        return (
+            abs(old.roll_deg - new.roll_deg) > eps
+            or abs(old.pitch_deg - new.pitch_deg) > eps
+            or abs(old.yaw_deg - new.yaw_deg) > eps
+        )
+
+    def _commit(
+        self, candidates: list[DroneStateSnapshot], read_time: float, *, publish: bool = True
+    ) -> None:
+        """
+        Apply candidates to the snapshot dict and the table. With publish=False the
+        table is only marked dirty and published by the next tick (or table_view()).
+        """
+        changed = []
+        with self._state_lock:
+            for candidate in candidates:
+                name = candidate.drone_name
+                self._fresh_times[name] = read_time
+                old = self._states.get(name)
+                if old is not None and not self._changed(old, candidate):
+                    continue
+                candidate.version = 1 if old is None else old.version + 1
+                self._states[name] = candidate
+                changed.append(candidate)
+            if changed:
+                self.version += 1
+            if self.table is not None:
+                for snapshot in changed:
+                    self.table.update(snapshot)
+                self.table.touch([c.drone_name for c in candidates], read_time)
+                if publish:
+                    self.table.publish()
+                    self._table_dirty = False
+                else:
+                    self._table_dirty = True
+            subscribers = list(self._subscribers.values())
+        self._stats["changes"] += len(changed)
+        for snapshot in changed:
+            for callback, names in subscribers:
+                if names is not None and snapshot.drone_name not in names:
+                    continue
+                try:
+                    callback(snapshot)
+                except Exception as e:
+                    print(f"[fleet_monitor] subscriber failed: drone={snapshot.drone_name} error={e}")
+
+    def poll_once(self) -> int:
+        """Read one tick and update the table. Returns the number of changed drones."""
+        started = time.monotonic()
+        reader = self.status_reader
+        tick = reader.read_tick((STATUS_PDU_NAME, POS_PDU_NAME))
+        views = reader.status_views()
+        candidates = []
+        for drone_name in self.drone_names:
+            pose = reader.read_pose(drone_name)
+            if pose is None:
+                continue
+            _tick, read_time, (x, y, z, roll, pitch, yaw) = pose
+            view = views.get(drone_name)
+            flight_mode = view.flight_mode if view is not None else -1
+            internal_state = view.internal_state if view is not None else -1
+            old = self._states.get(drone_name)
+            if old is None:
+                ok, is_ready, message = False, False, NO_STATE_MESSAGE
+                mode = FLIGHT_MODE_NAMES.get(flight_mode, str(flight_mode))
+            else:
+                ok, is_ready, mode, message = old.ok, old.is_ready, old.mode, old.message
+            candidates.append(
+                DroneStateSnapshot(
+                    drone_name=drone_name,
+                    ok=ok,
+                    is_ready=is_ready,
+                    mode=mode,
+                    message=message,
+                    x=x,
+                    y=y,
+                    z=z,
+                    roll_deg=math.degrees(roll),
+                    pitch_deg=math.degrees(pitch),
+                    yaw_deg=math.degrees(yaw),
+                    tick=tick,
+                    read_time=read_time,
+                    flight_mode=flight_mode,
+                    internal_state=internal_state,
+                )
+            )
+        before = self._stats["changes"]
+        self._commit(candidates, reader.read_time)
+        elapsed = time.monotonic() - started
+        self._stats["ticks"] += 1
+        self._stats["last_tick_sec"] = elapsed
+        self._stats["max_tick_sec"] = max(self._stats["max_tick_sec"], elapsed)
+        return self._stats["changes"] - before
+
+    def update_from_state(self, drone_name: str, state) -> DroneStateSnapshot:
+        """Merge a DroneGetState reply into the table."""
+        from hakosim_rpc import quaternion_to_euler_deg
+
+        pos = state.current_pose.position
+        ori = state.current_pose.orientation
+        roll_deg, pitch_deg, yaw_deg = quaternion_to_euler_deg(
+            ori.w, ori.x, ori.y, ori.z
+        )
+        now = time.monotonic()
+        old = self._states.get(drone_name)
+        snapshot = DroneStateSnapshot(
+            drone_name=drone_name,
+            ok=bool(state.ok),
+            is_ready=bool(state.is_ready),
+            mode=str(state.mode),
+            message=str(state.message),
+            x=float(pos.x),
+            y=float(pos.y),
+            z=float(pos.z),
+            roll_deg=float(roll_deg),
+            pitch_deg=float(pitch_deg),
+            yaw_deg=float(yaw_deg),
+            tick=old.tick if old is not None else 0,
+            read_time=now,
+            flight_mode=old.flight_mode if old is not None else -1,
+            internal_state=old.internal_state if old is not None else -1,
+        )
+        # A get_state fan-out over the fleet would copy the whole table once per
+        # reply; the monitor tick publishes the batch instead.
+        self._commit([snapshot], now, publish=False)
+        return self._states[drone_name]
+
+    def get(self, drone_name: str) -> DroneStateSnapshot | None:
+        with self._state_lock:
+            return self._states.get(drone_name)
+
+    def snapshot(self) -> tuple[int, dict[str, DroneStateSnapshot]]:
+        """(table version, copy of the drone_name -> snapshot table)."""
+        with self._state_lock:
+            return self.version, dict(self._states)
+
+    def changed_since(self, version_by_drone: dict[str, int]) -> list[DroneStateSnapshot]:
+        with self._state_lock:
+            return [
+                snapshot
+                for name, snapshot in self._states.items()
+                if snapshot.version > version_by_drone.get(name, 0)
+            ]
+
+    def table_view(self) -> FleetStateView | None:
+        """Latest read-only columnar view of the fleet (None without numpy)."""
+        if self.table is None:
+            return None
+        with self._state_lock:
+            # Without a running monitor nothing else publishes get_state() updates.
+            if self._table_dirty:
+                self.table.publish()
+                self._table_dirty = False
+        return self.table.view()
+
+    def subscribe(self, callback, drone_names: list[str] | None = None) -> int:
+        """
+        Call callback(snapshot) from the monitor thread whenever a drone's state changes.
+        Returns a token for unsubscribe().
+        """
+        token = next(self._subscriber_ids)
+        names = None if drone_names is None else frozenset(drone_names)
+        with self._state_lock:
+            self._subscribers[token] = (callback, names)
+        return token
+
+    def unsubscribe(self, token: int) -> None:
+        with self._state_lock:
+            self._subscribers.pop(token, None)
+
+    def freshness(self, drone_name: str) -> float | None:
+        """Seconds since drone_name's PDUs were last read successfully."""
+        read_time = self._fresh_times.get(drone_name)
+        if read_time is None:
+            return None
+        return time.monotonic() - read_time
+
+    def stale_drones(self, max_age_sec: float) -> list[str]:
+        now = time.monotonic()
+        return [
+            drone_name
+            for drone_name in self.drone_names
+            if now - self._fresh_times.get(drone_name, -math.inf) > max_age_sec
+        ]
+
+    def get_stats(self) -> dict:
+        stats = dict(self._stats)
+        stats["interval_sec"] = self.interval_sec
+        stats["version"] = self.version
+        stats["drones"] = len(self._states)
+        return stats
+
+
+__all__ = ["DroneStateSnapshot", "FLIGHT_MODE_NAMES", "FleetStateMonitor", "NO_STATE_MESSAGE"]
@@ -1,77 +1,20 @@
 #!/usr/bin/env python3
 from __future__ import annotations
 
-import json
 import threading
-import time
-import hakopy
-from concurrent.futures import Future, ThreadPoolExecutor, wait
-from dataclasses import dataclass
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
 from pathlib import Path
 
 from fleet_rpc_async_shared import AsyncSharedFleetRpcController
+from fleet_monitor import DroneStateSnapshot, FleetStateMonitor
+from fleet_status_reader import (
+    POS_PDU_NAME,
+    STATUS_PDU_NAME,
+    DroneStatusView,
+    FleetStatusReader,
+)
 from hakosim_rpc import DEFAULT_SERVICE_CONFIG_PATH, HakoniwaRpcDroneClient
-from hakoniwa_pdu.impl.pdu_channel_config import PduChannelConfig
-from hakoniwa_pdu.pdu_msgs.hako_msgs.pdu_conv_DroneStatus import pdu_to_py_DroneStatus
-from service_config_loader import create_runtime_service_config
-
-
-@dataclass
-class DroneStateSnapshot:
-    drone_name: str
-    ok: bool
-    is_ready: bool
-    mode: str
-    message: str
-    x: float
-    y: float
-    z: float
-    roll_deg: float
-    pitch_deg: float
-    yaw_deg: float
-
-
-class _FleetStatusReader:
-    def __init__(self, service_config_path: Path | str, ensure_initialized) -> None:
-        self.service_config_path = Path(service_config_path).resolve()
-        self._ensure_initialized = ensure_initialized
-        runtime_service_config_path = create_runtime_service_config(
-            self.service_config_path
-        )
-        runtime_service = json.loads(runtime_service_config_path.read_text())
-        pdu_config_path = runtime_service.get("pdu_config_path")
-        if not pdu_config_path:
-            raise RuntimeError(
-                f"pdu_config_path is missing in runtime service config: {runtime_service_config_path}"
-            )
-        self.pdu_config_path = Path(pdu_config_path).resolve()
-        self._pdu_config = PduChannelConfig(str(self.pdu_config_path))
-        self._read_lock = threading.Lock()
-
-    def get_raw_pdu(self, drone_name: str, pdu_name: str) -> bytearray:
-        self._ensure_initialized()
-        channel_id = self._pdu_config.get_pdu_channel_id(drone_name, pdu_name)
-        pdu_size = self._pdu_config.get_pdu_size(drone_name, pdu_name)
-        if channel_id < 0 or pdu_size <= 0:
-            raise RuntimeError(
-                f"PDU channel is not defined: drone={drone_name} pdu={pdu_name}"
-            )
-        last_error = None
-        with self._read_lock:
-            for _ in range(5):
-                try:
-                    raw_data = hakopy.pdu_read(drone_name, channel_id, pdu_size)
-                    if raw_data:
-                        return raw_data
-                except Exception as e:
-                    last_error = e
-                time.sleep(0.01)
-        raise RuntimeError(
-            f"Failed to read PDU raw data directly: drone={drone_name} pdu={pdu_name}"
-        ) from last_error
-
-    def get_status(self, drone_name: str):
-        return pdu_to_py_DroneStatus(self.get_raw_pdu(drone_name, "status"))
+from service_registration import register_services
 
 
 class _SyncFleetRpcController:
@@ -93,16 +36,19 @@ class _SyncFleetRpcController:
             )
             for drone_name in self.drone_names
         }
-        self._status_reader = _FleetStatusReader(
-            self.service_config_path, self._ensure_external_initialized
+        self._status_reader = FleetStatusReader(
+            self.service_config_path,
+            self._ensure_external_initialized,
+            self.drone_names,
+            tick_pdu_names=(STATUS_PDU_NAME, POS_PDU_NAME),
+        )
+        self._monitor = FleetStateMonitor(
+            self._status_reader, self.drone_names, monitor_interval_sec
         )
         self._locks = {
             drone_name: threading.Lock() for drone_name in self.drone_names
         }
-        self._latest_states: dict[str, DroneStateSnapshot] = {}
-        self._state_lock = threading.Lock()
-        self._monitor_stop = threading.Event()
-        self._monitor_thread: threading.Thread | None = None
+        self.registration_stats: dict = {}
         self._executor = ThreadPoolExecutor(
             max_workers=max_workers or max(len(self.drone_names), 1),
             thread_name_prefix="fleet-rpc",
@@ -135,8 +81,31 @@ class _SyncFleetRpcController:
     def _submit(self, drone_name: str, func) -> Future:
         return self._executor.submit(self._call_with_lock, drone_name, func)
 
-    def prepare_basic_services(self) -> None:
-        return None
+    def prepare_basic_services(self, **kwargs) -> dict:
+        return self.prepare_services(
+            ["DroneSetReady", "DroneTakeOff", "DroneGoTo", "DroneGetState", "DroneLand"],
+            **kwargs,
+        )
+
+    def prepare_services(
+        self,
+        service_types: list[str],
+        *,
+        max_workers: int | None = None,
+        cache_path: Path | str | None = None,
+    ) -> dict:
+        """
+        Register all (drone, service) pairs up front instead of lazily on the
+        first call. Returns per-phase timing.
+        """
+        self.registration_stats = register_services(
+            self._clients,
+            service_types,
+            service_config_path=self.service_config_path,
+            max_workers=max_workers,
+            cache_path=cache_path,
+        )
+        return self.registration_stats
 
     def set_ready_async(self, drone_name: str) -> Future:
         return self._submit(drone_name, lambda client: client.set_ready())
@@ -210,11 +179,20 @@ class _SyncFleetRpcController:
             drone_name, lambda client: client.land(timeout_sec=timeout_sec)
         )
 
+    def _get_state_and_record(self, drone_name: str, client):
+        state = client.get_state()
+        self._monitor.update_from_state(drone_name, state)
+        return state
+
     def get_state(self, drone_name: str):
-        return self._call_with_lock(drone_name, lambda client: client.get_state())
+        return self._call_with_lock(
+            drone_name, lambda client: self._get_state_and_record(drone_name, client)
+        )
 
     def get_state_async(self, drone_name: str) -> Future:
-        return self._submit(drone_name, lambda client: client.get_state())
+        return self._submit(
+            drone_name, lambda client: self._get_state_and_record(drone_name, client)
+        )
 
     def get_raw_pdu(self, drone_name: str, pdu_name: str):
         return self._status_reader.get_raw_pdu(drone_name, pdu_name)
@@ -222,65 +200,48 @@ class _SyncFleetRpcController:
     def get_status(self, drone_name: str):
         return self._status_reader.get_status(drone_name)
 
-    def get_status_async(self, drone_name: str) -> Future:
-        return self._executor.submit(self._status_reader.get_status, drone_name)
+    def read_status_tick(self) -> int:
+        return self._status_reader.read_tick()
 
-    def _to_snapshot(self, drone_name: str, state) -> DroneStateSnapshot:
-        from hakosim_rpc import quaternion_to_euler_deg
+    def get_status_views(
+        self, max_age_sec: float | None = None
+    ) -> dict[str, DroneStatusView]:
+        return self._status_reader.status_views(max_age_sec)
 
-        pos = state.current_pose.position
-        ori = state.current_pose.orientation
-        roll_deg, pitch_deg, yaw_deg = quaternion_to_euler_deg(
-            ori.w, ori.x, ori.y, ori.z
-        )
-        return DroneStateSnapshot(
-            drone_name=drone_name,
-            ok=bool(state.ok),
-            is_ready=bool(state.is_ready),
-            mode=str(state.mode),
-            message=str(state.message),
-            x=float(pos.x),
-            y=float(pos.y),
-            z=float(pos.z),
-            roll_deg=float(roll_deg),
-            pitch_deg=float(pitch_deg),
-            yaw_deg=float(yaw_deg),
-        )
+    def get_status_field(
+        self, drone_name: str, field: str, max_age_sec: float | None = None
+    ):
+        return self._status_reader.get_status_field(drone_name, field, max_age_sec)
 
-    def _monitor_loop(self) -> None:
-        while not self._monitor_stop.is_set():
-            for drone_name in self.drone_names:
-                if self._monitor_stop.is_set():
-                    break
-                try:
-                    state = self.get_state(drone_name)
-                    snapshot = self._to_snapshot(drone_name, state)
-                    with self._state_lock:
-                        self._latest_states[drone_name] = snapshot
-                except Exception:
-                    pass
-            self._monitor_stop.wait(self.monitor_interval_sec)
+    def get_status_async(self, drone_name: str) -> Future:
+        return self._executor.submit(self._status_reader.get_status, drone_name)
 
     def start_monitoring(self) -> None:
-        if self._monitor_thread is not None and self._monitor_thread.is_alive():
-            return
-        self._monitor_stop.clear()
-        self._monitor_thread = threading.Thread(
-            target=self._monitor_loop,
-            name="fleet-rpc-monitor",
-            daemon=True,
-        )
-        self._monitor_thread.start()
+        self._monitor.start()
 
     def stop_monitoring(self) -> None:
-        self._monitor_stop.set()
-        if self._monitor_thread is not None:
-            self._monitor_thread.join(timeout=1.0)
-            self._monitor_thread = None
+        self._monitor.stop()
 
     def get_latest_state(self, drone_name: str) -> DroneStateSnapshot | None:
-        with self._state_lock:
-            return self._latest_states.get(drone_name)
+        return self._monitor.get(drone_name)
+
+    def get_state_table(self) -> tuple[int, dict[str, DroneStateSnapshot]]:
+        return self._monitor.snapshot()
+
+    def get_state_view(self):
+        return self._monitor.table_view()
+
+    def subscribe_state(self, callback, drone_names: list[str] | None = None) -> int:
+        return self._monitor.subscribe(callback, drone_names)
+
+    def unsubscribe_state(self, token: int) -> None:
+        self._monitor.unsubscribe(token)
+
+    def get_state_freshness(self, drone_name: str) -> float | None:
+        return self._monitor.freshness(drone_name)
+
+    def get_monitor_stats(self) -> dict:
+        return self._monitor.get_stats()
 
     def wait_for_all(
         self,
@@ -308,6 +269,12 @@ class _SyncFleetRpcController:
                     raise e
         return results
 
+    def wait_for_any(
+        self, futures: list[Future], timeout_sec: float | None = None
+    ) -> tuple[set[Future], set[Future]]:
+        """(done, not_done) as soon as one future completes or timeout_sec passes."""
+        return wait(futures, timeout=timeout_sec, return_when=FIRST_COMPLETED)
+
 
 def FleetRpcController(
     drone_names: list[str],
@@ -1,61 +1,118 @@
 #!/usr/bin/env python3
 from __future__ import annotations
 
-import json
 import threading
 import time
-import hakopy
+import weakref
 from pathlib import Path
 
 from hakosim_async_shared_rpc import AsyncSharedHakoniwaRpcDroneClient
+from fleet_monitor import DroneStateSnapshot, FleetStateMonitor
+from fleet_status_reader import (
+    POS_PDU_NAME,
+    STATUS_PDU_NAME,
+    DroneStatusView,
+    FleetStatusReader,
+)
 from hakosim_rpc import DEFAULT_SERVICE_CONFIG_PATH
-from hakoniwa_pdu.impl.pdu_channel_config import PduChannelConfig
-from hakoniwa_pdu.pdu_msgs.hako_msgs.pdu_conv_DroneStatus import pdu_to_py_DroneStatus
+from poll_scheduler import PollScheduler
+from service_registration import register_services
 from hakoniwa_pdu.rpc.async_shared import RpcCallFuture
-from service_config_loader import create_runtime_service_config
+from hakoniwa_pdu.pdu_msgs.drone_srv_msgs.pdu_pytype_DroneGoToRequest import (
+    DroneGoToRequest,
+)
+from hakoniwa_pdu.pdu_msgs.drone_srv_msgs.pdu_pytype_DroneLandRequest import (
+    DroneLandRequest,
+)
+from hakoniwa_pdu.pdu_msgs.drone_srv_msgs.pdu_pytype_DroneTakeOffRequest import (
+    DroneTakeOffRequest,
+)
+from hakoniwa_pdu.pdu_msgs.geometry_msgs.pdu_pytype_Vector3 import Vector3
 
 
-class _FleetStatusReader:
-    def __init__(self, service_config_path: Path | str, ensure_initialized) -> None:
-        self.service_config_path = Path(service_config_path).resolve()
-        self._ensure_initialized = ensure_initialized
-        runtime_service_config_path = create_runtime_service_config(
-            self.service_config_path
-        )
-        runtime_service = json.loads(runtime_service_config_path.read_text())
-        pdu_config_path = runtime_service.get("pdu_config_path")
-        if not pdu_config_path:
-            raise RuntimeError(
-                f"pdu_config_path is missing in runtime service config: {runtime_service_config_path}"
-            )
-        self.pdu_config_path = Path(pdu_config_path).resolve()
-        self._pdu_config = PduChannelConfig(str(self.pdu_config_path))
-        self._read_lock = threading.Lock()
-
-    def get_raw_pdu(self, drone_name: str, pdu_name: str) -> bytearray:
-        self._ensure_initialized()
-        channel_id = self._pdu_config.get_pdu_channel_id(drone_name, pdu_name)
-        pdu_size = self._pdu_config.get_pdu_size(drone_name, pdu_name)
-        if channel_id < 0 or pdu_size <= 0:
-            raise RuntimeError(
-                f"PDU channel is not defined: drone={drone_name} pdu={pdu_name}"
-            )
-        last_error = None
-        with self._read_lock:
-            for _ in range(5):
-                try:
-                    raw_data = hakopy.pdu_read(drone_name, channel_id, pdu_size)
-                    if raw_data:
-                        return raw_data
-                except Exception as e:
-                    last_error = e
-                time.sleep(0.01)
-        raise RuntimeError(
-            f"Failed to read PDU raw data directly: drone={drone_name} pdu={pdu_name}"
-        ) from last_error
+def _per_drone(value, drone_name: str):
+    return value[drone_name] if isinstance(value, dict) else value
 
-    def get_status(self, drone_name: str):
-        return pdu_to_py_DroneStatus(self.get_raw_pdu(drone_name, "status"))
+
+class BatchFuture:
+    """
+    Completion of one batch of RPC calls.
+
+    Completions are counted by runtime callbacks, so done() is O(1) and wait()
+    only polls the runtimes the batch was submitted to. The wait between empty
+    polls is chosen by a scheduler spawned from the given PollScheduler for
+    each wait() call, so batches can be waited on from several threads.
+    """
+
+    def __init__(self, drone_names: list[str], scheduler: PollScheduler) -> None:
+        self.drone_names = list(drone_names)
+        self.futures: list[RpcCallFuture | None] = [None] * len(self.drone_names)
+        self.scheduler = scheduler
+        self._runtimes: dict[int, object] = {}
+        self._lock = threading.Lock()
+        self._remaining = len(self.drone_names)
+
+    def _on_done(self, _future: RpcCallFuture) -> None:
+        with self._lock:
+            self._remaining -= 1
+
+    def _add(self, index: int, future: RpcCallFuture, runtime) -> None:
+        self.futures[index] = future
+        if runtime is None or future.done():
+            self._on_done(future)
+            return
+        self._runtimes.setdefault(id(runtime), runtime)
+        runtime.add_done_callback(future, self._on_done)
+
+    @property
+    def remaining(self) -> int:
+        return self._remaining
+
+    @property
+    def completed(self) -> int:
+        return len(self.drone_names) - self._remaining
+
+    def done(self) -> bool:
+        return self._remaining <= 0
+
+    def wait(self, timeout_sec: float | None = None) -> bool:
+        deadline = None if timeout_sec is None else time.monotonic() + timeout_sec
+        runtimes = list(self._runtimes.values())
+        scheduler = self.scheduler.spawn()
+        while self._remaining > 0:
+            processed = 0
+            for runtime in runtimes:
+                processed += runtime.poll_once()
+            if self._remaining <= 0:
+                break
+            now = time.monotonic()
+            if deadline is not None and now >= deadline:
+                return False
+            scheduler.wait(
+                processed,
+                self._remaining,
+                None if deadline is None else deadline - now,
+            )
+        return True
+
+    def result(
+        self, timeout_sec: float | None = None, *, return_exceptions: bool = False
+    ) -> list:
+        """Results in submission order, like wait_for_all()."""
+        if not self.wait(timeout_sec) and not return_exceptions:
+            raise TimeoutError()
+        results = []
+        for drone_name, future in zip(self.drone_names, self.futures):
+            if not future.done():
+                results.append(TimeoutError())
+                continue
+            try:
+                results.append(future.result(timeout=0.0))
+            except Exception as e:
+                if not return_exceptions:
+                    raise RuntimeError(f"[{drone_name}] {e}") from e
+                results.append(e)
+        return results
 
 
 class AsyncSharedFleetRpcController:
@@ -65,10 +122,12 @@ class AsyncSharedFleetRpcController:
         service_config_path: Path | str = DEFAULT_SERVICE_CONFIG_PATH,
         *,
         monitor_interval_sec: float = 0.1,
+        poll_scheduler: PollScheduler | None = None,
     ) -> None:
         self.drone_names = list(drone_names)
         self.service_config_path = Path(service_config_path).resolve()
         self.monitor_interval_sec = monitor_interval_sec
+        self.poll_scheduler = poll_scheduler or PollScheduler()
         self._clients = {
             drone_name: AsyncSharedHakoniwaRpcDroneClient(
                 drone_name=drone_name,
@@ -76,16 +135,28 @@ class AsyncSharedFleetRpcController:
             )
             for drone_name in self.drone_names
         }
-        self._status_reader = _FleetStatusReader(
-            self.service_config_path, self._ensure_external_initialized
+        self._status_reader = FleetStatusReader(
+            self.service_config_path,
+            self._ensure_external_initialized,
+            self.drone_names,
+            tick_pdu_names=(STATUS_PDU_NAME, POS_PDU_NAME),
+        )
+        self._monitor = FleetStateMonitor(
+            self._status_reader, self.drone_names, monitor_interval_sec
         )
         self._locks = {
             drone_name: threading.Lock() for drone_name in self.drone_names
         }
-        self._future_runtime_ids: dict[int, int] = {}
+        # future -> id(runtime); weak so that futures a caller gave up on do not pile up
+        self._future_runtime_ids: "weakref.WeakKeyDictionary[RpcCallFuture, int]" = (
+            weakref.WeakKeyDictionary()
+        )
+        # wait_for_any() is called in a loop; each thread keeps its scheduler across calls
+        self._wait_any_local = threading.local()
+        self.registration_stats: dict = {}
 
     def close(self) -> None:
-        return None
+        self.stop_monitoring()
 
     def __enter__(self) -> "AsyncSharedFleetRpcController":
         return self
@@ -107,7 +178,7 @@ class AsyncSharedFleetRpcController:
     def _register_future_runtime(self, future: RpcCallFuture, drone_name: str) -> RpcCallFuture:
         runtime = getattr(self._clients[drone_name], "_runtime", None)
         if runtime is not None:
-            self._future_runtime_ids[id(future)] = id(runtime)
+            self._future_runtime_ids[future] = id(runtime)
         return future
 
     def _poll_once(self, runtime_ids: set[int] | None = None) -> int:
@@ -126,17 +197,124 @@ class AsyncSharedFleetRpcController:
             processed += client.poll_once()
         return processed
 
-    def prepare_basic_services(self) -> None:
-        for drone_name in self.drone_names:
-            self._call_with_lock(
-                drone_name, lambda client: client.prepare_all_basic_services()
-            )
+    def _submit_many(
+        self,
+        service_type: str,
+        items: list[tuple[str, object]],
+        fill_request,
+        *,
+        timeout_msec: int | None = None,
+    ) -> BatchFuture:
+        """
+        Submit one request per (drone_name, arg), grouped so that each
+        SharedRpcRuntime is handled in one pass. fill_request(drone_name, arg)
+        may return the same request object every time; it is encoded on submit.
+        """
+        batch = BatchFuture([drone_name for drone_name, _arg in items], self.poll_scheduler)
+        groups: dict[int, list[int]] = {}
+        for index, (drone_name, _arg) in enumerate(items):
+            runtime = getattr(self._clients[drone_name], "_runtime", None)
+            groups.setdefault(id(runtime), []).append(index)
+        for indexes in groups.values():
+            for index in indexes:
+                drone_name, arg = items[index]
+                client = self._clients[drone_name]
+                runtime = getattr(client, "_runtime", None)
+                with self._locks[drone_name]:
+                    try:
+                        future = client._submit(
+                            service_type,
+                            fill_request(drone_name, arg),
+                            timeout_msec=timeout_msec,
+                        )
+                    except Exception as e:
+                        future = RpcCallFuture(service_id=-1, client_id=-1, request_id=-1)
+                        future.set_exception(e)
+                        runtime = None
+                batch._add(index, future, runtime)
+        return batch
+
+    def goto_many(
+        self,
+        targets: dict[str, tuple[float, ...]],
+        *,
+        speed_m_s: float | dict[str, float] = 1.0,
+        tolerance_m: float = 0.5,
+        timeout_sec: float = 30.0,
+    ) -> BatchFuture:
+        """
+        :param targets: drone_name -> (x, y, z) or (x, y, z, yaw_deg)
+        :param speed_m_s: one speed for all drones, or drone_name -> speed
+        """
+        req = DroneGoToRequest()
+        req.target_pose = Vector3()
+        req.tolerance_m = tolerance_m
+        req.timeout_sec = timeout_sec
+
+        def fill(drone_name: str, target):
+            req.drone_name = drone_name
+            req.target_pose.x = target[0]
+            req.target_pose.y = target[1]
+            req.target_pose.z = target[2]
+            req.yaw_deg = target[3] if len(target) > 3 else 0.0
+            req.speed_m_s = _per_drone(speed_m_s, drone_name)
+            return req
+
+        return self._submit_many("DroneGoTo", list(targets.items()), fill)
+
+    def takeoff_many(
+        self, drone_names: list[str], alt_m: float | dict[str, float]
+    ) -> BatchFuture:
+        req = DroneTakeOffRequest()
+
+        def fill(drone_name: str, _arg):
+            req.drone_name = drone_name
+            req.alt_m = _per_drone(alt_m, drone_name)
+            return req
+
+        return self._submit_many(
+            "DroneTakeOff", [(drone_name, None) for drone_name in drone_names], fill
+        )
 
-    def prepare_services(self, service_types: list[str]) -> None:
-        for drone_name in self.drone_names:
-            self._call_with_lock(
-                drone_name, lambda client: client.prepare_services(service_types)
-            )
+    def land_many(
+        self, drone_names: list[str], timeout_sec: float = 0.0
+    ) -> BatchFuture:
+        req = DroneLandRequest()
+
+        def fill(drone_name: str, _arg):
+            req.drone_name = drone_name
+            return req
+
+        timeout_msec = int(timeout_sec * 1000) if timeout_sec > 0 else None
+        return self._submit_many(
+            "DroneLand",
+            [(drone_name, None) for drone_name in drone_names],
+            fill,
+            timeout_msec=timeout_msec,
+        )
+
+    def prepare_basic_services(self, **kwargs) -> dict:
+        return self.prepare_services(
+            ["DroneSetReady", "DroneTakeOff", "DroneGoTo", "DroneGetState", "DroneLand"],
+            **kwargs,
+        )
+
+    def prepare_services(
+        self,
+        service_types: list[str],
+        *,
+        max_workers: int | None = None,
+        cache_path: Path | str | None = None,
+    ) -> dict:
+        """Register all (drone, service) pairs in bulk. Returns per-phase timing."""
+        self.registration_stats = register_services(
+            self._clients,
+            service_types,
+            service_config_path=self.service_config_path,
+            max_workers=max_workers,
+            cache_path=cache_path,
+        )
+        return self.registration_stats
 
     def set_ready_async(self, drone_name: str) -> RpcCallFuture:
         future = self._call_with_lock(
@@ -221,7 +399,9 @@ class AsyncSharedFleetRpcController:
         )
 
     def get_state(self, drone_name: str):
-        return self._call_with_lock(drone_name, lambda client: client.get_state())
+        state = self._call_with_lock(drone_name, lambda client: client.get_state())
+        self._monitor.update_from_state(drone_name, state)
+        return state
 
     def get_state_async(self, drone_name: str) -> RpcCallFuture:
         future = self._call_with_lock(
@@ -235,6 +415,19 @@ class AsyncSharedFleetRpcController:
     def get_status(self, drone_name: str):
         return self._status_reader.get_status(drone_name)
 
+    def read_status_tick(self) -> int:
+        return self._status_reader.read_tick()
+
+    def get_status_views(
+        self, max_age_sec: float | None = None
+    ) -> dict[str, DroneStatusView]:
+        return self._status_reader.status_views(max_age_sec)
+
+    def get_status_field(
+        self, drone_name: str, field: str, max_age_sec: float | None = None
+    ):
+        return self._status_reader.get_status_field(drone_name, field, max_age_sec)
+
     def get_status_async(self, drone_name: str):
         future = RpcCallFuture(service_id=-1, client_id=-1, request_id=-1)
         try:
@@ -244,13 +437,35 @@ class AsyncSharedFleetRpcController:
         return future
 
     def start_monitoring(self) -> None:
-        return None
+        self._monitor.start()
 
     def stop_monitoring(self) -> None:
-        return None
+        self._monitor.stop()
+
+    def get_latest_state(self, drone_name: str) -> DroneStateSnapshot | None:
+        return self._monitor.get(drone_name)
+
+    def get_state_table(self) -> tuple[int, dict[str, DroneStateSnapshot]]:
+        return self._monitor.snapshot()
+
+    def get_state_view(self):
+        return self._monitor.table_view()
+
+    def subscribe_state(self, callback, drone_names: list[str] | None = None) -> int:
+        return self._monitor.subscribe(callback, drone_names)
 
-    def get_latest_state(self, drone_name: str):
-        return None
+    def unsubscribe_state(self, token: int) -> None:
+        self._monitor.unsubscribe(token)
+
+    def get_state_freshness(self, drone_name: str) -> float | None:
+        return self._monitor.freshness(drone_name)
+
+    def get_monitor_stats(self) -> dict:
+        return self._monitor.get_stats()
+
+    def get_poll_stats(self) -> dict:
+        """Poll count, empty-poll ratio and added latency of wait_for_all()/BatchFuture.wait()."""
+        return self.poll_scheduler.get_stats()
 
     def wait_for_all(
         self,
@@ -261,16 +476,17 @@ class AsyncSharedFleetRpcController:
     ):
         deadline = None if timeout_sec is None else time.monotonic() + timeout_sec
         pending = list(futures)
+        runtime_ids = {
+            self._future_runtime_ids[future]
+            for future in pending
+            if future in self._future_runtime_ids
+        }
+        scheduler = self.poll_scheduler.spawn()
         while True:
             still_pending = [future for future in pending if not future.done()]
             if not still_pending:
                 break
             pending = still_pending
-            runtime_ids = {
-                self._future_runtime_ids[ id(future) ]
-                for future in pending
-                if id(future) in self._future_runtime_ids
-            }
             now = time.monotonic()
             if deadline is not None and now >= deadline:
                 e = TimeoutError()
@@ -281,13 +497,11 @@ class AsyncSharedFleetRpcController:
                     ]
                 raise e
             processed = self._poll_once(runtime_ids if runtime_ids else None)
-            if processed == 0:
-                remaining = None if deadline is None else max(deadline - now, 0.0)
-                sleep_sec = self.monitor_interval_sec
-                if remaining is not None:
-                    sleep_sec = min(sleep_sec, remaining)
-                if sleep_sec > 0:
-                    time.sleep(sleep_sec)
+            scheduler.wait(
+                processed,
+                len(pending),
+                None if deadline is None else max(deadline - now, 0.0),
+            )
 
         results = []
         for future in futures:
@@ -299,5 +513,43 @@ class AsyncSharedFleetRpcController:
                 else:
                     raise
             finally:
-                self._future_runtime_ids.pop(id(future), None)
+                self._future_runtime_ids.pop(future, None)
         return results
+
+    def wait_for_any(
+        self, futures: list[RpcCallFuture], timeout_sec: float | None = None
+    ) -> tuple[set[RpcCallFuture], set[RpcCallFuture]]:
+        """
+        (done, not_done) as soon as one future completes or timeout_sec passes,
+        like concurrent.futures.wait(return_when=FIRST_COMPLETED). Only the
+        runtimes of the given futures are polled. The poll scheduler of the
+        calling thread is kept between calls, so a windowed loop keeps its
+        busy/short state instead of starting over at every completion.
+        """
+        if not futures:
+            return set(), set()
+        deadline = None if timeout_sec is None else time.monotonic() + timeout_sec
+        runtime_ids = {
+            self._future_runtime_ids[future]
+            for future in futures
+            if future in self._future_runtime_ids
+        }
+        scheduler = getattr(self._wait_any_local, "scheduler", None)
+        if scheduler is None:
+            scheduler = self._wait_any_local.scheduler = self.poll_scheduler.spawn()
+        while True:
+            done = {future for future in futures if future.done()}
+            if done:
+                break
+            now = time.monotonic()
+            if deadline is not None and now >= deadline:
+                break
+            processed = self._poll_once(runtime_ids if runtime_ids else None)
+            scheduler.wait(
+                processed,
+                len(futures),
+                None if deadline is None else max(deadline - now, 0.0),
+            )
+        for future in done:
+            self._future_runtime_ids.pop(future, None)
+        return done, {future for future in futures if future not in done}
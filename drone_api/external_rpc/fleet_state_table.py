@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+from __future__ import annotations
+
+import threading
+import time
+
+try:
+    import numpy as np
+except ModuleNotFoundError:
+    # numpy is optional; FleetStateMonitor skips the table without it
+    np = None
+
+# Upper bound of the pairwise distances held at once by nearest_neighbours().
+NEIGHBOUR_CHUNK_ELEMENTS = 1 << 20
+
+
+class FleetStateView:
+    """
+    Read-only columns of the whole fleet at one table version.
+
+    Row i belongs to names[i]. Rows that have never been written have valid == False
+    and are ignored by the aggregate queries.
+    """
+
+    def __init__(
+        self,
+        version: int,
+        names: tuple[str, ...],
+        index: dict[str, int],
+        columns: dict[str, np.ndarray],
+    ) -> None:
+        self.version = version
+        self.names = names
+        self._index = index
+        for name, column in columns.items():
+            column.flags.writeable = False
+            setattr(self, name, column)
+
+    def index_of(self, drone_name: str) -> int:
+        return self._index[drone_name]
+
+    def _target_array(self, targets) -> np.ndarray:
+        if isinstance(targets, dict):
+            out = np.full((len(self.names), 3), np.nan)
+            for drone_name, xyz in targets.items():
+                out[self._index[drone_name]] = xyz
+            return out
+        return np.asarray(targets, dtype=np.float64).reshape(len(self.names), 3)
+
+    def distance_to(self, targets) -> np.ndarray:
+        """
+        Distance of each drone to its target.
+
+        :param targets: (N, 3) array in row order, or dict drone_name -> (x, y, z).
+                        Drones without a target (or never read) get NaN.
+        """
+        d = np.linalg.norm(self.position - self._target_array(targets), axis=1)
+        d[~self.valid] = np.nan
+        return d
+
+    def within(self, targets, tolerance_m: float) -> list[str]:
+        """Names of drones within tolerance_m of their target."""
+        d = self.distance_to(targets)
+        with np.errstate(invalid="ignore"):
+            mask = d <= tolerance_m
+        return [self.names[i] for i in np.flatnonzero(mask)]
+
+    def bounding_box(self) -> tuple[np.ndarray, np.ndarray] | None:
+        """(min_xyz, max_xyz) over all valid drones, or None if none have been read."""
+        if not self.valid.any():
+            return None
+        pos = self.position[self.valid]
+        return pos.min(axis=0), pos.max(axis=0)
+
+    def nearest_neighbours(self, k: int = 1) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Indices and distances of each valid drone's k nearest valid neighbours.
+        Rows for invalid drones are -1 / inf.
+        """
+        n = len(self.names)
+        valid_rows = np.flatnonzero(self.valid)
+        k = max(min(k, len(valid_rows) - 1), 0)
+        idx = np.full((n, k), -1, dtype=np.int64)
+        dist = np.full((n, k), np.inf)
+        if k == 0:
+            return idx, dist
+        pos = self.position[valid_rows]
+        m = len(valid_rows)
+        # Rows are processed in chunks so memory stays O(chunk x N), not O(N^2).
+        chunk = max(1, NEIGHBOUR_CHUNK_ELEMENTS // m)
+        for start in range(0, m, chunk):
+            stop = min(start + chunk, m)
+            d = np.zeros((stop - start, m))
+            for axis in range(3):
+                diff = pos[start:stop, axis, None] - pos[None, :, axis]
+                d += diff * diff
+            np.sqrt(d, out=d)
+            d[np.arange(stop - start), np.arange(start, stop)] = np.inf
+            order = np.argpartition(d, k - 1, axis=1)[:, :k]
+            order_d = np.take_along_axis(d, order, axis=1)
+            sort = np.argsort(order_d, axis=1)
+            rows = valid_rows[start:stop]
+            idx[rows] = valid_rows[np.take_along_axis(order, sort, axis=1)]
+            dist[rows] = np.take_along_axis(order_d, sort, axis=1)
+        return idx, dist
+
+    def min_separation(self) -> tuple[float, str, str] | None:
+        """(distance, drone_a, drone_b) of the closest valid pair."""
+        idx, dist = self.nearest_neighbours(1)
+        if dist.size == 0 or not np.isfinite(dist).any():
+            return None
+        i = int(np.argmin(dist[:, 0]))
+        return float(dist[i, 0]), self.names[i], self.names[int(idx[i, 0])]
+
+    def readiness_counts(self) -> dict[str, int]:
+        return {
+            "total": len(self.names),
+            "valid": int(self.valid.sum()),
+            "ok": int((self.ok & self.valid).sum()),
+            "ready": int((self.is_ready & self.valid).sum()),
+        }
+
+    def stale(self, max_age_sec: float, now: float | None = None) -> list[str]:
+        now = time.monotonic() if now is None else now
+        mask = ~self.valid | (now - self.read_time > max_age_sec)
+        return [self.names[i] for i in np.flatnonzero(mask)]
+
+
+class FleetStateTable:
+    """
+    Columnar fleet state indexed by drone ID (row = position in drone_names).
+
+    The writer updates private columns and publish() swaps in a new read-only
+    FleetStateView, so view() never takes the writer's lock and a view never
+    changes after it has been handed out.
+    """
+
+    COLUMNS = {
+        "position": ((3,), "f8"),
+        "attitude_deg": ((3,), "f8"),
+        "flight_mode": ((), "i4"),
+        "internal_state": ((), "i4"),
+        "ok": ((), "?"),
+        "is_ready": ((), "?"),
+        "valid": ((), "?"),
+        "row_version": ((), "i8"),
+        "read_time": ((), "f8"),
+    }
+
+    def __init__(self, drone_names: list[str]) -> None:
+        if np is None:
+            raise RuntimeError("numpy is required for FleetStateTable")
+        self.names = tuple(drone_names)
+        self._index = {name: i for i, name in enumerate(self.names)}
+        n = len(self.names)
+        self._columns = {
+            name: np.zeros((n,) + shape, dtype=dtype)
+            for name, (shape, dtype) in self.COLUMNS.items()
+        }
+        self._columns["flight_mode"][:] = -1
+        self._columns["internal_state"][:] = -1
+        self._write_lock = threading.Lock()
+        self.version = 0
+        self._view = self._make_view()
+
+    def _make_view(self) -> FleetStateView:
+        return FleetStateView(
+            self.version,
+            self.names,
+            self._index,
+            {name: column.copy() for name, column in self._columns.items()},
+        )
+
+    def update(self, snapshot) -> None:
+        """Write one DroneStateSnapshot into its row (visible after publish())."""
+        i = self._index[snapshot.drone_name]
+        c = self._columns
+        with self._write_lock:
+            c["position"][i] = (snapshot.x, snapshot.y, snapshot.z)
+            c["attitude_deg"][i] = (snapshot.roll_deg, snapshot.pitch_deg, snapshot.yaw_deg)
+            c["flight_mode"][i] = snapshot.flight_mode
+            c["internal_state"][i] = snapshot.internal_state
+            c["ok"][i] = snapshot.ok
+            c["is_ready"][i] = snapshot.is_ready
+            c["valid"][i] = True
+            c["row_version"][i] = snapshot.version
+            c["read_time"][i] = snapshot.read_time
+
+    def touch(self, drone_names, read_time: float) -> None:
+        """Refresh read_time for drones whose state was read but did not change."""
+        rows = [self._index[name] for name in drone_names]
+        with self._write_lock:
+            self._columns["read_time"][rows] = read_time
+
+    def publish(self) -> FleetStateView:
+        with self._write_lock:
+            self.version += 1
+            view = self._make_view()
+        self._view = view
+        return view
+
+    def view(self) -> FleetStateView:
+        return self._view
+
+
+__all__ = ["FleetStateTable", "FleetStateView"]
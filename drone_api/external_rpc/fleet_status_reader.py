@@ -0,0 +1,298 @@
+#!/usr/bin/env python3
+from __future__ import annotations
+
+import struct
+import threading
+import time
+from pathlib import Path
+
+import hakopy
+from hakoniwa_pdu.impl.pdu_channel_config import PduChannelConfig
+from hakoniwa_pdu.pdu_msgs import binary_io
+from hakoniwa_pdu.pdu_msgs.hako_msgs.pdu_conv_DroneStatus import pdu_to_py_DroneStatus
+
+from service_config_loader import load_runtime_service_config
+
+
+STATUS_PDU_NAME = "status"
+POS_PDU_NAME = "pos"
+DEFAULT_READ_RETRY_COUNT = 5
+DEFAULT_READ_RETRY_INTERVAL_SEC = 0.01
+
+# DroneStatus field -> (offset from the start of the base data, struct format)
+DRONE_STATUS_FIELDS = {
+    "flight_mode": (0, "<i"),
+    "internal_state": (4, "<i"),
+    "propeller_wind": (8, "<3d"),
+    "collided_counts": (32, "<i"),
+}
+# geometry_msgs/Twist: linear x, y, z [m] followed by angular x, y, z [rad]
+TWIST_FORMAT = "<6d"
+
+
+class DroneStatusView:
+    """
+    One drone's `status` PDU inside a FleetStatusReader tick buffer.
+    Fields are decoded on access; call raw() to keep the bytes beyond the next tick.
+    """
+
+    __slots__ = ("drone_name", "tick", "read_time", "_buffer", "_offset", "_size")
+
+    def __init__(
+        self,
+        drone_name: str,
+        tick: int,
+        read_time: float,
+        buffer: bytearray,
+        offset: int,
+        size: int,
+    ) -> None:
+        self.drone_name = drone_name
+        self.tick = tick
+        self.read_time = read_time
+        self._buffer = buffer
+        self._offset = offset
+        self._size = size
+
+    def field(self, name: str):
+        off, fmt = DRONE_STATUS_FIELDS[name]
+        values = struct.unpack_from(
+            fmt,
+            self._buffer,
+            self._offset + binary_io.PduMetaData.PDU_META_DATA_SIZE + off,
+        )
+        return values[0] if len(values) == 1 else values
+
+    @property
+    def flight_mode(self) -> int:
+        return self.field("flight_mode")
+
+    @property
+    def internal_state(self) -> int:
+        return self.field("internal_state")
+
+    @property
+    def propeller_wind(self) -> tuple[float, float, float]:
+        return self.field("propeller_wind")
+
+    @property
+    def collided_counts(self) -> int:
+        return self.field("collided_counts")
+
+    def raw(self) -> bytearray:
+        return self._buffer[self._offset : self._offset + self._size]
+
+    def decode(self):
+        return pdu_to_py_DroneStatus(self.raw())
+
+    def __repr__(self) -> str:
+        return f"DroneStatusView(drone_name={self.drone_name}, tick={self.tick})"
+
+
+class _PduTickBuffer:
+    """Double-buffered storage for one PDU name across all drones."""
+
+    def __init__(self, stride: int, drone_count: int) -> None:
+        self.stride = stride
+        self.buffers = [bytearray(stride * drone_count), bytearray(stride * drone_count)]
+        self.front = 0
+        # (tick, read_time, buffer, valid) of the latest tick, replaced as one object
+        self.current: tuple[int, float, bytearray, list[bool]] = (0, 0.0, self.buffers[0], [False] * drone_count)
+
+
+class FleetStatusReader:
+    """
+    Direct shared-memory reader for fleet PDUs.
+
+    Channel IDs and sizes are resolved once. read_tick() reads every drone's
+    `status` PDU (and any other tick_pdu_names) into one preallocated buffer per
+    PDU name without holding a fleet-wide lock against single-drone reads; the
+    buffers are double-buffered so views from the previous tick stay valid while
+    the next one is being written.
+    """
+
+    def __init__(
+        self,
+        service_config_path: Path | str,
+        ensure_initialized,
+        drone_names: list[str] | None = None,
+        *,
+        retry_count: int = DEFAULT_READ_RETRY_COUNT,
+        retry_interval_sec: float = DEFAULT_READ_RETRY_INTERVAL_SEC,
+        tick_pdu_names: tuple[str, ...] = (STATUS_PDU_NAME,),
+    ) -> None:
+        self.service_config_path = Path(service_config_path).resolve()
+        self._ensure_initialized = ensure_initialized
+        runtime_service_config_path, runtime_service = load_runtime_service_config(
+            self.service_config_path
+        )
+        pdu_config_path = runtime_service.get("pdu_config_path")
+        if not pdu_config_path:
+            raise RuntimeError(
+                f"pdu_config_path is missing in runtime service config: {runtime_service_config_path}"
+            )
+        self.pdu_config_path = Path(pdu_config_path).resolve()
+        self._pdu_config = PduChannelConfig(str(self.pdu_config_path))
+        self.retry_count = retry_count
+        self.retry_interval_sec = retry_interval_sec
+        self.drone_names = list(drone_names or [])
+        self._index = {name: index for index, name in enumerate(self.drone_names)}
+        self._channels: dict[tuple[str, str], tuple[int, int]] = {}
+
+        self.tick_pdu_names = tuple(tick_pdu_names)
+        self.tick = 0
+        self.read_time = 0.0
+        self._tick_lock = threading.Lock()
+        self._tick_buffers: dict[str, _PduTickBuffer] = {}
+
+    def _resolve(self, drone_name: str, pdu_name: str) -> tuple[int, int]:
+        key = (drone_name, pdu_name)
+        channel = self._channels.get(key)
+        if channel is None:
+            channel_id = self._pdu_config.get_pdu_channel_id(drone_name, pdu_name)
+            pdu_size = self._pdu_config.get_pdu_size(drone_name, pdu_name)
+            if channel_id < 0 or pdu_size <= 0:
+                raise RuntimeError(
+                    f"PDU channel is not defined: drone={drone_name} pdu={pdu_name}"
+                )
+            channel = (channel_id, pdu_size)
+            self._channels[key] = channel
+        return channel
+
+    def _tick_buffer(self, pdu_name: str) -> _PduTickBuffer:
+        tick_buffer = self._tick_buffers.get(pdu_name)
+        if tick_buffer is None:
+            channels = [self._resolve(name, pdu_name) for name in self.drone_names]
+            stride = max((size for _channel_id, size in channels), default=0)
+            tick_buffer = _PduTickBuffer(stride, len(self.drone_names))
+            self._tick_buffers[pdu_name] = tick_buffer
+        return tick_buffer
+
+    def get_raw_pdu(self, drone_name: str, pdu_name: str) -> bytearray:
+        self._ensure_initialized()
+        channel_id, pdu_size = self._resolve(drone_name, pdu_name)
+        last_error = None
+        for attempt in range(self.retry_count):
+            try:
+                raw_data = hakopy.pdu_read(drone_name, channel_id, pdu_size)
+                if raw_data:
+                    return raw_data
+            except Exception as e:
+                last_error = e
+            if attempt + 1 < self.retry_count:
+                time.sleep(self.retry_interval_sec)
+        raise RuntimeError(
+            f"Failed to read PDU raw data directly: drone={drone_name} pdu={pdu_name}"
+        ) from last_error
+
+    def get_status(self, drone_name: str):
+        return pdu_to_py_DroneStatus(self.get_raw_pdu(drone_name, STATUS_PDU_NAME))
+
+    def read_tick(self, pdu_names: tuple[str, ...] | None = None) -> int:
+        """
+        Bulk-read the given PDUs (default: tick_pdu_names) of every drone once.
+        Returns the new tick number.
+        """
+        self._ensure_initialized()
+        with self._tick_lock:
+            tick = self.tick + 1
+            for pdu_name in pdu_names or self.tick_pdu_names:
+                tick_buffer = self._tick_buffer(pdu_name)
+                back = 1 - tick_buffer.front
+                buffer = tick_buffer.buffers[back]
+                valid = [False] * len(self.drone_names)
+                stride = tick_buffer.stride
+                for index, drone_name in enumerate(self.drone_names):
+                    channel_id, pdu_size = self._channels[(drone_name, pdu_name)]
+                    try:
+                        raw_data = hakopy.pdu_read(drone_name, channel_id, pdu_size)
+                    except Exception:
+                        raw_data = None
+                    if raw_data:
+                        offset = index * stride
+                        buffer[offset : offset + len(raw_data)] = raw_data
+                        valid[index] = True
+                tick_buffer.front = back
+                tick_buffer.current = (tick, time.monotonic(), buffer, valid)
+            self.read_time = time.monotonic()
+            self.tick = tick
+            return tick
+
+    def _latest(self, pdu_name: str, max_age_sec: float | None):
+        tick_buffer = self._tick_buffers.get(pdu_name)
+        if tick_buffer is None or tick_buffer.current[0] == 0 or (
+            max_age_sec is not None
+            and time.monotonic() - tick_buffer.current[1] > max_age_sec
+        ):
+            self.read_tick((pdu_name,))
+            tick_buffer = self._tick_buffers[pdu_name]
+        return tick_buffer.stride, tick_buffer.current
+
+    def _view(self, stride: int, current, drone_name: str, index: int) -> DroneStatusView:
+        tick, read_time, buffer, _valid = current
+        return DroneStatusView(
+            drone_name,
+            tick,
+            read_time,
+            buffer,
+            index * stride,
+            self._channels[(drone_name, STATUS_PDU_NAME)][1],
+        )
+
+    def status_view(
+        self, drone_name: str, max_age_sec: float | None = None
+    ) -> DroneStatusView | None:
+        """
+        View of drone_name's status from the latest tick; a new tick is read first
+        if there is none yet or it is older than max_age_sec.
+        """
+        stride, current = self._latest(STATUS_PDU_NAME, max_age_sec)
+        index = self._index[drone_name]
+        if not current[3][index]:
+            return None
+        return self._view(stride, current, drone_name, index)
+
+    def status_views(self, max_age_sec: float | None = None) -> dict[str, DroneStatusView]:
+        stride, current = self._latest(STATUS_PDU_NAME, max_age_sec)
+        valid = current[3]
+        return {
+            drone_name: self._view(stride, current, drone_name, index)
+            for index, drone_name in enumerate(self.drone_names)
+            if valid[index]
+        }
+
+    def get_status_field(self, drone_name: str, field: str, max_age_sec: float | None = None):
+        view = self.status_view(drone_name, max_age_sec)
+        if view is None:
+            raise RuntimeError(
+                f"status PDU is not available: drone={drone_name}"
+            )
+        return view.field(field)
+
+    def read_pose(
+        self, drone_name: str, max_age_sec: float | None = None
+    ) -> tuple[int, float, tuple[float, ...]] | None:
+        """
+        (tick, read_time, (x, y, z, roll_rad, pitch_rad, yaw_rad)) of drone_name's
+        `pos` PDU from the latest tick, or None if it has not been read.
+        """
+        stride, current = self._latest(POS_PDU_NAME, max_age_sec)
+        tick, read_time, buffer, valid = current
+        index = self._index[drone_name]
+        if not valid[index]:
+            return None
+        pose = struct.unpack_from(
+            TWIST_FORMAT,
+            buffer,
+            index * stride + binary_io.PduMetaData.PDU_META_DATA_SIZE,
+        )
+        return tick, read_time, pose
+
+
+__all__ = [
+    "DRONE_STATUS_FIELDS",
+    "POS_PDU_NAME",
+    "STATUS_PDU_NAME",
+    "DroneStatusView",
+    "FleetStatusReader",
+]
@@ -0,0 +1,286 @@
+#!/usr/bin/env python3
+from __future__ import annotations
+
+import math
+import os
+import time
+from collections import deque
+from dataclasses import dataclass
+
+try:
+    import numpy as np
+except ModuleNotFoundError:
+    # numpy is optional; without it every mode falls back to the greedy loop
+    np = None
+
+
+# Above this many drones the O(N^3) exact solver is replaced by the greedy one.
+DEFAULT_EXACT_MAX = int(os.getenv("HAKO_SHOW_ASSIGN_EXACT_MAX", "1024"))
+
+Point = tuple[float, float, float]
+
+
+@dataclass
+class AssignmentResult:
+    assignments: dict[str, Point]
+    solver: str
+    total_distance_m: float
+    max_distance_m: float
+    solve_sec: float
+
+    def to_dict(self) -> dict:
+        return {
+            "solver": self.solver,
+            "total_distance_m": self.total_distance_m,
+            "max_distance_m": self.max_distance_m,
+            "solve_sec": self.solve_sec,
+        }
+
+
+def _dist3(a: Point, b: Point) -> float:
+    return math.sqrt((a[0] - b[0]) ** 2 + (a[1] - b[1]) ** 2 + (a[2] - b[2]) ** 2)
+
+
+def travel_distances(
+    current_positions: dict[str, Point], assignments: dict[str, Point]
+) -> tuple[float, float]:
+    """(total, max) straight-line distance of the drones in both dicts."""
+    distances = [
+        _dist3(current_positions[d], target)
+        for d, target in assignments.items()
+        if d in current_positions
+    ]
+    return sum(distances), max(distances, default=0.0)
+
+
+def cost_matrix(sources: list[Point], targets: list[Point]):
+    """Euclidean distance matrix [source, target]."""
+    src = np.asarray(sources, dtype=np.float64)
+    dst = np.asarray(targets, dtype=np.float64)
+    squared = np.zeros((len(src), len(dst)))
+    for axis in range(3):
+        diff = src[:, axis, None] - dst[None, :, axis]
+        squared += diff * diff
+    return np.sqrt(squared, out=squared)
+
+
+def solve_min_sum(cost) -> list[int]:
+    """
+    Column assigned to each row minimizing the total cost (square matrix).
+
+    Shortest augmenting path Hungarian algorithm (Jonker-Volgenant style); the
+    per-column relaxation runs as numpy vector operations, one row at a time.
+    """
+    n = cost.shape[0]
+    u = np.zeros(n + 1)
+    v = np.zeros(n + 1)
+    row_of = np.zeros(n + 1, dtype=np.int64)  # column j (1-based) -> row (1-based), 0: free
+    way = np.zeros(n + 1, dtype=np.int64)
+    for i in range(1, n + 1):
+        row_of[0] = i
+        j0 = 0
+        minv = np.full(n + 1, np.inf)
+        used = np.zeros(n + 1, dtype=bool)
+        while True:
+            used[j0] = True
+            i0 = row_of[j0]
+            reduced = cost[i0 - 1] - u[i0] - v[1:]
+            free = ~used[1:]
+            better = free & (reduced < minv[1:])
+            minv[1:][better] = reduced[better]
+            way[1:][better] = j0
+            candidates = np.where(free, minv[1:], np.inf)
+            j1 = int(np.argmin(candidates)) + 1
+            delta = candidates[j1 - 1]
+            u[row_of[used]] += delta
+            v[used] -= delta
+            minv[~used] -= delta
+            j0 = j1
+            if row_of[j0] == 0:
+                break
+        while j0:
+            j1 = way[j0]
+            row_of[j0] = row_of[j1]
+            j0 = j1
+    col_of = [0] * n
+    for j in range(1, n + 1):
+        col_of[row_of[j] - 1] = j - 1
+    return col_of
+
+
+def _has_perfect_matching(allowed) -> bool:
+    """Hopcroft-Karp on the boolean [row, col] adjacency matrix."""
+    n = allowed.shape[0]
+    adj = [np.flatnonzero(row).tolist() for row in allowed]
+    if any(not cols for cols in adj):
+        return False
+    match_row = [-1] * n
+    match_col = [-1] * n
+    # Greedy start: most rows are matched without any augmenting search.
+    for r in range(n):
+        for c in adj[r]:
+            if match_col[c] < 0:
+                match_row[r] = c
+                match_col[c] = r
+                break
+    while True:
+        dist = [-1] * n
+        queue = deque(r for r in range(n) if match_row[r] < 0)
+        if not queue:
+            return True
+        for r in queue:
+            dist[r] = 0
+        found = False
+        while queue:
+            r = queue.popleft()
+            for c in adj[r]:
+                r2 = match_col[c]
+                if r2 < 0:
+                    found = True
+                elif dist[r2] < 0:
+                    dist[r2] = dist[r] + 1
+                    queue.append(r2)
+        if not found:
+            return False
+        for root in range(n):
+            if match_row[root] >= 0:
+                continue
+            # Iterative DFS along the BFS layers.
+            stack = [(root, iter(adj[root]))]
+            path: list[tuple[int, int]] = []
+            while stack:
+                r, cols = stack[-1]
+                advanced = False
+                for c in cols:
+                    r2 = match_col[c]
+                    if r2 < 0:
+                        path.append((r, c))
+                        for pr, pc in path:
+                            match_row[pr] = pc
+                            match_col[pc] = pr
+                        stack = []
+                        advanced = True
+                        break
+                    if dist[r2] == dist[r] + 1:
+                        path.append((r, c))
+                        stack.append((r2, iter(adj[r2])))
+                        advanced = True
+                        break
+                if not advanced:
+                    dist[r] = -1
+                    stack.pop()
+                    if path:
+                        path.pop()
+
+
+def solve_min_max(cost) -> list[int]:
+    """
+    Column per row minimizing the largest cost, then the total cost under that bound.
+
+    The bottleneck value is found by binary search over the distinct costs with a
+    perfect-matching test; the min-sum solver then runs with every cost above it
+    made prohibitive.
+    """
+    lower = max(float(cost.min(axis=1).max()), float(cost.min(axis=0).max()))
+    upper_cols = solve_min_sum(cost)
+    upper = float(max(cost[r, c] for r, c in enumerate(upper_cols)))
+    candidates = np.unique(cost[(cost >= lower) & (cost <= upper)])
+    lo, hi = 0, len(candidates) - 1
+    while lo < hi:
+        mid = (lo + hi) // 2
+        if _has_perfect_matching(cost <= candidates[mid]):
+            hi = mid
+        else:
+            lo = mid + 1
+    bound = candidates[lo] if len(candidates) else upper
+    if bound >= upper:
+        return upper_cols
+    penalty = float(cost.max()) * cost.shape[0] + 1.0
+    return solve_min_sum(np.where(cost <= bound, cost, penalty))
+
+
+def solve_greedy(cost) -> list[int]:
+    """Globally greedy: take the shortest remaining (drone, target) pair first."""
+    n = cost.shape[0]
+    order = np.argsort(cost, axis=None, kind="stable")
+    col_of = [-1] * n
+    row_done = [False] * n
+    col_done = [False] * n
+    assigned = 0
+    chunk = max(4 * n, 1024)
+    for start in range(0, order.size, chunk):
+        for flat in order[start : start + chunk].tolist():
+            r, c = divmod(flat, n)
+            if row_done[r] or col_done[c]:
+                continue
+            col_of[r] = c
+            row_done[r] = col_done[c] = True
+            assigned += 1
+            if assigned == n:
+                return col_of
+    return col_of
+
+
+def _solve_greedy_pure(drone_names, current_positions, targets) -> dict[str, Point]:
+    remaining = targets[:]
+    out: dict[str, Point] = {}
+    for d in drone_names:
+        cp = current_positions[d]
+        best_i = min(range(len(remaining)), key=lambda i: _dist3(cp, remaining[i]))
+        out[d] = remaining.pop(best_i)
+    return out
+
+
+def assign_formation(
+    drone_names: list[str],
+    current_positions: dict[str, Point],
+    targets: list[Point],
+    *,
+    objective: str = "sum",
+    exact_max: int | None = None,
+) -> AssignmentResult:
+    """
+    Assign one target per drone from the drones' current positions.
+
+    objective="sum" minimizes the total travel distance (no crossing paths in the
+    plane); objective="max" first minimizes the longest leg, which sets the
+    transition time, then the total. Fleets larger than exact_max (and runs
+    without numpy) use the greedy solver instead.
+    """
+    if len(drone_names) != len(targets):
+        raise ValueError("drone count and target count mismatch")
+    if objective not in ("sum", "max"):
+        raise ValueError(f"invalid assignment objective: {objective}")
+    exact_max = DEFAULT_EXACT_MAX if exact_max is None else exact_max
+    t0 = time.perf_counter()
+    if not drone_names:
+        return AssignmentResult({}, "empty", 0.0, 0.0, 0.0)
+    if np is None:
+        assignments = _solve_greedy_pure(drone_names, current_positions, targets)
+        solver = "greedy"
+    else:
+        cost = cost_matrix([current_positions[d] for d in drone_names], targets)
+        if len(drone_names) > exact_max:
+            col_of = solve_greedy(cost)
+            solver = "greedy"
+        elif objective == "max":
+            col_of = solve_min_max(cost)
+            solver = "hungarian_minmax"
+        else:
+            col_of = solve_min_sum(cost)
+            solver = "hungarian"
+        assignments = {d: targets[col_of[i]] for i, d in enumerate(drone_names)}
+    solve_sec = time.perf_counter() - t0
+    total, longest = travel_distances(current_positions, assignments)
+    return AssignmentResult(assignments, solver, total, longest, solve_sec)
+
+
+__all__ = [
+    "AssignmentResult",
+    "assign_formation",
+    "cost_matrix",
+    "solve_greedy",
+    "solve_min_max",
+    "solve_min_sum",
+    "travel_distances",
+]
@@ -1,7 +1,6 @@
 #!/usr/bin/env python3
 from __future__ import annotations
 
-import json
 import sys
 import threading
 import time
@@ -14,7 +13,6 @@ HAKO_PDU_PYTHON_SRC = REPO_ROOT / "work" / "hakoniwa-pdu-python" / "src"
 if str(HAKO_PDU_PYTHON_SRC) not in sys.path:
     sys.path.insert(0, str(HAKO_PDU_PYTHON_SRC))
 
-from hakoniwa_pdu.rpc.auto_wire import _load_protocol_components
 from hakoniwa_pdu.rpc.async_shared import (
     AsyncRpcClientHandle,
     RpcCallFuture,
@@ -47,15 +45,83 @@ from hakosim_rpc import (
     DEFAULT_TIMEOUT_MSEC,
     DEFAULT_TRACE_ENABLED,
     DEFAULT_TRACE_VERBOSE,
+    load_protocol_components,
+    resolved_client_ids,
 )
-from service_config_loader import create_runtime_service_config
+import rpc_trace
+from poll_scheduler import PollScheduler
+from service_config_loader import load_runtime_service_config
+
+
+class NotifyingSharedRpcRuntime(SharedRpcRuntime):
+    """SharedRpcRuntime that runs callbacks when a future is resolved or failed.
+
+    Lets batches count completions instead of scanning every future after each poll.
+    """
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self._callback_lock = threading.Lock()
+        self._done_callbacks: dict[tuple[int, int, int], list] = {}
+
+    def pending_count(self) -> int:
+        """Number of in-flight requests on this runtime (all clients)."""
+        return len(self._pending)
+
+    def add_done_callback(self, future: RpcCallFuture, callback) -> None:
+        key = (future.service_id, future.client_id, future.request_id)
+        with self._callback_lock:
+            if not future.done():
+                self._done_callbacks.setdefault(key, []).append((callback, future))
+                return
+        callback(future)
+
+    def _run_done_callbacks(self, key: tuple[int, int, int]) -> None:
+        with self._callback_lock:
+            callbacks = self._done_callbacks.pop(key, ())
+        for callback, future in callbacks:
+            callback(future)
+
+    def resolve_future(
+        self, *, service_id: int, client_id: int, request_id: int, result
+    ) -> bool:
+        ret = super().resolve_future(
+            service_id=service_id,
+            client_id=client_id,
+            request_id=request_id,
+            result=result,
+        )
+        self._run_done_callbacks((service_id, client_id, request_id))
+        return ret
+
+    def fail_future(
+        self,
+        *,
+        service_id: int,
+        client_id: int,
+        request_id: int,
+        exc: BaseException,
+    ) -> bool:
+        ret = super().fail_future(
+            service_id=service_id,
+            client_id=client_id,
+            request_id=request_id,
+            exc=exc,
+        )
+        self._run_done_callbacks((service_id, client_id, request_id))
+        return ret
+
+
+def _finish_trace(record: rpc_trace.RpcTraceRecord, future: RpcCallFuture) -> None:
+    record.observe()
+    record.finish(future.exception(timeout=0.0))
 
 
 class AsyncSharedHakoniwaRpcDroneClient:
     _external_init_lock = threading.Lock()
     _external_initialized = False
     _runtime_lock = threading.Lock()
-    _runtimes: dict[tuple[str, str, str, int], SharedRpcRuntime] = {}
+    _runtimes: dict[tuple[str, str, str, int], NotifyingSharedRpcRuntime] = {}
 
     def __init__(
         self,
@@ -76,13 +142,15 @@ class AsyncSharedHakoniwaRpcDroneClient:
         self.delta_time_usec = delta_time_usec
         self.timeout_msec = timeout_msec
         self.poll_interval_sec = poll_interval_sec
+        # poll_interval_sec > 0 keeps the fixed sleep; otherwise the wait adapts
+        # to recent completions.
+        self.poll_scheduler = PollScheduler.from_poll_interval(poll_interval_sec)
         self.trace_enabled = DEFAULT_TRACE_ENABLED
         self.trace_verbose = DEFAULT_TRACE_VERBOSE
-        self.runtime_service_config_path = create_runtime_service_config(
+        self.runtime_service_config_path, runtime_service = load_runtime_service_config(
             self.service_config_path
         )
         if pdu_config_path is None:
-            runtime_service = json.loads(self.runtime_service_config_path.read_text())
             runtime_pdu_config_path = runtime_service.get("pdu_config_path")
             if not runtime_pdu_config_path:
                 raise RuntimeError(
@@ -116,14 +184,14 @@ class AsyncSharedHakoniwaRpcDroneClient:
             self.delta_time_usec,
         )
 
-    def _get_or_create_runtime(self) -> SharedRpcRuntime:
+    def _get_or_create_runtime(self) -> NotifyingSharedRpcRuntime:
         self._ensure_external_initialized()
         key = self._runtime_key()
         with self._runtime_lock:
             runtime = self._runtimes.get(key)
             if runtime is not None:
                 return runtime
-            runtime = SharedRpcRuntime(
+            runtime = NotifyingSharedRpcRuntime(
                 asset_name=self.asset_name,
                 pdu_config_path=self.pdu_config_path,
                 service_config_path=self.runtime_service_config_path,
@@ -150,9 +218,7 @@ class AsyncSharedHakoniwaRpcDroneClient:
         #     f"AsyncSharedHakoniwaRpcDroneClient._get_handle drone={self.drone_name} service={service_type}"
         # ):
         req_packet, res_packet, req_encoder, req_decoder, res_encoder, res_decoder = (
-            _load_protocol_components(
-                service_type, "hakoniwa_pdu.pdu_msgs.drone_srv_msgs"
-            )
+            load_protocol_components(service_type)
         )
         handle = AsyncRpcClientHandle(
             runtime=self._runtime,
@@ -186,6 +252,12 @@ class AsyncSharedHakoniwaRpcDroneClient:
         for service_type in service_types:
             self.prepare_service(service_type)
 
+    def resolved_ids(self, service_type: str) -> dict | None:
+        handle = self._handles.get(service_type)
+        if handle is None or handle.client_context is None:
+            return None
+        return resolved_client_ids(self._runtime.manager, handle.client_context.client_id)
+
     def prepare_all_basic_services(self) -> None:
         self.prepare_services(
             [
@@ -197,19 +269,51 @@ class AsyncSharedHakoniwaRpcDroneClient:
             ]
         )
 
-    def _call_async(
+    def _submit(
         self, service_type: str, request, *, timeout_msec: int | None = None
     ) -> RpcCallFuture:
-        self._trace(f"call_async_start drone={self.drone_name} service={service_type}")
-        handle = self._get_handle(service_type)
+        """Encode and send one request. The request object may be reused after this returns."""
+        return self._submit_traced(service_type, request, timeout_msec=timeout_msec)[0]
+
+    def _submit_traced(
+        self,
+        service_type: str,
+        request,
+        *,
+        timeout_msec: int | None = None,
+        mode: str = "async_shared_nowait",
+    ) -> tuple[RpcCallFuture, rpc_trace.RpcTraceRecord | None]:
+        tracer = rpc_trace.TRACER
+        record = None
+        if tracer is not None:
+            record = tracer.begin(mode, service_type, self.drone_name)
         effective_timeout_msec = (
             self.timeout_msec if timeout_msec is None else timeout_msec
         )
-        future = handle.call_async(
-            request,
-            timeout_msec=effective_timeout_msec,
-            poll_interval=max(self.poll_interval_sec, 0.0),
-        )
+        try:
+            handle = self._get_handle(service_type)
+            future = handle.call_async(
+                request,
+                timeout_msec=effective_timeout_msec,
+                poll_interval=max(self.poll_interval_sec, 0.0),
+            )
+        except Exception as e:
+            if record is not None:
+                record.finish(e)
+            raise
+        if record is not None:
+            record.request_id = future.request_id
+            record.sent_wall = time.perf_counter()
+            self._runtime.add_done_callback(
+                future, lambda done: _finish_trace(record, done)
+            )
+        return future, record
+
+    def _call_async(
+        self, service_type: str, request, *, timeout_msec: int | None = None
+    ) -> RpcCallFuture:
+        self._trace(f"call_async_start drone={self.drone_name} service={service_type}")
+        future = self._submit(service_type, request, timeout_msec=timeout_msec)
         self._trace(
             "call_async_submitted "
             f"drone={self.drone_name} service={service_type} "
@@ -218,28 +322,41 @@ class AsyncSharedHakoniwaRpcDroneClient:
         return future
 
     def _call(self, service_type: str, request, *, timeout_msec: int | None = None):
-        future = self._call_async(service_type, request, timeout_msec=timeout_msec)
+        self._trace(f"call_async_start drone={self.drone_name} service={service_type}")
+        future, record = self._submit_traced(
+            service_type, request, timeout_msec=timeout_msec, mode="async_shared"
+        )
         start = time.monotonic()
         polls = 0
+        scheduler = self.poll_scheduler.spawn()
         while not future.done():
-            self._runtime.poll_once()
+            processed = self._runtime.poll_once()
             polls += 1
-            if self.poll_interval_sec > 0:
-                time.sleep(self.poll_interval_sec)
+            if future.done():
+                break
+            scheduler.wait(processed, self._runtime.pending_count())
             if self.timeout_msec >= 0:
                 elapsed_msec = (time.monotonic() - start) * 1000.0
                 if elapsed_msec > max(self.timeout_msec * 2, self.timeout_msec + 1000):
-                    raise TimeoutError(
+                    error = TimeoutError(
                         f"RPC wall timeout: drone={self.drone_name} service={service_type}"
                     )
+                    if record is not None:
+                        record.finish(error)
+                    raise error
         self._trace(
             f"call_done drone={self.drone_name} service={service_type} polls={polls}"
         )
+        if record is not None:
+            record.polls = polls
         return future.result(timeout=0.0)
 
     def poll_once(self) -> int:
         return self._runtime.poll_once()
 
+    def get_poll_stats(self) -> dict:
+        return self.poll_scheduler.get_stats()
+
     def _restart_pdu_read_service(self) -> None:
         pass # No-op for async shared runtime, as it should be always running
 
@@ -372,4 +489,4 @@ class AsyncSharedHakoniwaRpcDroneClient:
         return self._call("DroneLand", req, timeout_msec=timeout_msec)
 
 
-__all__ = ["AsyncSharedHakoniwaRpcDroneClient"]
+__all__ = ["AsyncSharedHakoniwaRpcDroneClient", "NotifyingSharedRpcRuntime"]
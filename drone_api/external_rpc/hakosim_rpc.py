@@ -1,7 +1,7 @@
 #!/usr/bin/env python3
 from __future__ import annotations
 
-import json
+import functools
 import math
 import os
 import sys
@@ -16,7 +16,7 @@ HAKO_PDU_PYTHON_SRC = REPO_ROOT / "work" / "hakoniwa-pdu-python" / "src"
 if str(HAKO_PDU_PYTHON_SRC) not in sys.path:
     sys.path.insert(0, str(HAKO_PDU_PYTHON_SRC))
 
-from hakoniwa_pdu.rpc.auto_wire import make_protocol_client
+from hakoniwa_pdu.rpc.auto_wire import _load_protocol_components
 from hakoniwa_pdu.rpc.protocol_client import ProtocolClientImmediate
 from hakoniwa_pdu.rpc.shm.shm_pdu_service_client_manager import (
     ShmPduServiceClientManager,
@@ -38,7 +38,8 @@ from hakoniwa_pdu.pdu_msgs.drone_srv_msgs.pdu_pytype_DroneTakeOffRequest import
 )
 from hakoniwa_pdu.pdu_msgs.geometry_msgs.pdu_pytype_Vector3 import Vector3
 
-from service_config_loader import create_runtime_service_config
+import rpc_trace
+from service_config_loader import load_runtime_service_config
 
 
 DEFAULT_SERVICE_CONFIG_PATH = (
@@ -52,6 +53,7 @@ DEFAULT_OFFSET_PATH = (
     / "pdu"
     / "offset"
 )
+DRONE_SRV_PKG = "hakoniwa_pdu.pdu_msgs.drone_srv_msgs"
 DEFAULT_ASSET_NAME = "DroneExternalClient"
 DEFAULT_DELTA_TIME_USEC = 100 * 1000
 DEFAULT_TIMEOUT_MSEC = -1
@@ -92,6 +94,106 @@ def quaternion_to_euler_deg(
     return (math.degrees(roll), math.degrees(pitch), math.degrees(yaw))
 
 
+@functools.lru_cache(maxsize=None)
+def load_protocol_components(service_type: str):
+    """(ReqPacket, ResPacket, req_encoder, req_decoder, res_encoder, res_decoder), loaded once per service type."""
+    return _load_protocol_components(service_type, DRONE_SRV_PKG)
+
+
+def resolved_client_ids(manager, client_id) -> dict | None:
+    """Service/client/channel IDs the core assigned to a registered client handle."""
+    context = manager.client_handles.get(client_id)
+    if context is None:
+        return None
+    return {
+        "service_id": context.service_id,
+        "client_id": context.native_client_id,
+        "request_channel_id": context.request_channel_id,
+        "response_channel_id": context.response_channel_id,
+    }
+
+
+class PendingRpcCall:
+    """
+    A request sent by HakoniwaRpcDroneClient._call_nowait().
+
+    poll() checks for the response without sleeping and returns (done, response);
+    it raises TimeoutError / RuntimeError the same way _call() does. A timed out
+    request is canceled without waiting: the cancel handshake is finished by the
+    following poll() calls, and TimeoutError is raised once it is done.
+    """
+
+    def __init__(
+        self,
+        owner: "HakoniwaRpcDroneClient",
+        service_type: str,
+        client,
+        trace_record=None,
+    ) -> None:
+        self.owner = owner
+        self.service_type = service_type
+        self.client = client
+        self.request_id = client._client_instance_last_request_id
+        self.trace_record = trace_record
+        self._cancel_error: TimeoutError | None = None
+
+    def _finish(self, error: BaseException | None = None) -> None:
+        self.owner._inflight.discard(self.service_type)
+        record = self.trace_record
+        if record is not None:
+            record.observe()
+            record.finish(error)
+
+    def poll(self) -> tuple[bool, object]:
+        client = self.client
+        manager = client.pdu_manager
+        if self.trace_record is not None:
+            self.trace_record.polls += 1
+        event = manager.poll_response_nowait(client.client_id)
+        if self._cancel_error is not None:
+            return self._poll_cancel(event)
+        if manager.is_client_event_none(event):
+            return False, None
+        if manager.is_client_event_response_in(event):
+            response = client.res_decoder(
+                manager.get_response(client.service_name, client.client_id)
+            )
+            if response.header.request_id != self.request_id:
+                # stale response of an earlier (timed out) request
+                return False, None
+            self._finish()
+            return True, response.body
+        if manager.is_client_event_timeout(event):
+            error = TimeoutError(
+                f"request timeout then canceled: service={client.service_name} client={client.client_name}"
+            )
+            # ProtocolClientImmediate.cancel() sleeps until the cancel is done;
+            # only send it here so that an event loop polling this call keeps running.
+            if not manager.cancel_request(client.client_id):
+                self._finish(error)
+                raise RuntimeError(
+                    f"Failed to cancel request: service={client.service_name} client={client.client_name}"
+                ) from error
+            self._cancel_error = error
+            return False, None
+        error = RuntimeError(f"Service call returned no response: {self.service_type}")
+        self._finish(error)
+        raise error
+
+    def _poll_cancel(self, event) -> tuple[bool, object]:
+        manager = self.client.pdu_manager
+        if manager.is_client_event_none(event):
+            return False, None
+        if manager.is_client_event_response_in(event):
+            # a response that raced with the cancel; drop it and keep waiting
+            manager.get_response(self.client.service_name, self.client.client_id)
+            return False, None
+        # cancel done (or the server gave up on the request as well)
+        error = self._cancel_error
+        self._finish(error)
+        raise error
+
+
 class HakoniwaRpcDroneClient:
     _external_init_lock = threading.Lock()
     _external_initialized = False
@@ -121,11 +223,10 @@ class HakoniwaRpcDroneClient:
         self.register_retry_interval_sec = register_retry_interval_sec
         self.trace_enabled = DEFAULT_TRACE_ENABLED
         self.trace_verbose = DEFAULT_TRACE_VERBOSE
-        self.runtime_service_config_path = create_runtime_service_config(
+        self.runtime_service_config_path, runtime_service = load_runtime_service_config(
             self.service_config_path
         )
         if pdu_config_path is None:
-            runtime_service = json.loads(self.runtime_service_config_path.read_text())
             runtime_pdu_config_path = runtime_service.get("pdu_config_path")
             if not runtime_pdu_config_path:
                 raise RuntimeError(
@@ -138,6 +239,8 @@ class HakoniwaRpcDroneClient:
         self._init_lock = threading.Lock()
         self._pdu_manager: ShmPduServiceClientManager | None = None
         self._clients: dict[str, object] = {}
+        self._inflight: set[str] = set()
+        self._register_attempts: dict[str, int] = {}
 
     def _trace(self, message: str) -> None:
         if self.trace_enabled:
@@ -185,13 +288,19 @@ class HakoniwaRpcDroneClient:
         if client is not None:
             return client
         assert self._pdu_manager is not None
-        client = make_protocol_client(
+        req_packet, res_packet, req_encoder, req_decoder, res_encoder, res_decoder = (
+            load_protocol_components(service_type)
+        )
+        client = ProtocolClientImmediate(
             pdu_manager=self._pdu_manager,
             service_name=self._service_name(service_type),
             client_name=self._client_name(service_type),
-            srv=service_type,
-            pkg="hakoniwa_pdu.pdu_msgs.drone_srv_msgs",
-            ProtocolClientClass=ProtocolClientImmediate,
+            cls_req_packet=req_packet,
+            req_encoder=req_encoder,
+            req_decoder=req_decoder,
+            cls_res_packet=res_packet,
+            res_encoder=res_encoder,
+            res_decoder=res_decoder,
         )
         t0 = time.time()
         self._trace(
@@ -202,6 +311,7 @@ class HakoniwaRpcDroneClient:
         for attempt in range(self.register_retry_count):
             if client.register():
                 self._clients[service_type] = client
+                self._register_attempts[service_type] = attempt + 1
                 self._trace(
                     "register_ok "
                     f"drone={self.drone_name} service={service_type} "
@@ -228,28 +338,63 @@ class HakoniwaRpcDroneClient:
             f"retry_interval_sec={self.register_retry_interval_sec})"
         )
 
+    def prepare_service(self, service_type: str) -> None:
+        self._get_protocol_client(service_type)
+
+    def prepare_services(self, service_types: list[str]) -> None:
+        for service_type in service_types:
+            self.prepare_service(service_type)
+
+    def resolved_ids(self, service_type: str) -> dict | None:
+        client = self._clients.get(service_type)
+        if client is None or self._pdu_manager is None:
+            return None
+        return resolved_client_ids(self._pdu_manager, client.client_id)
+
+    def _begin_trace(self, service_type: str, mode: str = "sync"):
+        """Structured trace record (see rpc_trace), or None while tracing is disabled."""
+        tracer = rpc_trace.TRACER
+        if tracer is None:
+            return None
+        record = tracer.begin(mode, service_type, self.drone_name)
+        if service_type not in self._clients:
+            # registration happens inside this call
+            record.retries = -1
+        return record
+
     def _call(self, service_type: str, request, *, timeout_msec: int | None = None):
         t0 = time.time()
         self._trace(
             "call_start "
             f"drone={self.drone_name} service={service_type}"
         )
-        client = self._get_protocol_client(service_type)
-        effective_timeout_msec = (
-            self.timeout_msec if timeout_msec is None else timeout_msec
-        )
-        response = client.call(
-            request,
-            timeout_msec=effective_timeout_msec,
-            poll_interval=self.poll_interval_sec,
-        )
-        if response is None:
-            self._trace(
-                "call_no_response "
-                f"drone={self.drone_name} service={service_type} "
-                f"elapsed_sec={time.time() - t0:.3f}"
+        record = self._begin_trace(service_type)
+        try:
+            client = self._get_protocol_client(service_type)
+            if record is not None and record.retries < 0:
+                record.retries = self._register_attempts.get(service_type, 1) - 1
+            effective_timeout_msec = (
+                self.timeout_msec if timeout_msec is None else timeout_msec
             )
-            raise RuntimeError(f"Service call returned no response: {service_type}")
+            response = client.call(
+                request,
+                timeout_msec=effective_timeout_msec,
+                poll_interval=self.poll_interval_sec,
+            )
+            if response is None:
+                self._trace(
+                    "call_no_response "
+                    f"drone={self.drone_name} service={service_type} "
+                    f"elapsed_sec={time.time() - t0:.3f}"
+                )
+                raise RuntimeError(f"Service call returned no response: {service_type}")
+        except Exception as e:
+            if record is not None:
+                record.finish(e)
+            raise
+        if record is not None:
+            record.request_id = client._client_instance_last_request_id
+            record.finish()
         self._trace(
             "call_done "
             f"drone={self.drone_name} service={service_type} "
@@ -257,6 +402,40 @@ class HakoniwaRpcDroneClient:
         )
         return response
 
+    def _call_nowait(
+        self, service_type: str, request, *, timeout_msec: int | None = None
+    ) -> PendingRpcCall:
+        """Send a request without waiting; poll the returned PendingRpcCall for the response."""
+        if service_type in self._inflight:
+            raise RuntimeError(
+                f"in-flight request already exists: drone={self.drone_name} service={service_type}"
+            )
+        record = self._begin_trace(service_type, "sync_nowait")
+        try:
+            client = self._get_protocol_client(service_type)
+            if record is not None and record.retries < 0:
+                record.retries = self._register_attempts.get(service_type, 1) - 1
+            effective_timeout_msec = (
+                self.timeout_msec if timeout_msec is None else timeout_msec
+            )
+            req_pdu_data = client._create_request_packet(request, self.poll_interval_sec)
+            if not client.pdu_manager.call_request(
+                client.client_id, req_pdu_data, effective_timeout_msec
+            ):
+                raise RuntimeError(f"Failed to send request: {service_type}")
+        except Exception as e:
+            if record is not None:
+                record.finish(e)
+            raise
+        self._inflight.add(service_type)
+        self._trace(
+            f"call_nowait drone={self.drone_name} service={service_type}"
+        )
+        if record is not None:
+            record.request_id = client._client_instance_last_request_id
+            record.sent_wall = time.perf_counter()
+        return PendingRpcCall(self, service_type, client, record)
+
     def set_ready(self):
         req = DroneSetReadyRequest()
         req.drone_name = self.drone_name
@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+from __future__ import annotations
+
+import os
+import threading
+import time
+from multiprocessing import AuthenticationError
+from multiprocessing.connection import Client, Listener, wait
+
+# Workers read the barrier key from the environment so it never shows up in argv.
+AUTHKEY_ENV = "HAKO_SHOW_BARRIER_AUTHKEY"
+
+
+def format_address(address: tuple[str, int]) -> str:
+    return f"{address[0]}:{address[1]}"
+
+
+def parse_address(text: str) -> tuple[str, int]:
+    host, _sep, port = text.rpartition(":")
+    if not host or not port.isdigit():
+        raise ValueError(f"invalid barrier address: {text}")
+    return host, int(port)
+
+
+class PhaseBarrierServer:
+    """
+    Phase barrier of the show workers over a local socket.
+
+    Every worker connects once, then sends ("arrive", phase) before starting a
+    phase; the server answers ("go", phase) to all workers once each of them has
+    arrived. A worker that reports failure or disconnects before reporting
+    done makes the server send ("abort", reason) to the others.
+    """
+
+    def __init__(self, worker_count: int, *, host: str = "127.0.0.1") -> None:
+        self.worker_count = int(worker_count)
+        self.authkey = os.urandom(16)
+        self._listener = Listener((host, 0), authkey=self.authkey)
+        self._conns: dict[int, object] = {}
+        self._lock = threading.Lock()
+        self._closed = False
+        self.arrived: dict[int, set[int]] = {}
+        self.released: set[int] = set()
+        self.finished: dict[int, str] = {}
+        self.aborted: str | None = None
+        self.wait_sec: dict[int, float] = {}
+        self._first_arrival: dict[int, float] = {}
+        threading.Thread(target=self._accept_loop, name="phase-barrier-accept", daemon=True).start()
+
+    @property
+    def address(self) -> tuple[str, int]:
+        return self._listener.address
+
+    def worker_env(self) -> dict[str, str]:
+        return {AUTHKEY_ENV: self.authkey.hex()}
+
+    def _accept_loop(self) -> None:
+        while not self._closed:
+            with self._lock:
+                if len(self._conns) >= self.worker_count:
+                    return
+            try:
+                conn = self._listener.accept()
+            except (EOFError, AuthenticationError, OSError) as e:
+                if self._closed:
+                    return
+                # One worker died during the handshake; the others still connect.
+                # Its process exit is caught by serve(alive=...).
+                print(f"WARN: phase_barrier accept failed: {type(e).__name__}: {e}")
+                continue
+            try:
+                kind, worker = conn.recv()
+            except (EOFError, OSError, TypeError, ValueError) as e:
+                print(f"WARN: phase_barrier hello failed: {type(e).__name__}: {e}")
+                conn.close()
+                continue
+            if kind != "hello":
+                conn.close()
+                continue
+            with self._lock:
+                self._conns[int(worker)] = conn
+
+    def _broadcast(self, message: tuple) -> None:
+        with self._lock:
+            conns = list(self._conns.values())
+        for conn in conns:
+            try:
+                conn.send(message)
+            except OSError:
+                pass
+
+    def _abort(self, reason: str) -> None:
+        if self.aborted is None:
+            self.aborted = reason
+            print(f"WARN: phase_barrier abort reason={reason}")
+            self._broadcast(("abort", reason))
+
+    def _handle(self, worker: int, message: tuple) -> None:
+        kind = message[0]
+        if kind == "arrive":
+            phase = int(message[1])
+            arrived = self.arrived.setdefault(phase, set())
+            arrived.add(worker)
+            self._first_arrival.setdefault(phase, time.perf_counter())
+            if len(arrived) >= self.worker_count and phase not in self.released:
+                self.released.add(phase)
+                self.wait_sec[phase] = time.perf_counter() - self._first_arrival[phase]
+                self._broadcast(("go", phase))
+        elif kind == "finish":
+            status = str(message[1])
+            self.finished[worker] = status
+            if status != "done":
+                self._abort(f"worker {worker} {status}")
+
+    def serve(self, alive=None, poll_sec: float = 0.2) -> None:
+        """
+        Relay barrier messages until every worker has finished.
+
+        alive() is called between polls; returning False (e.g. a worker process
+        exited without connecting) aborts the barrier.
+        """
+        while len(self.finished) < self.worker_count:
+            with self._lock:
+                conns = {conn: worker for worker, conn in self._conns.items()}
+            for conn in wait(list(conns), timeout=poll_sec) if conns else []:
+                worker = conns[conn]
+                try:
+                    message = conn.recv()
+                except (EOFError, OSError):
+                    with self._lock:
+                        self._conns.pop(worker, None)
+                    if worker not in self.finished:
+                        self.finished[worker] = "disconnected"
+                        self._abort(f"worker {worker} disconnected")
+                    continue
+                self._handle(worker, message)
+            if not conns:
+                time.sleep(poll_sec)
+            if alive is not None and not alive():
+                self._abort("worker process exited")
+                return
+
+    def close(self) -> None:
+        self._closed = True
+        with self._lock:
+            conns = list(self._conns.values())
+            self._conns = {}
+        for conn in conns:
+            conn.close()
+        self._listener.close()
+
+    def get_stats(self) -> dict:
+        return {
+            "workers": self.worker_count,
+            "phases": len(self.released),
+            "wait_sec_max": max(self.wait_sec.values(), default=0.0),
+            "wait_sec_total": sum(self.wait_sec.values()),
+            "finished": {str(worker): status for worker, status in sorted(self.finished.items())},
+            "aborted": self.aborted,
+        }
+
+
+class PhaseBarrierClient:
+    """Worker side of PhaseBarrierServer; never blocks the simulation loop."""
+
+    def __init__(self, address: tuple[str, int], worker_index: int, authkey: bytes | None = None) -> None:
+        if authkey is None:
+            authkey = bytes.fromhex(os.environ[AUTHKEY_ENV])
+        self.worker_index = int(worker_index)
+        self._conn = Client(address, authkey=authkey)
+        self._conn.send(("hello", self.worker_index))
+        self._arrived: set[int] = set()
+        self._released: set[int] = set()
+        self._finished = False
+
+    def _drain(self) -> None:
+        while self._conn.poll(0):
+            kind, value = self._conn.recv()
+            if kind == "go":
+                self._released.add(int(value))
+            elif kind == "abort":
+                raise RuntimeError(f"[barrier] aborted: {value}")
+
+    def check(self) -> None:
+        """Raise RuntimeError if another worker aborted the show (non-blocking, call every step)."""
+        self._drain()
+
+    def passed(self, phase: int) -> bool:
+        """Announce arrival at phase (once) and report whether every worker is there."""
+        if phase not in self._arrived:
+            self._arrived.add(phase)
+            self._conn.send(("arrive", phase))
+        if phase not in self._released:
+            self._drain()
+        return phase in self._released
+
+    def finish(self, status: str) -> None:
+        if self._finished:
+            return
+        self._finished = True
+        try:
+            self._conn.send(("finish", status))
+        except OSError:
+            pass
+
+    def close(self) -> None:
+        self._conn.close()
+
+
+__all__ = [
+    "AUTHKEY_ENV",
+    "PhaseBarrierClient",
+    "PhaseBarrierServer",
+    "format_address",
+    "parse_address",
+]
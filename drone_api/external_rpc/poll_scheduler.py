@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+from __future__ import annotations
+
+import threading
+import time
+
+MODE_BUSY = "busy"
+MODE_SHORT = "short"
+MODE_IDLE = "idle"
+MODE_FIXED = "fixed"
+
+
+class PollScheduler:
+    """
+    Decides how long to wait after each SharedRpcRuntime.poll_once().
+
+    - busy:  a completion arrived in this poll or within busy_window_sec (responses
+             tend to arrive in bursts) -> poll again at once after a completion,
+             after short_min_sec after an empty poll
+    - short: futures outstanding but quiet -> exponential backoff from
+             short_min_sec up to short_max_sec, reset on every completion
+    - idle:  nothing outstanding -> idle_sec
+
+    Only completions make it busy: an empty poll always waits at least
+    short_min_sec, however many futures are outstanding. The wait it chooses
+    while futures are outstanding is reported as added latency.
+
+    An instance holds the backoff of one wait loop and is not shared between
+    threads; spawn() gives each waiting thread its own scheduler whose
+    statistics also add up in the parent.
+    """
+
+    def __init__(
+        self,
+        *,
+        busy_window_sec: float = 0.002,
+        short_min_sec: float = 0.0002,
+        short_max_sec: float = 0.01,
+        idle_sec: float = 0.05,
+        fixed_sec: float | None = None,
+    ) -> None:
+        self.busy_window_sec = busy_window_sec
+        self.short_min_sec = short_min_sec
+        self.short_max_sec = short_max_sec
+        self.idle_sec = idle_sec
+        self.fixed_sec = fixed_sec
+        self._backoff_sec = short_min_sec
+        self._last_completion = float("-inf")
+        self._parent: PollScheduler | None = None
+        self._stats_lock = threading.Lock()
+        self.mode = MODE_IDLE if fixed_sec is None else MODE_FIXED
+        self.polls = 0
+        self.empty_polls = 0
+        self.completions = 0
+        self.added_latency_sec = 0.0
+        self.mode_counts = {MODE_BUSY: 0, MODE_SHORT: 0, MODE_IDLE: 0, MODE_FIXED: 0}
+
+    @classmethod
+    def fixed(cls, interval_sec: float) -> "PollScheduler":
+        """Always wait interval_sec after an empty poll (the previous behaviour)."""
+        return cls(fixed_sec=max(interval_sec, 0.0))
+
+    @classmethod
+    def from_poll_interval(cls, poll_interval_sec: float) -> "PollScheduler":
+        """poll_interval_sec > 0 keeps a fixed interval; otherwise adapt."""
+        if poll_interval_sec > 0:
+            return cls.fixed(poll_interval_sec)
+        return cls()
+
+    def spawn(self) -> "PollScheduler":
+        """
+        New scheduler with the same settings for one waiting thread; its
+        statistics are also added to this one.
+        """
+        child = PollScheduler(
+            busy_window_sec=self.busy_window_sec,
+            short_min_sec=self.short_min_sec,
+            short_max_sec=self.short_max_sec,
+            idle_sec=self.idle_sec,
+            fixed_sec=self.fixed_sec,
+        )
+        child._parent = self
+        return child
+
+    def reset(self) -> None:
+        """Start a new wait: forget the backoff, keep the statistics."""
+        self._backoff_sec = self.short_min_sec
+
+    def next_delay(
+        self, processed: int, outstanding: int, max_sec: float | None = None
+    ) -> float:
+        """
+        Record one poll result and return the wait [sec] before the next poll.
+
+        :param processed: return value of poll_once()
+        :param outstanding: requests still in flight after the poll
+        :param max_sec: upper bound of the wait (e.g. time left until a deadline)
+        """
+        now = time.monotonic()
+        if processed > 0:
+            self._last_completion = now
+            self._backoff_sec = self.short_min_sec
+
+        if self.fixed_sec is not None:
+            mode = MODE_FIXED
+            delay = 0.0 if processed > 0 else self.fixed_sec
+        elif outstanding <= 0:
+            mode = MODE_IDLE
+            delay = self.idle_sec
+        elif processed > 0:
+            mode = MODE_BUSY
+            delay = 0.0
+        elif now - self._last_completion <= self.busy_window_sec:
+            mode = MODE_BUSY
+            delay = self.short_min_sec
+        else:
+            mode = MODE_SHORT
+            delay = self._backoff_sec
+            self._backoff_sec = min(self._backoff_sec * 2.0, self.short_max_sec)
+
+        if max_sec is not None:
+            delay = max(min(delay, max_sec), 0.0)
+        self._record(mode, processed, outstanding, delay)
+        return delay
+
+    def _record(self, mode: str, processed: int, outstanding: int, delay: float) -> None:
+        with self._stats_lock:
+            self.polls += 1
+            if processed > 0:
+                self.completions += processed
+            else:
+                self.empty_polls += 1
+            self.mode = mode
+            self.mode_counts[mode] += 1
+            if outstanding > 0:
+                self.added_latency_sec += delay
+        if self._parent is not None:
+            self._parent._record(mode, processed, outstanding, delay)
+
+    def wait(self, processed: int, outstanding: int, max_sec: float | None = None) -> float:
+        """next_delay() followed by the sleep. Returns the time slept."""
+        delay = self.next_delay(processed, outstanding, max_sec)
+        if delay > 0:
+            time.sleep(delay)
+        return delay
+
+    def get_stats(self) -> dict:
+        with self._stats_lock:
+            return {
+                "mode": self.mode,
+                "polls": self.polls,
+                "empty_polls": self.empty_polls,
+                "empty_poll_ratio": self.empty_polls / self.polls if self.polls else 0.0,
+                "completions": self.completions,
+                "added_latency_sec": self.added_latency_sec,
+                "mode_counts": dict(self.mode_counts),
+            }
+
+
+__all__ = ["PollScheduler"]
@@ -0,0 +1,512 @@
+#!/usr/bin/env python3
+from __future__ import annotations
+
+import json
+import random
+import time
+from pathlib import Path
+
+
+class RetryPolicy:
+    """
+    Per-drone exponential backoff with jitter and an overall deadline.
+
+    After the n-th consecutive failure of a drone its next attempt is due after
+    min(max_delay_sec, base_delay_sec * multiplier ** (n - 1)), shortened by up to
+    `jitter` (0..1) of that value so retries of many drones do not line up.
+    """
+
+    def __init__(
+        self,
+        *,
+        base_delay_sec: float = 0.2,
+        max_delay_sec: float = 5.0,
+        multiplier: float = 2.0,
+        jitter: float = 0.5,
+        deadline_sec: float | None = None,
+        max_attempts: int | None = None,
+        seed: int | None = None,
+    ) -> None:
+        self.base_delay_sec = max(0.0, float(base_delay_sec))
+        self.max_delay_sec = max(self.base_delay_sec, float(max_delay_sec))
+        self.multiplier = max(1.0, float(multiplier))
+        self.jitter = min(max(float(jitter), 0.0), 1.0)
+        self.deadline_sec = deadline_sec if deadline_sec and deadline_sec > 0 else None
+        self.max_attempts = max_attempts if max_attempts and max_attempts > 0 else None
+        self._random = random.Random(seed)
+        self._failures: dict[str, int] = {}
+        self._attempts: dict[str, int] = {}
+        self._next_at: dict[str, float] = {}
+        self._started = time.monotonic()
+
+    def start(self) -> None:
+        """Forget every drone and restart the deadline clock."""
+        self._failures = {}
+        self._attempts = {}
+        self._next_at = {}
+        self._started = time.monotonic()
+
+    def remaining_sec(self, now: float | None = None) -> float | None:
+        if self.deadline_sec is None:
+            return None
+        now = time.monotonic() if now is None else now
+        return self._started + self.deadline_sec - now
+
+    def expired(self, now: float | None = None) -> bool:
+        remaining = self.remaining_sec(now)
+        return remaining is not None and remaining <= 0.0
+
+    def attempts(self, drone_name: str) -> int:
+        return self._attempts.get(drone_name, 0)
+
+    def exhausted(self, drone_name: str) -> bool:
+        return self.max_attempts is not None and self.attempts(drone_name) >= self.max_attempts
+
+    def due(self, drone_name: str, now: float) -> bool:
+        return self._next_at.get(drone_name, 0.0) <= now
+
+    def next_at(self, drone_name: str) -> float:
+        return self._next_at.get(drone_name, 0.0)
+
+    def delay_for(self, failures: int) -> float:
+        delay = min(
+            self.max_delay_sec,
+            self.base_delay_sec * (self.multiplier ** max(failures - 1, 0)),
+        )
+        return delay * (1.0 - self.jitter * self._random.random())
+
+    def record_attempt(self, drone_name: str) -> None:
+        self._attempts[drone_name] = self._attempts.get(drone_name, 0) + 1
+
+    def record_success(self, drone_name: str) -> None:
+        self._failures.pop(drone_name, None)
+        self._next_at.pop(drone_name, None)
+
+    def record_failure(self, drone_name: str, now: float | None = None) -> float:
+        """Schedule the next attempt of drone_name and return the backoff delay."""
+        failures = self._failures.get(drone_name, 0) + 1
+        self._failures[drone_name] = failures
+        delay = self.delay_for(failures)
+        now = time.monotonic() if now is None else now
+        self._next_at[drone_name] = now + delay
+        return delay
+
+
+class CircuitBreaker:
+    """
+    Breaker of one drone-service process (partition).
+
+    closed: every due drone is sent. After failure_threshold consecutive failed
+    calls the breaker opens and nothing is sent for cooldown_sec; it then goes
+    half_open and admits half_open_probes drones. A successful probe closes it,
+    a failed one opens it again with the cooldown doubled (up to max_cooldown_sec).
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self,
+        key: str,
+        *,
+        failure_threshold: int = 8,
+        cooldown_sec: float = 2.0,
+        max_cooldown_sec: float = 30.0,
+        half_open_probes: int = 1,
+    ) -> None:
+        self.key = key
+        self.failure_threshold = max(1, int(failure_threshold))
+        self.base_cooldown_sec = max(0.0, float(cooldown_sec))
+        self.max_cooldown_sec = max(self.base_cooldown_sec, float(max_cooldown_sec))
+        self.half_open_probes = max(1, int(half_open_probes))
+        self.state = self.CLOSED
+        self.cooldown_sec = self.base_cooldown_sec
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self.opens = 0
+        self.throttled = 0
+
+    def reopen_at(self) -> float:
+        return self.opened_at + self.cooldown_sec
+
+    def admit(self, drone_names: list[str], now: float) -> list[str]:
+        """Subset of drone_names that may be sent now."""
+        if self.state == self.OPEN:
+            if now < self.reopen_at():
+                self.throttled += len(drone_names)
+                return []
+            self.state = self.HALF_OPEN
+        if self.state == self.HALF_OPEN:
+            admitted = drone_names[: self.half_open_probes]
+            self.throttled += len(drone_names) - len(admitted)
+            return admitted
+        return drone_names
+
+    def record_success(self) -> None:
+        self.consecutive_failures = 0
+        if self.state != self.CLOSED:
+            self.state = self.CLOSED
+            self.cooldown_sec = self.base_cooldown_sec
+
+    def record_failure(self, now: float) -> None:
+        self.consecutive_failures += 1
+        if self.state == self.HALF_OPEN:
+            self.cooldown_sec = min(self.cooldown_sec * 2.0, self.max_cooldown_sec)
+            self._open(now)
+        elif self.state == self.CLOSED and self.consecutive_failures >= self.failure_threshold:
+            self._open(now)
+
+    def _open(self, now: float) -> None:
+        self.state = self.OPEN
+        self.opened_at = now
+        self.opens += 1
+
+    def get_stats(self) -> dict:
+        return {
+            "state": self.state,
+            "opens": self.opens,
+            "throttled": self.throttled,
+            "consecutive_failures": self.consecutive_failures,
+        }
+
+
+def load_partitions(part_files: list[Path | str]) -> dict[str, str]:
+    """drone_name -> part file stem, from fleet part configs (see tools/gen_fleet_split_config.py)."""
+    partitions: dict[str, str] = {}
+    for part_file in part_files:
+        path = Path(part_file)
+        fleet = json.loads(path.read_text(encoding="utf-8"))
+        for drone in fleet.get("drones", []):
+            partitions[str(drone["name"])] = path.stem
+    return partitions
+
+
+def split_partitions(drone_names: list[str], proc_count: int) -> dict[str, str]:
+    """
+    drone_name -> "part<N>" for proc_count contiguous parts, split the same way as
+    tools/gen_fleet_split_config.py (the last `rem` parts get one extra drone).
+    """
+    proc_count = max(1, min(int(proc_count), len(drone_names) or 1))
+    base, rem = divmod(len(drone_names), proc_count)
+    partitions: dict[str, str] = {}
+    start = 0
+    for i in range(proc_count):
+        size = base + (1 if i >= proc_count - rem else 0)
+        for drone_name in drone_names[start : start + size]:
+            partitions[drone_name] = f"part{i + 1}"
+        start += size
+    return partitions
+
+
+class FleetRetry:
+    """
+    Retry loop for fan-out phases (ready gate, set_ready, takeoff).
+
+        retry = FleetRetry(RetryPolicy(deadline_sec=60.0), partitions)
+        retry.run("set_ready", drones, send_round, is_success)
+
+    Only drones whose backoff has elapsed and whose partition breaker admits
+    them are sent, so a slow drone-service process is throttled while the drones
+    of healthy processes keep being retried at full rate. run() works in rounds
+    (a round ends when its slowest call does); run_async() resubmits each drone
+    as soon as its own call completes.
+    """
+
+    def __init__(
+        self,
+        policy: RetryPolicy,
+        partitions: dict[str, str] | None = None,
+        *,
+        failure_threshold: int = 8,
+        cooldown_sec: float = 2.0,
+        max_cooldown_sec: float = 30.0,
+        half_open_probes: int = 1,
+        coalesce_sec: float | None = None,
+    ) -> None:
+        self.policy = policy
+        self.partitions = partitions or {}
+        # Drones due within this window are sent in the same round, so jittered
+        # backoffs do not turn into many one-drone rounds.
+        self.coalesce_sec = (
+            policy.base_delay_sec * 0.5 if coalesce_sec is None else max(0.0, coalesce_sec)
+        )
+        self._breaker_kwargs = {
+            "failure_threshold": failure_threshold,
+            "cooldown_sec": cooldown_sec,
+            "max_cooldown_sec": max_cooldown_sec,
+            "half_open_probes": half_open_probes,
+        }
+        # Breakers live across phases: a process that was slow in the ready
+        # gate starts set_ready still throttled.
+        self.breakers: dict[str, CircuitBreaker] = {}
+        self.rounds = 0
+        self.calls = 0
+
+    def with_policy(self, policy: RetryPolicy) -> "FleetRetry":
+        """Same partitions and breakers with another backoff/deadline (e.g. for the ready gate)."""
+        other = FleetRetry(policy, self.partitions, **self._breaker_kwargs)
+        other.breakers = self.breakers
+        return other
+
+    def breaker(self, drone_name: str) -> CircuitBreaker:
+        key = self.partitions.get(drone_name, "default")
+        breaker = self.breakers.get(key)
+        if breaker is None:
+            breaker = self.breakers[key] = CircuitBreaker(key, **self._breaker_kwargs)
+        return breaker
+
+    def select(self, pending: list[str], now: float) -> list[str]:
+        by_breaker: dict[str, list[str]] = {}
+        for drone_name in pending:
+            if self.policy.due(drone_name, now + self.coalesce_sec):
+                by_breaker.setdefault(self.breaker(drone_name).key, []).append(drone_name)
+        selected: list[str] = []
+        for key, drone_names in by_breaker.items():
+            selected.extend(self.breakers[key].admit(drone_names, now))
+        return selected
+
+    def _next_wake(self, pending: list[str], now: float) -> float:
+        wake = None
+        for drone_name in pending:
+            at = self.policy.next_at(drone_name)
+            breaker = self.breaker(drone_name)
+            if breaker.state == CircuitBreaker.OPEN:
+                at = max(at, breaker.reopen_at())
+            wake = at if wake is None else min(wake, at)
+        return now if wake is None else wake
+
+    def run(self, phase: str, drone_names: list[str], send_round, is_success) -> int:
+        """
+        Retry until every drone succeeded; returns the number of rounds.
+
+        send_round(round_no, drone_names) returns one result per drone (exceptions
+        included);
+        is_success(result) decides whether the drone is done. Raises RuntimeError
+        when the deadline passes or a drone runs out of attempts.
+
+        A failed drone is retried in the next round at the earliest, i.e. only
+        after every call of the current round (including a slow partition's) has
+        finished. Use run_async() when the calls can be submitted as futures.
+        """
+        self.policy.start()
+        pending = list(drone_names)
+        rounds = 0
+        while pending:
+            now = time.monotonic()
+            if self.policy.expired(now):
+                raise RuntimeError(
+                    f"{phase} deadline exceeded: pending={len(pending)} "
+                    f"sample={pending[:10]} rounds={rounds} breakers={self.breaker_states()}"
+                )
+            selected = self.select(pending, now)
+            if not selected:
+                wake = max(self._next_wake(pending, now), now + 0.001)
+                remaining = self.policy.remaining_sec(now)
+                if remaining is not None:
+                    wake = min(wake, now + max(remaining, 0.0))
+                time.sleep(wake - now)
+                continue
+
+            rounds += 1
+            self.rounds += 1
+            self.calls += len(selected)
+            for drone_name in selected:
+                self.policy.record_attempt(drone_name)
+            results = list(send_round(rounds, selected))
+            now = time.monotonic()
+            failed: set[str] = set()
+            for i, drone_name in enumerate(selected):
+                ok = i < len(results) and is_success(results[i])
+                if ok:
+                    self.policy.record_success(drone_name)
+                    self.breaker(drone_name).record_success()
+                else:
+                    failed.add(drone_name)
+                    self.policy.record_failure(drone_name, now)
+                    self.breaker(drone_name).record_failure(now)
+            done = set(selected) - failed
+            pending = [d for d in pending if d not in done]
+            exhausted = [d for d in failed if self.policy.exhausted(d)]
+            if exhausted:
+                raise RuntimeError(
+                    f"{phase} failed after retries: count={len(pending)} sample={pending[:10]} "
+                    f"exhausted={sorted(exhausted)[:10]} breakers={self.breaker_states()}"
+                )
+            if failed:
+                print(
+                    f"WARN: {phase} round={rounds} sent={len(selected)} failed={len(failed)} "
+                    f"pending={len(pending)} breakers={self.breaker_states()}"
+                )
+        return rounds
+
+    def run_async(
+        self,
+        phase: str,
+        drone_names: list[str],
+        submit,
+        is_success,
+        *,
+        wait_for_any,
+        call_timeout_sec: float,
+        limit: int = 0,
+    ) -> int:
+        """
+        Per-drone version of run(); returns the number of calls.
+
+        submit(drone_name) returns a future and wait_for_any(futures, timeout_sec)
+        returns (done, not_done) like concurrent.futures.wait(FIRST_COMPLETED).
+        A drone is resubmitted as soon as its backoff has elapsed and its
+        partition breaker admits it, whatever the other drones' calls are doing.
+        At most limit calls (0: no limit) are in flight, split evenly over the
+        partitions, and a half-open partition has at most one probe round in
+        flight. A call without a result after call_timeout_sec counts as a
+        failure, but the drone is not resubmitted until that call resolves or
+        max(2 * call_timeout_sec, call_timeout_sec + 1) has passed.
+        """
+        self.policy.start()
+        pending = dict.fromkeys(drone_names)
+        # future -> (drone_name, deadline, timed out); after a timeout the deadline is the abandon time
+        in_flight: dict[object, tuple[str, float, bool]] = {}
+        flying: set[str] = set()
+        busy: dict[str, int] = {}
+        keys = {self.breaker(drone_name).key for drone_name in drone_names}
+        limit = limit if limit > 0 else len(drone_names)
+        window = max(1, limit // max(len(keys), 1))
+        abandon_after_sec = max(call_timeout_sec, 1.0)
+        calls = 0
+        failures = 0
+
+        def fail(drone_name: str, error, now: float) -> None:
+            nonlocal failures
+            failures += 1
+            self.policy.record_failure(drone_name, now)
+            self.breaker(drone_name).record_failure(now)
+            print(
+                f"WARN: {phase} drone={drone_name} attempt={self.policy.attempts(drone_name)} "
+                f"failed: {error!r} pending={len(pending)}"
+            )
+            if self.policy.exhausted(drone_name):
+                raise RuntimeError(
+                    f"{phase} failed after retries: count={len(pending)} "
+                    f"sample={list(pending)[:10]} exhausted={[drone_name]} "
+                    f"breakers={self.breaker_states()}"
+                )
+
+        def release(future) -> tuple[str, float, bool]:
+            drone_name, deadline, timed_out = in_flight.pop(future)
+            flying.discard(drone_name)
+            busy[self.breaker(drone_name).key] -= 1
+            return drone_name, deadline, timed_out
+
+        def sendable() -> list[str]:
+            """
+            Drones that may be sent once due: not in flight, their partition has a free
+            slot, and a half-open partition is not already waiting on a probe.
+            """
+            if len(in_flight) >= limit:
+                return []
+            out = []
+            for drone_name in pending:
+                if drone_name in flying:
+                    continue
+                breaker = self.breaker(drone_name)
+                in_use = busy.get(breaker.key, 0)
+                if in_use >= window or (in_use and breaker.state == CircuitBreaker.HALF_OPEN):
+                    continue
+                out.append(drone_name)
+            return out
+
+        while pending:
+            now = time.monotonic()
+            if self.policy.expired(now):
+                raise RuntimeError(
+                    f"{phase} deadline exceeded: pending={len(pending)} "
+                    f"sample={list(pending)[:10]} calls={calls} breakers={self.breaker_states()}"
+                )
+            idle = sendable()
+            if idle:
+                for drone_name in self.select(idle, now):
+                    key = self.breaker(drone_name).key
+                    if len(in_flight) >= limit or busy.get(key, 0) >= window:
+                        continue
+                    calls += 1
+                    self.calls += 1
+                    self.policy.record_attempt(drone_name)
+                    try:
+                        future = submit(drone_name)
+                    except Exception as e:
+                        fail(drone_name, e, now)
+                        continue
+                    in_flight[future] = (drone_name, now + call_timeout_sec, False)
+                    flying.add(drone_name)
+                    busy[key] = busy.get(key, 0) + 1
+                idle = sendable()
+
+            wake = self._next_wake(idle, now) if idle else None
+            if in_flight:
+                earliest = min(deadline for _d, deadline, _t in in_flight.values())
+                wake = earliest if wake is None else min(wake, earliest)
+            if wake is None:
+                wake = now
+            wake = max(wake, now + 0.001)
+            remaining = self.policy.remaining_sec(now)
+            if remaining is not None:
+                wake = min(wake, now + max(remaining, 0.0))
+            if not in_flight:
+                time.sleep(wake - now)
+                continue
+
+            done, _not_done = wait_for_any(list(in_flight), max(wake - time.monotonic(), 0.0))
+            now = time.monotonic()
+            for future in list(in_flight):
+                drone_name, deadline, timed_out = in_flight[future]
+                if future in done:
+                    release(future)
+                    if timed_out:
+                        # already counted as a failure; the drone may be sent again
+                        continue
+                    try:
+                        result = future.result(timeout=0.0)
+                    except Exception as e:
+                        result = e
+                    if is_success(result):
+                        self.policy.record_success(drone_name)
+                        self.breaker(drone_name).record_success()
+                        pending.pop(drone_name, None)
+                    else:
+                        fail(drone_name, result, now)
+                elif deadline <= now:
+                    if timed_out:
+                        release(future)
+                        print(f"WARN: {phase} drone={drone_name} call abandoned")
+                    else:
+                        in_flight[future] = (drone_name, deadline + abandon_after_sec, True)
+                        fail(drone_name, TimeoutError(), now)
+        print(f"INFO: {phase} done calls={calls} failures={failures}")
+        return calls
+
+    def breaker_states(self) -> dict[str, str]:
+        return {
+            key: breaker.state
+            for key, breaker in sorted(self.breakers.items())
+            if breaker.state != CircuitBreaker.CLOSED or breaker.opens
+        }
+
+    def get_stats(self) -> dict:
+        return {
+            "rounds": self.rounds,
+            "calls": self.calls,
+            "breakers": {
+                key: breaker.get_stats() for key, breaker in sorted(self.breakers.items())
+            },
+        }
+
+
+__all__ = [
+    "CircuitBreaker",
+    "FleetRetry",
+    "RetryPolicy",
+    "load_partitions",
+    "split_partitions",
+]
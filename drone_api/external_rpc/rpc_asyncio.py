@@ -0,0 +1,357 @@
+#!/usr/bin/env python3
+from __future__ import annotations
+
+import asyncio
+import weakref
+
+from hakoniwa_pdu.rpc.async_shared import RpcCallFuture
+from hakoniwa_pdu.pdu_msgs.drone_srv_msgs.pdu_pytype_DroneGetStateRequest import (
+    DroneGetStateRequest,
+)
+from hakoniwa_pdu.pdu_msgs.drone_srv_msgs.pdu_pytype_DroneGoToRequest import (
+    DroneGoToRequest,
+)
+from hakoniwa_pdu.pdu_msgs.drone_srv_msgs.pdu_pytype_DroneLandRequest import (
+    DroneLandRequest,
+)
+from hakoniwa_pdu.pdu_msgs.drone_srv_msgs.pdu_pytype_DroneSetReadyRequest import (
+    DroneSetReadyRequest,
+)
+from hakoniwa_pdu.pdu_msgs.drone_srv_msgs.pdu_pytype_DroneTakeOffRequest import (
+    DroneTakeOffRequest,
+)
+from hakoniwa_pdu.pdu_msgs.geometry_msgs.pdu_pytype_Vector3 import Vector3
+
+from poll_scheduler import PollScheduler
+
+
+class RpcPoller:
+    """
+    One task per event loop that drives every awaited RPC call.
+
+    Shared-runtime futures are completed by polling each runtime once per cycle;
+    calls of the sync client are polled one by one without sleeping. The wait
+    between cycles comes from a PollScheduler, so thousands of in-flight calls
+    cost one task instead of one thread each.
+    """
+
+    def __init__(
+        self,
+        loop: asyncio.AbstractEventLoop,
+        scheduler: PollScheduler | None = None,
+    ) -> None:
+        self.loop = loop
+        # The poller task has a scheduler of its own; a given one only collects its statistics.
+        self.scheduler = scheduler.spawn() if scheduler is not None else PollScheduler()
+        # id(runtime) -> (runtime, [(RpcCallFuture, asyncio.Future)])
+        self._runtimes: dict[int, tuple[object, list]] = {}
+        # [(poll, asyncio.Future)]
+        self._calls: list[tuple[object, asyncio.Future]] = []
+        self._task: asyncio.Task | None = None
+
+    def outstanding(self) -> int:
+        return len(self._calls) + sum(
+            len(waiters) for _runtime, waiters in self._runtimes.values()
+        )
+
+    def _wake(self) -> None:
+        if self._task is None or self._task.done():
+            self.scheduler.reset()
+            self._task = self.loop.create_task(self._run())
+
+    def watch_future(self, runtime, future: RpcCallFuture) -> asyncio.Future:
+        """asyncio future that completes with future's result; runtime is polled by this task."""
+        waiter = self.loop.create_future()
+        if future.done():
+            _transfer(future, waiter)
+            return waiter
+        entry = self._runtimes.setdefault(id(runtime), (runtime, []))
+        entry[1].append((future, waiter))
+        self._wake()
+        return waiter
+
+    def watch_call(self, poll) -> asyncio.Future:
+        """asyncio future for a call whose poll() returns (done, value) or raises."""
+        waiter = self.loop.create_future()
+        self._calls.append((poll, waiter))
+        self._wake()
+        return waiter
+
+    def _poll_runtimes(self) -> int:
+        completed = 0
+        for key, (runtime, waiters) in list(self._runtimes.items()):
+            runtime.poll_once()
+            still = []
+            for future, waiter in waiters:
+                if future.done():
+                    _transfer(future, waiter)
+                    completed += 1
+                elif waiter.cancelled():
+                    completed += 1
+                else:
+                    still.append((future, waiter))
+            if still:
+                self._runtimes[key] = (runtime, still)
+            else:
+                del self._runtimes[key]
+        return completed
+
+    def _poll_calls(self) -> int:
+        completed = 0
+        still = []
+        # Calls whose waiter was cancelled are still polled to the end so that
+        # the client's in-flight slot is released.
+        for poll, waiter in self._calls:
+            try:
+                done, value = poll()
+            except Exception as e:
+                if not waiter.done():
+                    waiter.set_exception(e)
+                completed += 1
+                continue
+            if done:
+                if not waiter.done():
+                    waiter.set_result(value)
+                completed += 1
+            else:
+                still.append((poll, waiter))
+        self._calls = still
+        return completed
+
+    async def _run(self) -> None:
+        while self._runtimes or self._calls:
+            completed = self._poll_runtimes() + self._poll_calls()
+            outstanding = self.outstanding()
+            delay = self.scheduler.next_delay(completed, outstanding)
+            if outstanding == 0:
+                break
+            # sleep(0) still yields so that callers can submit more calls
+            await asyncio.sleep(delay)
+
+    def get_stats(self) -> dict:
+        stats = self.scheduler.get_stats()
+        stats["outstanding"] = self.outstanding()
+        return stats
+
+
+def _transfer(future: RpcCallFuture, waiter: asyncio.Future) -> None:
+    if waiter.done():
+        return
+    try:
+        waiter.set_result(future.result(timeout=0.0))
+    except Exception as e:
+        waiter.set_exception(e)
+
+
+_pollers: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, RpcPoller]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def get_poller() -> RpcPoller:
+    """RpcPoller of the running event loop (created on first use)."""
+    loop = asyncio.get_running_loop()
+    poller = _pollers.get(loop)
+    if poller is None:
+        poller = RpcPoller(loop)
+        _pollers[loop] = poller
+    return poller
+
+
+class AioDroneClient:
+    """
+    Coroutine API over HakoniwaRpcDroneClient or AsyncSharedHakoniwaRpcDroneClient.
+
+        client = AioDroneClient(HakoniwaRpcDroneClient("Drone-1"))
+        await client.takeoff(3.0)
+        await client.goto(1.0, 0.0, 3.0, speed_m_s=2.0)
+
+    Only the send runs on the calling task; the response is awaited through the
+    loop's RpcPoller. Calls of one drone are serialized like the fleet controllers' locks.
+    """
+
+    def __init__(self, client) -> None:
+        self.client = client
+        self.drone_name = client.drone_name
+        self._shared = hasattr(client, "_submit")
+        self._lock: asyncio.Lock | None = None
+
+    async def _call(self, service_type: str, request, *, timeout_msec: int | None = None):
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            poller = get_poller()
+            client = self.client
+            if self._shared:
+                future = client._submit(service_type, request, timeout_msec=timeout_msec)
+                waiter = poller.watch_future(client._runtime, future)
+                limit_msec = client.timeout_msec if timeout_msec is None else timeout_msec
+                if limit_msec < 0:
+                    return await waiter
+                # Same wall bound as AsyncSharedHakoniwaRpcDroneClient._call, in case the
+                # runtime never delivers a response or timeout event for the call.
+                try:
+                    return await asyncio.wait_for(
+                        waiter, max(limit_msec * 2, limit_msec + 1000) / 1000.0
+                    )
+                except asyncio.TimeoutError:
+                    raise TimeoutError(
+                        f"RPC wall timeout: drone={self.drone_name} service={service_type}"
+                    ) from None
+            pending = client._call_nowait(service_type, request, timeout_msec=timeout_msec)
+            return await poller.watch_call(pending.poll)
+
+    async def set_ready(self):
+        req = DroneSetReadyRequest()
+        req.drone_name = self.drone_name
+        return await self._call("DroneSetReady", req)
+
+    async def takeoff(self, alt_m: float):
+        req = DroneTakeOffRequest()
+        req.drone_name = self.drone_name
+        req.alt_m = alt_m
+        return await self._call("DroneTakeOff", req)
+
+    async def get_state(self):
+        req = DroneGetStateRequest()
+        req.drone_name = self.drone_name
+        return await self._call("DroneGetState", req)
+
+    async def goto(
+        self,
+        x: float,
+        y: float,
+        z: float,
+        yaw_deg: float = 0.0,
+        *,
+        speed_m_s: float = 1.0,
+        tolerance_m: float = 0.5,
+        timeout_sec: float = 30.0,
+    ):
+        req = DroneGoToRequest()
+        req.drone_name = self.drone_name
+        req.target_pose = Vector3()
+        req.target_pose.x = x
+        req.target_pose.y = y
+        req.target_pose.z = z
+        req.speed_m_s = speed_m_s
+        req.yaw_deg = yaw_deg
+        req.tolerance_m = tolerance_m
+        req.timeout_sec = timeout_sec
+        return await self._call("DroneGoTo", req)
+
+    async def land(self, timeout_sec: float = 0.0):
+        req = DroneLandRequest()
+        req.drone_name = self.drone_name
+        timeout_msec = int(timeout_sec * 1000) if timeout_sec > 0 else None
+        return await self._call("DroneLand", req, timeout_msec=timeout_msec)
+
+
+class AioFleet:
+    """
+    asyncio.gather-friendly helpers over a FleetRpcController (sync or async shared).
+
+        fleet = AioFleet(FleetRpcController(names))
+        await fleet.takeoff_all(3.0)
+        await fleet.goto_all({"Drone-1": (1.0, 0.0, 3.0)}, speed_m_s=2.0)
+
+    Per-drone coroutines are available as fleet[drone_name].goto(...).
+    """
+
+    def __init__(self, controller) -> None:
+        self.controller = controller
+        self.drone_names = list(controller.drone_names)
+        self.clients = {
+            drone_name: AioDroneClient(controller._clients[drone_name])
+            for drone_name in self.drone_names
+        }
+
+    def __getitem__(self, drone_name: str) -> AioDroneClient:
+        return self.clients[drone_name]
+
+    async def _gather(self, drone_names, make_call, return_exceptions: bool) -> list:
+        async def _one(drone_name: str):
+            try:
+                return await make_call(self.clients[drone_name])
+            except Exception as e:
+                raise RuntimeError(f"[{drone_name}] {e}") from e
+
+        return await asyncio.gather(
+            *(_one(drone_name) for drone_name in drone_names),
+            return_exceptions=return_exceptions,
+        )
+
+    async def set_ready_all(
+        self, drone_names: list[str] | None = None, *, return_exceptions: bool = False
+    ) -> list:
+        return await self._gather(
+            drone_names or self.drone_names,
+            lambda client: client.set_ready(),
+            return_exceptions,
+        )
+
+    async def takeoff_all(
+        self,
+        alt_m: float,
+        drone_names: list[str] | None = None,
+        *,
+        return_exceptions: bool = False,
+    ) -> list:
+        return await self._gather(
+            drone_names or self.drone_names,
+            lambda client: client.takeoff(alt_m),
+            return_exceptions,
+        )
+
+    async def get_state_all(
+        self, drone_names: list[str] | None = None, *, return_exceptions: bool = False
+    ) -> list:
+        return await self._gather(
+            drone_names or self.drone_names,
+            lambda client: client.get_state(),
+            return_exceptions,
+        )
+
+    async def goto_all(
+        self,
+        targets: dict[str, tuple[float, ...]],
+        *,
+        speed_m_s: float | dict[str, float] = 1.0,
+        tolerance_m: float = 0.5,
+        timeout_sec: float = 30.0,
+        return_exceptions: bool = False,
+    ) -> list:
+        """
+        :param targets: drone_name -> (x, y, z) or (x, y, z, yaw_deg)
+        :param speed_m_s: one speed for all drones, or drone_name -> speed
+        """
+        def make_call(client: AioDroneClient):
+            target = targets[client.drone_name]
+            speed = speed_m_s[client.drone_name] if isinstance(speed_m_s, dict) else speed_m_s
+            return client.goto(
+                target[0],
+                target[1],
+                target[2],
+                target[3] if len(target) > 3 else 0.0,
+                speed_m_s=speed,
+                tolerance_m=tolerance_m,
+                timeout_sec=timeout_sec,
+            )
+
+        return await self._gather(list(targets), make_call, return_exceptions)
+
+    async def land_all(
+        self,
+        drone_names: list[str] | None = None,
+        *,
+        timeout_sec: float = 0.0,
+        return_exceptions: bool = False,
+    ) -> list:
+        return await self._gather(
+            drone_names or self.drone_names,
+            lambda client: client.land(timeout_sec),
+            return_exceptions,
+        )
+
+
+__all__ = ["AioDroneClient", "AioFleet", "RpcPoller", "get_poller"]
@@ -0,0 +1,267 @@
+#!/usr/bin/env python3
+from __future__ import annotations
+
+import csv
+import json
+import math
+import os
+import threading
+import time
+from pathlib import Path
+
+DEFAULT_TRACE_CAPACITY = 65536
+# Histogram resolution: each power-of-two range of microseconds is split into
+# this many linear sub-buckets (about 3% relative error, like HDR with 2 digits).
+SUB_BUCKET_BITS = 5
+SUB_BUCKET_COUNT = 1 << SUB_BUCKET_BITS
+EXPORT_PERCENTILES = (50.0, 90.0, 99.0, 99.9, 100.0)
+
+# Set by enable_tracing(); call sites check `rpc_trace.TRACER is not None` only,
+# so tracing costs one global lookup per call while disabled.
+TRACER: "RpcTracer | None" = None
+
+
+def _sim_time_usec() -> int:
+    # Imported here so that the tracer and histograms work without the simulator.
+    try:
+        import hakopy
+
+        return int(hakopy.simulation_time())
+    except Exception:
+        return -1
+
+
+class RpcTraceRecord:
+    """
+    One RPC call.
+
+    Wall times are time.perf_counter() values:
+    submit (before encode) -> sent (request written) -> observed (response seen
+    by a poll) -> done (returned to the caller). Unknown stages stay None.
+    """
+
+    __slots__ = (
+        "tracer",
+        "mode",
+        "service",
+        "drone",
+        "label",
+        "request_id",
+        "submit_wall",
+        "sent_wall",
+        "observed_wall",
+        "done_wall",
+        "submit_sim_usec",
+        "done_sim_usec",
+        "polls",
+        "retries",
+        "ok",
+        "error",
+    )
+
+    def __init__(
+        self, tracer: "RpcTracer", mode: str, service: str, drone: str, label: str | None
+    ) -> None:
+        self.tracer = tracer
+        self.mode = mode
+        self.service = service
+        self.drone = drone
+        self.label = label
+        self.request_id = -1
+        self.submit_wall = time.perf_counter()
+        self.sent_wall: float | None = None
+        self.observed_wall: float | None = None
+        self.done_wall: float | None = None
+        self.submit_sim_usec = _sim_time_usec()
+        self.done_sim_usec = -1
+        self.polls = 0
+        self.retries = 0
+        self.ok: bool | None = None
+        self.error: str | None = None
+
+    @property
+    def latency_sec(self) -> float | None:
+        end = self.observed_wall if self.observed_wall is not None else self.done_wall
+        return None if end is None else end - self.submit_wall
+
+    def observe(self) -> None:
+        self.tracer.observe(self)
+
+    def finish(self, error: BaseException | None = None) -> None:
+        self.tracer.finish(self, error)
+
+    def to_dict(self) -> dict:
+        return {name: getattr(self, name) for name in self.__slots__[1:]}
+
+
+class LatencyHistogram:
+    """Log-linear latency histogram in microseconds (HDR-style bucketing)."""
+
+    def __init__(self) -> None:
+        self.counts: dict[int, int] = {}
+        self.count = 0
+        self.total_us = 0
+        self.min_us: int | None = None
+        self.max_us = 0
+
+    @staticmethod
+    def _index(value_us: int) -> int:
+        if value_us < SUB_BUCKET_COUNT:
+            return value_us
+        shift = value_us.bit_length() - SUB_BUCKET_BITS - 1
+        return ((shift + 1) << SUB_BUCKET_BITS) + ((value_us >> shift) - SUB_BUCKET_COUNT)
+
+    @staticmethod
+    def _upper(index: int) -> int:
+        if index < SUB_BUCKET_COUNT:
+            return index
+        shift = (index >> SUB_BUCKET_BITS) - 1
+        sub = (index & (SUB_BUCKET_COUNT - 1)) + SUB_BUCKET_COUNT
+        return ((sub + 1) << shift) - 1
+
+    def record(self, value_sec: float) -> None:
+        value_us = max(int(value_sec * 1_000_000), 0)
+        index = self._index(value_us)
+        self.counts[index] = self.counts.get(index, 0) + 1
+        self.count += 1
+        self.total_us += value_us
+        self.min_us = value_us if self.min_us is None else min(self.min_us, value_us)
+        self.max_us = max(self.max_us, value_us)
+
+    def percentile(self, p: float) -> int:
+        if self.count == 0:
+            return 0
+        target = max(1, math.ceil(self.count * p / 100.0))
+        seen = 0
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            if seen >= target:
+                return min(self._upper(index), self.max_us)
+        return self.max_us
+
+    def to_dict(self) -> dict:
+        return {
+            "count": self.count,
+            "min_us": self.min_us or 0,
+            "max_us": self.max_us,
+            "mean_us": self.total_us / self.count if self.count else 0.0,
+            "percentiles_us": {str(p): self.percentile(p) for p in EXPORT_PERCENTILES},
+            "buckets": [
+                [self._upper(index), self.counts[index]] for index in sorted(self.counts)
+            ],
+        }
+
+
+class RpcTracer:
+    """Ring buffer of RpcTraceRecord plus cumulative histograms per (mode, service)."""
+
+    def __init__(self, capacity: int = DEFAULT_TRACE_CAPACITY) -> None:
+        self.capacity = max(int(capacity), 1)
+        self._ring: list[RpcTraceRecord | None] = [None] * self.capacity
+        self._next = 0
+        self._lock = threading.Lock()
+        self.histograms: dict[tuple[str, str], LatencyHistogram] = {}
+        self.dropped = 0
+
+    def begin(
+        self, mode: str, service: str, drone: str, label: str | None = None
+    ) -> RpcTraceRecord:
+        record = RpcTraceRecord(self, mode, service, drone, label)
+        with self._lock:
+            if self._ring[self._next] is not None:
+                self.dropped += 1
+            self._ring[self._next] = record
+            self._next = (self._next + 1) % self.capacity
+        return record
+
+    def observe(self, record: RpcTraceRecord) -> None:
+        """Response seen by a poll (may run on another thread than the caller)."""
+        if record.observed_wall is None:
+            record.observed_wall = time.perf_counter()
+
+    def finish(
+        self, record: RpcTraceRecord, error: BaseException | None = None
+    ) -> None:
+        if record.ok is not None:
+            return
+        record.done_wall = time.perf_counter()
+        record.done_sim_usec = _sim_time_usec()
+        record.ok = error is None
+        if error is not None:
+            record.error = f"{type(error).__name__}: {error}"
+        latency = record.latency_sec
+        key = (record.mode, record.service)
+        with self._lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = LatencyHistogram()
+            histogram.record(latency)
+
+    def records(self) -> list[RpcTraceRecord]:
+        """Buffered records, oldest first."""
+        with self._lock:
+            ring = self._ring[self._next :] + self._ring[: self._next]
+        return [record for record in ring if record is not None]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._ring = [None] * self.capacity
+            self._next = 0
+            self.histograms = {}
+            self.dropped = 0
+
+    def summary(self) -> dict:
+        with self._lock:
+            histograms = dict(self.histograms)
+        return {
+            f"{mode}/{service}": histogram.to_dict()
+            for (mode, service), histogram in sorted(histograms.items())
+        }
+
+    def export_json(self, path: Path | str, *, include_records: bool = False) -> None:
+        payload = {"histograms": self.summary(), "dropped": self.dropped}
+        if include_records:
+            payload["records"] = [record.to_dict() for record in self.records()]
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(payload, ensure_ascii=True, indent=2) + "\n", encoding="utf-8")
+
+    def export_csv(self, path: Path | str) -> None:
+        """One row per (mode, service, bucket): mode,service,upper_us,count,cumulative."""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with path.open("w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(["mode", "service", "upper_us", "count", "cumulative"])
+            for key, histogram in self.summary().items():
+                mode, service = key.split("/", 1)
+                cumulative = 0
+                for upper_us, count in histogram["buckets"]:
+                    cumulative += count
+                    writer.writerow([mode, service, upper_us, count, cumulative])
+
+
+def enable_tracing(capacity: int = DEFAULT_TRACE_CAPACITY) -> RpcTracer:
+    global TRACER
+    if TRACER is None or TRACER.capacity != capacity:
+        TRACER = RpcTracer(capacity)
+    return TRACER
+
+
+def disable_tracing() -> None:
+    global TRACER
+    TRACER = None
+
+
+_env_capacity = os.getenv("HAKO_RPC_TRACE_BUFFER", "")
+if _env_capacity not in ("", "0"):
+    enable_tracing(int(_env_capacity))
+
+
+__all__ = [
+    "LatencyHistogram",
+    "RpcTraceRecord",
+    "RpcTracer",
+    "disable_tracing",
+    "enable_tracing",
+]
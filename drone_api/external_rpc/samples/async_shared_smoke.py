@@ -2,7 +2,6 @@
 from __future__ import annotations
 
 import argparse
-import json
 import sys
 import time
 from pathlib import Path
@@ -39,7 +38,7 @@ from hakosim_rpc import (
     DEFAULT_SERVICE_CONFIG_PATH,
     quaternion_to_euler_deg,
 )
-from service_config_loader import create_runtime_service_config
+from service_config_loader import load_runtime_service_config
 
 
 def parse_args() -> argparse.Namespace:
@@ -70,8 +69,9 @@ def parse_args() -> argparse.Namespace:
 
 
 def build_runtime(service_config_path: Path) -> tuple[SharedRpcRuntime, Path]:
-    runtime_service_config_path = create_runtime_service_config(service_config_path)
-    runtime_service = json.loads(runtime_service_config_path.read_text())
+    runtime_service_config_path, runtime_service = load_runtime_service_config(
+        service_config_path
+    )
     pdu_config_path = Path(runtime_service["pdu_config_path"]).resolve()
     runtime = SharedRpcRuntime(
         asset_name=DEFAULT_ASSET_NAME,
@@ -1,13 +1,20 @@
+import hashlib
 import json
+import os
 import tempfile
+import threading
 from pathlib import Path
 
 
 REPO_ROOT = Path(__file__).resolve().parents[2]
+RUNTIME_DIR_NAME = "hakoniwa-drone-external-rpc"
 
+# (resolved source path) -> (mtime_ns, size, runtime path, parsed runtime config)
+_runtime_configs: dict[Path, tuple[int, int, Path, dict]] = {}
+_runtime_configs_lock = threading.Lock()
 
-def create_runtime_service_config(service_config_path: Path | str) -> Path:
-    service_config_path = Path(service_config_path).resolve()
+
+def _materialize(service_config_path: Path) -> tuple[Path, dict]:
     service_config = json.loads(service_config_path.read_text())
 
     pdu_config_path = service_config.get("pdu_config_path")
@@ -26,8 +33,48 @@ def create_runtime_service_config(service_config_path: Path | str) -> Path:
 
     service_config["pdu_config_path"] = str(pdu_path)
 
-    runtime_dir = Path(tempfile.gettempdir()) / "hakoniwa-drone-external-rpc"
+    text = json.dumps(service_config, indent=2)
+    digest = hashlib.sha1(text.encode("utf-8")).hexdigest()[:16]
+    runtime_dir = Path(tempfile.gettempdir()) / RUNTIME_DIR_NAME
     runtime_dir.mkdir(parents=True, exist_ok=True)
-    runtime_path = runtime_dir / service_config_path.name
-    runtime_path.write_text(json.dumps(service_config, indent=2))
-    return runtime_path
+    # The name carries the content hash, so an existing file is already correct
+    # and concurrent writers of the same config produce identical bytes.
+    runtime_path = runtime_dir / f"{service_config_path.stem}-{digest}{service_config_path.suffix}"
+    if not runtime_path.exists():
+        tmp_path = runtime_dir / f".{runtime_path.name}.{os.getpid()}.{threading.get_ident()}.tmp"
+        tmp_path.write_text(text)
+        os.replace(tmp_path, runtime_path)
+    return runtime_path, service_config
+
+
+def load_runtime_service_config(service_config_path: Path | str) -> tuple[Path, dict]:
+    """
+    Runtime copy of a service config with pdu_config_path made absolute.
+
+    Returns (runtime config path, parsed runtime config). The result is cached per
+    source path and reused until the source file's mtime or size changes; the
+    returned dict is shared between callers and must not be modified.
+    """
+    service_config_path = Path(service_config_path).resolve()
+    st = service_config_path.stat()
+    with _runtime_configs_lock:
+        cached = _runtime_configs.get(service_config_path)
+        if (
+            cached is not None
+            and cached[0] == st.st_mtime_ns
+            and cached[1] == st.st_size
+            and cached[2].exists()
+        ):
+            return cached[2], cached[3]
+        runtime_path, service_config = _materialize(service_config_path)
+        _runtime_configs[service_config_path] = (
+            st.st_mtime_ns,
+            st.st_size,
+            runtime_path,
+            service_config,
+        )
+        return runtime_path, service_config
+
+
+def create_runtime_service_config(service_config_path: Path | str) -> Path:
+    return load_runtime_service_config(service_config_path)[0]
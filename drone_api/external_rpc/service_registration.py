@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+from __future__ import annotations
+
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from hakosim_rpc import load_protocol_components
+
+
+DEFAULT_REGISTER_MAX_WORKERS = int(os.getenv("HAKO_RPC_REGISTER_MAX_WORKERS", "8"))
+DEFAULT_REGISTRATION_CACHE_PATH = os.getenv("HAKO_RPC_REGISTRATION_CACHE", "")
+
+
+def _group_key(client) -> int:
+    # Clients on one SharedRpcRuntime register under the runtime's lock, so they
+    # are handled by one worker; sync clients each own their service manager.
+    runtime = getattr(client, "_runtime", None)
+    return id(runtime) if runtime is not None else id(client)
+
+
+def _pair_key(client, service_type: str) -> str:
+    return f"{client._service_name(service_type)}|{client._client_name(service_type)}"
+
+
+def load_registration_cache(cache_path: Path | str, service_config_path: Path | str) -> dict:
+    """Resolved IDs of the previous run, or {} if the cache is missing or for another config."""
+    path = Path(cache_path)
+    if not path.exists():
+        return {}
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    if data.get("service_config") != str(service_config_path):
+        return {}
+    return data.get("entries", {})
+
+
+def save_registration_cache(
+    cache_path: Path | str, service_config_path: Path | str, entries: dict
+) -> None:
+    path = Path(cache_path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    tmp_path.write_text(
+        json.dumps(
+            {"service_config": str(service_config_path), "entries": entries},
+            ensure_ascii=True,
+        ),
+        encoding="utf-8",
+    )
+    os.replace(tmp_path, path)
+
+
+def register_services(
+    clients: dict[str, object],
+    service_types: list[str],
+    *,
+    service_config_path: Path | str,
+    max_workers: int | None = None,
+    cache_path: Path | str | None = None,
+) -> dict:
+    """
+    Register every (drone, service) pair of clients and return per-phase timing.
+
+    - load_components: protocol modules are imported once per service type
+    - register: one worker per registration group (sync client or shared runtime),
+      up to max_workers groups in parallel; pairs are registered in the order of
+      the cached client IDs so the core hands out the same IDs as the last run
+    - cache: resolved service/client/channel IDs are written to cache_path and
+      compared with the previous run (id_changes)
+
+    Raises RuntimeError naming the first drone that failed.
+    """
+    t_total = time.perf_counter()
+    stats: dict = {"pairs": len(clients) * len(service_types)}
+
+    t0 = time.perf_counter()
+    for service_type in service_types:
+        load_protocol_components(service_type)
+    stats["load_components_sec"] = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    cache_path = cache_path or DEFAULT_REGISTRATION_CACHE_PATH or None
+    cached = (
+        load_registration_cache(cache_path, service_config_path) if cache_path else {}
+    )
+    stats["cache_load_sec"] = time.perf_counter() - t0
+
+    groups: dict[int, list[tuple[str, object, str]]] = {}
+    for drone_name, client in clients.items():
+        for service_type in service_types:
+            groups.setdefault(_group_key(client), []).append(
+                (drone_name, client, service_type)
+            )
+    for pairs in groups.values():
+        pairs.sort(
+            key=lambda pair: cached.get(_pair_key(pair[1], pair[2]), {}).get(
+                "client_id", float("inf")
+            )
+        )
+
+    def _register_group(pairs) -> tuple[float, list[tuple[str, BaseException]]]:
+        started = time.perf_counter()
+        errors = []
+        for drone_name, client, service_type in pairs:
+            try:
+                client.prepare_service(service_type)
+            except Exception as e:
+                errors.append((drone_name, e))
+        return time.perf_counter() - started, errors
+
+    t0 = time.perf_counter()
+    workers = max(1, min(max_workers or DEFAULT_REGISTER_MAX_WORKERS, len(groups)))
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="rpc-register") as executor:
+        outcomes = list(executor.map(_register_group, groups.values()))
+    stats["register_sec"] = time.perf_counter() - t0
+    stats["groups"] = len(groups)
+    stats["workers"] = workers
+    stats["max_group_sec"] = max((sec for sec, _errors in outcomes), default=0.0)
+    errors = [error for _sec, group_errors in outcomes for error in group_errors]
+    stats["failed"] = len(errors)
+
+    t0 = time.perf_counter()
+    entries = {}
+    id_changes = 0
+    for drone_name, client in clients.items():
+        for service_type in service_types:
+            ids = client.resolved_ids(service_type)
+            if ids is None:
+                continue
+            key = _pair_key(client, service_type)
+            entries[key] = ids
+            if key in cached and cached[key] != ids:
+                id_changes += 1
+    stats["cache_hits"] = sum(1 for key in entries if key in cached)
+    stats["id_changes"] = id_changes
+    if cache_path and not errors:
+        save_registration_cache(cache_path, service_config_path, entries)
+    stats["cache_save_sec"] = time.perf_counter() - t0
+    stats["total_sec"] = time.perf_counter() - t_total
+
+    if errors:
+        drone_name, e = errors[0]
+        raise RuntimeError(
+            f"[{drone_name}] {e} (failed registrations: {len(errors)}/{stats['pairs']})"
+        ) from e
+    return stats
+
+
+__all__ = [
+    "load_registration_cache",
+    "register_services",
+    "save_registration_cache",
+]
@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import math
+import mmap
+import struct
+import sys
+from array import array
+from dataclasses import dataclass, field
+from pathlib import Path
+
+Point = tuple[float, float, float]
+
+MAGIC = b"HKSHOW\x00\x01"
+FORMAT_VERSION = 1
+# Per drone and step: x, y, z, speed, start offset, yaw, planned arrival
+# (NaN when the drone has no planned arrival, e.g. a leg inside the tolerance).
+STEP_COLUMNS = ("x", "y", "z", "speed_m_s", "offset_sec", "yaw_deg", "planned_arrival_sec")
+_PREFIX = struct.Struct("<8sI")
+_ALIGN = 8
+
+
+@dataclass
+class ScheduleStep:
+    """One goto phase: per-drone command values keyed by drone name."""
+
+    formation: str
+    targets: dict[str, Point]
+    speeds: dict[str, float]
+    offsets_sec: dict[str, float]
+    yaw_deg: dict[str, float]
+    timeout_sec: float
+    # Empty when the start positions are unknown (first goto).
+    planned_arrivals: dict[str, float] = field(default_factory=dict)
+    assignment: dict = field(default_factory=dict)
+    transition: dict | None = None
+
+
+def resolved_show_digest(resolved: dict) -> str:
+    """sha256 of the resolved show JSON (key order independent)."""
+    text = json.dumps(resolved, sort_keys=True, separators=(",", ":"), ensure_ascii=True)
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def write_schedule(
+    path: Path | str,
+    drone_names: list[str],
+    steps: list[ScheduleStep],
+    *,
+    meta: dict,
+) -> str:
+    """
+    Write the schedule and return its sha256.
+
+    Layout: magic, header length, JSON header (sorted keys), padding to 8 bytes,
+    then one float64 block of len(drone_names) x len(STEP_COLUMNS) per step in
+    drone_names order. The output depends only on the inputs.
+    """
+    columns = len(STEP_COLUMNS)
+    step_headers = []
+    body = array("d")
+    for step in steps:
+        step_headers.append(
+            {
+                "formation": step.formation,
+                "timeout_sec": step.timeout_sec,
+                "offset": len(body) * body.itemsize,
+                "assignment": step.assignment,
+                "transition": step.transition,
+            }
+        )
+        for d in drone_names:
+            target = step.targets[d]
+            body.extend(
+                (
+                    target[0],
+                    target[1],
+                    target[2],
+                    step.speeds[d],
+                    step.offsets_sec.get(d, 0.0),
+                    step.yaw_deg.get(d, 0.0),
+                    step.planned_arrivals.get(d, math.nan),
+                )
+            )
+    header = {
+        "format": "hako-show-schedule",
+        "version": FORMAT_VERSION,
+        "byteorder": sys.byteorder,
+        "columns": list(STEP_COLUMNS),
+        "drone_names": list(drone_names),
+        "meta": meta,
+        "steps": step_headers,
+    }
+    header_bytes = json.dumps(header, sort_keys=True, ensure_ascii=True).encode("utf-8")
+    head_len = _PREFIX.size + len(header_bytes)
+    padding = b"\x00" * (-head_len % _ALIGN)
+    data = _PREFIX.pack(MAGIC, len(header_bytes)) + header_bytes + padding + body.tobytes()
+    assert len(body) == len(steps) * len(drone_names) * columns
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(path.name + ".tmp")
+    tmp_path.write_bytes(data)
+    tmp_path.replace(path)
+    return hashlib.sha256(data).hexdigest()
+
+
+class ShowSchedule:
+    """
+    Memory-mapped schedule written by write_schedule().
+
+    values(step, drone) returns one drone's row without copying the rest of the
+    step; a phase start therefore costs one row lookup per commanded drone.
+    """
+
+    def __init__(self, path: Path | str) -> None:
+        self.path = Path(path)
+        with self.path.open("rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, header_len = _PREFIX.unpack_from(self._mmap, 0)
+        if magic != MAGIC:
+            raise ValueError(f"not a show schedule: {self.path}")
+        start = _PREFIX.size
+        self.header = json.loads(self._mmap[start : start + header_len].decode("utf-8"))
+        if self.header.get("version") != FORMAT_VERSION:
+            raise ValueError(f"unsupported show schedule version: {self.header.get('version')}")
+        if self.header.get("byteorder") != sys.byteorder:
+            raise ValueError(f"show schedule byte order {self.header.get('byteorder')} != {sys.byteorder}")
+        body_start = start + header_len
+        body_start += -body_start % _ALIGN
+        self._values = memoryview(self._mmap)[body_start:].cast("d")
+        self.sha256 = hashlib.sha256(self._mmap).hexdigest()
+        self.drone_names: list[str] = self.header["drone_names"]
+        self.index = {d: i for i, d in enumerate(self.drone_names)}
+        self.steps: list[dict] = self.header["steps"]
+        self.meta: dict = self.header["meta"]
+
+    def values(self, step: int, drone_name: str) -> tuple[float, ...]:
+        columns = len(STEP_COLUMNS)
+        base = self.steps[step]["offset"] // 8 + self.index[drone_name] * columns
+        return tuple(self._values[base : base + columns])
+
+    def step(self, step: int, drone_names: list[str]) -> ScheduleStep:
+        """ScheduleStep of the given drones only."""
+        info = self.steps[step]
+        targets, speeds, offsets, yaws, planned = {}, {}, {}, {}, {}
+        for d in drone_names:
+            x, y, z, speed, offset, yaw, arrival = self.values(step, d)
+            targets[d] = (x, y, z)
+            speeds[d] = speed
+            if offset > 0.0:
+                offsets[d] = offset
+            yaws[d] = yaw
+            if not math.isnan(arrival):
+                planned[d] = arrival
+        return ScheduleStep(
+            formation=info["formation"],
+            targets=targets,
+            speeds=speeds,
+            offsets_sec=offsets,
+            yaw_deg=yaws,
+            timeout_sec=info["timeout_sec"],
+            planned_arrivals=planned,
+            assignment=info["assignment"],
+            transition=info["transition"],
+        )
+
+    def close(self) -> None:
+        self._values.release()
+        self._mmap.close()
+
+    def to_dict(self) -> dict:
+        """Whole schedule as JSON-friendly data (for diffing builds)."""
+        steps = []
+        for i, info in enumerate(self.steps):
+            rows = {
+                d: {
+                    column: None if math.isnan(value) else value
+                    for column, value in zip(STEP_COLUMNS, self.values(i, d))
+                }
+                for d in self.drone_names
+            }
+            steps.append({**{k: v for k, v in info.items() if k != "offset"}, "drones": rows})
+        return {
+            **{k: v for k, v in self.header.items() if k != "steps"},
+            "sha256": self.sha256,
+            "steps": steps,
+        }
+
+
+def main() -> int:
+    p = argparse.ArgumentParser(description="Print a compiled show schedule as JSON")
+    p.add_argument("schedule", type=Path)
+    args = p.parse_args()
+    schedule = ShowSchedule(args.schedule)
+    try:
+        print(json.dumps(schedule.to_dict(), ensure_ascii=True, indent=2, sort_keys=True))
+    finally:
+        schedule.close()
+    return 0
+
+
+__all__ = [
+    "STEP_COLUMNS",
+    "ScheduleStep",
+    "ShowSchedule",
+    "resolved_show_digest",
+    "write_schedule",
+]
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,24 @@
+#!/bin/bash
+
+echo "INFO: test_fleet_state_table:"
+python -m unittest tests.test_fleet_state_table
+echo "INFO: test_poll_scheduler:"
+python -m unittest tests.test_poll_scheduler
+echo "INFO: test_retry_policy:"
+python -m unittest tests.test_retry_policy
+echo "INFO: test_formation_assignment:"
+python -m unittest tests.test_formation_assignment
+echo "INFO: test_transition_planner:"
+python -m unittest tests.test_transition_planner
+echo "INFO: test_phase_barrier:"
+python -m unittest tests.test_phase_barrier
+echo "INFO: test_show_schedule:"
+python -m unittest tests.test_show_schedule
+echo "INFO: test_fleet_rpc_async_shared:"
+python -m unittest tests.test_fleet_rpc_async_shared
+echo "INFO: test_rpc_asyncio:"
+python -m unittest tests.test_rpc_asyncio
+echo "INFO: test_fleet_monitor:"
+python -m unittest tests.test_fleet_monitor
+echo "INFO: test_rpc_trace:"
+python -m unittest tests.test_rpc_trace
@@ -0,0 +1,84 @@
+import sys
+import os
+# external_rpcディレクトリをモジュール検索パスに追加
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+import unittest
+from types import SimpleNamespace
+import fleet_state_table
+from fleet_monitor import FleetStateMonitor, NO_STATE_MESSAGE
+
+
+DRONES = [f"Drone-{i}" for i in range(1, 6)]
+
+
+class _FakeStatusReader:
+    """read_tick / status_views / read_pose だけを持つ FleetStatusReader"""
+
+    def __init__(self):
+        self.read_time = 0.0
+        self.poses = {d: (i, 0.0, 3.0) for i, d in enumerate(DRONES)}
+
+    def read_tick(self, pdu_names):
+        self.read_time += 0.1
+        return 1
+
+    def status_views(self):
+        return {}
+
+    def read_pose(self, drone_name):
+        x, y, z = self.poses[drone_name]
+        return 1, self.read_time, (x, y, z, 0.0, 0.0, 0.0)
+
+
+def _state(x, ok=True):
+    pose = SimpleNamespace(
+        position=SimpleNamespace(x=x, y=0.0, z=3.0),
+        orientation=SimpleNamespace(w=1.0, x=0.0, y=0.0, z=0.0),
+    )
+    return SimpleNamespace(ok=ok, is_ready=True, mode="GUIDED", message="", current_pose=pose)
+
+
+class TestFleetStateMonitor(unittest.TestCase):
+
+    def setUp(self):
+        self.monitor = FleetStateMonitor(_FakeStatusReader(), DRONES, interval_sec=0.1)
+
+    def test_ok_until_get_state(self):
+        """get_state の応答を受け取るまでは ok=False / NO_STATE_MESSAGE で、応答後は引き継ぐか確認"""
+        self.monitor.poll_once()
+        self.assertFalse(self.monitor.get("Drone-1").ok)
+        self.assertEqual(self.monitor.get("Drone-1").message, NO_STATE_MESSAGE)
+        self.monitor.update_from_state("Drone-1", _state(0.0))
+        self.monitor.poll_once()
+        self.assertTrue(self.monitor.get("Drone-1").ok)
+        self.assertFalse(self.monitor.get("Drone-2").ok)
+
+    @unittest.skipIf(fleet_state_table.np is None, "numpy is not installed")
+    def test_get_state_fan_out_publishes_once(self):
+        """get_state の応答ごとには table を publish せず、次の tick で 1 回だけ publish するか確認"""
+        table = self.monitor.table
+        self.monitor.poll_once()
+        published = table.version
+        for i, d in enumerate(DRONES):
+            self.monitor.update_from_state(d, _state(float(i) + 5.0))
+        self.assertEqual(table.version, published)
+        self.monitor.poll_once()
+        self.assertEqual(table.version, published + 1)
+        self.assertTrue(self.monitor.table_view().ok.all())
+
+    @unittest.skipIf(fleet_state_table.np is None, "numpy is not installed")
+    def test_table_view_publishes_pending_updates(self):
+        """monitor が動いていなくても table_view() が未 publish の get_state 結果を返すか確認"""
+        table = self.monitor.table
+        self.monitor.update_from_state("Drone-3", _state(7.0))
+        published = table.version
+        view = self.monitor.table_view()
+        self.assertEqual(table.version, published + 1)
+        self.assertEqual(float(view.position[DRONES.index("Drone-3")][0]), 7.0)
+        self.monitor.table_view()
+        self.assertEqual(table.version, published + 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
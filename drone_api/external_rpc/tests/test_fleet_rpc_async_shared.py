@@ -0,0 +1,78 @@
+import sys
+import os
+# external_rpcディレクトリをモジュール検索パスに追加
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+import threading
+import time
+import unittest
+import weakref
+from fleet_rpc_async_shared import AsyncSharedFleetRpcController
+from poll_scheduler import PollScheduler
+
+
+class _FakeFuture:
+    def __init__(self):
+        self._done = False
+
+    def done(self):
+        return self._done
+
+
+def _controller():
+    """runtime に接続せず、wait_for_any() に必要な属性だけを持つ controller"""
+    fleet = AsyncSharedFleetRpcController.__new__(AsyncSharedFleetRpcController)
+    fleet.poll_scheduler = PollScheduler()
+    fleet._future_runtime_ids = weakref.WeakKeyDictionary()
+    fleet._wait_any_local = threading.local()
+    fleet.polls = 0
+
+    def poll_once(runtime_ids=None):
+        fleet.polls += 1
+        return 0
+
+    fleet._poll_once = poll_once
+    return fleet
+
+
+class TestWaitForAny(unittest.TestCase):
+
+    def _wait_in_thread(self, fleet, futures, timeout_sec):
+        result = []
+        waiting = threading.Thread(
+            target=lambda: result.append(fleet.wait_for_any(futures, timeout_sec=timeout_sec)),
+            daemon=True,
+        )
+        waiting.start()
+        waiting.join(timeout=5.0)
+        self.assertFalse(waiting.is_alive())
+        return result[0]
+
+    def test_empty_returns_immediately(self):
+        """futures が空なら timeout_sec=None でもすぐに (set(), set()) を返すか確認"""
+        fleet = _controller()
+        self.assertEqual(self._wait_in_thread(fleet, [], None), (set(), set()))
+        self.assertEqual(fleet.polls, 0)
+
+    def test_returns_first_completed(self):
+        """完了した future が 1 件でもあれば (done, not_done) に分けて返すか確認"""
+        fleet = _controller()
+        futures = [_FakeFuture() for _ in range(3)]
+        futures[1]._done = True
+        done, not_done = self._wait_in_thread(fleet, futures, None)
+        self.assertEqual(done, {futures[1]})
+        self.assertEqual(not_done, {futures[0], futures[2]})
+
+    def test_timeout(self):
+        """完了しない future だけなら timeout_sec で全件 not_done として返すか確認"""
+        fleet = _controller()
+        futures = [_FakeFuture()]
+        t0 = time.monotonic()
+        done, not_done = self._wait_in_thread(fleet, futures, 0.05)
+        self.assertGreaterEqual(time.monotonic() - t0, 0.05)
+        self.assertEqual((done, not_done), (set(), set(futures)))
+        self.assertGreater(fleet.polls, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,86 @@
+import sys
+import os
+# external_rpcディレクトリをモジュール検索パスに追加
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+import random
+import unittest
+from types import SimpleNamespace
+import fleet_state_table
+from fleet_state_table import FleetStateTable
+
+
+def _snapshot(name, x, y, z):
+    # DroneStateSnapshot と同じ属性 (fleet_monitor は hakopy が必要なため使わない)
+    return SimpleNamespace(drone_name=name, ok=True, is_ready=True, x=x, y=y, z=z,
+                           roll_deg=0.0, pitch_deg=0.0, yaw_deg=0.0, flight_mode=1,
+                           internal_state=0, version=1, read_time=0.0)
+
+
+@unittest.skipIf(fleet_state_table.np is None, "numpy is not installed")
+class TestNearestNeighbours(unittest.TestCase):
+
+    def setUp(self):
+        rng = random.Random(7)
+        self.names = [f"Drone-{i}" for i in range(1, 61)]
+        self.positions = {
+            name: (rng.uniform(-20, 20), rng.uniform(-20, 20), rng.uniform(0, 10)) for name in self.names
+        }
+        self.table = FleetStateTable(self.names)
+        # Drone-60 は一度も読まれていない
+        for name in self.names[:-1]:
+            self.table.update(_snapshot(name, *self.positions[name]))
+        self.view = self.table.publish()
+
+    def _brute_force(self, k):
+        valid = self.names[:-1]
+        out = {}
+        for a in valid:
+            pa = self.positions[a]
+            d = sorted(
+                (sum((pa[i] - self.positions[b][i]) ** 2 for i in range(3)) ** 0.5, b)
+                for b in valid if b != a
+            )
+            out[a] = d[:k]
+        return out
+
+    def test_chunked_matches_brute_force(self):
+        """分割計算が総当たりと同じ近傍を返すか確認"""
+        saved = fleet_state_table.NEIGHBOUR_CHUNK_ELEMENTS
+        for chunk_elements in (saved, 1, 100):
+            fleet_state_table.NEIGHBOUR_CHUNK_ELEMENTS = chunk_elements
+            try:
+                idx, dist = self.view.nearest_neighbours(3)
+            finally:
+                fleet_state_table.NEIGHBOUR_CHUNK_ELEMENTS = saved
+            for name, expected in self._brute_force(3).items():
+                i = self.view.index_of(name)
+                self.assertEqual([self.view.names[j] for j in idx[i]], [b for _d, b in expected])
+                for a, (b, _name) in zip(dist[i].tolist(), expected):
+                    self.assertAlmostEqual(a, b, places=9)
+            last = self.view.index_of(self.names[-1])
+            self.assertEqual(idx[last].tolist(), [-1, -1, -1])
+
+    def test_min_separation(self):
+        """最接近ペアが総当たりと一致するか確認"""
+        expected = min((d[0][0], a) for a, d in self._brute_force(1).items())
+        distance, a, b = self.view.min_separation()
+        self.assertAlmostEqual(distance, expected[0], places=9)
+        self.assertIn(expected[1], (a, b))
+
+
+class TestWithoutNumpy(unittest.TestCase):
+
+    def test_table_requires_numpy(self):
+        """numpy がない場合は分かるエラーになるか確認"""
+        saved = fleet_state_table.np
+        fleet_state_table.np = None
+        try:
+            with self.assertRaises(RuntimeError):
+                FleetStateTable(["Drone-1"])
+        finally:
+            fleet_state_table.np = saved
+
+
+if __name__ == '__main__':
+    unittest.main()
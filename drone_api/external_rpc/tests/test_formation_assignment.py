@@ -0,0 +1,104 @@
+import sys
+import os
+# external_rpcディレクトリをモジュール検索パスに追加
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+import itertools
+import random
+import unittest
+import formation_assignment
+from formation_assignment import _has_perfect_matching, assign_formation, solve_min_max, solve_min_sum
+
+np = formation_assignment.np
+
+
+def _brute_force(cost, key):
+    """全順列から key(row->col の割り当て) が最小のものの値を返す"""
+    n = cost.shape[0]
+    return min(key([cost[r, c] for r, c in enumerate(perm)]) for perm in itertools.permutations(range(n)))
+
+
+def _brute_force_matching(allowed) -> bool:
+    n = allowed.shape[0]
+    return any(all(allowed[r, c] for r, c in enumerate(perm)) for perm in itertools.permutations(range(n)))
+
+
+def _random_cost(rng, n, integer=False):
+    if integer:
+        # 同値のコストが多い (タイを含む) ケース
+        return np.array([[rng.randint(0, 4) for _ in range(n)] for _ in range(n)], dtype=np.float64)
+    points = [(rng.uniform(-10, 10), rng.uniform(-10, 10), rng.uniform(0, 5)) for _ in range(2 * n)]
+    return formation_assignment.cost_matrix(points[:n], points[n:])
+
+
+@unittest.skipIf(np is None, "numpy is required")
+class TestSolversAgainstBruteForce(unittest.TestCase):
+
+    CASES = 150
+
+    def _check_permutation(self, col_of, n):
+        self.assertEqual(sorted(col_of), list(range(n)))
+
+    def test_min_sum(self):
+        """solve_min_sum の総コストが全探索の最小値と一致するか確認"""
+        rng = random.Random(1)
+        for case in range(self.CASES):
+            n = rng.randint(1, 7)
+            cost = _random_cost(rng, n, integer=case % 3 == 0)
+            col_of = solve_min_sum(cost)
+            self._check_permutation(col_of, n)
+            actual = sum(cost[r, c] for r, c in enumerate(col_of))
+            self.assertAlmostEqual(actual, _brute_force(cost, sum), msg=f"case={case} cost={cost.tolist()}")
+
+    def test_min_max(self):
+        """solve_min_max の最大コストが全探索の最小値と一致し、その上限内で総コストも最小か確認"""
+        rng = random.Random(2)
+        for case in range(self.CASES):
+            n = rng.randint(1, 7)
+            cost = _random_cost(rng, n, integer=case % 3 == 0)
+            col_of = solve_min_max(cost)
+            self._check_permutation(col_of, n)
+            legs = [cost[r, c] for r, c in enumerate(col_of)]
+            best_max = _brute_force(cost, max)
+            self.assertAlmostEqual(max(legs), best_max, msg=f"case={case} cost={cost.tolist()}")
+            best_sum = _brute_force(cost, lambda values: sum(values) if max(values) <= best_max else float("inf"))
+            self.assertAlmostEqual(sum(legs), best_sum, msg=f"case={case} cost={cost.tolist()}")
+
+    def test_has_perfect_matching(self):
+        """_has_perfect_matching の判定が全探索と一致するか確認"""
+        rng = random.Random(3)
+        for case in range(self.CASES * 2):
+            n = rng.randint(1, 7)
+            density = rng.choice([0.2, 0.35, 0.5, 0.8])
+            allowed = np.array([[rng.random() < density for _ in range(n)] for _ in range(n)])
+            self.assertEqual(
+                _has_perfect_matching(allowed), _brute_force_matching(allowed),
+                msg=f"case={case} allowed={allowed.astype(int).tolist()}",
+            )
+
+
+@unittest.skipIf(np is None, "numpy is required")
+class TestAssignFormation(unittest.TestCase):
+
+    def test_swapped_targets(self):
+        """入れ替わった目標に対して交差しない割り当てを返すか確認"""
+        names = ["D1", "D2"]
+        current = {"D1": (0.0, 0.0, 3.0), "D2": (10.0, 0.0, 3.0)}
+        result = assign_formation(names, current, [(10.0, 1.0, 3.0), (0.0, 1.0, 3.0)])
+        self.assertEqual(result.solver, "hungarian")
+        self.assertEqual(result.assignments, {"D1": (0.0, 1.0, 3.0), "D2": (10.0, 1.0, 3.0)})
+        self.assertAlmostEqual(result.total_distance_m, 2.0)
+        self.assertAlmostEqual(result.max_distance_m, 1.0)
+
+    def test_greedy_above_exact_max(self):
+        """exact_max を超えると greedy にフォールバックするか確認"""
+        names = [f"D{i}" for i in range(4)]
+        current = {d: (float(i), 0.0, 3.0) for i, d in enumerate(names)}
+        targets = [(float(i), 1.0, 3.0) for i in range(4)]
+        result = assign_formation(names, current, targets, exact_max=2)
+        self.assertEqual(result.solver, "greedy")
+        self.assertEqual(sorted(result.assignments.values()), sorted(targets))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,89 @@
+import sys
+import os
+# external_rpcディレクトリをモジュール検索パスに追加
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+import contextlib
+import io
+import socket
+import threading
+import time
+import unittest
+from multiprocessing.connection import Client
+from phase_barrier import PhaseBarrierClient, PhaseBarrierServer
+
+
+def _wait_until(predicate, timeout_sec=5.0):
+    deadline = time.monotonic() + timeout_sec
+    while not predicate():
+        if time.monotonic() > deadline:
+            raise AssertionError("condition not met in time")
+        time.sleep(0.01)
+
+
+class TestPhaseBarrier(unittest.TestCase):
+
+    def setUp(self):
+        self._stdout = contextlib.redirect_stdout(io.StringIO())
+        self._stdout.__enter__()
+        self.server = PhaseBarrierServer(2)
+
+    def tearDown(self):
+        self.server.close()
+        self._stdout.__exit__(None, None, None)
+
+    def _connected(self, count):
+        return lambda: len(self.server._conns) >= count
+
+    def test_accept_survives_dead_worker(self):
+        """hello 前に切断した接続・認証に失敗した接続があっても残りの worker を受け付けるか確認"""
+        clients = []
+        wrong_key_errors = []
+
+        def connect():
+            raw = socket.create_connection(self.server.address)
+            raw.close()
+            Client(self.server.address, authkey=self.server.authkey).close()
+            try:
+                Client(self.server.address, authkey=b"wrong-key-000000")
+            except Exception as e:
+                wrong_key_errors.append(e)
+            clients.extend(
+                PhaseBarrierClient(self.server.address, i, authkey=self.server.authkey) for i in range(2)
+            )
+
+        # 受け付けが止まると Client() の handshake が返らないので thread で待つ
+        connecting = threading.Thread(target=connect, daemon=True)
+        connecting.start()
+        connecting.join(timeout=5.0)
+        self.assertFalse(connecting.is_alive())
+        self.assertEqual(len(wrong_key_errors), 1)
+        _wait_until(self._connected(2))
+        for client in clients:
+            client.close()
+
+    def test_phase_release_and_abort(self):
+        """全 worker の到着で phase が解放され、失敗した worker の abort が check() で他の worker に届くか確認"""
+        clients = [
+            PhaseBarrierClient(self.server.address, i, authkey=self.server.authkey) for i in range(2)
+        ]
+        _wait_until(self._connected(2))
+        serving = threading.Thread(target=self.server.serve, kwargs={"poll_sec": 0.01}, daemon=True)
+        serving.start()
+        self.assertFalse(clients[0].passed(0))
+        clients[1].passed(0)
+        _wait_until(lambda: clients[0].passed(0) and clients[1].passed(0))
+        clients[1].check()
+        clients[0].finish("failed")
+        with self.assertRaisesRegex(RuntimeError, r"\[barrier\] aborted: worker 0 failed"):
+            _wait_until(lambda: clients[1].check() and False)
+        clients[1].finish("failed")
+        serving.join(timeout=5.0)
+        self.assertFalse(serving.is_alive())
+        self.assertEqual(self.server.get_stats()["finished"], {"0": "failed", "1": "failed"})
+        for client in clients:
+            client.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
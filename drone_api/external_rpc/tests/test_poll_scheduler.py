@@ -0,0 +1,130 @@
+import sys
+import os
+# external_rpcディレクトリをモジュール検索パスに追加
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+import threading
+import unittest
+import poll_scheduler
+from poll_scheduler import MODE_BUSY, MODE_FIXED, MODE_IDLE, MODE_SHORT, PollScheduler
+
+
+class _FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, sec):
+        self.now += sec
+
+
+class TestPollSchedulerModes(unittest.TestCase):
+
+    def setUp(self):
+        self.clock = _FakeClock()
+        self._saved_time = poll_scheduler.time
+        poll_scheduler.time = self.clock
+        self.scheduler = PollScheduler(
+            busy_window_sec=0.002, short_min_sec=0.0002, short_max_sec=0.01, idle_sec=0.05
+        )
+
+    def tearDown(self):
+        poll_scheduler.time = self._saved_time
+
+    def test_many_outstanding_without_completions_is_not_busy(self):
+        """未完了が多くても応答がなければ busy にならず、sleep が伸びるか確認"""
+        delays = []
+        for _ in range(8):
+            delays.append(self.scheduler.wait(0, 1000))
+            self.assertEqual(self.scheduler.mode, MODE_SHORT)
+        self.assertEqual(delays[0], 0.0002)
+        self.assertTrue(all(b >= a for a, b in zip(delays, delays[1:])))
+        self.assertEqual(delays[-1], 0.01)
+        self.assertEqual(self.scheduler.get_stats()["mode_counts"][MODE_BUSY], 0)
+
+    def test_completion_then_quiet(self):
+        """応答直後は busy、窓内の空 poll は最短 sleep、窓を過ぎると backoff になるか確認"""
+        self.assertEqual(self.scheduler.wait(0, 10), 0.0002)
+        self.assertEqual(self.scheduler.wait(0, 10), 0.0004)
+        self.assertEqual(self.scheduler.wait(3, 10), 0.0)
+        self.assertEqual(self.scheduler.mode, MODE_BUSY)
+        delay = self.scheduler.wait(0, 10)
+        self.assertEqual(self.scheduler.mode, MODE_BUSY)
+        self.assertEqual(delay, 0.0002)
+        self.clock.now += 0.01
+        self.assertEqual(self.scheduler.wait(0, 10), 0.0002)
+        self.assertEqual(self.scheduler.mode, MODE_SHORT)
+        self.assertEqual(self.scheduler.wait(0, 10), 0.0004)
+
+    def test_empty_poll_always_sleeps(self):
+        """空 poll の待ちは 0 にならないか確認"""
+        for processed in (1, 0, 0, 1, 0):
+            delay = self.scheduler.next_delay(processed, 500)
+            if processed == 0:
+                self.assertGreater(delay, 0.0)
+            self.clock.now += 0.0005
+
+    def test_idle_and_max_sec(self):
+        """未完了なしで idle、max_sec で待ちが切り詰められるか確認"""
+        self.assertEqual(self.scheduler.next_delay(0, 0), 0.05)
+        self.assertEqual(self.scheduler.mode, MODE_IDLE)
+        self.assertEqual(self.scheduler.next_delay(0, 0, max_sec=0.01), 0.01)
+        self.assertEqual(self.scheduler.next_delay(0, 5, max_sec=-1.0), 0.0)
+
+    def test_fixed(self):
+        """固定間隔モードでは空 poll だけ待つか確認"""
+        scheduler = PollScheduler.fixed(0.1)
+        self.assertEqual(scheduler.next_delay(0, 5), 0.1)
+        self.assertEqual(scheduler.next_delay(2, 5), 0.0)
+        self.assertEqual(scheduler.mode, MODE_FIXED)
+        self.assertIsNone(PollScheduler.from_poll_interval(0.0).fixed_sec)
+
+    def test_stats(self):
+        """統計 (poll 数・空 poll 率・追加遅延) を数えるか確認"""
+        self.scheduler.next_delay(0, 4)
+        self.scheduler.next_delay(2, 4)
+        self.scheduler.next_delay(0, 0)
+        stats = self.scheduler.get_stats()
+        self.assertEqual(stats["polls"], 3)
+        self.assertEqual(stats["empty_polls"], 2)
+        self.assertEqual(stats["completions"], 2)
+        self.assertAlmostEqual(stats["added_latency_sec"], 0.0002)
+
+
+class TestPollSchedulerSpawn(unittest.TestCase):
+
+    def test_children_keep_own_backoff(self):
+        """spawn() した scheduler は backoff を共有しないか確認"""
+        parent = PollScheduler(short_min_sec=0.001, short_max_sec=1.0)
+        a = parent.spawn()
+        b = parent.spawn()
+        a.next_delay(0, 1)
+        a.next_delay(0, 1)
+        self.assertEqual(b.next_delay(0, 1), 0.001)
+        self.assertEqual(parent.get_stats()["polls"], 3)
+        self.assertEqual(a.get_stats()["polls"], 2)
+
+    def test_threads_add_up_in_parent(self):
+        """複数 thread の統計が親に漏れなく集まるか確認"""
+        parent = PollScheduler()
+
+        def _run():
+            child = parent.spawn()
+            for i in range(2000):
+                child.next_delay(i % 2, 10)
+
+        threads = [threading.Thread(target=_run) for _ in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        stats = parent.get_stats()
+        self.assertEqual(stats["polls"], 8000)
+        self.assertEqual(stats["completions"], 4000)
+        self.assertEqual(sum(stats["mode_counts"].values()), 8000)
+
+
+if __name__ == '__main__':
+    unittest.main()
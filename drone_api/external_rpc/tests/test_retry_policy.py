@@ -0,0 +1,362 @@
+import sys
+import os
+# external_rpcディレクトリをモジュール検索パスに追加
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+import contextlib
+import io
+import unittest
+import retry_policy
+from retry_policy import CircuitBreaker, FleetRetry, RetryPolicy
+
+
+class _FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, sec):
+        self.now += sec
+
+
+class _FakeSender:
+    """send_round の代わり。drone ごとに失敗させる回数を持ち、送信時刻を記録する"""
+
+    def __init__(self, clock, failures, round_sec=0.01):
+        self.clock = clock
+        self.failures = dict(failures)
+        self.round_sec = round_sec
+        self.sent = []
+
+    def __call__(self, round_no, drone_names):
+        self.sent.append((self.clock.now, list(drone_names)))
+        self.clock.now += self.round_sec
+        results = []
+        for drone_name in drone_names:
+            left = self.failures.get(drone_name, 0)
+            if left == 0:
+                results.append(True)
+                continue
+            if left > 0:
+                self.failures[drone_name] = left - 1
+            results.append(RuntimeError(f"{drone_name} busy"))
+        return results
+
+    def send_times(self, drone_name):
+        return [at for at, drone_names in self.sent if drone_name in drone_names]
+
+
+class _FakeCall:
+    def __init__(self, due, result):
+        self.due = due
+        self._result = result
+        self._done = False
+
+    def done(self):
+        return self._done
+
+    def result(self, timeout=None):
+        if isinstance(self._result, Exception):
+            raise self._result
+        return self._result
+
+
+class _FakeService:
+    """
+    submit / wait_for_any の代わり。drone ごとの応答時間 (None: 応答しない) と
+    失敗回数を持ち、待つ間は fake clock を進める
+    """
+
+    def __init__(self, clock, latency, failures=None):
+        self.clock = clock
+        self.latency = dict(latency)
+        self.failures = dict(failures or {})
+        self.sent = []
+        self.calls = []
+        self.max_in_flight = 0
+
+    def submit(self, drone_name):
+        self.sent.append((self.clock.now, drone_name))
+        latency = self.latency.get(drone_name, 0.01)
+        left = self.failures.get(drone_name, 0)
+        if left:
+            self.failures[drone_name] = left - 1
+            result = RuntimeError(f"{drone_name} busy")
+        else:
+            result = True
+        call = _FakeCall(None if latency is None else self.clock.now + latency, result)
+        self.calls.append(call)
+        in_flight = sum(1 for c in self.calls if not c._done)
+        self.max_in_flight = max(self.max_in_flight, in_flight)
+        return call
+
+    def wait_for_any(self, futures, timeout_sec=None):
+        dues = [f.due for f in futures if f.due is not None]
+        until = self.clock.now + timeout_sec
+        if dues and min(dues) <= until:
+            until = min(dues)
+        self.clock.now = max(self.clock.now, until)
+        done = set()
+        for f in futures:
+            if f.due is not None and f.due <= self.clock.now:
+                f._done = True
+                done.add(f)
+        return done, set(futures) - done
+
+    def send_times(self, drone_name):
+        return [at for at, d in self.sent if d == drone_name]
+
+    def run(self, retry, drone_names, call_timeout_sec=5.0, limit=0):
+        return retry.run_async(
+            "set_ready",
+            drone_names,
+            self.submit,
+            _is_success,
+            wait_for_any=self.wait_for_any,
+            call_timeout_sec=call_timeout_sec,
+            limit=limit,
+        )
+
+
+def _is_success(result):
+    return result is True
+
+
+class _FakeClockTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.clock = _FakeClock()
+        self._saved_time = retry_policy.time
+        retry_policy.time = self.clock
+        self._stdout = contextlib.redirect_stdout(io.StringIO())
+        self._stdout.__enter__()
+
+    def tearDown(self):
+        self._stdout.__exit__(None, None, None)
+        retry_policy.time = self._saved_time
+
+
+class TestRetryPolicy(_FakeClockTestCase):
+
+    def test_backoff_due_times(self):
+        """失敗回数に応じて次の送信時刻が指数的に伸び、max_delay_sec で頭打ちになるか確認"""
+        policy = RetryPolicy(base_delay_sec=0.2, max_delay_sec=1.0, multiplier=2.0, jitter=0.0)
+        now = 10.0
+        delays = [policy.record_failure("D1", now) for _ in range(5)]
+        for actual, expected in zip(delays, [0.2, 0.4, 0.8, 1.0, 1.0]):
+            self.assertAlmostEqual(actual, expected)
+        self.assertAlmostEqual(policy.next_at("D1"), now + 1.0)
+        self.assertFalse(policy.due("D1", now + 0.999))
+        self.assertTrue(policy.due("D1", now + 1.0))
+        policy.record_success("D1")
+        self.assertTrue(policy.due("D1", now))
+        self.assertAlmostEqual(policy.record_failure("D1", now), 0.2)
+
+    def test_jitter_only_shortens_delay(self):
+        """jitter が遅延を [1-jitter, 1] 倍の範囲でだけ縮めるか確認"""
+        policy = RetryPolicy(base_delay_sec=1.0, max_delay_sec=1.0, jitter=0.5, seed=1)
+        delays = [policy.delay_for(1) for _ in range(200)]
+        self.assertGreaterEqual(min(delays), 0.5)
+        self.assertLessEqual(max(delays), 1.0)
+        self.assertGreater(max(delays) - min(delays), 0.1)
+
+    def test_deadline_and_attempts(self):
+        """deadline と max_attempts の判定が境界どおりか確認"""
+        policy = RetryPolicy(deadline_sec=2.0, max_attempts=2)
+        policy.start()
+        self.assertAlmostEqual(policy.remaining_sec(), 2.0)
+        self.assertFalse(policy.expired(self.clock.now + 1.999))
+        self.assertTrue(policy.expired(self.clock.now + 2.0))
+        policy.record_attempt("D1")
+        self.assertFalse(policy.exhausted("D1"))
+        policy.record_attempt("D1")
+        self.assertTrue(policy.exhausted("D1"))
+
+
+class TestCircuitBreaker(unittest.TestCase):
+
+    def test_open_half_open_closed(self):
+        """連続失敗で open、cooldown 後に half_open でプローブのみ通し、成功で closed に戻るか確認"""
+        breaker = CircuitBreaker("part1", failure_threshold=3, cooldown_sec=1.0, half_open_probes=1)
+        names = ["D1", "D2", "D3"]
+        for i in range(2):
+            breaker.record_failure(float(i))
+        self.assertEqual(breaker.state, CircuitBreaker.CLOSED)
+        breaker.record_failure(2.0)
+        self.assertEqual(breaker.state, CircuitBreaker.OPEN)
+        self.assertEqual(breaker.admit(names, 2.5), [])
+        self.assertEqual(breaker.throttled, 3)
+        self.assertEqual(breaker.admit(names, 3.0), ["D1"])
+        self.assertEqual(breaker.state, CircuitBreaker.HALF_OPEN)
+        breaker.record_success()
+        self.assertEqual(breaker.state, CircuitBreaker.CLOSED)
+        self.assertEqual(breaker.admit(names, 3.0), names)
+        self.assertEqual(breaker.opens, 1)
+
+    def test_failed_probe_doubles_cooldown(self):
+        """half_open のプローブ失敗で再び open になり、cooldown が上限まで倍になるか確認"""
+        breaker = CircuitBreaker("part1", failure_threshold=1, cooldown_sec=1.0, max_cooldown_sec=3.0)
+        breaker.record_failure(0.0)
+        now = 0.0
+        for expected in [2.0, 3.0, 3.0]:
+            now = breaker.reopen_at()
+            self.assertEqual(breaker.admit(["D1"], now), ["D1"])
+            breaker.record_failure(now)
+            self.assertEqual(breaker.state, CircuitBreaker.OPEN)
+            self.assertAlmostEqual(breaker.cooldown_sec, expected)
+        breaker.admit(["D1"], breaker.reopen_at())
+        breaker.record_success()
+        self.assertAlmostEqual(breaker.cooldown_sec, 1.0)
+
+
+class TestFleetRetryRun(_FakeClockTestCase):
+
+    def test_retries_follow_backoff(self):
+        """失敗した drone だけが backoff 後に再送され、成功した drone は再送されないか確認"""
+        policy = RetryPolicy(base_delay_sec=0.2, max_delay_sec=5.0, jitter=0.0)
+        retry = FleetRetry(policy, failure_threshold=100, coalesce_sec=0.0)
+        sender = _FakeSender(self.clock, {"D2": 2})
+        rounds = retry.run("set_ready", ["D1", "D2", "D3"], sender, _is_success)
+        self.assertEqual(rounds, 3)
+        self.assertEqual(len(sender.send_times("D1")), 1)
+        self.assertEqual(sender.sent[1][1], ["D2"])
+        times = sender.send_times("D2")
+        # 応答後 (round_sec 後) から 0.2, 0.4 秒
+        self.assertAlmostEqual(times[1] - times[0], 0.01 + 0.2)
+        self.assertAlmostEqual(times[2] - times[1], 0.01 + 0.4)
+        self.assertEqual(retry.calls, 5)
+
+    def test_breaker_throttles_failing_partition(self):
+        """失敗が続く partition の breaker が open → half_open → closed と遷移し、他の partition は止まらないか確認"""
+        policy = RetryPolicy(base_delay_sec=0.1, max_delay_sec=0.1, jitter=0.0)
+        partitions = {"A1": "part1", "A2": "part1", "B1": "part2"}
+        retry = FleetRetry(
+            policy, partitions, failure_threshold=2, cooldown_sec=1.0, half_open_probes=1, coalesce_sec=0.0
+        )
+        sender = _FakeSender(self.clock, {"A1": 1, "A2": 1, "B1": 1})
+        retry.run("takeoff", ["A1", "A2", "B1"], sender, _is_success)
+        part1 = retry.breakers["part1"]
+        self.assertEqual(part1.opens, 1)
+        self.assertEqual(part1.state, CircuitBreaker.CLOSED)
+        self.assertGreater(part1.throttled, 0)
+        self.assertEqual(retry.breakers["part2"].opens, 0)
+        # part2 は part1 の cooldown を待たずに再送されている
+        self.assertLess(sender.send_times("B1")[1] - sender.send_times("B1")[0], 0.5)
+        # open 中は part1 の drone が送られない
+        opened_at = sender.send_times("A1")[0] + 0.01
+        for at, drone_names in sender.sent:
+            if opened_at <= at < opened_at + 1.0:
+                self.assertNotIn("A1", drone_names)
+                self.assertNotIn("A2", drone_names)
+        self.assertEqual(retry.breaker_states(), {"part1": CircuitBreaker.CLOSED})
+
+    def test_deadline_expires(self):
+        """失敗し続ける drone があると deadline 経過で RuntimeError になるか確認"""
+        policy = RetryPolicy(base_delay_sec=0.2, max_delay_sec=0.5, jitter=0.0, deadline_sec=3.0)
+        retry = FleetRetry(policy, failure_threshold=100)
+        sender = _FakeSender(self.clock, {"D1": -1})
+        start = self.clock.now
+        with self.assertRaisesRegex(RuntimeError, "set_ready deadline exceeded: pending=1"):
+            retry.run("set_ready", ["D1", "D2"], sender, _is_success)
+        self.assertGreaterEqual(self.clock.now - start, 3.0)
+        self.assertLess(self.clock.now - start, 3.0 + 0.5)
+
+    def test_max_attempts_exhausted(self):
+        """max_attempts 回失敗した drone で打ち切られ、それ以上送られないか確認"""
+        policy = RetryPolicy(base_delay_sec=0.1, jitter=0.0, max_attempts=3)
+        retry = FleetRetry(policy, failure_threshold=100)
+        sender = _FakeSender(self.clock, {"D1": -1})
+        with self.assertRaisesRegex(RuntimeError, r"takeoff failed after retries: .*exhausted=\['D1'\]"):
+            retry.run("takeoff", ["D1", "D2"], sender, _is_success)
+        self.assertEqual(len(sender.send_times("D1")), 3)
+        self.assertEqual(policy.attempts("D1"), 3)
+
+
+
+class TestFleetRetryRunAsync(_FakeClockTestCase):
+
+    def test_retry_does_not_wait_for_slow_partition(self):
+        """遅い partition の要求が完了する前に、健全な partition の失敗した drone が再送されるか確認"""
+        policy = RetryPolicy(base_delay_sec=0.2, max_delay_sec=5.0, jitter=0.0)
+        retry = FleetRetry(policy, {"A1": "part1", "B1": "part2"}, failure_threshold=100, coalesce_sec=0.0)
+        service = _FakeService(self.clock, {"A1": 0.01, "B1": 4.0}, failures={"A1": 2})
+        start = self.clock.now
+        calls = service.run(retry, ["A1", "B1"])
+        self.assertEqual(calls, 4)
+        times = service.send_times("A1")
+        self.assertEqual(len(times), 3)
+        # 応答 (0.01 秒後) から 0.2, 0.4 秒で再送され、B1 の応答 (4 秒後) を待たない
+        self.assertAlmostEqual(times[1] - times[0], 0.01 + 0.2)
+        self.assertAlmostEqual(times[2] - times[1], 0.01 + 0.4)
+        self.assertLess(times[2] - start, 4.0)
+        self.assertEqual(len(service.send_times("B1")), 1)
+
+    def test_timed_out_call_is_not_overlapped(self):
+        """応答しない要求は call_timeout_sec で失敗扱いになるが、放棄するまで同じ drone を再送しないか確認"""
+        policy = RetryPolicy(base_delay_sec=0.1, jitter=0.0)
+        retry = FleetRetry(policy, failure_threshold=100, coalesce_sec=0.0)
+        service = _FakeService(self.clock, {"D1": None})
+        start = self.clock.now
+
+        def submit(drone_name):
+            call = service.submit(drone_name)
+            service.latency[drone_name] = 0.01
+            return call
+
+        retry.run_async(
+            "takeoff", ["D1", "D2"], submit, _is_success,
+            wait_for_any=service.wait_for_any, call_timeout_sec=1.0,
+        )
+        times = service.send_times("D1")
+        self.assertEqual(len(times), 2)
+        # max(2 * 1.0, 1.0 + 1) 秒で放棄してから再送
+        self.assertAlmostEqual(times[1] - start, 2.0)
+        self.assertEqual(policy.attempts("D1"), 2)
+
+    def test_limit_per_partition(self):
+        """同時に流す要求が limit を超えず、partition ごとに均等に分かれるか確認"""
+        policy = RetryPolicy(base_delay_sec=0.1, jitter=0.0)
+        drones = [f"A{i}" for i in range(4)] + [f"B{i}" for i in range(4)]
+        partitions = {d: "part1" if d.startswith("A") else "part2" for d in drones}
+        retry = FleetRetry(policy, partitions, failure_threshold=100, coalesce_sec=0.0)
+        service = _FakeService(self.clock, {d: 0.5 for d in drones}, failures={"A0": 1})
+        service.run(retry, drones, limit=4)
+        self.assertEqual(service.max_in_flight, 4)
+        first = [d for at, d in service.sent if at == service.sent[0][0]]
+        self.assertEqual(sorted(first), ["A0", "A1", "B0", "B1"])
+        self.assertEqual(len(service.sent), 9)
+
+    def test_half_open_sends_one_probe(self):
+        """half_open の partition では probe の応答が来るまで次の drone を送らないか確認"""
+        policy = RetryPolicy(base_delay_sec=0.1, max_delay_sec=0.1, jitter=0.0)
+        drones = ["A1", "A2", "A3"]
+        retry = FleetRetry(
+            policy, dict.fromkeys(drones, "part1"), failure_threshold=3, cooldown_sec=1.0, coalesce_sec=0.0
+        )
+        service = _FakeService(self.clock, dict.fromkeys(drones, 0.3), failures=dict.fromkeys(drones, 1))
+        service.run(retry, drones)
+        part1 = retry.breakers["part1"]
+        self.assertEqual(part1.opens, 1)
+        self.assertEqual(part1.state, CircuitBreaker.CLOSED)
+        retries = service.sent[3:]
+        # cooldown 後は 1 機だけ送り、その応答 (0.3 秒後) の後に残りを送る
+        self.assertEqual(len(retries), 3)
+        self.assertAlmostEqual(retries[1][0] - retries[0][0], 0.3)
+        self.assertEqual(retries[1][0], retries[2][0])
+
+    def test_deadline_expires(self):
+        """失敗し続ける drone があると deadline 経過で RuntimeError になるか確認"""
+        policy = RetryPolicy(base_delay_sec=0.2, max_delay_sec=0.5, jitter=0.0, deadline_sec=3.0)
+        retry = FleetRetry(policy, failure_threshold=100)
+        service = _FakeService(self.clock, {}, failures={"D1": -1})
+        start = self.clock.now
+        with self.assertRaisesRegex(RuntimeError, "set_ready deadline exceeded: pending=1"):
+            service.run(retry, ["D1", "D2"])
+        self.assertGreaterEqual(self.clock.now - start, 3.0)
+        self.assertLess(self.clock.now - start, 3.0 + 0.5)
+
+
+if __name__ == '__main__':
+    unittest.main()
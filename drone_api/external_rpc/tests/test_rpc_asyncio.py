@@ -0,0 +1,166 @@
+import sys
+import os
+# external_rpcディレクトリをモジュール検索パスに追加
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+import asyncio
+import time
+import unittest
+from rpc_asyncio import AioDroneClient, RpcPoller
+
+
+class _FakeFuture:
+    """RpcCallFuture の代わり: runtime の poll で完了する"""
+
+    def __init__(self, value=None, error=None):
+        self._done = False
+        self.value = value
+        self.error = error
+
+    def done(self):
+        return self._done
+
+    def result(self, timeout=None):
+        if self.error is not None:
+            raise self.error
+        return self.value
+
+
+class _FakeRuntime:
+    """poll_once() のたびに、予定 poll 回数に達した future を完了させる runtime"""
+
+    def __init__(self):
+        self.polls = 0
+        self._due = []
+
+    def add(self, future, after_polls):
+        self._due.append((self.polls + after_polls, future))
+        return future
+
+    def poll_once(self):
+        self.polls += 1
+        completed = 0
+        for due, future in self._due:
+            if not future._done and due <= self.polls:
+                future._done = True
+                completed += 1
+        return completed
+
+    def pending_count(self):
+        return sum(1 for _due, future in self._due if not future._done)
+
+
+class _FakeSharedClient:
+    """AsyncSharedHakoniwaRpcDroneClient の _submit/_runtime/timeout_msec だけを持つ client"""
+
+    def __init__(self, timeout_msec, after_polls=None):
+        self.drone_name = "Drone-1"
+        self.timeout_msec = timeout_msec
+        self._runtime = _FakeRuntime()
+        self.after_polls = after_polls
+        self.submitted = []
+
+    def _submit(self, service_type, request, *, timeout_msec=None):
+        future = _FakeFuture(value=f"{service_type}:ok")
+        self.submitted.append(service_type)
+        if self.after_polls is not None:
+            self._runtime.add(future, self.after_polls)
+        return future
+
+
+class TestRpcPoller(unittest.TestCase):
+
+    def test_watch_future_shares_runtime_polls(self):
+        """同じ runtime の future 群を 1 つの task で poll し、1 周期に 1 回だけ poll_once するか確認"""
+        runtime = _FakeRuntime()
+
+        async def main():
+            poller = RpcPoller(asyncio.get_running_loop())
+            futures = [runtime.add(_FakeFuture(value=i), after_polls=3 + i % 4) for i in range(50)]
+            results = await asyncio.gather(*(poller.watch_future(runtime, f) for f in futures))
+            return poller, results
+
+        poller, results = asyncio.run(main())
+        self.assertEqual(results, list(range(50)))
+        self.assertLessEqual(runtime.polls, 7)
+        self.assertEqual(poller.outstanding(), 0)
+
+    def test_watch_future_done_and_error(self):
+        """完了済みの future はそのまま返し、例外は await 側に渡すか確認"""
+        runtime = _FakeRuntime()
+
+        async def main():
+            poller = RpcPoller(asyncio.get_running_loop())
+            done = _FakeFuture(value="ready")
+            done._done = True
+            failed = runtime.add(_FakeFuture(error=RuntimeError("rpc failed")), after_polls=1)
+            first = await poller.watch_future(runtime, done)
+            with self.assertRaisesRegex(RuntimeError, "rpc failed"):
+                await poller.watch_future(runtime, failed)
+            return first
+
+        self.assertEqual(asyncio.run(main()), "ready")
+        self.assertEqual(runtime.polls, 1)
+
+    def test_cancelled_waiter_is_dropped(self):
+        """キャンセルされた待ちは poll 対象から外れ、poller task が終わるか確認"""
+        runtime = _FakeRuntime()
+
+        async def main():
+            poller = RpcPoller(asyncio.get_running_loop())
+            waiter = poller.watch_future(runtime, _FakeFuture())
+            with self.assertRaises(asyncio.TimeoutError):
+                await asyncio.wait_for(waiter, 0.02)
+            await asyncio.wait_for(poller._task, 1.0)
+            return poller
+
+        self.assertEqual(asyncio.run(main()).outstanding(), 0)
+
+    def test_watch_call(self):
+        """sync client の poll() が (done, value) を返すまで poll し、例外は await 側に渡すか確認"""
+        answers = iter([(False, None), (False, None), (True, "state")])
+
+        def failing_poll():
+            raise TimeoutError("rpc timeout")
+
+        async def main():
+            poller = RpcPoller(asyncio.get_running_loop())
+            value = await poller.watch_call(lambda: next(answers))
+            with self.assertRaises(TimeoutError):
+                await poller.watch_call(failing_poll)
+            return value
+
+        self.assertEqual(asyncio.run(main()), "state")
+
+
+class TestAioDroneClient(unittest.TestCase):
+
+    def test_shared_call(self):
+        """shared runtime の応答を await で受け取れるか確認"""
+        client = AioDroneClient(_FakeSharedClient(timeout_msec=1000, after_polls=2))
+        self.assertEqual(asyncio.run(client.land()), "DroneLand:ok")
+
+    def test_shared_call_wall_timeout(self):
+        """runtime が応答もタイムアウトも返さない場合に壁時計の上限で TimeoutError になり、機体のロックを解放するか確認"""
+        fake = _FakeSharedClient(timeout_msec=10)
+        client = AioDroneClient(fake)
+
+        async def main():
+            t0 = time.monotonic()
+            with self.assertRaisesRegex(TimeoutError, "RPC wall timeout"):
+                await client.land()
+            elapsed = time.monotonic() - t0
+            # ロックが解放されていれば次の呼び出しを送信できる
+            fake.after_polls = 1
+            return elapsed, await asyncio.wait_for(client.land(), 1.0)
+
+        elapsed, value = asyncio.run(asyncio.wait_for(main(), 5.0))
+        # max(10 * 2, 10 + 1000) msec
+        self.assertGreaterEqual(elapsed, 1.0)
+        self.assertLess(elapsed, 3.0)
+        self.assertEqual(value, "DroneLand:ok")
+        self.assertEqual(fake.submitted, ["DroneLand", "DroneLand"])
+
+
+if __name__ == '__main__':
+    unittest.main()
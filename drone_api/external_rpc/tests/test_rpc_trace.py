@@ -0,0 +1,134 @@
+import sys
+import os
+# external_rpcディレクトリをモジュール検索パスに追加
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+import csv
+import json
+import math
+import random
+import tempfile
+import unittest
+from pathlib import Path
+import rpc_trace
+from rpc_trace import SUB_BUCKET_COUNT, LatencyHistogram, RpcTracer
+
+
+def _exact_percentile(values_us, p):
+    ordered = sorted(values_us)
+    return ordered[max(1, math.ceil(len(ordered) * p / 100.0)) - 1]
+
+
+class TestLatencyHistogram(unittest.TestCase):
+
+    def test_small_values_are_exact(self):
+        """SUB_BUCKET_COUNT マイクロ秒未満の値は誤差なく集計されるか確認"""
+        histogram = LatencyHistogram()
+        for value_us in range(SUB_BUCKET_COUNT):
+            histogram.record(value_us / 1_000_000)
+        self.assertEqual(histogram.count, SUB_BUCKET_COUNT)
+        self.assertEqual(histogram.min_us, 0)
+        self.assertEqual(histogram.max_us, SUB_BUCKET_COUNT - 1)
+        self.assertEqual(histogram.percentile(50.0), SUB_BUCKET_COUNT // 2 - 1)
+        self.assertEqual(histogram.percentile(100.0), SUB_BUCKET_COUNT - 1)
+
+    def test_bucket_bounds(self):
+        """各値がその bucket の上限以下で、上限との相対誤差が 1/SUB_BUCKET_COUNT 以内か確認"""
+        for value_us in list(range(1, 5000)) + [2 ** k + d for k in range(12, 34) for d in (-1, 0, 1)]:
+            index = LatencyHistogram._index(value_us)
+            upper = LatencyHistogram._upper(index)
+            self.assertGreaterEqual(upper, value_us, msg=f"value={value_us}")
+            self.assertLessEqual(upper - value_us, value_us / SUB_BUCKET_COUNT, msg=f"value={value_us}")
+            if index > 0:
+                self.assertLess(LatencyHistogram._upper(index - 1), value_us, msg=f"value={value_us}")
+
+    def test_percentiles_against_sorted(self):
+        """ランダムな latency の percentile が厳密値の bucket 誤差以内に収まるか確認"""
+        rng = random.Random(7)
+        values_us = [int(rng.lognormvariate(7.0, 1.5)) for _ in range(5000)]
+        histogram = LatencyHistogram()
+        for value_us in values_us:
+            histogram.record(value_us / 1_000_000)
+        self.assertEqual(histogram.max_us, max(values_us))
+        for p in rpc_trace.EXPORT_PERCENTILES:
+            exact = _exact_percentile(values_us, p)
+            actual = histogram.percentile(p)
+            self.assertGreaterEqual(actual, exact, msg=f"p={p}")
+            self.assertLessEqual(actual - exact, exact / SUB_BUCKET_COUNT + 1, msg=f"p={p}")
+        self.assertEqual(LatencyHistogram().percentile(99.0), 0)
+
+
+class TestRpcTracer(unittest.TestCase):
+
+    def test_ring_buffer_overflow(self):
+        """capacity を超えた記録は古い順に捨てられ、dropped に数えられるか確認"""
+        tracer = RpcTracer(capacity=3)
+        records = [tracer.begin("sync", "DroneGoTo", f"Drone-{i}") for i in range(5)]
+        self.assertEqual(tracer.dropped, 2)
+        self.assertEqual([r.drone for r in tracer.records()], ["Drone-2", "Drone-3", "Drone-4"])
+        # 捨てられた記録も finish すれば histogram には入る
+        for record in records:
+            record.finish()
+        self.assertEqual(tracer.histograms[("sync", "DroneGoTo")].count, 5)
+        tracer.clear()
+        self.assertEqual((tracer.records(), tracer.dropped, tracer.histograms), ([], 0, {}))
+
+    def test_finish_once(self):
+        """finish は最初の 1 回だけ記録され、例外はエラー文字列として残るか確認"""
+        tracer = RpcTracer(capacity=8)
+        record = tracer.begin("async_shared", "DroneLand", "Drone-1")
+        record.observe()
+        observed = record.observed_wall
+        record.observe()
+        record.finish(TimeoutError("no response"))
+        record.finish()
+        self.assertEqual(record.observed_wall, observed)
+        self.assertIs(record.ok, False)
+        self.assertEqual(record.error, "TimeoutError: no response")
+        self.assertEqual(tracer.histograms[("async_shared", "DroneLand")].count, 1)
+        self.assertEqual(record.done_sim_usec, rpc_trace._sim_time_usec())
+
+    def _traced(self):
+        tracer = RpcTracer(capacity=16)
+        for i in range(6):
+            record = tracer.begin("sync", "DroneGoTo" if i % 2 else "DroneGetState", f"Drone-{i}")
+            record.finish()
+        return tracer
+
+    def test_export_json(self):
+        """export_json が histogram の要約と (指定時は) 記録を書き出すか確認"""
+        tracer = self._traced()
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "out" / "trace.json"
+            tracer.export_json(path, include_records=True)
+            payload = json.loads(path.read_text(encoding="utf-8"))
+        self.assertEqual(sorted(payload["histograms"]), ["sync/DroneGetState", "sync/DroneGoTo"])
+        goto = payload["histograms"]["sync/DroneGoTo"]
+        self.assertEqual(goto["count"], 3)
+        self.assertEqual(sorted(goto["percentiles_us"]), sorted(str(p) for p in rpc_trace.EXPORT_PERCENTILES))
+        self.assertEqual(sum(count for _upper, count in goto["buckets"]), 3)
+        self.assertEqual(payload["dropped"], 0)
+        self.assertEqual([r["drone"] for r in payload["records"]], [f"Drone-{i}" for i in range(6)])
+        self.assertNotIn("tracer", payload["records"][0])
+
+    def test_export_csv(self):
+        """export_csv が (mode, service, bucket) ごとの行と累積数を書き出すか確認"""
+        tracer = self._traced()
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "trace.csv"
+            tracer.export_csv(path)
+            with path.open(newline="", encoding="utf-8") as f:
+                rows = list(csv.reader(f))
+        self.assertEqual(rows[0], ["mode", "service", "upper_us", "count", "cumulative"])
+        by_service = {}
+        for mode, service, upper_us, count, cumulative in rows[1:]:
+            self.assertEqual(mode, "sync")
+            by_service.setdefault(service, []).append((int(upper_us), int(count), int(cumulative)))
+        self.assertEqual(sorted(by_service), ["DroneGetState", "DroneGoTo"])
+        for buckets in by_service.values():
+            self.assertEqual([upper for upper, _c, _cum in buckets], sorted(upper for upper, _c, _cum in buckets))
+            self.assertEqual(buckets[-1][2], 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,120 @@
+import sys
+import os
+# external_rpcディレクトリをモジュール検索パスに追加
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+import hashlib
+import math
+import tempfile
+import unittest
+from pathlib import Path
+from show_schedule import STEP_COLUMNS, ScheduleStep, ShowSchedule, resolved_show_digest, write_schedule
+
+
+DRONES = ["Drone-1", "Drone-2", "Drone-3"]
+
+
+def _steps():
+    return [
+        ScheduleStep(
+            formation="line",
+            targets={d: (float(i), 0.0, 3.0) for i, d in enumerate(DRONES)},
+            speeds={d: 1.5 for d in DRONES},
+            offsets_sec={},
+            yaw_deg={d: 0.0 for d in DRONES},
+            timeout_sec=90.0,
+        ),
+        ScheduleStep(
+            formation="circle",
+            targets={d: (math.cos(i), math.sin(i), 4.5) for i, d in enumerate(DRONES)},
+            speeds={"Drone-1": 1.2, "Drone-2": 0.75, "Drone-3": 1.5},
+            offsets_sec={"Drone-2": 0.4},
+            yaw_deg={d: 90.0 for d in DRONES},
+            timeout_sec=45.5,
+            # Drone-3 は許容誤差内の移動なので到着予定を持たない
+            planned_arrivals={"Drone-1": 3.25, "Drone-2": 4.0},
+            assignment={"mode": "minmax", "max_leg_m": 2.1},
+            transition={"mode": "stagger", "conflicts_remaining": 0},
+        ),
+    ]
+
+
+def _meta():
+    return {"show_sha256": resolved_show_digest({"name": "test", "steps": 2}), "speed_mode": "sync"}
+
+
+class TestShowSchedule(unittest.TestCase):
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.tmp = Path(self._tmp.name)
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def _open(self, path):
+        schedule = ShowSchedule(path)
+        self.addCleanup(schedule.close)
+        return schedule
+
+    def test_round_trip(self):
+        """write_schedule で書いた全 step の値が ShowSchedule で同じ値として読めるか確認"""
+        path = self.tmp / "out" / "schedule.bin"
+        digest = write_schedule(path, DRONES, _steps(), meta=_meta())
+        schedule = self._open(path)
+        self.assertEqual(schedule.sha256, digest)
+        self.assertEqual(digest, hashlib.sha256(path.read_bytes()).hexdigest())
+        self.assertEqual(schedule.drone_names, DRONES)
+        self.assertEqual(schedule.meta, _meta())
+        self.assertEqual(len(schedule.steps), 2)
+        self.assertFalse(path.with_name(path.name + ".tmp").exists())
+        for index, expected in enumerate(_steps()):
+            self.assertEqual(schedule.step(index, DRONES), expected, msg=f"step={index}")
+        self.assertEqual(len(schedule.values(1, "Drone-3")), len(STEP_COLUMNS))
+        self.assertTrue(math.isnan(schedule.values(1, "Drone-3")[-1]))
+
+    def test_local_drones(self):
+        """step() に一部の機体だけを渡すとその機体の値だけを返すか確認"""
+        path = self.tmp / "schedule.bin"
+        write_schedule(path, DRONES, _steps(), meta=_meta())
+        step = self._open(path).step(1, ["Drone-2"])
+        self.assertEqual(step.targets, {"Drone-2": (math.cos(1), math.sin(1), 4.5)})
+        self.assertEqual(step.speeds, {"Drone-2": 0.75})
+        self.assertEqual(step.offsets_sec, {"Drone-2": 0.4})
+        self.assertEqual(step.planned_arrivals, {"Drone-2": 4.0})
+
+    def test_same_input_same_digest(self):
+        """同じ入力を 2 回書き出すと (dict の挿入順が違っても) 同じ sha256 になるか確認"""
+        first = write_schedule(self.tmp / "a.bin", DRONES, _steps(), meta=_meta())
+        steps = _steps()
+        for step in steps:
+            step.targets = dict(reversed(list(step.targets.items())))
+            step.speeds = dict(reversed(list(step.speeds.items())))
+        meta = dict(reversed(list(_meta().items())))
+        second = write_schedule(self.tmp / "b.bin", DRONES, steps, meta=meta)
+        self.assertEqual(first, second)
+        self.assertEqual((self.tmp / "a.bin").read_bytes(), (self.tmp / "b.bin").read_bytes())
+        # 上書きしても同じ内容
+        self.assertEqual(write_schedule(self.tmp / "a.bin", DRONES, _steps(), meta=_meta()), first)
+        changed = _steps()
+        changed[1].speeds["Drone-1"] = 1.25
+        self.assertNotEqual(write_schedule(self.tmp / "c.bin", DRONES, changed, meta=_meta()), first)
+
+    def test_resolved_show_digest_ignores_key_order(self):
+        """resolved_show_digest がキー順に依存しないか確認"""
+        self.assertEqual(
+            resolved_show_digest({"a": 1, "b": [1, 2]}),
+            resolved_show_digest({"b": [1, 2], "a": 1}),
+        )
+        self.assertNotEqual(resolved_show_digest({"a": 1}), resolved_show_digest({"a": 2}))
+
+    def test_rejects_other_files(self):
+        """schedule 以外のファイルを ValueError で拒否するか確認"""
+        path = self.tmp / "show.json"
+        path.write_bytes(b"{\"not\": \"a schedule\"}")
+        with self.assertRaises(ValueError):
+            ShowSchedule(path)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,202 @@
+import sys
+import os
+# external_rpcディレクトリをモジュール検索パスに追加
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+import math
+import random
+import unittest
+from transition_planner import _Motion, candidate_pairs, find_conflicts, pair_closest_approach, plan_transition, static_pairs
+
+
+def _sampled_min_distance(a, b, steps=2000):
+    end = max(a.end_sec, b.end_sec, 1e-9)
+    return min(math.dist(a.position(end * k / steps), b.position(end * k / steps)) for k in range(steps + 1))
+
+
+def _path_distance(a, b, steps=40):
+    """2 つの直線経路 (時刻を無視) の最短距離のサンプリング値"""
+    pa = [a.position(a.end_sec * k / steps) for k in range(steps + 1)]
+    pb = [b.position(b.end_sec * k / steps) for k in range(steps + 1)]
+    return min(math.dist(p, q) for p in pa for q in pb)
+
+
+def _crossing(count=2, length=10.0):
+    """原点で交差する count 本の直線移動 (同時刻に原点を通る)"""
+    start, target = {}, {}
+    for i in range(count):
+        angle = math.pi * i / count
+        dx, dy = math.cos(angle) * length / 2, math.sin(angle) * length / 2
+        start[f"D{i}"] = (-dx, -dy, 3.0)
+        target[f"D{i}"] = (dx, dy, 3.0)
+    return start, target
+
+
+class TestPairClosestApproach(unittest.TestCase):
+
+    def test_head_on(self):
+        """正面衝突するペアの最接近距離と時刻が解析解どおりか確認"""
+        a = _Motion("a", (0.0, 0.0, 0.0), (10.0, 0.0, 0.0), 1.0)
+        b = _Motion("b", (10.0, 0.5, 0.0), (0.0, 0.5, 0.0), 1.0)
+        dist, at = pair_closest_approach(a, b)
+        self.assertAlmostEqual(dist, 0.5)
+        self.assertAlmostEqual(at, 5.0)
+
+    def test_offset_moves_the_approach(self):
+        """出発遅延で交差点の通過時刻がずれると最接近距離が広がるか確認"""
+        a = _Motion("a", (-5.0, 0.0, 0.0), (5.0, 0.0, 0.0), 1.0)
+        b = _Motion("b", (0.0, -5.0, 0.0), (0.0, 5.0, 0.0), 1.0)
+        self.assertAlmostEqual(pair_closest_approach(a, b)[0], 0.0)
+        b.offset = 2.0
+        dist, at = pair_closest_approach(a, b)
+        self.assertAlmostEqual(dist, math.sqrt(2.0))
+        self.assertAlmostEqual(at, 6.0)
+
+    def test_stationary_and_arrived(self):
+        """停止中・到着後の機体も含めて区間ごとの最接近を求めるか確認"""
+        a = _Motion("a", (0.0, 0.0, 0.0), (0.0, 0.0, 0.0), 1.0)
+        b = _Motion("b", (4.0, 1.0, 0.0), (1.0, 1.0, 0.0), 3.0)
+        dist, at = pair_closest_approach(a, b)
+        self.assertAlmostEqual(dist, math.sqrt(2.0))
+        self.assertAlmostEqual(at, 1.0)
+
+    def test_random_against_sampling(self):
+        """速度・遅延がばらばらのペアでサンプリングの最小距離と一致するか確認"""
+        rng = random.Random(4)
+        for case in range(200):
+            def motion(name):
+                m = _Motion(
+                    name,
+                    tuple(rng.uniform(-5, 5) for _ in range(3)),
+                    tuple(rng.uniform(-5, 5) for _ in range(3)),
+                    rng.uniform(0.5, 3.0),
+                )
+                m.offset = rng.choice([0.0, rng.uniform(0.0, 4.0)])
+                return m
+
+            a, b = motion("a"), motion("b")
+            dist, at = pair_closest_approach(a, b)
+            self.assertLessEqual(dist, _sampled_min_distance(a, b) + 1e-9, msg=f"case={case}")
+            self.assertAlmostEqual(dist, _sampled_min_distance(a, b), delta=0.01, msg=f"case={case}")
+            self.assertAlmostEqual(dist, math.dist(a.position(at), b.position(at)), msg=f"case={case}")
+
+
+class TestCandidatePairs(unittest.TestCase):
+
+    def test_no_missed_pairs(self):
+        """経路同士が半径未満に近づくペアが必ず候補に含まれ、離れたペアは含まれないか確認"""
+        rng = random.Random(5)
+        radius = 1.0
+        for case in range(10):
+            motions = [
+                _Motion(
+                    f"D{i}",
+                    tuple(rng.uniform(0, 12) for _ in range(3)),
+                    tuple(rng.uniform(0, 12) for _ in range(3)),
+                    1.0,
+                )
+                for i in range(12)
+            ]
+            neighbours = candidate_pairs(motions, radius)
+            for i in range(len(motions)):
+                for j in range(i + 1, len(motions)):
+                    self.assertEqual(i in neighbours[j], j in neighbours[i])
+                    path = _path_distance(motions[i], motions[j])
+                    if path < radius:
+                        self.assertIn(j, neighbours[i], msg=f"case={case} pair=({i},{j})")
+                    elif path > 4.0 * radius:
+                        # 近傍セル (一辺 3 * radius) より遠い経路は候補にならない
+                        self.assertNotIn(j, neighbours[i], msg=f"case={case} pair=({i},{j})")
+
+    def test_static_pairs(self):
+        """開始・目標フォーメーションで既に近いペアを static として返すか確認"""
+        motions = [
+            _Motion("a", (0.0, 0.0, 0.0), (10.0, 0.0, 0.0), 1.0),
+            _Motion("b", (0.5, 0.0, 0.0), (20.0, 0.0, 0.0), 1.0),
+            _Motion("c", (30.0, 0.0, 0.0), (20.3, 0.0, 0.0), 1.0),
+        ]
+        self.assertEqual(static_pairs(motions, 1.0), {(0, 1), (1, 2)})
+        conflicts, _min_sep = find_conflicts(motions, 1.0, {(0, 1), (1, 2)}, candidate_pairs(motions, 1.0))
+        self.assertEqual(conflicts, {})
+
+
+class TestPlanTransition(unittest.TestCase):
+
+    def test_check_only_reports(self):
+        """check は交差を検出するだけで速度・遅延を変えないか確認"""
+        start, target = _crossing()
+        plan = plan_transition(start, target, 1.0, safe_radius_m=1.0, mode="check")
+        self.assertEqual(plan.conflicts_initial, 1)
+        self.assertEqual(plan.conflicts_remaining, 1)
+        self.assertAlmostEqual(plan.min_separation_m, 0.0)
+        self.assertEqual(plan.speeds, plan.base_speeds)
+        self.assertFalse(plan.staggered)
+        self.assertEqual(plan.conflict_sample[0][:2], ("D0", "D1"))
+
+    def test_off_and_missing_start(self):
+        """off では何も検査せず、開始位置の無い機体は計画対象外になるか確認"""
+        start, target = _crossing()
+        target["X"] = (0.0, 0.0, 3.0)
+        plan = plan_transition(start, target, {"D0": 1.0, "D1": 2.0}, safe_radius_m=1.0, mode="off")
+        self.assertEqual(plan.conflicts_initial, 0)
+        self.assertIsNone(plan.min_separation_m)
+        self.assertEqual(set(plan.speeds), {"D0", "D1"})
+        self.assertAlmostEqual(plan.nominal_sec, 10.0)
+        with self.assertRaises(ValueError):
+            plan_transition(start, target, 1.0, safe_radius_m=1.0, mode="fast")
+
+    def test_stagger_resolves_crossing(self):
+        """stagger で交差が解消され、遷移時間が公称の max_stretch 倍以内に収まるか確認"""
+        start, target = _crossing()
+        plan = plan_transition(start, target, 1.0, safe_radius_m=1.0, mode="stagger")
+        self.assertEqual(plan.conflicts_remaining, 0)
+        self.assertGreaterEqual(plan.min_separation_m, 1.0)
+        self.assertTrue(plan.staggered)
+        self.assertLessEqual(plan.transition_sec, plan.nominal_sec * 1.5)
+
+    def test_speed_resolves_crossing(self):
+        """speed で片方の機体だけ減速して交差が解消されるか確認"""
+        start, target = _crossing()
+        # 0.8 倍 2 回 (遷移時間 1.56 倍) で解消するので max_stretch を広げる
+        plan = plan_transition(start, target, 1.0, safe_radius_m=1.0, mode="speed", max_stretch=2.0)
+        self.assertEqual(plan.conflicts_remaining, 0)
+        self.assertEqual(sum(1 for d in plan.speeds if plan.speeds[d] < plan.base_speeds[d]), 1)
+        self.assertGreaterEqual(plan.min_separation_m, 1.0)
+
+    def test_never_worse_than_nominal(self):
+        """speed / stagger の結果が公称より最小離隔を下げず、遷移時間の上限を守るか確認"""
+        rng = random.Random(6)
+        for case in range(20):
+            names = [f"D{i}" for i in range(30)]
+            start = {d: (rng.uniform(0, 15), rng.uniform(0, 15), 3.0) for d in names}
+            target = {d: (rng.uniform(0, 15), rng.uniform(0, 15), rng.uniform(3.0, 6.0)) for d in names}
+            nominal = plan_transition(start, target, 1.5, safe_radius_m=1.0, mode="check")
+            for mode in ("speed", "stagger"):
+                plan = plan_transition(start, target, 1.5, safe_radius_m=1.0, mode=mode, max_stretch=1.3)
+                msg = f"case={case} mode={mode}"
+                self.assertLessEqual(plan.conflicts_remaining, nominal.conflicts_remaining, msg=msg)
+                if nominal.min_separation_m is not None:
+                    self.assertGreaterEqual(plan.min_separation_m, nominal.min_separation_m, msg=msg)
+                self.assertLessEqual(plan.transition_sec, plan.nominal_sec * 1.3 + 1e-9, msg=msg)
+                if plan.conflicts_remaining == nominal.conflicts_remaining:
+                    self.assertAlmostEqual(plan.transition_sec, plan.nominal_sec, msg=msg)
+
+    def test_rejects_stretch_beyond_limit(self):
+        """max_stretch を超える遅延が必要な場合は公称の計画のまま返すか確認"""
+        start, target = _crossing()
+        plan = plan_transition(start, target, 1.0, safe_radius_m=1.0, mode="stagger", max_stretch=1.05)
+        self.assertEqual(plan.conflicts_remaining, 1)
+        self.assertFalse(plan.staggered)
+        self.assertAlmostEqual(plan.transition_sec, plan.nominal_sec)
+
+    def test_plan_time_cap(self):
+        """max_plan_sec を使い切ると調整ラウンドを回さないか確認"""
+        start, target = _crossing(count=6)
+        plan = plan_transition(start, target, 1.0, safe_radius_m=1.0, mode="speed", max_plan_sec=0.0)
+        self.assertEqual(plan.iterations, 0)
+        self.assertEqual(plan.conflicts_remaining, plan.conflicts_initial)
+        self.assertEqual(plan.speeds, plan.base_speeds)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,459 @@
+#!/usr/bin/env python3
+from __future__ import annotations
+
+import math
+import time
+from dataclasses import dataclass, field
+
+Point = tuple[float, float, float]
+
+PLAN_MODES = ("off", "check", "speed", "stagger")
+SPEED_MODES = ("fixed", "sync")
+# Slowest commanded speed in sync mode; legs that short arrive early instead.
+DEFAULT_MIN_SPEED_M_S = 0.1
+
+
+@dataclass
+class TransitionPlan:
+    """
+    Per-drone speed and start offset of one formation transition.
+
+    transition_sec is the shortest time in which every drone reaches its target
+    with these speeds and offsets (offset + leg / speed of the slowest drone);
+    nominal_sec is the same without any fix.
+    """
+
+    speeds: dict[str, float]
+    base_speeds: dict[str, float]
+    offsets_sec: dict[str, float]
+    transition_sec: float
+    nominal_sec: float
+    conflicts_initial: int
+    conflicts_remaining: int
+    static_conflicts: int
+    min_separation_m: float | None
+    iterations: int
+    plan_sec: float
+    conflict_sample: list[tuple[str, str, float, float]] = field(default_factory=list)
+
+    @property
+    def staggered(self) -> bool:
+        return any(offset > 0.0 for offset in self.offsets_sec.values())
+
+    def to_dict(self) -> dict:
+        return {
+            "transition_sec": self.transition_sec,
+            "nominal_sec": self.nominal_sec,
+            "conflicts_initial": self.conflicts_initial,
+            "conflicts_remaining": self.conflicts_remaining,
+            "static_conflicts": self.static_conflicts,
+            "min_separation_m": self.min_separation_m,
+            "iterations": self.iterations,
+            "plan_sec": self.plan_sec,
+            "slowed": sum(1 for d, speed in self.speeds.items() if speed < self.base_speeds[d]),
+            "staggered": sum(1 for offset in self.offsets_sec.values() if offset > 0.0),
+            "max_offset_sec": max(self.offsets_sec.values(), default=0.0),
+        }
+
+
+class _Motion:
+    __slots__ = ("name", "start", "delta", "length", "speed", "offset")
+
+    def __init__(self, name: str, start: Point, target: Point, speed: float) -> None:
+        self.name = name
+        self.start = start
+        self.delta = (target[0] - start[0], target[1] - start[1], target[2] - start[2])
+        self.length = math.sqrt(sum(c * c for c in self.delta))
+        self.speed = speed
+        self.offset = 0.0
+
+    @property
+    def end_sec(self) -> float:
+        if self.length <= 0.0:
+            return self.offset
+        return self.offset + self.length / self.speed
+
+    def position(self, t: float) -> Point:
+        if self.length <= 0.0 or t <= self.offset:
+            return self.start
+        s = min((t - self.offset) * self.speed / self.length, 1.0)
+        return (
+            self.start[0] + self.delta[0] * s,
+            self.start[1] + self.delta[1] * s,
+            self.start[2] + self.delta[2] * s,
+        )
+
+
+
+def _closest_approach(a0: Point, a1: Point, b0: Point, b1: Point) -> tuple[float, float]:
+    """(distance, fraction of the interval) of two points moving linearly a0->a1, b0->b1."""
+    r0 = (a0[0] - b0[0], a0[1] - b0[1], a0[2] - b0[2])
+    dr = (
+        (a1[0] - b1[0]) - r0[0],
+        (a1[1] - b1[1]) - r0[1],
+        (a1[2] - b1[2]) - r0[2],
+    )
+    dd = dr[0] * dr[0] + dr[1] * dr[1] + dr[2] * dr[2]
+    s = 0.0
+    if dd > 0.0:
+        s = min(max(-(r0[0] * dr[0] + r0[1] * dr[1] + r0[2] * dr[2]) / dd, 0.0), 1.0)
+    x, y, z = r0[0] + dr[0] * s, r0[1] + dr[1] * s, r0[2] + dr[2] * s
+    return math.sqrt(x * x + y * y + z * z), s
+
+
+_NEIGHBOURS = [
+    (dx, dy, dz) for dx in (-1, 0, 1) for dy in (-1, 0, 1) for dz in (-1, 0, 1)
+]
+
+
+def _cell_key(p: Point, cell: float) -> tuple[int, int, int]:
+    return (math.floor(p[0] / cell), math.floor(p[1] / cell), math.floor(p[2] / cell))
+
+
+def _close_pairs(points: list[Point], radius: float) -> set[tuple[int, int]]:
+    grid: dict[tuple[int, int, int], list[int]] = {}
+    for i, p in enumerate(points):
+        grid.setdefault(_cell_key(p, radius), []).append(i)
+    pairs: set[tuple[int, int]] = set()
+    for key, members in grid.items():
+        for dx, dy, dz in _NEIGHBOURS:
+            for j in grid.get((key[0] + dx, key[1] + dy, key[2] + dz), ()):
+                for i in members:
+                    if i < j and math.dist(points[i], points[j]) < radius:
+                        pairs.add((i, j))
+    return pairs
+
+
+def static_pairs(motions: list[_Motion], safe_radius_m: float) -> set[tuple[int, int]]:
+    """
+    Pairs already closer than safe_radius_m in the start or in the target formation.
+
+    The formation itself is too tight for them, which no speed or timing change
+    can fix, so they are reported separately and left out of the conflicts.
+    """
+    starts = [m.start for m in motions]
+    targets = [m.position(math.inf) for m in motions]
+    return _close_pairs(starts, safe_radius_m) | _close_pairs(targets, safe_radius_m)
+
+
+def candidate_pairs(motions: list[_Motion], safe_radius_m: float) -> dict[int, set[int]]:
+    """
+    drone index -> drones whose paths pass near its path (spatial hash of swept paths).
+
+    Every path is sampled every safe_radius_m / 2 into cells of safe_radius_m, so two
+    paths that come within safe_radius_m of each other always share neighbouring
+    cells. Speeds and start offsets do not move the paths, so this is computed
+    once per transition.
+    """
+    cell = safe_radius_m
+    step = safe_radius_m * 0.5
+    grid: dict[tuple[int, int, int], list[int]] = {}
+    cells_of: list[set[tuple[int, int, int]]] = []
+    for i, m in enumerate(motions):
+        count = max(1, math.ceil(m.length / step))
+        cells = {
+            _cell_key(
+                (
+                    m.start[0] + m.delta[0] * k / count,
+                    m.start[1] + m.delta[1] * k / count,
+                    m.start[2] + m.delta[2] * k / count,
+                ),
+                cell,
+            )
+            for k in range(count + 1)
+        }
+        cells_of.append(cells)
+        for key in cells:
+            grid.setdefault(key, []).append(i)
+    neighbours: dict[int, set[int]] = {}
+    for i, cells in enumerate(cells_of):
+        near: set[int] = set()
+        for key in cells:
+            for dx, dy, dz in _NEIGHBOURS:
+                near.update(grid.get((key[0] + dx, key[1] + dy, key[2] + dz), ()))
+        near.discard(i)
+        neighbours[i] = near
+    return neighbours
+
+
+def pair_closest_approach(a: _Motion, b: _Motion) -> tuple[float, float]:
+    """
+    Exact (distance, time) of closest approach of two timed straight-line moves.
+
+    Between the start/arrival times of both drones each one moves linearly, so
+    the closest approach is solved in closed form on every such piece.
+    """
+    times = sorted({0.0, a.offset, a.end_sec, b.offset, b.end_sec})
+    best = (math.inf, 0.0)
+    for t0, t1 in zip(times, times[1:] or times):
+        dist, s = _closest_approach(a.position(t0), a.position(t1), b.position(t0), b.position(t1))
+        if dist < best[0]:
+            best = (dist, t0 + (t1 - t0) * s)
+    return best
+
+
+def _separations(
+    motions: list[_Motion],
+    static: set[tuple[int, int]],
+    neighbours: dict[int, set[int]],
+    subjects=None,
+) -> dict[tuple[int, int], tuple[float, float]]:
+    """(distance, time) of closest approach of every candidate pair, or of the pairs of subjects."""
+    found: dict[tuple[int, int], tuple[float, float]] = {}
+    for i in range(len(motions)) if subjects is None else subjects:
+        for j in neighbours.get(i, ()):
+            if subjects is None and j < i:
+                continue
+            pair = (i, j) if i < j else (j, i)
+            if pair in static or pair in found:
+                continue
+            found[pair] = pair_closest_approach(motions[i], motions[j])
+    return found
+
+
+def find_conflicts(
+    motions: list[_Motion],
+    safe_radius_m: float,
+    static: set[tuple[int, int]],
+    neighbours: dict[int, set[int]],
+    subjects=None,
+) -> tuple[dict[tuple[int, int], tuple[float, float]], float | None]:
+    """
+    Candidate pairs (see candidate_pairs) that come closer than safe_radius_m.
+
+    With subjects, only pairs that involve one of those drones are checked.
+    Returns ({(i, j): (distance, time)}, min separation among the checked pairs).
+    """
+    found = _separations(motions, static, neighbours, subjects)
+    conflicts = {pair: value for pair, value in found.items() if value[0] < safe_radius_m}
+    min_sep = min((dist for dist, _at in found.values()), default=None)
+    return conflicts, min_sep
+
+
+def plan_transition(
+    start_positions: dict[str, Point],
+    targets: dict[str, Point],
+    speeds: dict[str, float] | float,
+    *,
+    safe_radius_m: float,
+    mode: str = "speed",
+    speed_step: float = 0.8,
+    min_speed_scale: float = 0.4,
+    stagger_step_sec: float | None = None,
+    max_iterations: int = 8,
+    max_stretch: float = 1.5,
+    max_plan_sec: float = 2.0,
+) -> TransitionPlan:
+    """
+    Check and fix the straight-line transition start_positions -> targets.
+
+    mode:
+      - "check": only detect conflicts
+      - "speed": slow down one drone of each conflicting pair by speed_step (down
+        to min_speed_scale of its speed), then start it later once at the floor
+      - "stagger": start one drone of each conflicting pair later, by
+        stagger_step_sec or by the time the other drone needs for 2 * safe_radius_m
+    The drone that is changed is the one with the shorter flight, so the
+    transition time grows as little as possible. After each round only the
+    changed drones are re-checked. A round is kept only if it does not lower the
+    min separation, stays within max_stretch of the nominal transition time and
+    has fewer conflicts (or as many and a shorter transition) than the best so
+    far. The rounds stop at max_iterations, after max_plan_sec of planning, once
+    the transition is stretched too far, or after two rounds without a kept
+    result. Drones without a start position are not planned.
+    """
+    if mode not in PLAN_MODES:
+        raise ValueError(f"invalid transition plan mode: {mode}")
+    t_start = time.perf_counter()
+    names = [d for d in targets if d in start_positions]
+    base = {
+        d: float(speeds[d] if isinstance(speeds, dict) else speeds) for d in names
+    }
+    motions = [_Motion(d, start_positions[d], targets[d], base[d]) for d in names]
+    nominal = max((m.end_sec for m in motions), default=0.0)
+    if mode == "off" or safe_radius_m <= 0.0:
+        return TransitionPlan(
+            speeds=base,
+            base_speeds=base,
+            offsets_sec={d: 0.0 for d in names},
+            transition_sec=nominal,
+            nominal_sec=nominal,
+            conflicts_initial=0,
+            conflicts_remaining=0,
+            static_conflicts=0,
+            min_separation_m=None,
+            iterations=0,
+            plan_sec=time.perf_counter() - t_start,
+        )
+
+    static = static_pairs(motions, safe_radius_m)
+    neighbours = candidate_pairs(motions, safe_radius_m)
+    separations = _separations(motions, static, neighbours)
+
+    def score():
+        conflicts = {
+            pair: value for pair, value in separations.items() if value[0] < safe_radius_m
+        }
+        min_sep = min((dist for dist, _at in separations.values()), default=None)
+        transition = max((m.end_sec for m in motions), default=0.0)
+        return conflicts, min_sep, transition
+
+    conflicts, min_sep, transition = score()
+    initial = len(conflicts)
+    best = (conflicts, min_sep, transition, [(m.speed, m.offset) for m in motions])
+    max_transition = nominal * max(max_stretch, 1.0)
+    iterations = 0
+    stale = 0
+    while (
+        conflicts
+        and mode != "check"
+        and iterations < max_iterations
+        and stale < 2
+        and time.perf_counter() - t_start < max_plan_sec
+    ):
+        iterations += 1
+        changed: set[int] = set()
+        for i, j in sorted(conflicts, key=lambda pair: conflicts[pair][1]):
+            if i in changed or j in changed:
+                continue
+            mi, mj = motions[i], motions[j]
+            # Rank by the nominal flight so the same drone keeps being adjusted.
+            victim_index = i if (mi.length / base[mi.name], mi.name) < (mj.length / base[mj.name], mj.name) else j
+            victim = motions[victim_index]
+            other = mj if victim is mi else mi
+            changed.add(victim_index)
+            if mode == "speed" and victim.speed * speed_step >= base[victim.name] * min_speed_scale:
+                victim.speed *= speed_step
+            else:
+                victim.offset += stagger_step_sec or (
+                    2.0 * safe_radius_m / max(other.speed, 1e-6)
+                )
+        for pair in [pair for pair in separations if pair[0] in changed or pair[1] in changed]:
+            del separations[pair]
+        separations.update(_separations(motions, static, neighbours, changed))
+        conflicts, min_sep, transition = score()
+        best_conflicts, best_min_sep, best_transition, _state = best
+        if transition > max_transition:
+            # Speeds only go down and offsets only up, so later rounds are longer still.
+            break
+        if (
+            (min_sep is None or best_min_sep is None or min_sep >= best_min_sep)
+            and (len(conflicts), transition) < (len(best_conflicts), best_transition)
+        ):
+            best = (conflicts, min_sep, transition, [(m.speed, m.offset) for m in motions])
+            stale = 0
+        else:
+            stale += 1
+    conflicts, min_sep, _transition, state = best
+    for m, (speed, offset) in zip(motions, state):
+        m.speed, m.offset = speed, offset
+
+    sample = [
+        (motions[i].name, motions[j].name, dist, at)
+        for (i, j), (dist, at) in sorted(conflicts.items(), key=lambda item: item[1][0])[:10]
+    ]
+    return TransitionPlan(
+        speeds={m.name: m.speed for m in motions},
+        base_speeds=base,
+        offsets_sec={m.name: m.offset for m in motions},
+        transition_sec=max((m.end_sec for m in motions), default=0.0),
+        nominal_sec=nominal,
+        conflicts_initial=initial,
+        conflicts_remaining=len(conflicts),
+        static_conflicts=len(static),
+        min_separation_m=min_sep,
+        iterations=iterations,
+        plan_sec=time.perf_counter() - t_start,
+        conflict_sample=sample,
+    )
+
+
+def _leg_length(start: Point, target: Point) -> float:
+    return math.sqrt(sum((target[i] - start[i]) ** 2 for i in range(3)))
+
+
+def synchronized_speeds(
+    start_positions: dict[str, Point],
+    targets: dict[str, Point],
+    duration_sec: float,
+    *,
+    max_speed_m_s: float,
+    min_speed_m_s: float = DEFAULT_MIN_SPEED_M_S,
+) -> tuple[dict[str, float], float]:
+    """
+    Per-drone speed so that every leg ends at the same time, and that time.
+
+    The arrival time is duration_sec unless the longest leg cannot make it at
+    max_speed_m_s; then every drone is stretched to the longest leg instead, so
+    the formation still lands together.
+    """
+    lengths = {d: _leg_length(start_positions[d], target) for d, target in targets.items()}
+    arrival_sec = max(
+        float(duration_sec), max(lengths.values(), default=0.0) / max_speed_m_s
+    )
+    if arrival_sec <= 0.0:
+        return {d: max_speed_m_s for d in targets}, 0.0
+    speeds = {
+        d: min(max(length / arrival_sec, min_speed_m_s), max_speed_m_s)
+        for d, length in lengths.items()
+    }
+    return speeds, arrival_sec
+
+
+def arrival_times(
+    start_positions: dict[str, Point],
+    targets: dict[str, Point],
+    speeds: dict[str, float],
+    offsets_sec: dict[str, float] | None = None,
+    *,
+    min_leg_m: float = 0.0,
+) -> dict[str, float]:
+    """
+    Planned arrival of each drone [sec after the phase start].
+
+    Drones whose leg is shorter than min_leg_m (already within the goto
+    tolerance) are left out.
+    """
+    offsets_sec = offsets_sec or {}
+    out: dict[str, float] = {}
+    for d, target in targets.items():
+        length = _leg_length(start_positions[d], target)
+        if length >= min_leg_m:
+            out[d] = offsets_sec.get(d, 0.0) + length / speeds[d]
+    return out
+
+
+def arrival_spread(planned_sec: dict[str, float], realized_sec: dict[str, float]) -> dict:
+    """Planned vs realized arrival of the drones in both dicts (spread = last - first)."""
+    drones = [d for d in planned_sec if d in realized_sec]
+    if not drones:
+        return {"drones": 0}
+    planned = [planned_sec[d] for d in drones]
+    realized = [realized_sec[d] for d in drones]
+    errors = [r - p for p, r in zip(planned, realized)]
+    latest = max(range(len(drones)), key=lambda i: errors[i])
+    return {
+        "drones": len(drones),
+        "planned_max_sec": max(planned),
+        "planned_spread_sec": max(planned) - min(planned),
+        "realized_max_sec": max(realized),
+        "realized_spread_sec": max(realized) - min(realized),
+        "error_mean_sec": sum(errors) / len(errors),
+        "error_max_sec": errors[latest],
+        "latest_drone": drones[latest],
+    }
+
+
+__all__ = [
+    "PLAN_MODES",
+    "SPEED_MODES",
+    "TransitionPlan",
+    "arrival_spread",
+    "arrival_times",
+    "candidate_pairs",
+    "find_conflicts",
+    "pair_closest_approach",
+    "plan_transition",
+    "static_pairs",
+    "synchronized_speeds",
+]
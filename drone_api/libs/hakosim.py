@@ -7,11 +7,11 @@ from hakoniwa_pdu.pdu_msgs.hako_msgs.pdu_pytype_GameControllerOperation import G
 from hakoniwa_pdu.pdu_msgs.hako_msgs.pdu_conv_GameControllerOperation import py_to_pdu_GameControllerOperation, pdu_to_py_GameControllerOperation
 
 from hakoniwa_pdu.pdu_msgs.hako_msgs.pdu_pytype_HakoDroneCmdTakeoff import HakoDroneCmdTakeoff
-from hakoniwa_pdu.pdu_msgs.hako_msgs.pdu_conv_HakoDroneCmdTakeoff import py_to_pdu_HakoDroneCmdTakeoff, pdu_to_py_HakoDroneCmdTakeoff
+from hakoniwa_pdu.pdu_msgs.hako_msgs.pdu_conv_HakoDroneCmdTakeoff import py_to_pdu_HakoDroneCmdTakeoff
 from hakoniwa_pdu.pdu_msgs.hako_msgs.pdu_pytype_HakoDroneCmdLand import HakoDroneCmdLand
-from hakoniwa_pdu.pdu_msgs.hako_msgs.pdu_conv_HakoDroneCmdLand import py_to_pdu_HakoDroneCmdLand, pdu_to_py_HakoDroneCmdLand
+from hakoniwa_pdu.pdu_msgs.hako_msgs.pdu_conv_HakoDroneCmdLand import py_to_pdu_HakoDroneCmdLand
 from hakoniwa_pdu.pdu_msgs.hako_msgs.pdu_pytype_HakoDroneCmdMove import HakoDroneCmdMove
-from hakoniwa_pdu.pdu_msgs.hako_msgs.pdu_conv_HakoDroneCmdMove import py_to_pdu_HakoDroneCmdMove, pdu_to_py_HakoDroneCmdMove
+from hakoniwa_pdu.pdu_msgs.hako_msgs.pdu_conv_HakoDroneCmdMove import py_to_pdu_HakoDroneCmdMove
 
 # hako_msgs/HakoCmdCamera
 from hakoniwa_pdu.pdu_msgs.hako_msgs.pdu_pytype_HakoCmdCamera import HakoCmdCamera
@@ -34,14 +34,72 @@ from hakoniwa_pdu.pdu_msgs.hako_msgs.pdu_conv_HakoCmdMagnetHolder import py_to_p
 # sensor_msgs/PointCloud2
 from hakoniwa_pdu.pdu_msgs.sensor_msgs.pdu_pytype_PointCloud2 import PointCloud2
 from hakoniwa_pdu.pdu_msgs.sensor_msgs.pdu_conv_PointCloud2 import pdu_to_py_PointCloud2, py_to_pdu_PointCloud2
+from hakoniwa_pdu.pdu_msgs.sensor_msgs.pdu_pytype_PointField import PointField
+from hakoniwa_pdu.pdu_msgs.sensor_msgs.pdu_conv_PointField import binary_read_recursive_PointField
+from hakoniwa_pdu.pdu_msgs.std_msgs.pdu_conv_Header import binary_read_recursive_Header
+from hakoniwa_pdu.pdu_msgs import binary_io
 
 import libs.hakosim_types as hakosim_types
 import libs.hakosim_lidar as hakosim_lidar
+import libs.hakosim_wait as hakosim_wait
+import collections
 import math
 import json
 import os
+import struct
 import time
 
+# キャッシュ済みの PDU を読み直さずに返してよい最大経過時間 (既定値)
+DEFAULT_MAX_AGE_USEC = 20 * 1000
+# 同じシミュレーション時刻でも、この実時間 (秒) を過ぎたら run_nowait() をやり直す
+PUMP_REUSE_SEC = 0.001
+
+# 読み込み側 PDU 名 -> デコーダ
+PDU_DECODERS = {
+    'pos': pdu_to_py_Twist,
+    'lidar_pos': pdu_to_py_Twist,
+    'lidar_points': pdu_to_py_PointCloud2,
+    'hako_cmd_game': pdu_to_py_GameControllerOperation,
+    'hako_status_magnet_holder': pdu_to_py_HakoStatusMagnetHolder,
+    'hako_camera_data': pdu_to_py_HakoCameraData,
+    'hako_cmd_camera_info': pdu_to_py_HakoCameraInfo,
+}
+
+# sensor_msgs/PointCloud2 の data(varray) メンバのオフセット (pdu_conv_PointCloud2 の生成コードと同じ)
+POINT_CLOUD2_DATA_OFFSET = 164
+# sensor_msgs/PointCloud2 の固定長メンバ -> (メタデータ後の先頭からのオフセット, struct 書式)
+POINT_CLOUD2_SCALAR_FIELDS = {
+    'height': (136, '<I'),
+    'width': (140, '<I'),
+    'is_bigendian': (152, '<I'),
+    'point_step': (156, '<I'),
+    'row_step': (160, '<I'),
+    'is_dense': (172, '<I'),
+}
+# fields(varray of sensor_msgs/PointField) のオフセットと要素サイズ
+POINT_CLOUD2_FIELDS_OFFSET = 144
+POINT_FIELD_SIZE = 140
+# hako_msgs/HakoCameraData の request_id と image.data(varray) のオフセット (pdu_conv_HakoCameraData の生成コードと同じ)
+CAMERA_DATA_REQUEST_ID_OFFSET = 0
+CAMERA_DATA_IMAGE_DATA_OFFSET = 4 + 264
+
+# コマンド PDU のフィールド -> (メタデータ後の先頭からのオフセット, struct 書式)
+CMD_HEADER_FIELDS = {
+    'request': (0, '<i'),
+    'result': (4, '<i'),
+    'result_code': (8, '<i'),
+}
+CMD_TEMPLATE_LAYOUTS = {
+    'drone_cmd_takeoff': (HakoDroneCmdTakeoff, py_to_pdu_HakoDroneCmdTakeoff,
+                          {'height': (16, '<d'), 'speed': (24, '<d'), 'yaw_deg': (32, '<d')}),
+    'drone_cmd_move': (HakoDroneCmdMove, py_to_pdu_HakoDroneCmdMove,
+                       {'x': (16, '<d'), 'y': (24, '<d'), 'z': (32, '<d'), 'speed': (40, '<d'), 'yaw_deg': (48, '<d')}),
+    'drone_cmd_land': (HakoDroneCmdLand, py_to_pdu_HakoDroneCmdLand,
+                       {'height': (16, '<d'), 'speed': (24, '<d'), 'yaw_deg': (32, '<d')}),
+    'hako_cmd_magnet_holder': (HakoCmdMagnetHolder, py_to_pdu_HakoCmdMagnetHolder,
+                               {'magnet_on': (12, '<i')}),
+}
+
 class ImageType:
     Scene = "png"
 
@@ -53,13 +111,78 @@ class HakoDrone:
         self.camera_cmd_request_id = 1
         self.camera_move_cmd_request_id = 1
 
+class CommandTemplate:
+    """
+    Pre-encoded command PDU. The buffer is encoded once by the generated converter;
+    later commands only patch the changed fields in place.
+    """
+    def __init__(self, py_type, conv_py_to_pdu, fields):
+        self.buffer = conv_py_to_pdu(py_type())
+        self.fields = dict(CMD_HEADER_FIELDS)
+        self.fields.update(fields)
+
+    def set(self, **values):
+        base = binary_io.PduMetaData.PDU_META_DATA_SIZE
+        for name, value in values.items():
+            off, fmt = self.fields[name]
+            struct.pack_into(fmt, self.buffer, base + off, value)
+        return self.buffer
+
+class PduCacheEntry:
+    """
+    Last raw buffer read for one (vehicle, pdu), the clock time (usec) it was read at
+    and the wall-clock time (time.monotonic()) of the same read.
+    """
+    def __init__(self, raw_data, read_usec, cycle, read_wall=None):
+        self.raw_data = raw_data
+        self.read_usec = read_usec
+        self.read_wall = time.monotonic() if read_wall is None else read_wall
+        self.cycle = cycle
+        self.decoded = None
+
+class PduSnapshot:
+    """
+    Raw buffers and decoded objects of several PDUs read in the same run_nowait() cycle.
+    Decoded objects are shared with the client's PDU cache; treat them as read-only.
+    """
+    def __init__(self, vehicle_name, cycle, raw_data, decoded, read_usec=None):
+        self.vehicle_name = vehicle_name
+        self.cycle = cycle
+        self.read_usec = read_usec
+        self.raw_data = raw_data
+        self.decoded = decoded
+
+    def __getitem__(self, pdu_name):
+        return self.decoded[pdu_name]
+
+    def get(self, pdu_name, default=None):
+        value = self.decoded.get(pdu_name)
+        return default if value is None else value
+
+    def __repr__(self):
+        return f"PduSnapshot(vehicle_name={self.vehicle_name}, cycle={self.cycle}, pdus={list(self.decoded)})"
+
 class MultirotorClient:
-    def __init__(self, config_path, default_drone_name = None):
+    def __init__(self, config_path, default_drone_name = None, wait_strategy = None):
+        """
+        :param wait_strategy: Optional; hakosim_wait.WaitStrategy used while waiting for command completion.
+                              Default is adaptive backoff from 1ms to 100ms in wall-clock time.
+        """
         self.pdu_manager = None
+        self.wait_strategy = wait_strategy if wait_strategy is not None else hakosim_wait.WaitStrategy()
+        self.last_wait_result = None
         self.config_path = config_path
         self.pdudef = self._load_json(config_path)
         self.vehicles = {}
-        self.last_read_time = 0
+        self.pdu_cycle = 0
+        self.max_age_usec = DEFAULT_MAX_AGE_USEC
+        self._pdu_cache = {}
+        self._last_pump_usec = None
+        self._last_pump_wall = None
+        self._sim_time_func = getattr(hakopy, 'simulation_time', None)
+        self.read_stats = {'reads': 0, 'hits': 0, 'pumps': 0, 'total_age_usec': 0, 'max_age_usec': 0}
+        # (vehicle_name, pdu_name) -> CommandTemplate
+        self._cmd_templates = {}
         default_drone_set = False
         if default_drone_name is None:
             for entry in self.pdudef['robots']:
@@ -89,9 +212,26 @@ class MultirotorClient:
             print(f"ERROR: {e}")
         return None
 
+    def _now_usec(self):
+        # 箱庭のシミュレーション時刻を優先し、取れない場合は実時間を使う
+        if self._sim_time_func is not None:
+            try:
+                return int(self._sim_time_func())
+            except Exception:
+                self._sim_time_func = None
+                self._pdu_cache.clear()
+        return int(time.time() * 1000000)
+
+    def _pump(self):
+        self.pdu_manager.run_nowait()
+        self.pdu_cycle += 1
+        self.read_stats['pumps'] += 1
+        self._last_pump_usec = self._now_usec()
+        self._last_pump_wall = time.monotonic()
+
     def run_nowait(self):
         if self.pdu_manager is not None:
-            self.pdu_manager.run_nowait()
+            self._pump()
         else:
             print("ERROR: PDU manager is not initialized. Call confirmConnection() first.")
             return False
@@ -105,22 +245,115 @@ class MultirotorClient:
         self.run_nowait()
         return True
     
-    def _read_carefully(self, vehicle_name, pdu_name):
+    def _record_age(self, age_usec):
+        self.read_stats['reads'] += 1
+        self.read_stats['total_age_usec'] += age_usec
+        if age_usec > self.read_stats['max_age_usec']:
+            self.read_stats['max_age_usec'] = age_usec
+
+    def _read_entry(self, vehicle_name, pdu_name, max_age_usec=None):
         if self.pdu_manager is None:
             print("ERROR: PDU manager is not initialized. Call confirmConnection() first.")
             return None
-        if time.time() - self.last_read_time > 0.02: #20ms
-            self.pdu_manager.run_nowait()
+        if max_age_usec is None:
+            max_age_usec = self.max_age_usec
+        key = (vehicle_name, pdu_name)
+        now = self._now_usec()
+        entry = self._pdu_cache.get(key)
+        if entry is not None and self._is_fresh(entry, now, max_age_usec):
+            self.read_stats['hits'] += 1
+            self._record_age(now - entry.read_usec)
+            return entry
+        # 同じ時刻に、直前に run_nowait() 済みなら、共有メモリの内容は最新なので読むだけにする
+        # (シミュレーション時刻が止まっている間も、実時間が進めば読み直す)
+        if (self._last_pump_usec != now or self._last_pump_wall is None
+                or time.monotonic() - self._last_pump_wall >= PUMP_REUSE_SEC):
+            self._pump()
         raw_data = self.pdu_manager.read_pdu_raw_data(vehicle_name, pdu_name)
         if raw_data is None or len(raw_data) == 0:
-            self.pdu_manager.run_nowait()
+            self._pump()
             raw_data = self.pdu_manager.read_pdu_raw_data(vehicle_name, pdu_name)
             if raw_data is None or len(raw_data) == 0:
                 print(f"ERROR: Failed to read data for {pdu_name} from vehicle '{vehicle_name}'")
                 return None
-        if raw_data is not None and len(raw_data) > 0:
-            self.last_read_time = time.time()
-        return raw_data
+        entry = PduCacheEntry(raw_data, self._last_pump_usec, self.pdu_cycle, self._last_pump_wall)
+        self._pdu_cache[key] = entry
+        self._record_age(max(0, now - entry.read_usec))
+        return entry
+
+    @staticmethod
+    def _is_fresh(entry, now, max_age_usec):
+        # 時刻が読み込み時より前 (シミュレーションのリセット後) なら古いとみなす。
+        # シミュレーション時刻が止まっていても、実時間で max_age_usec を過ぎたら読み直す。
+        age_usec = now - entry.read_usec
+        wall_age_usec = (time.monotonic() - entry.read_wall) * 1000000
+        return 0 <= age_usec < max_age_usec and wall_age_usec < max_age_usec
+
+    def _read_carefully(self, vehicle_name, pdu_name, max_age_usec=None):
+        entry = self._read_entry(vehicle_name, pdu_name, max_age_usec)
+        if entry is None:
+            return None
+        return entry.raw_data
+
+    def _read_decoded(self, vehicle_name, pdu_name, max_age_usec=None):
+        """
+        Returns (raw_data, decoded) for pdu_name, reusing the cached decode while the buffer is fresh enough.
+        """
+        entry = self._read_entry(vehicle_name, pdu_name, max_age_usec)
+        if entry is None:
+            return None
+        if entry.decoded is None:
+            entry.decoded = PDU_DECODERS[pdu_name](entry.raw_data)
+        return entry.raw_data, entry.decoded
+
+    def get_pdu_age_usec(self, vehicle_name, pdu_name):
+        """
+        Age of the cached buffer of (vehicle, pdu) in usec (simulation time when available), or None.
+        """
+        entry = self._pdu_cache.get((self.get_vehicle_name(vehicle_name), pdu_name))
+        if entry is None:
+            return None
+        return self._now_usec() - entry.read_usec
+
+    def get_read_stats(self):
+        stats = dict(self.read_stats)
+        stats['mean_age_usec'] = stats['total_age_usec'] / stats['reads'] if stats['reads'] > 0 else 0.0
+        stats['hit_ratio'] = stats['hits'] / stats['reads'] if stats['reads'] > 0 else 0.0
+        stats['clock'] = 'wall' if self._sim_time_func is None else 'simulation'
+        return stats
+
+    def read_snapshot(self, vehicle_name, pdu_names):
+        """
+        Reads several PDUs of one vehicle after a single run_nowait().
+
+        :param vehicle_name: Vehicle name (None for the default drone).
+        :param pdu_names: PDU names to read, e.g. ['pos', 'lidar_points', 'lidar_pos'].
+        :return: PduSnapshot. PDUs that could not be read are None.
+        """
+        if self.pdu_manager is None:
+            print("ERROR: PDU manager is not initialized. Call confirmConnection() first.")
+            return None
+        name = self.get_vehicle_name(vehicle_name)
+        if name is None:
+            return None
+        self._pump()
+        raw = {}
+        decoded = {}
+        for pdu_name in pdu_names:
+            raw_data = self.pdu_manager.read_pdu_raw_data(name, pdu_name)
+            if raw_data is None or len(raw_data) == 0:
+                print(f"ERROR: Failed to read data for {pdu_name} from vehicle '{name}'")
+                raw[pdu_name] = None
+                decoded[pdu_name] = None
+                continue
+            entry = PduCacheEntry(raw_data, self._last_pump_usec, self.pdu_cycle, self._last_pump_wall)
+            conv = PDU_DECODERS.get(pdu_name)
+            if conv is not None:
+                entry.decoded = conv(raw_data)
+            self._pdu_cache[(name, pdu_name)] = entry
+            raw[pdu_name] = raw_data
+            decoded[pdu_name] = entry.decoded
+        return PduSnapshot(name, self.pdu_cycle, raw, decoded, self._last_pump_usec)
 
     def confirmConnection(self):
         pdu_manager = PduManager()
@@ -149,24 +382,27 @@ class MultirotorClient:
         else:
             print(f"Vehicle '{vehicle_name}' not found.")
 
-    def simGetVehiclePose(self, vehicle_name=None):
+    def simGetVehiclePose(self, vehicle_name=None, max_age_usec=None):
+        """
+        :param max_age_usec: Optional; maximum staleness of the pose buffer. Default is client.max_age_usec.
+        """
         name = self.get_vehicle_name(vehicle_name)
-        raw_data = self._read_carefully(name, 'pos')
-        if raw_data is None or len(raw_data) == 0:
+        entry = self._read_decoded(name, 'pos', max_age_usec)
+        if entry is None:
             print(f"ERROR: Failed to read pose data for vehicle '{name}'")
             return None
-        pose: Twist = pdu_to_py_Twist(raw_data)
+        pose: Twist = entry[1]
         pos = hakosim_types.Vector3r(pose.linear.x, pose.linear.y, pose.linear.z)
         orientation = hakosim_types.Quaternionr.euler_to_quaternion(pose.angular.x, pose.angular.y, pose.angular.z)
         return hakosim_types.Pose(pos, orientation)
 
-    def simGetVehiclePoseUnityFrame(self, vehicle_name=None):
+    def simGetVehiclePoseUnityFrame(self, vehicle_name=None, max_age_usec=None):
         name = self.get_vehicle_name(vehicle_name)
-        raw_data = self._read_carefully(name, 'pos')
-        if raw_data is None or len(raw_data) == 0:
+        entry = self._read_decoded(name, 'pos', max_age_usec)
+        if entry is None:
             print(f"ERROR: Failed to read pose data for vehicle '{name}'")
             return None
-        pose: Twist = pdu_to_py_Twist(raw_data)
+        pose: Twist = entry[1]
         pos = hakosim_types.Vector3r(
             -pose.linear.y, 
             pose.linear.z, 
@@ -187,37 +423,88 @@ class MultirotorClient:
         header.result = 0
         header.result_code = 0
 
-    def _send_request(self, pdu_name: str, py_obj, conv_py_to_pdu):
+    def _send_request(self, pdu_name: str, py_obj, conv_py_to_pdu, vehicle_name=None):
         raw_data = conv_py_to_pdu(py_obj)
-        ret = self.pdu_manager.flush_pdu_raw_data_nowait(self.get_vehicle_name(self.default_drone_name), pdu_name, raw_data)
+        ret = self.pdu_manager.flush_pdu_raw_data_nowait(self.get_vehicle_name(vehicle_name), pdu_name, raw_data)
         if not ret:
             print(f"ERROR: Failed to send request for {pdu_name}")
             return False
         return True
 
-    def _wait_res(self, pdu_name: str, conv_pdu_to_py, conv_py_to_pdu, timeout_sec=-1):
+    def _get_cmd_template(self, vehicle_name, pdu_name):
+        key = (vehicle_name, pdu_name)
+        template = self._cmd_templates.get(key)
+        if template is None:
+            py_type, conv_py_to_pdu, fields = CMD_TEMPLATE_LAYOUTS[pdu_name]
+            template = CommandTemplate(py_type, conv_py_to_pdu, fields)
+            self._cmd_templates[key] = template
+        return template
+
+    def _write_cmd(self, vehicle_name, pdu_name, **fields):
+        """
+        Patch the cached command template for (vehicle_name, pdu_name) and write it.
+
+        :param fields: header (request/result/result_code) or body fields to change.
+        """
+        raw_data = self._get_cmd_template(vehicle_name, pdu_name).set(**fields)
+        if not self.pdu_manager.flush_pdu_raw_data_nowait(vehicle_name, pdu_name, raw_data):
+            print(f"ERROR: Failed to send request for {pdu_name}")
+            return False
+        return True
+
+    @staticmethod
+    def _cmd_result(raw_data):
+        off = binary_io.PduMetaData.PDU_META_DATA_SIZE + CMD_HEADER_FIELDS['result'][0]
+        return struct.unpack_from('<i', raw_data, off)[0]
+
+    def _ack_cmd(self, vehicle_name, pdu_name, raw_data):
+        # 応答 PDU をデコードし直さず、result フィールドだけ 0 に戻して書き戻す
+        raw_data = bytearray(raw_data)
+        struct.pack_into('<i', raw_data, binary_io.PduMetaData.PDU_META_DATA_SIZE + CMD_HEADER_FIELDS['result'][0], 0)
+        return self.pdu_manager.flush_pdu_raw_data_nowait(vehicle_name, pdu_name, raw_data)
+
+    def set_wait_strategy(self, wait_strategy):
+        self.wait_strategy = wait_strategy
+
+    def _wait_res(self, pdu_name: str, timeout_sec=-1, vehicle_name=None):
+        name = self.get_vehicle_name(vehicle_name)
+        strategy = self.wait_strategy
+        strategy.reset()
         start_time = time.time()
+        sim_start_usec = strategy.now_usec()
+        checks = 0
+        last_interval_sec = 0.0
         while True:
-            self.pdu_manager.run_nowait()
-            raw_data = self._read_carefully(self.get_vehicle_name(self.default_drone_name), pdu_name)
+            self._pump()
+            raw_data = self._read_carefully(name, pdu_name, max_age_usec=0)
+            checks += 1
             if raw_data is None or len(raw_data) == 0:
                 print(f"INFO: No data received for {pdu_name}")
                 time.sleep(1)
                 return False
             #print(f"INFO: Received data for {pdu_name}, length: {len(raw_data)} bytes: {raw_data[:24]}...")  # Print first 24 bytes for debugging
-            py_obj = conv_pdu_to_py(raw_data)
-
-            if py_obj.header.result == 1:
-                py_obj.header.result = 0
-                self.pdu_manager.flush_pdu_raw_data_nowait(self.get_vehicle_name(self.default_drone_name), pdu_name, conv_py_to_pdu(py_obj))
-                print('DONE')
+            if self._cmd_result(raw_data) == 1:
+                self._ack_cmd(name, pdu_name, raw_data)
+                self._record_wait_result(pdu_name, True, start_time, checks, last_interval_sec, sim_start_usec)
+                print(f'DONE: {self.last_wait_result}')
                 return True
 
             if timeout_sec >= 0 and time.time() - start_time > timeout_sec:
+                self._record_wait_result(pdu_name, False, start_time, checks, last_interval_sec, sim_start_usec)
                 print(f"Timeout reached: {timeout_sec} seconds")
                 return False
 
-            time.sleep(1)
+            last_interval_sec = strategy.wait(start_time + timeout_sec if timeout_sec >= 0 else None)
+
+    def _record_wait_result(self, pdu_name, completed, start_time, checks, last_interval_sec, sim_start_usec):
+        sim_now_usec = self.wait_strategy.now_usec()
+        self.last_wait_result = hakosim_wait.WaitResult(
+            pdu_name,
+            completed,
+            time.time() - start_time,
+            checks,
+            last_interval_sec,
+            None if sim_start_usec is None else sim_now_usec - sim_start_usec)
 
     def get_vehicle_name(self, vehicle_name):
         if vehicle_name is None:
@@ -228,20 +515,32 @@ class MultirotorClient:
             print(f"Vehicle '{vehicle_name}' not found.")
             return None
 
+    def _send_takeoff(self, height, vehicle_name):
+        return self._write_cmd(vehicle_name, 'drone_cmd_takeoff',
+                               request=1, result=0, result_code=0,
+                               height=height, speed=5, yaw_deg=self._get_yaw_degree(vehicle_name))
+
+    def _send_move(self, x, y, z, speed, yaw_deg, vehicle_name):
+        if yaw_deg is None:
+            yaw_deg = self._get_yaw_degree(vehicle_name)
+        return self._write_cmd(vehicle_name, 'drone_cmd_move',
+                               request=1, result=0, result_code=0,
+                               x=x, y=y, z=z, speed=speed, yaw_deg=yaw_deg)
+
+    def _send_land(self, vehicle_name):
+        return self._write_cmd(vehicle_name, 'drone_cmd_land',
+                               request=1, result=0, result_code=0,
+                               height=0, speed=5, yaw_deg=self._get_yaw_degree(vehicle_name))
+
     def takeoff(self, height, vehicle_name=None):
         if self.get_vehicle_name(vehicle_name) != None:
             print(f"INFO: takeoff: height={height}")
-            pdu_cmd: HakoDroneCmdTakeoff = HakoDroneCmdTakeoff()
-            self._initialize_header(pdu_cmd.header)
-            pdu_cmd.height = height
-            pdu_cmd.speed = 5
-            pdu_cmd.yaw_deg = self._get_yaw_degree(vehicle_name)
-            if not self._send_request('drone_cmd_takeoff', pdu_cmd, py_to_pdu_HakoDroneCmdTakeoff):
+            if not self._send_takeoff(height, self.get_vehicle_name(vehicle_name)):
                 return False
             print("takeoff request sent")
             # Wait for response
             print("Waiting for takeoff response...")
-            return self._wait_res('drone_cmd_takeoff', pdu_to_py_HakoDroneCmdTakeoff, py_to_pdu_HakoDroneCmdTakeoff)
+            return self._wait_res('drone_cmd_takeoff', vehicle_name=vehicle_name)
         else:
             return False
 
@@ -258,38 +557,24 @@ class MultirotorClient:
     def moveToPosition(self, x, y, z, speed, yaw_deg=None, timeout_sec=-1, vehicle_name=None):
         if self.get_vehicle_name(vehicle_name) != None:
             print("INFO: moveToPosition")
-            pdu_cmd: HakoDroneCmdMove = HakoDroneCmdMove()
-            self._initialize_header(pdu_cmd.header)
-            pdu_cmd.x = x
-            pdu_cmd.y = y
-            pdu_cmd.z = z
-            pdu_cmd.speed = speed
-            if yaw_deg is None:
-                yaw_deg = self._get_yaw_degree(vehicle_name)
-            pdu_cmd.yaw_deg = yaw_deg
-            if not self._send_request('drone_cmd_move', pdu_cmd, py_to_pdu_HakoDroneCmdMove):
+            if not self._send_move(x, y, z, speed, yaw_deg, self.get_vehicle_name(vehicle_name)):
                 return False
             print("move request sent")            
             # Wait for response
             print("Waiting for move response...")
-            return self._wait_res('drone_cmd_move', pdu_to_py_HakoDroneCmdMove, py_to_pdu_HakoDroneCmdMove, timeout_sec)
+            return self._wait_res('drone_cmd_move', timeout_sec, vehicle_name)
         else:
             return False
 
     def land(self, vehicle_name=None):
         if self.get_vehicle_name(vehicle_name) != None:
             print("INFO: Landing")
-            py_obj = HakoDroneCmdLand()
-            self._initialize_header(py_obj.header)
-            py_obj.height = 0
-            py_obj.speed = 5
-            py_obj.yaw_deg = self._get_yaw_degree(vehicle_name)
-            if not self._send_request('drone_cmd_land', py_obj, py_to_pdu_HakoDroneCmdLand):
+            if not self._send_land(self.get_vehicle_name(vehicle_name)):
                 return False
             print("land request sent")
             # Wait for response
             print("Waiting for land response...")
-            return self._wait_res('drone_cmd_land', pdu_to_py_HakoDroneCmdLand, py_to_pdu_HakoDroneCmdLand)
+            return self._wait_res('drone_cmd_land', vehicle_name=vehicle_name)
         else:
             return False
 
@@ -323,11 +608,8 @@ class MultirotorClient:
     def grab_baggage(self, grab, timeout_sec=-1, vehicle_name=None):
         if self.get_vehicle_name(vehicle_name) != None:
             print("INFO: grab baggage: ", grab)
-            pdu_cmd = HakoCmdMagnetHolder()
-            self._initialize_header(pdu_cmd.header)
-            pdu_cmd.magnet_on = grab
-            raw_data = py_to_pdu_HakoCmdMagnetHolder(pdu_cmd)
-            ret = self.pdu_manager.flush_pdu_raw_data_nowait(self.get_vehicle_name(vehicle_name), 'hako_cmd_magnet_holder', raw_data)
+            name = self.get_vehicle_name(vehicle_name)
+            ret = self._write_cmd(name, 'hako_cmd_magnet_holder', request=1, result=0, result_code=0, magnet_on=bool(grab))
             if not ret:
                 print(f"ERROR: Failed to send grab command for vehicle '{vehicle_name}'")
                 return False
@@ -335,12 +617,9 @@ class MultirotorClient:
             # Wait for response
             ret = self.wait_grab(grab, timeout_sec, vehicle_name)
             if ret == False:
-                pdu_cmd.magnet_on = False
+                self._get_cmd_template(name, 'hako_cmd_magnet_holder').set(magnet_on=False)
 
-            pdu_cmd.header.request = 0
-            pdu_cmd.header.result = 0
-            raw_data = py_to_pdu_HakoCmdMagnetHolder(pdu_cmd)
-            self.pdu_manager.flush_pdu_raw_data_nowait(self.get_vehicle_name(vehicle_name), 'hako_cmd_magnet_holder', raw_data)
+            self._write_cmd(name, 'hako_cmd_magnet_holder', request=0, result=0)
             print("grab command reset")
             return ret
         else:
@@ -384,9 +663,14 @@ class MultirotorClient:
                 continue
 
     def _get_yaw_degree(self, vehicle_name=None):
-        pose = self.simGetVehiclePose(vehicle_name)
-        _, _, yaw = hakosim_types.Quaternionr.quaternion_to_euler(pose.orientation)
-        return math.degrees(yaw)
+        # Twist の angular.z がそのまま yaw なので、クォータニオンを経由しない
+        name = self.get_vehicle_name(vehicle_name)
+        entry = self._read_decoded(name, 'pos')
+        if entry is None:
+            print(f"ERROR: Failed to read pose data for vehicle '{name}'")
+            return None
+        yaw = entry[1].angular.z
+        return math.degrees(math.atan2(math.sin(yaw), math.cos(yaw)))
 
     def simGetImage(self, id, image_type, vehicle_name=None):
         vehicle_name = self.get_vehicle_name(vehicle_name)
@@ -414,6 +698,73 @@ class MultirotorClient:
         else:
             return None
 
+    def simStreamImages(self, id, image_type, vehicle_name=None, depth=4, copy=True, timeout_sec=-1, max_frames=None):
+        """
+        Yields camera frames continuously without the request/reset round trip of simGetImage().
+
+        hako_cmd_camera holds a single request, so the next request id is written as soon as
+        a frame arrives. The last `depth` issued request ids are kept in a ring, and a frame
+        answering any of them (newer than the last yielded frame) is accepted.
+
+        :param depth: Number of recent request ids accepted as in flight.
+        :param copy: If False, frames are memoryviews over the PDU read buffer; they are only
+                     valid until the next frame is requested from the iterator.
+        :param timeout_sec: Stops the stream if no frame arrives within this time (-1: wait forever).
+        :param max_frames: Optional; number of frames to yield.
+        """
+        vehicle_name = self.get_vehicle_name(vehicle_name)
+        if vehicle_name is None:
+            return
+        vehicle = self.vehicles[vehicle_name]
+        pdu_cmd = HakoCmdCamera()
+        self._initialize_header(pdu_cmd.header)
+        pdu_cmd.encode_type = 0
+        ring = collections.deque(maxlen=max(depth, 1))
+        strategy = hakosim_wait.WaitStrategy(initial_sec=0.001, max_sec=0.02)
+
+        def _issue():
+            pdu_cmd.request_id = vehicle.camera_cmd_request_id
+            vehicle.camera_cmd_request_id += 1
+            ring.append(pdu_cmd.request_id)
+            return self.pdu_manager.flush_pdu_raw_data_nowait(vehicle.name, 'hako_cmd_camera', py_to_pdu_HakoCmdCamera(pdu_cmd))
+
+        if not _issue():
+            print(f"ERROR: Failed to send camera command for vehicle '{vehicle_name}'")
+            return
+        last_request_id = ring[-1] - 1
+        frames = 0
+        wait_start = time.time()
+        try:
+            while max_frames is None or frames < max_frames:
+                self._pump()
+                raw_data = self.pdu_manager.read_pdu_raw_data(vehicle.name, 'hako_camera_data')
+                request_id = None
+                if raw_data is not None and len(raw_data) > 0:
+                    off = binary_io.PduMetaData.PDU_META_DATA_SIZE + CAMERA_DATA_REQUEST_ID_OFFSET
+                    request_id = int.from_bytes(raw_data[off:off + 4], byteorder='little', signed=True)
+                if request_id is not None and request_id > last_request_id and request_id in ring:
+                    view = self._uint8_varray_view(raw_data, CAMERA_DATA_IMAGE_DATA_OFFSET)
+                    if view is None:
+                        view = memoryview(bytes(pdu_to_py_HakoCameraData(raw_data).image.data))
+                    last_request_id = request_id
+                    while ring and ring[0] <= request_id:
+                        ring.popleft()
+                    # 次の要求を先に出してから、呼び出し側にフレームを渡す
+                    _issue()
+                    frames += 1
+                    strategy.reset()
+                    wait_start = time.time()
+                    yield bytes(view) if copy else view
+                    continue
+                if timeout_sec >= 0 and time.time() - wait_start > timeout_sec:
+                    print(f"Timeout reached: {timeout_sec} seconds")
+                    return
+                strategy.wait(wait_start + timeout_sec if timeout_sec >= 0 else None)
+        finally:
+            pdu_cmd.header.request = 0
+            pdu_cmd.header.result = 0
+            self.pdu_manager.flush_pdu_raw_data_nowait(vehicle.name, 'hako_cmd_camera', py_to_pdu_HakoCmdCamera(pdu_cmd))
+
     def simSetCameraOrientation(self, id, degree, vehicle_name=None):
         vehicle_name = self.get_vehicle_name(vehicle_name)
         if vehicle_name != None:
@@ -450,26 +801,115 @@ class MultirotorClient:
             return None
 
 
-    def getLidarData(self, return_point_cloud=False, vehicle_name=None):
+    @staticmethod
+    def _uint8_varray_view(raw_data, member_offset):
+        # PDUのヒープ領域にある uint8 可変長配列を、コピーせずに memoryview で参照する
+        meta = binary_io.PduMetaDataParser().load_pdu_meta(raw_data)
+        if meta is None:
+            return None
+        base_off = binary_io.PduMetaData.PDU_META_DATA_SIZE + member_offset
+        array_size = int.from_bytes(raw_data[base_off:base_off + 4], byteorder='little', signed=True)
+        offset_from_heap = int.from_bytes(raw_data[base_off + 4:base_off + 8], byteorder='little', signed=True)
+        start = meta.heap_off + offset_from_heap
+        if array_size < 0 or start + array_size > len(raw_data):
+            return None
+        return memoryview(raw_data)[start:start + array_size]
+
+    @staticmethod
+    def _point_cloud_header(raw_data):
+        """
+        Decodes every PointCloud2 member except data, reading the fixed offsets of the generated converter.
+        The point area is left in the PDU buffer (data stays empty); returns None if the metadata is invalid.
+        """
+        meta = binary_io.PduMetaDataParser().load_pdu_meta(raw_data)
+        if meta is None:
+            return None
+        base = binary_io.PduMetaData.PDU_META_DATA_SIZE
+        pc = PointCloud2()
+        binary_read_recursive_Header(meta, raw_data, pc.header, base)
+        for name, (off, fmt) in POINT_CLOUD2_SCALAR_FIELDS.items():
+            setattr(pc, name, struct.unpack_from(fmt, raw_data, base + off)[0])
+        pc.is_bigendian = bool(pc.is_bigendian)
+        pc.is_dense = bool(pc.is_dense)
+        count, offset_from_heap = struct.unpack_from('<ii', raw_data, base + POINT_CLOUD2_FIELDS_OFFSET)
+        for i in range(count):
+            field = PointField()
+            binary_read_recursive_PointField(meta, raw_data, field, meta.heap_off + offset_from_heap + i * POINT_FIELD_SIZE)
+            pc.fields.append(field)
+        return pc
+
+    def _read_point_cloud(self, vehicle_name, max_age_usec=None):
+        """
+        Returns (PointCloud2 without data, point data view) of lidar_points without decoding the points.
+        The view shares memory with the PDU buffer.
+        """
+        entry = self._read_entry(vehicle_name, 'lidar_points', max_age_usec)
+        if entry is None:
+            return None
+        lidar_pdu_data = entry.decoded
+        if lidar_pdu_data is None:
+            lidar_pdu_data = self._point_cloud_header(entry.raw_data)
+        view = self._uint8_varray_view(entry.raw_data, POINT_CLOUD2_DATA_OFFSET)
+        total_data_bytes = lidar_pdu_data.height * lidar_pdu_data.row_step if lidar_pdu_data is not None else 0
+        if view is None or len(view) < total_data_bytes:
+            # レイアウトが想定と異なる場合は、生成コードでデコードしてコピーする
+            raw_data, lidar_pdu_data = self._read_decoded(vehicle_name, 'lidar_points', max_age_usec)
+            total_data_bytes = lidar_pdu_data.height * lidar_pdu_data.row_step
+            return lidar_pdu_data, bytes(lidar_pdu_data.data[:total_data_bytes])
+        return lidar_pdu_data, view[:total_data_bytes]
+
+    def _point_cloud_data_view(self, raw_data, lidar_pdu_data):
+        total_data_bytes = lidar_pdu_data.height * lidar_pdu_data.row_step
+        view = self._uint8_varray_view(raw_data, POINT_CLOUD2_DATA_OFFSET)
+        if view is not None and len(view) == len(lidar_pdu_data.data):
+            return view[:total_data_bytes]
+        # レイアウトが想定と異なる場合は、デコード済みの data からコピーする
+        return bytes(lidar_pdu_data.data[:total_data_bytes])
+
+    def getLidarData(self, return_point_cloud=False, vehicle_name=None, as_numpy=False, max_age_usec=None):
+        """
+        :param max_age_usec: Optional; maximum staleness of the LiDAR buffers. Default is client.max_age_usec.
+        :param as_numpy: True の場合、LidarData.point_cloud は PDU バッファ上の
+                         (x, y, z, intensity) 構造化配列（ゼロコピー）になる。
+                         False の場合は従来どおりフラットリスト。
+        点データは PDU バッファから直接参照し、点ごとのデコードはしない
+        (return_point_cloud=True の場合のみ、data を含む PointCloud2 全体をデコードする)。
+        """
         vehicle_name = self.get_vehicle_name(vehicle_name)
         if vehicle_name != None:
             vehicle = self.vehicles[vehicle_name]
-            raw_data = self._read_carefully(vehicle.name, 'lidar_points')
-            if raw_data is None or len(raw_data) == 0:
+            if return_point_cloud:
+                entry = self._read_decoded(vehicle.name, 'lidar_points', max_age_usec)
+                if entry is not None:
+                    entry = (entry[1], self._point_cloud_data_view(*entry))
+            else:
+                entry = self._read_point_cloud(vehicle.name, max_age_usec)
+            if entry is None:
                 print(f"ERROR: Failed to read Lidar data for vehicle '{vehicle_name}'")
                 return None
-            lidar_pdu_data = pdu_to_py_PointCloud2(raw_data)
-            raw_data = self._read_carefully(vehicle.name, 'lidar_pos')
-            if raw_data is None or len(raw_data) == 0:
+            lidar_pdu_data, point_cloud_bytes = entry
+            entry = self._read_decoded(vehicle.name, 'lidar_pos', max_age_usec)
+            if entry is None:
                 print(f"ERROR: Failed to read Lidar pose for vehicle '{vehicle_name}'")
                 return None
-            lidar_pos_pdu_data = pdu_to_py_Twist(raw_data)
+            lidar_pos_pdu_data = entry[1]
             time_stamp = lidar_pdu_data.header.stamp.sec
-            point_cloud_bytes = lidar_pdu_data.data
             height = lidar_pdu_data.height
             row_step = lidar_pdu_data.row_step
             total_data_bytes = height * row_step
-            point_cloud = hakosim_lidar.LidarData.extract_xyz_from_point_cloud(point_cloud_bytes, total_data_bytes)
+            point_step = lidar_pdu_data.point_step if lidar_pdu_data.point_step > 0 else hakosim_lidar.DEFAULT_POINT_STEP
+            if as_numpy:
+                point_cloud = hakosim_lidar.LidarData.decode_point_cloud(
+                    point_cloud_bytes,
+                    fields=lidar_pdu_data.fields,
+                    point_step=point_step,
+                    num_points=total_data_bytes // point_step,
+                    is_bigendian=bool(lidar_pdu_data.is_bigendian))
+            else:
+                point_cloud = hakosim_lidar.LidarData.extract_xyz_from_point_cloud(
+                    point_cloud_bytes, total_data_bytes, point_step,
+                    fields=lidar_pdu_data.fields,
+                    is_bigendian=bool(lidar_pdu_data.is_bigendian))
             position = hakosim_types.Vector3r(lidar_pos_pdu_data.linear.x, lidar_pos_pdu_data.linear.y, lidar_pos_pdu_data.linear.z)
             orientation = hakosim_types.Quaternionr.euler_to_quaternion(lidar_pos_pdu_data.angular.x, lidar_pos_pdu_data.angular.y, lidar_pos_pdu_data.angular.z)
             pose = hakosim_types.Pose(position, orientation)
@@ -479,15 +919,16 @@ class MultirotorClient:
         else:
             return None
 
-    def getGameJoystickData(self, vehicle_name=None) -> GameControllerOperation:
+    def getGameJoystickData(self, vehicle_name=None, max_age_usec=None) -> GameControllerOperation:
         vehicle_name = self.get_vehicle_name(vehicle_name)
         if vehicle_name != None:
             vehicle = self.vehicles[vehicle_name]
-            raw_data = self._read_carefully(vehicle.name, 'hako_cmd_game')
+            raw_data = self._read_carefully(vehicle.name, 'hako_cmd_game', max_age_usec)
             if raw_data is None or len(raw_data) == 0:
                 print(f"ERROR: Failed to read game joystick data for vehicle '{vehicle_name}'")
                 return None
             try:
+                # 呼び出し側が書き換えて putGameJoystickData() するので、キャッシュは共有しない
                 game_pdu_data: GameControllerOperation = pdu_to_py_GameControllerOperation(raw_data)
                 return game_pdu_data
             except Exception as e:
@@ -501,6 +942,8 @@ class MultirotorClient:
         if vehicle_name != None:
             vehicle = self.vehicles[vehicle_name]
             ret = self.pdu_manager.flush_pdu_raw_data_nowait(vehicle.name, 'hako_cmd_game', py_to_pdu_GameControllerOperation(data))
+            # 書き込んだ内容を次の読み込みで返すため、キャッシュを破棄する
+            self._pdu_cache.pop((vehicle.name, 'hako_cmd_game'), None)
             return ret
         else:
             return False
@@ -0,0 +1,207 @@
+import asyncio
+import collections
+import time
+
+from hakoniwa_pdu.pdu_msgs.hako_msgs.pdu_pytype_HakoCmdCamera import HakoCmdCamera
+from hakoniwa_pdu.pdu_msgs.hako_msgs.pdu_conv_HakoCmdCamera import py_to_pdu_HakoCmdCamera
+from hakoniwa_pdu.pdu_msgs.hako_msgs.pdu_conv_HakoCameraData import pdu_to_py_HakoCameraData
+
+from hakoniwa_pdu.pdu_msgs import binary_io
+
+from libs.hakosim import MultirotorClient, CAMERA_DATA_REQUEST_ID_OFFSET, CAMERA_DATA_IMAGE_DATA_OFFSET
+
+
+class _PduWaiter:
+    def __init__(self, vehicle_name, pdu_name, check, future, deadline):
+        self.vehicle_name = vehicle_name
+        self.pdu_name = pdu_name
+        self.check = check
+        self.future = future
+        self.deadline = deadline
+
+
+class AsyncMultirotorClient(MultirotorClient):
+    """
+    asyncio version of MultirotorClient.
+
+    takeoff/moveToPosition/land/simGetImage are coroutines routed to vehicle_name.
+    All pending commands share one PDU pump task, so many vehicles can be flown
+    concurrently from one event loop:
+
+        await asyncio.gather(*(client.takeoff(3, vehicle_name=n) for n in client.vehicles))
+    """
+    def __init__(self, config_path, default_drone_name=None, pump_interval_sec=0.005):
+        super().__init__(config_path, default_drone_name)
+        self.pump_interval_sec = pump_interval_sec
+        self._waiters = {}
+        self._pump_task = None
+
+    async def _pump_loop(self):
+        try:
+            while self._waiters:
+                self._pump()
+                now = time.time()
+                for key, waiter in list(self._waiters.items()):
+                    if waiter.future.done():
+                        del self._waiters[key]
+                        continue
+                    raw_data = self.pdu_manager.read_pdu_raw_data(waiter.vehicle_name, waiter.pdu_name)
+                    if raw_data is not None and len(raw_data) > 0:
+                        try:
+                            done, value = waiter.check(raw_data)
+                        except Exception:
+                            # まだ書き込まれていない PDU はデコードできないので次周期で再確認する
+                            done, value = False, None
+                        if done:
+                            del self._waiters[key]
+                            waiter.future.set_result(value)
+                            continue
+                    if waiter.deadline is not None and now > waiter.deadline:
+                        print(f"Timeout reached: vehicle={waiter.vehicle_name} pdu={waiter.pdu_name}")
+                        del self._waiters[key]
+                        waiter.future.set_result(None)
+                await asyncio.sleep(self.pump_interval_sec)
+        except Exception as e:
+            # PDU の読み書きに失敗したら、待っている全コマンドに例外を渡して pending のまま残さない
+            print(f"ERROR: PDU pump failed: {e!r}")
+            waiters, self._waiters = self._waiters, {}
+            for waiter in waiters.values():
+                if not waiter.future.done():
+                    waiter.future.set_exception(e)
+        finally:
+            self._pump_task = None
+
+    def _wait_pdu(self, vehicle_name, pdu_name, check, timeout_sec=-1):
+        key = (vehicle_name, pdu_name)
+        if key in self._waiters:
+            raise RuntimeError(f"command already in flight: vehicle={vehicle_name} pdu={pdu_name}")
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        deadline = time.time() + timeout_sec if timeout_sec >= 0 else None
+        self._waiters[key] = _PduWaiter(vehicle_name, pdu_name, check, future, deadline)
+        if self._pump_task is None:
+            self._pump_task = loop.create_task(self._pump_loop())
+        return future
+
+    async def _command(self, vehicle_name, pdu_name, send, timeout_sec):
+        if (vehicle_name, pdu_name) in self._waiters:
+            print(f"ERROR: {pdu_name} is already in flight for vehicle '{vehicle_name}'")
+            return False
+        if not send():
+            return False
+
+        def _check(raw_data):
+            if self._cmd_result(raw_data) != 1:
+                return False, None
+            self._ack_cmd(vehicle_name, pdu_name, raw_data)
+            return True, True
+
+        return bool(await self._wait_pdu(vehicle_name, pdu_name, _check, timeout_sec))
+
+    async def takeoff(self, height, vehicle_name=None, timeout_sec=-1):
+        name = self.get_vehicle_name(vehicle_name)
+        if name is None:
+            return False
+        return await self._command(name, 'drone_cmd_takeoff',
+                                   lambda: self._send_takeoff(height, name), timeout_sec)
+
+    async def moveToPosition(self, x, y, z, speed, yaw_deg=None, timeout_sec=-1, vehicle_name=None):
+        name = self.get_vehicle_name(vehicle_name)
+        if name is None:
+            return False
+        return await self._command(name, 'drone_cmd_move',
+                                   lambda: self._send_move(x, y, z, speed, yaw_deg, name), timeout_sec)
+
+    async def moveToPositionUnityFrame(self, x, y, z, speed, yaw_deg=None, timeout_sec=-1, vehicle_name=None):
+        ros_yaw_deg = None if yaw_deg is None else -yaw_deg
+        return await self.moveToPosition(z, -x, y, speed, ros_yaw_deg, timeout_sec, vehicle_name)
+
+    async def land(self, vehicle_name=None, timeout_sec=-1):
+        name = self.get_vehicle_name(vehicle_name)
+        if name is None:
+            return False
+        return await self._command(name, 'drone_cmd_land',
+                                   lambda: self._send_land(name), timeout_sec)
+
+    async def simGetImage(self, id, image_type, vehicle_name=None, timeout_sec=-1):
+        name = self.get_vehicle_name(vehicle_name)
+        if name is None:
+            return None
+        vehicle = self.vehicles[name]
+        pdu_cmd = HakoCmdCamera()
+        self._initialize_header(pdu_cmd.header)
+        request_id = vehicle.camera_cmd_request_id
+        pdu_cmd.request_id = request_id
+        pdu_cmd.encode_type = 0
+        if not self.pdu_manager.flush_pdu_raw_data_nowait(name, 'hako_cmd_camera', py_to_pdu_HakoCmdCamera(pdu_cmd)):
+            print(f"ERROR: Failed to send camera command for vehicle '{name}'")
+            return None
+
+        def _check(raw_data):
+            pdu_data = pdu_to_py_HakoCameraData(raw_data)
+            if pdu_data.request_id != request_id:
+                return False, None
+            return True, bytes(pdu_data.image.data)
+
+        img = await self._wait_pdu(name, 'hako_camera_data', _check, timeout_sec)
+        pdu_cmd.header.request = 0
+        pdu_cmd.header.result = 0
+        if not self.pdu_manager.flush_pdu_raw_data_nowait(name, 'hako_cmd_camera', py_to_pdu_HakoCmdCamera(pdu_cmd)):
+            print(f"ERROR: Failed to reset camera command for vehicle '{name}'")
+            return None
+        vehicle.camera_cmd_request_id = request_id + 1
+        return img
+
+    async def streamImages(self, id, image_type, vehicle_name=None, depth=4, copy=True, timeout_sec=-1, max_frames=None):
+        """
+        Async generator version of simStreamImages(); frames are served by the shared pump task.
+
+            async for frame in client.streamImages("0", hakosim.ImageType.Scene, vehicle_name="Drone"):
+                ...
+        """
+        name = self.get_vehicle_name(vehicle_name)
+        if name is None:
+            return
+        vehicle = self.vehicles[name]
+        pdu_cmd = HakoCmdCamera()
+        self._initialize_header(pdu_cmd.header)
+        pdu_cmd.encode_type = 0
+        ring = collections.deque(maxlen=max(depth, 1))
+        last = [vehicle.camera_cmd_request_id - 1]
+
+        def _issue():
+            pdu_cmd.request_id = vehicle.camera_cmd_request_id
+            vehicle.camera_cmd_request_id += 1
+            ring.append(pdu_cmd.request_id)
+            return self.pdu_manager.flush_pdu_raw_data_nowait(name, 'hako_cmd_camera', py_to_pdu_HakoCmdCamera(pdu_cmd))
+
+        def _check(raw_data):
+            off = binary_io.PduMetaData.PDU_META_DATA_SIZE + CAMERA_DATA_REQUEST_ID_OFFSET
+            request_id = int.from_bytes(raw_data[off:off + 4], byteorder='little', signed=True)
+            if request_id <= last[0] or request_id not in ring:
+                return False, None
+            view = self._uint8_varray_view(raw_data, CAMERA_DATA_IMAGE_DATA_OFFSET)
+            if view is None:
+                view = memoryview(bytes(pdu_to_py_HakoCameraData(raw_data).image.data))
+            last[0] = request_id
+            while ring and ring[0] <= request_id:
+                ring.popleft()
+            # 次の要求を先に出してから、呼び出し側にフレームを渡す
+            _issue()
+            return True, view
+
+        if not _issue():
+            print(f"ERROR: Failed to send camera command for vehicle '{name}'")
+            return
+        frames = 0
+        try:
+            while max_frames is None or frames < max_frames:
+                view = await self._wait_pdu(name, 'hako_camera_data', _check, timeout_sec)
+                if view is None:
+                    return
+                frames += 1
+                yield bytes(view) if copy else view
+        finally:
+            pdu_cmd.header.request = 0
+            pdu_cmd.header.result = 0
+            self.pdu_manager.flush_pdu_raw_data_nowait(name, 'hako_cmd_camera', py_to_pdu_HakoCmdCamera(pdu_cmd))
@@ -1,15 +1,35 @@
 import struct
 import math
 from typing import Dict, List, Tuple, Optional
+try:
+    import numpy as np
+except ModuleNotFoundError:
+    np = None
 Point = Tuple[float, float, float]
 CellKey = Tuple[int, int]
 
+# 既定の点レイアウト: x, y, z, intensity (float32 x 4 = 16バイト)
+DEFAULT_POINT_STEP = 16
+# sensor_msgs/PointField.datatype -> NumPy の型コード
+POINT_FIELD_DTYPES = {
+    1: 'i1',  # INT8
+    2: 'u1',  # UINT8
+    3: 'i2',  # INT16
+    4: 'u2',  # UINT16
+    5: 'i4',  # INT32
+    6: 'u4',  # UINT32
+    7: 'f4',  # FLOAT32
+    8: 'f8',  # FLOAT64
+}
+
 class LidarData:
     def __init__(self, point_cloud, time_stamp, pose, data_frame='VehicleInertialFrame', segmentation=None):
         """
         Initializes a new instance of the LidarData class.
 
-        :param point_cloud: A flat list of floats representing the [x, y, z] coordinates of each point.
+        :param point_cloud: A flat list of floats representing the [x, y, z] coordinates of each point,
+                            or a NumPy structured array with 'x', 'y', 'z' (and optionally 'intensity') fields
+                            as returned by decode_point_cloud().
         :param time_stamp: Timestamp of the Lidar data capture.
         :param pose: The pose of the Lidar in vehicle inertial frame (in NED, in meters).
         :param data_frame: Frame of the point cloud data. Default is 'VehicleInertialFrame'.
@@ -24,7 +44,43 @@ class LidarData:
 
     def __repr__(self):
         return f"LidarData(time_stamp={self.time_stamp}, data_frame={self.data_frame}, " \
-               f"pose={self.pose}, number_of_points={len(self.point_cloud) // 3})"
+               f"pose={self.pose}, number_of_points={self.number_of_points})"
+
+    @property
+    def is_structured(self):
+        """
+        True if point_cloud holds a NumPy structured array instead of a flat list.
+        """
+        return getattr(getattr(self.point_cloud, 'dtype', None), 'names', None) is not None
+
+    @property
+    def number_of_points(self):
+        if self.is_structured:
+            return len(self.point_cloud)
+        return len(self.point_cloud) // 3
+
+    def xyz_array(self):
+        """
+        Returns the points as an (N, 3) float32 NumPy array.
+        """
+        if np is None:
+            raise RuntimeError("numpy is required for xyz_array()")
+        pc = self.point_cloud
+        if self.is_structured:
+            out = np.empty((len(pc), 3), dtype=np.float32)
+            out[:, 0] = pc['x']
+            out[:, 1] = pc['y']
+            out[:, 2] = pc['z']
+            return out
+        return np.asarray(pc, dtype=np.float32).reshape(-1, 3)
+
+    def flat_point_cloud(self):
+        """
+        Compatibility view: returns the points as a flat list [x0, y0, z0, x1, y1, z1, ...].
+        """
+        if self.is_structured:
+            return self.xyz_array().ravel().tolist()
+        return self.point_cloud
 
     @staticmethod
     def parse_point_cloud(point_cloud):
@@ -38,29 +94,136 @@ class LidarData:
 
 
     @staticmethod
-    def extract_xyz_from_point_cloud(point_cloud_bytes, total_data_bytes):
-        # 各ポイントは16バイトで、x, y, z, intensityが含まれています。
-        num_points = total_data_bytes // 16
+    def point_cloud_dtype(fields=None, point_step=DEFAULT_POINT_STEP, is_bigendian=False):
+        """
+        Builds a NumPy structured dtype describing one point of a PointCloud2 buffer.
+
+        :param fields: List of sensor_msgs/PointField (name, offset, datatype, count).
+                       If empty, the default x, y, z, intensity float32 layout is used.
+        :param point_step: Size of one point in bytes.
+        :param is_bigendian: Byte order of the buffer.
+        :return: numpy.dtype whose itemsize equals point_step.
+        """
+        if np is None:
+            raise RuntimeError("numpy is required for point_cloud_dtype()")
+        order = '>' if is_bigendian else '<'
+        names, formats, offsets = [], [], []
+        if fields:
+            for f in fields:
+                code = POINT_FIELD_DTYPES.get(int(f.datatype))
+                if code is None:
+                    raise ValueError(f"Unsupported PointField datatype: {f.datatype} (field={f.name})")
+                count = max(int(f.count), 1)
+                end = int(f.offset) + np.dtype(code).itemsize * count
+                if end > int(point_step):
+                    raise ValueError(f"PointField {f.name} ends at byte {end}, beyond point_step={point_step}")
+                names.append(f.name)
+                formats.append(order + code if count == 1 else (order + code, (count,)))
+                offsets.append(int(f.offset))
+        else:
+            if int(point_step) < DEFAULT_POINT_STEP:
+                raise ValueError(f"point_step={point_step} is too small for the default x, y, z, intensity layout")
+            for i, name in enumerate(('x', 'y', 'z', 'intensity')):
+                names.append(name)
+                formats.append(order + 'f4')
+                offsets.append(i * 4)
+        return np.dtype({'names': names, 'formats': formats, 'offsets': offsets,
+                         'itemsize': int(point_step)})
+
+    @staticmethod
+    def decode_point_cloud(data, fields=None, point_step=DEFAULT_POINT_STEP, num_points=None, is_bigendian=False):
+        """
+        Views a PointCloud2 data buffer as a NumPy structured array without copying.
+
+        :param data: bytes-like object (bytes, bytearray, memoryview) holding the point data.
+        :param fields: List of sensor_msgs/PointField. If empty, x, y, z, intensity float32 is assumed.
+        :param point_step: Size of one point in bytes.
+        :param num_points: Number of points to view. Default is len(data) // point_step.
+        :param is_bigendian: Byte order of the buffer.
+        :return: Structured array (one record per point) sharing memory with data.
+                 Copy it if the buffer may be reused by the next PDU read.
+        """
+        dtype = LidarData.point_cloud_dtype(fields, point_step, is_bigendian)
+        if num_points is None:
+            num_points = len(data) // dtype.itemsize
+        return np.frombuffer(data, dtype=dtype, count=int(num_points))
+
+    @staticmethod
+    def xyz_layout(fields=None, point_step=DEFAULT_POINT_STEP, is_bigendian=False):
+        """
+        Returns (struct format, x/y/z byte offsets) of the coordinates in one point.
+
+        :param fields: List of sensor_msgs/PointField. If empty, x, y, z float32 at offsets 0, 4, 8 is assumed.
+        :raises ValueError: if x, y or z is missing, is not float32/float64, or does not fit in point_step.
+        """
+        order = '>' if is_bigendian else '<'
+        if not fields:
+            layout = {'x': ('f', 0), 'y': ('f', 4), 'z': ('f', 8)}
+        else:
+            by_name = {f.name: f for f in fields}
+            layout = {}
+            for name in ('x', 'y', 'z'):
+                f = by_name.get(name)
+                if f is None:
+                    raise ValueError(f"PointCloud2 has no '{name}' field")
+                code = {7: 'f', 8: 'd'}.get(int(f.datatype))
+                if code is None:
+                    raise ValueError(f"PointField {name} must be FLOAT32 or FLOAT64 (datatype={f.datatype})")
+                layout[name] = (code, int(f.offset))
+        codes = {code for code, _off in layout.values()}
+        if len(codes) != 1:
+            raise ValueError("PointField x, y, z must share one datatype")
+        code = codes.pop()
+        offsets = tuple(layout[name][1] for name in ('x', 'y', 'z'))
+        end = max(offsets) + struct.calcsize(code)
+        if end > int(point_step):
+            raise ValueError(f"x, y, z end at byte {end}, beyond point_step={point_step}")
+        return order + code, offsets
+
+    @staticmethod
+    def extract_xyz_from_point_cloud(point_cloud_bytes, total_data_bytes, point_step=DEFAULT_POINT_STEP,
+                                     fields=None, is_bigendian=False):
+        """
+        Returns the points as a flat list [x0, y0, z0, x1, y1, z1, ...].
+
+        The x, y, z positions come from fields (default: float32 at offsets 0, 4, 8);
+        ValueError is raised when the layout cannot be read.
+        """
+        num_points = total_data_bytes // point_step
+        fmt, offsets = LidarData.xyz_layout(fields, point_step, is_bigendian)
+        if np is not None:
+            if isinstance(point_cloud_bytes, (list, tuple)):
+                point_cloud_bytes = bytes(point_cloud_bytes)
+            xyz_fields = [_XyzField(name, off, 7 if fmt[1] == 'f' else 8)
+                          for name, off in zip(('x', 'y', 'z'), offsets)]
+            points = LidarData.decode_point_cloud(point_cloud_bytes, fields=xyz_fields, point_step=point_step,
+                                                  num_points=num_points, is_bigendian=is_bigendian)
+            return LidarData(points, None, None).flat_point_cloud()
         # 出力リストを初期化
         points = []
-
         for i in range(num_points):
-            # 16バイトごとにデータを取り出す
-            offset = i * 16
-            # '<3f'はリトルエンディアンのfloat32が3つ、x, y, z座標を意味します。
-            # 12バイトを読み取り、次の4バイト（intensity）は無視します。
-            point = struct.unpack_from('<3f', point_cloud_bytes, offset)
-            # 取り出した座標をリストに追加
-            points.extend(point)
-
+            # point_step バイトごとに、fields が示す位置から x, y, z を取り出す
+            base = i * point_step
+            for off in offsets:
+                points.append(struct.unpack_from(fmt, point_cloud_bytes, base + off)[0])
         return points
-    
+
+
+class _XyzField:
+    # decode_point_cloud() に渡す x, y, z だけの PointField 相当
+    def __init__(self, name, offset, datatype):
+        self.name = name
+        self.offset = offset
+        self.datatype = datatype
+        self.count = 1
+
 
 class LiDARFilter:
     def __init__(self, lidar_data):
         """
         :param lidar_data: あなたの hakosim_lidar.LidarData インスタンス
-                           .point_cloud は [x0,y0,z0, x1,y1,z1, ...] のフラット配列を想定
+                           .point_cloud は [x0,y0,z0, x1,y1,z1, ...] のフラット配列、
+                           または decode_point_cloud() の構造化配列
         """
         self.ld = lidar_data
 
@@ -70,7 +233,7 @@ class LiDARFilter:
                         max_r: float,
                         z_band: Optional[Tuple[float, float]],
                         eps: float = 1e-3):
-        pc = self.ld.point_cloud
+        pc = self.ld.flat_point_cloud()
         n = len(pc) // 3
         if z_band is None:
             z0, z1 = -float("inf"), float("inf")
@@ -98,11 +261,26 @@ class LiDARFilter:
                max_r: float = 10.0,
                z_band: Optional[Tuple[float, float]] = (-0.2, 2.5),
                top_k: int = 10,
-               with_stats: bool = False) -> List[dict]:
+               with_stats: bool = False,
+               engine: str = "auto") -> List[dict]:
         """
         S0（未接触/範囲/高さフィルタ）→ S2（XYセルの最短点）
+        :param engine: "numpy"（ベクトル化）, "python"（逐次処理）, "auto"（numpy があれば numpy）
         :returns: 近い順Top-Kの候補。with_stats=False なら最短点のみ。
         """
+        if engine == "auto":
+            engine = "python" if np is None else "numpy"
+        kwargs = dict(x_size=x_size, y_size=y_size, min_r=min_r, max_r=max_r,
+                      z_band=z_band, top_k=top_k, with_stats=with_stats)
+        if engine == "numpy":
+            if np is None:
+                raise RuntimeError("numpy is required for engine='numpy'")
+            return self._filter_numpy(**kwargs)
+        if engine == "python":
+            return self._filter_python(**kwargs)
+        raise ValueError(f"unknown engine: {engine}")
+
+    def _filter_python(self, *, x_size, y_size, min_r, max_r, z_band, top_k, with_stats) -> List[dict]:
         cells: Dict[CellKey, Dict] = {}
         for p, r in self._iter_sanitized(min_r=min_r, max_r=max_r, z_band=z_band):
             key = self._cell_key(p, x_size, y_size)
@@ -132,3 +310,72 @@ class LiDARFilter:
                 "aabb_min": {"x": c["min"][0], "y": c["min"][1], "z": c["min"][2]},
                 "aabb_max": {"x": c["max"][0], "y": c["max"][1], "z": c["max"][2]},
             } for c in arr]
+
+    def _xyz64(self):
+        pc = self.ld.point_cloud
+        if self.ld.is_structured:
+            out = np.empty((len(pc), 3), dtype=np.float64)
+            out[:, 0] = pc['x']
+            out[:, 1] = pc['y']
+            out[:, 2] = pc['z']
+            return out
+        n = len(pc) // 3
+        return np.asarray(pc[:3 * n], dtype=np.float64).reshape(n, 3)
+
+    def _filter_numpy(self, *, x_size, y_size, min_r, max_r, z_band, top_k, with_stats,
+                      eps: float = 1e-3) -> List[dict]:
+        # --- S0: 配列マスクでサニタイズ ---
+        xyz = self._xyz64()
+        x, y, z = xyz[:, 0], xyz[:, 1], xyz[:, 2]
+        r = np.sqrt(x * x + y * y + z * z)
+        mask = (r >= min_r) & (r < max_r - eps)
+        if z_band is not None:
+            mask &= (z >= z_band[0]) & (z <= z_band[1])
+        idx = np.flatnonzero(mask)
+        if idx.size == 0:
+            return []
+        x, y, z, r = x[idx], y[idx], z[idx], r[idx]
+
+        # --- S2: 整数セルキー + グループ単位の argmin ---
+        cx = np.floor(x / x_size).astype(np.int64)
+        cy = np.floor(y / y_size).astype(np.int64)
+        cx -= cx.min()
+        cy -= cy.min()
+        key = cx * (int(cy.max()) + 1) + cy
+        # セル→距離→入力順で並べると、各セルの先頭が「最初に現れた最短点」になる
+        order = np.lexsort((idx, r, key))
+        key_sorted = key[order]
+        boundary = np.r_[True, key_sorted[1:] != key_sorted[:-1]]
+        starts = np.flatnonzero(boundary)
+        best = order[starts]
+        first_seen = np.minimum.reduceat(idx[order], starts)
+
+        # 近い順Top-K（同距離は逐次版と同じくセルの出現順）
+        rank = np.lexsort((first_seen, r[best]))[:top_k]
+        sel = best[rank]
+        xs, ys, zs, rs = x[sel].tolist(), y[sel].tolist(), z[sel].tolist(), r[sel].tolist()
+        if not with_stats:
+            return [{"x": xs[i], "y": ys[i], "z": zs[i], "distance": rs[i]} for i in range(len(sel))]
+
+        # 逐次版は最短点が更新されるたびに統計をリセットするため、
+        # 各セルの最短点以降に現れた点だけを集計する
+        group_of = np.empty(idx.size, dtype=np.int64)
+        group_of[order] = np.cumsum(boundary) - 1
+        inc = idx >= idx[best][group_of]
+        g = group_of[inc]
+        n_groups = starts.size
+        count = np.bincount(g, minlength=n_groups)
+        aabb_min = np.full((n_groups, 3), np.inf)
+        aabb_max = np.full((n_groups, 3), -np.inf)
+        pts = np.stack((x[inc], y[inc], z[inc]), axis=1)
+        np.minimum.at(aabb_min, g, pts)
+        np.maximum.at(aabb_max, g, pts)
+        count = count[rank].tolist()
+        mins = aabb_min[rank].tolist()
+        maxs = aabb_max[rank].tolist()
+        return [{
+            "x": xs[i], "y": ys[i], "z": zs[i], "distance": rs[i],
+            "count": count[i],
+            "aabb_min": {"x": mins[i][0], "y": mins[i][1], "z": mins[i][2]},
+            "aabb_max": {"x": maxs[i][0], "y": maxs[i][1], "z": maxs[i][2]},
+        } for i in range(len(sel))]
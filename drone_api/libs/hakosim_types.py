@@ -1,6 +1,12 @@
 import math
+try:
+    import numpy as np
+except ModuleNotFoundError:
+    np = None
 
 class Vector3r:
+    __slots__ = ('x_val', 'y_val', 'z_val')
+
     def __init__(self, x_val=0.0, y_val=0.0, z_val=0.0):
         self.x_val = x_val
         self.y_val = y_val
@@ -10,6 +16,8 @@ class Vector3r:
         return f"Vector3r(x_val={self.x_val}, y_val={self.y_val}, z_val={self.z_val})"
 
 class Quaternionr:
+    __slots__ = ('w_val', 'x_val', 'y_val', 'z_val')
+
     def __init__(self, w_val=1.0, x_val=0.0, y_val=0.0, z_val=0.0):
         self.w_val = w_val
         self.x_val = x_val
@@ -54,6 +62,8 @@ class Quaternionr:
         return f"Quaternionr(w_val={self.w_val}, x_val={self.x_val}, y_val={self.y_val}, z_val={self.z_val})"
 
 class Pose:
+    __slots__ = ('position', 'orientation')
+
     def __init__(self, position=None, orientation=None):
         if position is None:
             position = Vector3r()
@@ -64,4 +74,174 @@ class Pose:
         self.orientation = orientation
 
     def __repr__(self):
-        return f"Pose(position={self.position}, orientation={self.orientation})"
\ No newline at end of file
+        return f"Pose(position={self.position}, orientation={self.orientation})"
+
+
+def euler_to_quaternion_array(rpy):
+    """
+    Vectorized Quaternionr.euler_to_quaternion().
+
+    :param rpy: (N, 3) array of roll, pitch, yaw [rad].
+    :return: (N, 4) float64 array of w, x, y, z.
+    """
+    rpy = np.asarray(rpy, dtype=np.float64).reshape(-1, 3)
+    half = rpy * 0.5
+    cr, cp, cy = np.cos(half).T
+    sr, sp, sy = np.sin(half).T
+    out = np.empty((len(rpy), 4), dtype=np.float64)
+    out[:, 0] = cr * cp * cy + sr * sp * sy
+    out[:, 1] = sr * cp * cy - cr * sp * sy
+    out[:, 2] = cr * sp * cy + sr * cp * sy
+    out[:, 3] = cr * cp * sy - sr * sp * cy
+    return out
+
+def quaternion_to_euler_array(wxyz):
+    """
+    Vectorized Quaternionr.quaternion_to_euler().
+
+    :param wxyz: (N, 4) array of w, x, y, z.
+    :return: (N, 3) float64 array of roll, pitch, yaw [rad].
+    """
+    wxyz = np.asarray(wxyz, dtype=np.float64).reshape(-1, 4)
+    w, x, y, z = wxyz.T
+    out = np.empty((len(wxyz), 3), dtype=np.float64)
+    out[:, 0] = np.arctan2(2.0 * (w * x + y * z), 1.0 - 2.0 * (x * x + y * y))
+    out[:, 1] = np.arcsin(np.clip(2.0 * (w * y - z * x), -1.0, 1.0))
+    out[:, 2] = np.arctan2(2.0 * (w * z + x * y), 1.0 - 2.0 * (y * y + z * z))
+    return out
+
+
+def _row_property(index):
+    def _get(self):
+        return float(self._row[index])
+
+    def _set(self, value):
+        self._row[index] = value
+
+    return property(_get, _set)
+
+
+class _Vector3rView(Vector3r):
+    """
+    Vector3r backed by x, y, z of one PoseArray row; assignments write through to the array.
+    """
+    __slots__ = ('_row',)
+    x_val = _row_property(0)
+    y_val = _row_property(1)
+    z_val = _row_property(2)
+
+    def __init__(self, row):
+        self._row = row
+
+
+class _QuaternionrView(Quaternionr):
+    """
+    Quaternionr backed by qw, qx, qy, qz of one PoseArray row; assignments write through to the array.
+    """
+    __slots__ = ('_row',)
+    w_val = _row_property(3)
+    x_val = _row_property(4)
+    y_val = _row_property(5)
+    z_val = _row_property(6)
+
+    def __init__(self, row):
+        self._row = row
+
+
+class PoseArray:
+    """
+    Poses of many vehicles in one contiguous (N, 7) float64 array: x, y, z, qw, qx, qy, qz.
+
+    Positions and orientations are views into the same array, so fleet-level code can
+    convert frames or angles for all vehicles in one call. Indexing returns a Pose whose
+    position and orientation read and write the row in place (no copy).
+    """
+    __slots__ = ('data',)
+
+    def __init__(self, data):
+        if np is None:
+            raise RuntimeError("numpy is required for PoseArray")
+        data = np.ascontiguousarray(data, dtype=np.float64)
+        if data.ndim != 2 or data.shape[1] != 7:
+            raise ValueError(f"PoseArray expects an (N, 7) array, got {data.shape}")
+        self.data = data
+
+    @classmethod
+    def empty(cls, n):
+        data = np.zeros((n, 7), dtype=np.float64)
+        data[:, 3] = 1.0
+        return cls(data)
+
+    @classmethod
+    def from_euler(cls, positions, rpy):
+        """
+        :param positions: (N, 3) array of x, y, z.
+        :param rpy: (N, 3) array of roll, pitch, yaw [rad].
+        """
+        positions = np.asarray(positions, dtype=np.float64).reshape(-1, 3)
+        data = np.empty((len(positions), 7), dtype=np.float64)
+        data[:, :3] = positions
+        data[:, 3:] = euler_to_quaternion_array(rpy)
+        return cls(data)
+
+    @classmethod
+    def from_poses(cls, poses):
+        out = cls(np.empty((len(poses), 7), dtype=np.float64))
+        for i, p in enumerate(poses):
+            out.data[i] = (p.position.x_val, p.position.y_val, p.position.z_val,
+                           p.orientation.w_val, p.orientation.x_val, p.orientation.y_val, p.orientation.z_val)
+        return out
+
+    def __len__(self):
+        return len(self.data)
+
+    def __getitem__(self, i):
+        """
+        Pose backed by row i. Changing pose.position.x_val etc. changes this array;
+        use PoseArray.from_poses([pose]) or the scalar constructors for a detached copy.
+        """
+        row = self.data[int(i)]
+        return Pose(_Vector3rView(row), _QuaternionrView(row))
+
+    def __repr__(self):
+        return f"PoseArray(size={len(self.data)})"
+
+    @property
+    def positions(self):
+        return self.data[:, :3]
+
+    @property
+    def orientations(self):
+        return self.data[:, 3:]
+
+    def to_euler(self):
+        """
+        :return: (N, 3) array of roll, pitch, yaw [rad].
+        """
+        return quaternion_to_euler_array(self.orientations)
+
+    def ros_to_ned(self):
+        """
+        ROS (x forward, y left, z up) -> NED. The conversion is its own inverse.
+        """
+        rpy = self.to_euler()
+        pos = self.positions * np.array([1.0, -1.0, -1.0])
+        return PoseArray.from_euler(pos, rpy * np.array([1.0, -1.0, -1.0]))
+
+    ned_to_ros = ros_to_ned
+
+    def ros_to_unity(self):
+        """
+        Same conversion as MultirotorClient.simGetVehiclePoseUnityFrame().
+        """
+        rpy = self.to_euler()
+        pos = np.stack((-self.positions[:, 1], self.positions[:, 2], self.positions[:, 0]), axis=1)
+        return PoseArray.from_euler(pos, np.stack((rpy[:, 1], -rpy[:, 2], -rpy[:, 0]), axis=1))
+
+    def unity_to_ros(self):
+        """
+        Inverse of ros_to_unity() (same position mapping as moveToPositionUnityFrame()).
+        """
+        rpy = self.to_euler()
+        pos = np.stack((self.positions[:, 2], -self.positions[:, 0], self.positions[:, 1]), axis=1)
+        return PoseArray.from_euler(pos, np.stack((-rpy[:, 2], rpy[:, 0], -rpy[:, 1]), axis=1))
@@ -0,0 +1,112 @@
+import time
+
+
+class WaitStrategy:
+    def __init__(self, initial_sec=0.001, max_sec=0.1, factor=2.0, sim_time_func=None, sim_poll_sec=0.0005,
+                 sim_stall_sec=1.0):
+        """
+        Adaptive backoff used between completion checks of a command PDU.
+
+        The first checks are a few milliseconds apart and the interval grows by
+        factor up to max_sec, so a short command completes quickly while a long
+        move does not spin the CPU.
+
+        :param initial_sec: First wait interval in seconds.
+        :param max_sec: Upper bound of the wait interval in seconds.
+        :param factor: Growth factor applied after each wait.
+        :param sim_time_func: Optional; function returning Hakoniwa simulation time in usec
+                              (e.g. hakopy.simulation_time). If set, intervals are measured
+                              in simulation time instead of wall-clock time.
+        :param sim_poll_sec: Wall-clock sleep between simulation time checks.
+        :param sim_stall_sec: Wall-clock time after which a wait returns if simulation time
+                              has not advanced (paused or stopped simulation).
+        """
+        if initial_sec <= 0 or max_sec < initial_sec or factor < 1.0:
+            raise ValueError("invalid wait strategy parameters")
+        self.initial_sec = initial_sec
+        self.max_sec = max_sec
+        self.factor = factor
+        self.sim_time_func = sim_time_func
+        self.sim_poll_sec = sim_poll_sec
+        self.sim_stall_sec = sim_stall_sec
+        self.interval_sec = initial_sec
+
+    @classmethod
+    def fixed(cls, interval_sec):
+        """
+        Fixed interval polling (interval_sec=1.0 reproduces the former behaviour).
+        """
+        return cls(initial_sec=interval_sec, max_sec=interval_sec, factor=1.0)
+
+    @classmethod
+    def simulation_time(cls, initial_sec=0.001, max_sec=0.1, factor=2.0):
+        """
+        Backoff measured in Hakoniwa simulation time through hakopy.simulation_time().
+        """
+        import hakopy
+        return cls(initial_sec=initial_sec, max_sec=max_sec, factor=factor,
+                   sim_time_func=hakopy.simulation_time)
+
+    def reset(self):
+        self.interval_sec = self.initial_sec
+
+    def now_usec(self):
+        if self.sim_time_func is None:
+            return None
+        return int(self.sim_time_func())
+
+    def wait(self, deadline=None):
+        """
+        Waits for the current interval and advances the backoff.
+
+        :param deadline: Optional; wall-clock time (time.time()) the wait never passes,
+                         typically the caller's command timeout.
+        :return: The interval that was waited, in seconds.
+        """
+        interval_sec = self.interval_sec
+        if self.sim_time_func is None:
+            if deadline is not None:
+                interval_sec = max(0.0, min(interval_sec, deadline - time.time()))
+            time.sleep(interval_sec)
+        else:
+            # シミュレーションが止まったり巻き戻ったりしても、実時間で待ちを打ち切る
+            sim_usec = int(self.sim_time_func())
+            target_usec = sim_usec + int(interval_sec * 1000000)
+            stall_start = time.time()
+            while sim_usec < target_usec:
+                now = time.time()
+                if now - stall_start >= self.sim_stall_sec or (deadline is not None and now >= deadline):
+                    break
+                time.sleep(self.sim_poll_sec)
+                last_usec, sim_usec = sim_usec, int(self.sim_time_func())
+                if sim_usec < last_usec:
+                    break
+                if sim_usec > last_usec:
+                    stall_start = time.time()
+        self.interval_sec = min(self.interval_sec * self.factor, self.max_sec)
+        return interval_sec
+
+
+class WaitResult:
+    def __init__(self, name, completed, elapsed_sec, checks, last_interval_sec, sim_elapsed_usec=None):
+        """
+        Observed completion latency of one command.
+
+        :param name: PDU name of the command.
+        :param completed: True if the result flag was observed before the timeout.
+        :param elapsed_sec: Wall-clock time from the first check to the completion (or timeout).
+        :param checks: Number of result checks.
+        :param last_interval_sec: Last wait interval; the completion may have been observed up to this much late.
+        :param sim_elapsed_usec: Optional; elapsed Hakoniwa simulation time.
+        """
+        self.name = name
+        self.completed = completed
+        self.elapsed_sec = elapsed_sec
+        self.checks = checks
+        self.last_interval_sec = last_interval_sec
+        self.sim_elapsed_usec = sim_elapsed_usec
+
+    def __repr__(self):
+        return f"WaitResult(name={self.name}, completed={self.completed}, elapsed_sec={self.elapsed_sec:.3f}, " \
+               f"checks={self.checks}, last_interval_sec={self.last_interval_sec}, " \
+               f"sim_elapsed_usec={self.sim_elapsed_usec})"
@@ -0,0 +1,10 @@
+#!/bin/bash
+
+echo "INFO: test_hakosim_lidar:"
+python -m unittest libs.tests.test_hakosim_lidar
+echo "INFO: test_hakosim_types:"
+python -m unittest libs.tests.test_hakosim_types
+echo "INFO: test_hakosim_wait:"
+python -m unittest libs.tests.test_hakosim_wait
+echo "INFO: test_hakosim_async:"
+python -m unittest libs.tests.test_hakosim_async
@@ -0,0 +1,124 @@
+import sys
+import os
+# drone_apiディレクトリをモジュール検索パスに追加
+sys.path.append(os.path.join(os.path.dirname(__file__), '../..'))
+
+import asyncio
+import contextlib
+import io
+import json
+import struct
+import tempfile
+import unittest
+from hakoniwa_pdu.pdu_msgs import binary_io
+from libs.hakosim import CMD_HEADER_FIELDS
+from libs.hakosim_async import AsyncMultirotorClient
+
+
+DRONES = ["Drone-1", "Drone-2"]
+
+
+def _cmd_reply(result):
+    raw_data = bytearray(binary_io.PduMetaData.PDU_META_DATA_SIZE + 64)
+    struct.pack_into('<i', raw_data, binary_io.PduMetaData.PDU_META_DATA_SIZE + CMD_HEADER_FIELDS['result'][0], result)
+    return raw_data
+
+
+class _FakePduManager:
+    """run_nowait / read_pdu_raw_data / flush_pdu_raw_data_nowait だけを持つ pdu_manager"""
+
+    def __init__(self):
+        self.replies = {}
+        self.flushed = []
+        self.run_error = None
+        self.read_error = None
+
+    def run_nowait(self):
+        if self.run_error is not None:
+            raise self.run_error
+
+    def read_pdu_raw_data(self, vehicle_name, pdu_name):
+        if self.read_error is not None:
+            raise self.read_error
+        return self.replies.get((vehicle_name, pdu_name))
+
+    def flush_pdu_raw_data_nowait(self, vehicle_name, pdu_name, raw_data):
+        self.flushed.append((vehicle_name, pdu_name))
+        return True
+
+
+class TestAsyncPump(unittest.TestCase):
+
+    def setUp(self):
+        self._stdout = contextlib.redirect_stdout(io.StringIO())
+        self._stdout.__enter__()
+        self._tmp = tempfile.TemporaryDirectory()
+        config_path = os.path.join(self._tmp.name, 'pdudef.json')
+        robots = [
+            {'name': d, 'shm_pdu_readers': [], 'shm_pdu_writers': [{}], 'rpc_pdu_readers': [], 'rpc_pdu_writers': []}
+            for d in DRONES
+        ]
+        with open(config_path, 'w') as f:
+            json.dump({'robots': robots}, f)
+        self.client = AsyncMultirotorClient(config_path, pump_interval_sec=0.001)
+        self.pdu_manager = _FakePduManager()
+        self.client.pdu_manager = self.pdu_manager
+        # コマンド PDU のテンプレートは使わず、送信は常に成功させる
+        self.client._send_takeoff = lambda height, name: True
+        self.client._send_land = lambda name: True
+
+    def tearDown(self):
+        self._tmp.cleanup()
+        self._stdout.__exit__(None, None, None)
+
+    def _run(self, coro):
+        return asyncio.run(asyncio.wait_for(coro, timeout=5.0))
+
+    def test_command_completes(self):
+        """応答 PDU の result=1 でコマンドが True で完了し、result を 0 に戻して書き戻すか確認"""
+        self.pdu_manager.replies[("Drone-2", "drone_cmd_takeoff")] = _cmd_reply(1)
+        self.assertTrue(self._run(self.client.takeoff(3, vehicle_name="Drone-2")))
+        self.assertIn(("Drone-2", "drone_cmd_takeoff"), self.pdu_manager.flushed)
+        self.assertEqual(self.client._waiters, {})
+        self.assertIsNone(self.client._pump_task)
+
+    def test_command_timeout(self):
+        """応答が来ないコマンドは timeout_sec で False になるか確認"""
+        self.assertFalse(self._run(self.client.land(vehicle_name="Drone-1", timeout_sec=0.02)))
+        self.assertEqual(self.client._waiters, {})
+
+    def _assert_all_fail(self, error):
+        async def fly():
+            return await asyncio.gather(
+                *(self.client.takeoff(3, vehicle_name=d) for d in DRONES),
+                self.client.land(vehicle_name="Drone-1"),
+                return_exceptions=True,
+            )
+
+        results = self._run(fly())
+        self.assertEqual(results, [error] * 3)
+        self.assertEqual(self.client._waiters, {})
+        self.assertIsNone(self.client._pump_task)
+
+    def test_pump_error_fails_all_waiters(self):
+        """PDU の pump が例外を出したら、待っている全コマンドがその例外で終わるか確認"""
+        self.pdu_manager.run_error = RuntimeError("pdu channel closed")
+        self._assert_all_fail(self.pdu_manager.run_error)
+
+    def test_read_error_fails_all_waiters(self):
+        """read_pdu_raw_data が例外を出したら、待っている全コマンドがその例外で終わるか確認"""
+        self.pdu_manager.read_error = OSError("shm detached")
+        self._assert_all_fail(self.pdu_manager.read_error)
+
+    def test_pump_restarts_after_error(self):
+        """pump の失敗後に出したコマンドで pump task が再び動くか確認"""
+        self.pdu_manager.run_error = RuntimeError("pdu channel closed")
+        with self.assertRaises(RuntimeError):
+            self._run(self.client.takeoff(3, vehicle_name="Drone-1"))
+        self.pdu_manager.run_error = None
+        self.pdu_manager.replies[("Drone-1", "drone_cmd_takeoff")] = _cmd_reply(1)
+        self.assertTrue(self._run(self.client.takeoff(3, vehicle_name="Drone-1")))
+
+
+if __name__ == '__main__':
+    unittest.main()
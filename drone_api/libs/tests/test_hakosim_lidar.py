@@ -0,0 +1,120 @@
+import sys
+import os
+# drone_apiディレクトリをモジュール検索パスに追加
+sys.path.append(os.path.join(os.path.dirname(__file__), '../..'))
+
+import random
+import struct
+import unittest
+import libs.hakosim_lidar as hakosim_lidar
+from libs.hakosim_lidar import LidarData, LiDARFilter
+
+
+class _PointField:
+    def __init__(self, name, offset, datatype=7, count=1):
+        self.name = name
+        self.offset = offset
+        self.datatype = datatype
+        self.count = count
+
+
+@unittest.skipIf(hakosim_lidar.np is None, "numpy is not installed")
+class TestLidarDecode(unittest.TestCase):
+
+    def test_decode_default_layout(self):
+        """16バイト(x, y, z, intensity)の点をコピーなしで参照できるか確認"""
+        buf = bytearray(b''.join(struct.pack('<4f', i, i + 0.5, -i, 1.0) for i in range(4)))
+        points = LidarData.decode_point_cloud(buf)
+        self.assertEqual(len(points), 4)
+        self.assertEqual(points['y'].tolist(), [0.5, 1.5, 2.5, 3.5])
+        struct.pack_into('<f', buf, 0, 42.0)
+        self.assertEqual(float(points['x'][0]), 42.0)
+
+    def test_decode_honors_fields_and_point_step(self):
+        """fields/point_step のレイアウトに従ってデコードされるか確認"""
+        fields = [_PointField('x', 0), _PointField('y', 4), _PointField('z', 8), _PointField('intensity', 16)]
+        buf = b''.join(struct.pack('<3f4xf', i, 2 * i, 3 * i, 9.0) for i in range(3))
+        points = LidarData.decode_point_cloud(buf, fields=fields, point_step=20)
+        self.assertEqual(points['z'].tolist(), [0.0, 3.0, 6.0])
+        self.assertEqual(points['intensity'].tolist(), [9.0, 9.0, 9.0])
+
+    def test_flat_compatibility_view(self):
+        """構造化配列とフラットリストが同じ座標列になるか確認"""
+        buf = b''.join(struct.pack('<4f', i, i + 0.25, i - 0.25, 0.0) for i in range(5))
+        flat = LidarData.extract_xyz_from_point_cloud(buf, len(buf))
+        lidar = LidarData(LidarData.decode_point_cloud(buf), 0, None)
+        self.assertEqual(lidar.flat_point_cloud(), flat)
+        self.assertEqual(lidar.number_of_points, 5)
+
+    def test_extract_xyz_honors_fields(self):
+        """フラットリスト変換でも fields の x, y, z の位置に従うか確認"""
+        fields = [_PointField('intensity', 0), _PointField('x', 4), _PointField('y', 8), _PointField('z', 12)]
+        buf = b''.join(struct.pack('<4f', 9.0, i, 2 * i, 3 * i) for i in range(3))
+        flat = LidarData.extract_xyz_from_point_cloud(buf, len(buf), 16, fields=fields)
+        self.assertEqual(flat, [0.0, 0.0, 0.0, 1.0, 2.0, 3.0, 2.0, 4.0, 6.0])
+
+    def test_extract_xyz_rejects_unreadable_layout(self):
+        """x, y, z が読めないレイアウトは ValueError になるか確認"""
+        buf = bytes(24)
+        with self.assertRaises(ValueError):
+            LidarData.extract_xyz_from_point_cloud(buf, len(buf), 12, fields=[_PointField('x', 0), _PointField('y', 4)])
+        with self.assertRaises(ValueError):
+            LidarData.extract_xyz_from_point_cloud(buf, len(buf), 8)
+
+
+class TestLidarExtractPure(unittest.TestCase):
+
+    def test_extract_xyz_without_numpy(self):
+        """numpy なしの経路でも fields に従って取り出せるか確認"""
+        fields = [_PointField('x', 8), _PointField('y', 12), _PointField('z', 16)]
+        buf = b''.join(struct.pack('<2i3f', 0, 0, i, -i, 0.5) for i in range(2))
+        saved = hakosim_lidar.np
+        hakosim_lidar.np = None
+        try:
+            flat = LidarData.extract_xyz_from_point_cloud(buf, len(buf), 20, fields=fields)
+        finally:
+            hakosim_lidar.np = saved
+        self.assertEqual(flat, [0.0, 0.0, 0.5, 1.0, -1.0, 0.5])
+
+
+@unittest.skipIf(hakosim_lidar.np is None, "numpy is not installed")
+class TestLiDARFilterParity(unittest.TestCase):
+
+    def setUp(self):
+        rng = random.Random(1234)
+        flat = []
+        for _ in range(3000):
+            flat.extend(struct.unpack('<3f', struct.pack('<3f',
+                rng.uniform(-12.0, 12.0), rng.uniform(-12.0, 12.0), rng.uniform(-1.0, 3.0))))
+        # 同一セル内の同距離の点と、未接触点(MaxDistance)を混ぜる
+        flat.extend([1.0, 1.0, 0.5, 1.0, 1.0, 0.5, -1.0, 1.0, 0.5, 10.0, 0.0, 0.0])
+        self.flat = flat
+
+    def _assert_parity(self, lidar, **kwargs):
+        expected = LiDARFilter(lidar).filter(engine="python", **kwargs)
+        actual = LiDARFilter(lidar).filter(engine="numpy", **kwargs)
+        self.assertEqual(actual, expected)
+
+    def test_parity_flat_list(self):
+        """フラットリスト入力で逐次版と結果が一致するか確認"""
+        lidar = LidarData(self.flat, 0, None)
+        self._assert_parity(lidar)
+        self._assert_parity(lidar, with_stats=True, top_k=50)
+        self._assert_parity(lidar, z_band=None, top_k=1000, with_stats=True)
+        self._assert_parity(lidar, x_size=1.0, y_size=0.25, min_r=0.0, max_r=20.0)
+
+    def test_parity_structured(self):
+        """構造化配列入力で逐次版と結果が一致するか確認"""
+        buf = b''.join(struct.pack('<3ff', *self.flat[i:i + 3], 0.0) for i in range(0, len(self.flat), 3))
+        lidar = LidarData(LidarData.decode_point_cloud(buf), 0, None)
+        self._assert_parity(lidar, with_stats=True, top_k=100)
+
+    def test_empty(self):
+        """条件に合う点がない場合は空リストを返すか確認"""
+        lidar = LidarData([20.0, 0.0, 0.0], 0, None)
+        self._assert_parity(lidar, with_stats=True)
+        self.assertEqual(LiDARFilter(lidar).filter(engine="numpy"), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
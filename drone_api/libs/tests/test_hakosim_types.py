@@ -0,0 +1,63 @@
+import sys
+import os
+# drone_apiディレクトリをモジュール検索パスに追加
+sys.path.append(os.path.join(os.path.dirname(__file__), '../..'))
+
+import random
+import unittest
+import libs.hakosim_types as hakosim_types
+from libs.hakosim_types import Quaternionr, PoseArray, Vector3r
+
+
+@unittest.skipIf(hakosim_types.np is None, "numpy is not installed")
+class TestPoseArray(unittest.TestCase):
+
+    def setUp(self):
+        rng = random.Random(42)
+        self.positions = [(rng.uniform(-50, 50), rng.uniform(-50, 50), rng.uniform(0, 20)) for _ in range(100)]
+        self.rpy = [(rng.uniform(-1.0, 1.0), rng.uniform(-1.0, 1.0), rng.uniform(-3.0, 3.0)) for _ in range(100)]
+
+    def test_euler_matches_scalar(self):
+        """ベクトル化したオイラー角変換がスカラー版と一致するか確認"""
+        poses = PoseArray.from_euler(self.positions, self.rpy)
+        for i, (r, p, y) in enumerate(self.rpy):
+            q = Quaternionr.euler_to_quaternion(r, p, y)
+            for a, b in zip(poses.orientations[i].tolist(), [q.w_val, q.x_val, q.y_val, q.z_val]):
+                self.assertAlmostEqual(a, b, places=12)
+            for a, b in zip(poses.to_euler()[i].tolist(), Quaternionr.quaternion_to_euler(q)):
+                self.assertAlmostEqual(a, b, places=12)
+
+    def test_frame_round_trip(self):
+        """ROS⇔NED/Unity 変換が往復で元に戻るか確認"""
+        # Unity 変換ではヨー角がピッチ角になるため、オイラー角で往復できる範囲に限定する
+        rpy = [(r, p, max(-1.5, min(1.5, y))) for r, p, y in self.rpy]
+        poses = PoseArray.from_euler(self.positions, rpy)
+        for back in (poses.ros_to_ned().ned_to_ros(), poses.ros_to_unity().unity_to_ros()):
+            for a, b in zip(back.positions.ravel().tolist(), poses.positions.ravel().tolist()):
+                self.assertAlmostEqual(a, b, places=9)
+            # q と -q は同じ姿勢を表す
+            for q1, q2 in zip(back.orientations.tolist(), poses.orientations.tolist()):
+                self.assertAlmostEqual(abs(sum(a * b for a, b in zip(q1, q2))), 1.0, places=9)
+
+    def test_scalar_view(self):
+        """インデックスでスカラー版 Pose が得られるか確認"""
+        poses = PoseArray.from_euler(self.positions, self.rpy)
+        pose = poses[3]
+        self.assertEqual(pose.position.x_val, self.positions[3][0])
+        self.assertEqual(PoseArray.from_poses([pose]).data.tolist(), [poses.data[3].tolist()])
+
+    def test_scalar_view_writes_through(self):
+        """インデックスで得た Pose への代入が配列に反映されるか確認"""
+        poses = PoseArray.from_euler(self.positions, self.rpy)
+        pose = poses[5]
+        pose.position.z_val = -7.5
+        pose.orientation.w_val = 0.25
+        self.assertEqual(poses.data[5, 2], -7.5)
+        self.assertEqual(poses.data[5, 3], 0.25)
+        poses.data[5, 0] = 3.0
+        self.assertEqual(pose.position.x_val, 3.0)
+        self.assertIsInstance(pose.position, Vector3r)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,57 @@
+import sys
+import os
+# drone_apiディレクトリをモジュール検索パスに追加
+sys.path.append(os.path.join(os.path.dirname(__file__), '../..'))
+
+import time
+import unittest
+from libs.hakosim_wait import WaitStrategy
+
+
+class TestWaitStrategy(unittest.TestCase):
+
+    def test_wall_wait_respects_deadline(self):
+        """実時間モードでは期限を超えて待たないか確認"""
+        strategy = WaitStrategy(initial_sec=0.5, max_sec=0.5)
+        t0 = time.time()
+        strategy.wait(deadline=t0 + 0.02)
+        self.assertLess(time.time() - t0, 0.3)
+
+    def test_frozen_simulation_returns_at_deadline(self):
+        """シミュレーション時刻が止まっていても期限で戻るか確認"""
+        strategy = WaitStrategy(initial_sec=0.01, sim_time_func=lambda: 1000, sim_stall_sec=10.0)
+        t0 = time.time()
+        strategy.wait(deadline=t0 + 0.05)
+        self.assertLess(time.time() - t0, 1.0)
+
+    def test_frozen_simulation_returns_after_stall(self):
+        """期限がなくてもシミュレーション時刻の停止を検出して戻るか確認"""
+        strategy = WaitStrategy(initial_sec=0.01, sim_time_func=lambda: 0, sim_stall_sec=0.05)
+        t0 = time.time()
+        strategy.wait()
+        self.assertLess(time.time() - t0, 1.0)
+
+    def test_simulation_reset_returns(self):
+        """シミュレーション時刻が巻き戻ったら待ちを打ち切るか確認"""
+        clock = iter([5_000_000, 0] + [1] * 1000)
+        strategy = WaitStrategy(initial_sec=0.01, sim_time_func=lambda: next(clock), sim_stall_sec=10.0)
+        t0 = time.time()
+        strategy.wait()
+        self.assertLess(time.time() - t0, 1.0)
+
+    def test_simulation_interval(self):
+        """シミュレーション時刻が進めば、その間隔だけ待って backoff が進むか確認"""
+        state = {'usec': 0}
+
+        def clock():
+            state['usec'] += 1000
+            return state['usec']
+
+        strategy = WaitStrategy(initial_sec=0.004, max_sec=0.006, sim_time_func=clock, sim_poll_sec=0.0)
+        self.assertEqual(strategy.wait(), 0.004)
+        self.assertGreaterEqual(state['usec'], 5000)
+        self.assertEqual(strategy.interval_sec, 0.006)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -8,23 +8,19 @@ import cv2
 
 def image_display_thread(client, fps=15):
     interval = 1.0 / fps
-    while True:
-        start_time = time.time()
-
+    start_time = time.time()
+    # 応答を受け取った時点で次の撮影要求を出すストリームを使う (フレームは PDU バッファのビュー)
+    for response in client.simStreamImages("0", hakosim.ImageType.Scene, copy=False):
         try:
-            response = client.simGetImage("0", hakosim.ImageType.Scene)
-            if response:
-                img_np = np.frombuffer(response, dtype=np.uint8)
-                img_rgb = cv2.imdecode(img_np, cv2.IMREAD_COLOR)
-
-                if img_rgb is None or img_rgb.size == 0:
-                    print("Error: Failed to decode image")
-                else:
-                    cv2.imshow("Camera View", img_rgb)
-                    if cv2.waitKey(1) & 0xFF == ord('q'):
-                        break
+            img_np = np.frombuffer(response, dtype=np.uint8)
+            img_rgb = cv2.imdecode(img_np, cv2.IMREAD_COLOR)
+
+            if img_rgb is None or img_rgb.size == 0:
+                print("Error: Failed to decode image")
             else:
-                print("Error: No image received from client")
+                cv2.imshow("Camera View", img_rgb)
+                if cv2.waitKey(1) & 0xFF == ord('q'):
+                    break
 
         except Exception as e:
             print(f"Error: {e}")
@@ -32,6 +28,7 @@ def image_display_thread(client, fps=15):
         elapsed_time = time.time() - start_time
         wait_time = max(0, interval - elapsed_time)
         time.sleep(wait_time)
+        start_time = time.time()
 
     cv2.destroyAllWindows()
 